@@ -3,12 +3,68 @@
 This Python script implements several functionalities:
 
     1. Communication with the DRIVER (/dev/ADC_driver) via following functions
-        - open_driver(device_path) 
-        - close_driver(fd) 
+        - open_driver(source)           opens sample source (config section "sample_source") -
+                                        the driver, a FIFO, a simulator or a replay of recorded
+                                        samples (see sample_source.py)
+        - close_driver(source)
         - read_adc(fd, num_bytes)
+        - configure_acquisition(fd)     acquisition rate, averaging window and read mode
+        - start_ring(fd) / stop_ring(fd)
+        - map_ring(fd) / unmap_ring()
+        - open_epoll(fd) / wait_for_samples()   wakes up only on new samples or threshold crossing
     2. Reading and interpreting raw data got from ADC
-        - read_adc(fd, num_bytes)
+        - read_adc(fd, num_bytes)       one value per read() (config "ingest": "single") - the driver
+                                        samples continuously at "sample_rate", read() returns at once
+                                        the average of the last "average_window" samples or, with
+                                        "read_mode": "raw", the last sample
+        - read_adc_block(fd)            block of samples drained from the ring buffer (config "ingest": "block")
+        - read_ring()                   block of samples taken directly from mmap-ed ring buffer (config "ingest": "mmap")
+        - samples go through detection.DetectionEngine (filter, hysteresis, N-of-M
+          confirmation); with "edge_triggered" only transitions into range are sent
     3. Establishing gRPC communication with the Main gRPC-server
+        - unary request per detection, or
+        - one long-lived sample stream (config key "streaming")
+        - batches of samples flushed after N samples or T milliseconds
+          (config keys "batch_size" and "batch_interval_ms")
+        - samples delivered through shared memory ring instead of gRPC
+          (config "transport": "shm"), gRPC channel stays open as control plane
+    4. Latency tracing (config key "trace_buffer" > 0) - unary requests and
+       batches carry trace context in gRPC metadata, spans of the driver read,
+       detection and RPC are written to "trace_path" (see tracing.py)
+    5. Metrics (config key "metrics_address") - driver reads, samples, threshold
+       crossings, requests to the Main server and their latency, connection
+       retries served in Prometheus text format (see metrics.py)
+    6. Client mode (config key "client_mode") - "test" sends one request of
+       distance 1500 every 100 seconds, "sensor" runs the sensor loop on the
+       samples of the configured sample source
+    7. Multiple sensors (config section "sensors") - the driver samples every
+       listed sensor into its ring, samples carry the sensor id (ADC_SAMPLE()
+       in ADC_driver.h) and are split per sensor in one loop; every sensor has
+       its own detection engine ("threshold" and "detection" of its entry,
+       defaults - top level keys) and its id is sent with its samples.
+       Without "sensors" only sensor 0 is read.
+    8. Historian (config section "historian", "path" not empty) - every sample
+       read is kept in compact segment files with size and age retention
+       (see historian.py), queried with history_query.py
+    9. Edge aggregation (config section "aggregation", "window_ms" > 0) - samples
+       of every sensor are summarized per window (count, min, max, mean,
+       "percentiles", threshold crossings) and the summaries of all sensors are
+       sent to the Main server in one request per window, with raw samples
+       around the crossings ("pre_event_samples", "post_event_samples"); only
+       transitions into range are sent as detections (see aggregation.py)
+    10. Supervised channel to the Main server (config section "channel", see
+        channel_supervisor.py) - keepalive pings, reconnection in the
+        background with jittered exponential backoff, deadline of every
+        request and a circuit breaker; ADC client keeps reading while the
+        Main server is down: unary detections are dropped and counted,
+        batches wait in memory ("pending_batches", oldest dropped first) and
+        are sent when the Main server is back, the stream is reopened
+    11. Worker processes of the Main server (config key "main_worker_addresses",
+        the "worker_addresses" of the Main server in the same order) - one
+        supervised channel to every worker, samples, batches and summaries of
+        sensor s go to worker s % N, which keeps the detection engines of the
+        sensor; every worker has its own stream and its batches wait on their
+        own while it is down
     
 Scripts assignment is to read raw data got from ADC, interpret it and if
 nearby object has been detected, to send gRPC-request to Main gRPC-server
@@ -17,29 +73,131 @@ nearby object has been detected, to send gRPC-request to Main gRPC-server
 
 import os
 import time
+import mmap
+import select
+import struct
 import grpc
 import logging
+import queue
+from array import array
+from collections import deque
 import threading
 import config
+import detection
+import log_pipeline
+import shm_transport
+import tracing
+import metrics
+import sample_source
+import historian
+import aggregation
+import channel_supervisor
 import objectProximityDetectionService_pb2
 import objectProximityDetectionService_pb2_grpc
 
-# Configure logging
-logging.basicConfig(filename='ADC.log',
-                    level=logging.DEBUG,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
-
 # path to the config file in JSON format                    
 config_path       = "config_adc.json"
-ADC_DRIVER_DEVICE = "/dev/ADC_driver"	# device path to the driver file                          
+
+# Configure logging - records are formatted and written in batches by a background thread
+log_pipeline.setup_logging('ADC.log',
+                           fmt=config.get_config(config_path, 'log_format', default="text"),
+                           rate_limit=config.get_config(config_path, 'log_rate_limit', default=0))
+# config keys and their defaults (None - key is required)
+CONFIG_KEYS       = {'main': None, 'connection_time': None, 'threshold': None,
+                     'streaming': False, 'batch_size': 0, 'batch_interval_ms': 1000,
+                     'ingest': "single", 'wakeup_watermark': 1, 'read_interval_ms': 5000,
+                     'detection': {}, 'log_format': "text", 'log_rate_limit': 0,
+                     'transport': "grpc", 'shm_path': "/dev/shm/adc_samples",
+                     'trace_buffer': 0, 'trace_path': "ADC_trace.jsonl", 'metrics': "",
+                     'socket_mode': "0660", 'source': {}, 'client_mode': "test", 'sensors': [],
+                     'sample_rate': 1000, 'average_window': 20, 'read_mode': "averaged",
+                     'historian': {}, 'aggregation': {}, 'channel': {}, 'main_workers': []}
+ADC_DRIVER_DEVICE = "/dev/ADC_driver"	# device path to the driver file (default path of the "device" sample source)
+ADC_IOC_RING_START = (ord('a') << 8) | 1    # _IO('a', 1) from ADC_driver.h
+ADC_IOC_RING_STOP  = (ord('a') << 8) | 2    # _IO('a', 2) from ADC_driver.h
+ADC_IOC_SET_THRESHOLD = (1 << 30) | (4 << 16) | (ord('a') << 8) | 3   # _IOW('a', 3, __u32) from ADC_driver.h
+ADC_IOC_SET_WATERMARK = (1 << 30) | (4 << 16) | (ord('a') << 8) | 4   # _IOW('a', 4, __u32) from ADC_driver.h
+ADC_IOC_SET_SENSORS   = (1 << 30) | (4 << 16) | (ord('a') << 8) | 5   # _IOW('a', 5, __u32) from ADC_driver.h
+ADC_IOC_SET_RATE      = (1 << 30) | (4 << 16) | (ord('a') << 8) | 6   # _IOW('a', 6, __u32) from ADC_driver.h
+ADC_IOC_SET_AVERAGE   = (1 << 30) | (4 << 16) | (ord('a') << 8) | 7   # _IOW('a', 7, __u32) from ADC_driver.h
+ADC_IOC_SET_READ_MODE = (1 << 30) | (4 << 16) | (ord('a') << 8) | 8   # _IOW('a', 8, __u32) from ADC_driver.h
+ADC_READ_MODES        = {"averaged": 0, "raw": 1}                     # ADC_READ_AVERAGED, ADC_READ_RAW from ADC_driver.h
+ADC_SAMPLE_SENSOR_SHIFT = 16                # sensor id in bits 31-16 of a ring sample (ADC_SAMPLE() from ADC_driver.h)
+ADC_SAMPLE_VALUE_MASK   = 0xffff            # converted value in bits 15-0
+ADC_RING_HEADER    = struct.Struct('5I')    # head, tail, size, overruns, data_offset (struct adc_ring_header)
+ADC_BLOCK_SAMPLES  = 4096                   # max number of samples decoded at once
 adc_fd      = None						# file descriptor
-channel     = None                      # for communication with Main server
+adc_source  = None                      # sample source adc_fd belongs to
+channel     = None                      # channel_supervisor.ChannelSupervisor of the channel to Main server (its worker 0)
 stub        = None                      # for communication with Main server
+control_stub  = None                    # gRPC stub of the Main server, also with shared memory transport
+worker_channels = []                    # channels to the Main server workers ([channel] without workers)
+worker_stubs    = []                    # gRPC stubs of the Main server workers - samples of sensor s go to worker s % N
+sample_queues   = {}                    # worker -> samples waiting to be pushed on its stream
+stream_threads  = {}                    # worker -> thread consuming replies from its stream
+sequence_number = 0                     # sequence number of the last sample sent to Main server
+batch_distances = array('i')            # distances waiting to be sent in one batch
+batch_deltas    = array('I')            # per-sample timestamp deltas in microseconds
+batch_sensors   = array('I')            # sensor ids of the batched distances
+batch_base_us   = 0                     # monotonic timestamp of the first sample in batch
+batch_last_us   = 0                     # monotonic timestamp of the last sample in batch
+pending_batches = deque()               # (worker, batch request) not delivered yet, the worker was unreachable
+ring        = None                      # mmap-ed ring buffer of the driver
+ring_words  = None                      # ring buffer seen as array of __u32
+block_remainder = b""                   # bytes of a sample split by the last block read, start of the next block
+adc_epoll   = None                      # epoll object waiting for driver readiness
+engines     = {}                        # sensor id -> (detection engine deciding when object is in range, level triggered)
+read_started_us  = 0                    # monotonic time the last read of samples started
+read_finished_us = 0                    # monotonic time the last read of samples finished
+metrics_server   = None                 # HTTP server of metrics
+sample_history   = None                 # historian.Historian keeping every sample read
+aggregators      = {}                   # sensor id -> aggregation.WindowAggregator of the current window
+window_start_us  = 0                    # monotonic time the current aggregation window started
+
+# Metrics served on metrics_address
+reads_total        = metrics.Counter("adc_reads_total", "Reads of the ADC driver")
+samples_total      = metrics.Counter("adc_samples_read_total", "Samples read from the ADC driver")
+crossings_enter    = metrics.Counter("adc_threshold_crossings_total", "Transitions of the object into or out of range", {"direction": "enter"})
+crossings_exit     = metrics.Counter("adc_threshold_crossings_total", "Transitions of the object into or out of range", {"direction": "exit"})
+requests_ok        = metrics.Counter("adc_requests_total", "Requests sent to the Main server", {"outcome": "ok"})
+requests_error     = metrics.Counter("adc_requests_total", "Requests sent to the Main server", {"outcome": "error"})
+request_latency    = metrics.Histogram("adc_request_latency_seconds", "Latency of successful requests to the Main server")
+connect_retries    = metrics.Counter("adc_connect_retries_total", "Failed attempts to connect to the Main server")
+samples_dropped    = metrics.Counter("adc_samples_dropped_total", "Detections not delivered because the Main server was unreachable")
+main_available     = metrics.GaugeFunction("adc_main_available", "1 while the Main server is connected and its circuit is closed", lambda: int(all(worker.available() for worker in worker_channels)))
+shm_samples_lost   = metrics.CounterFunction("adc_shm_samples_lost_total", "Samples lost because the Main server was not attached to the shared memory ring", lambda: stub.producer.lost)
+batches_pending    = metrics.GaugeFunction("adc_pending_batches", "Batches waiting for the Main server to be reachable", lambda: len(pending_batches))
+summaries_total    = metrics.Counter("adc_summaries_total", "Aggregation window summaries sent to the Main server")
+history_samples    = metrics.CounterFunction("adc_historian_samples_total", "Samples written to the historian", lambda: sample_history.samples_written)
+source_overruns    = metrics.CounterFunction("adc_source_overruns_total", "Samples dropped by a simulated sample source because ADC client fell behind", lambda: adc_source.overruns())
 
 # global configuration data
 main_server_address  = None
 connection_time      = None
 threshold            = None
+streaming            = None
+batch_size           = None
+batch_interval_ms    = None
+ingest               = None
+wakeup_watermark     = None
+read_interval_ms     = None
+detection_settings   = None
+transport            = None
+shm_path             = None
+trace_buffer         = None
+trace_path           = None
+metrics_address      = None
+socket_mode          = None
+source_settings      = None
+client_mode          = None
+sensors              = None             # sensor id -> entry of config section "sensors"
+sample_rate          = None
+average_window       = None
+read_mode            = None
+historian_settings   = None
+aggregation_settings = None
+channel_settings     = None
+main_worker_addresses = None
 
 """
     Gets configuration data
@@ -48,44 +206,74 @@ threshold            = None
     :return: None
 """
 def get_configs():
-    global main_server_address, connection_time, threshold
+    global main_server_address, connection_time, threshold, streaming, batch_size, batch_interval_ms, ingest
+    global wakeup_watermark, read_interval_ms, detection_settings, transport, shm_path, trace_buffer, trace_path
+    global metrics_address, socket_mode, source_settings, client_mode, sensors, sample_rate, average_window, read_mode
+    global historian_settings, aggregation_settings, channel_settings, main_worker_addresses
     
     try:
-        main_server_address  = config.get_config(config_path, 'main')
-        connection_time      = config.get_config(config_path, 'connection_time')
-        threshold            = config.get_config(config_path, 'threshold')
+        settings             = config.Config(config_path, CONFIG_KEYS)
+        main_server_address  = settings.main
+        connection_time      = settings.connection_time
+        threshold            = settings.threshold
+        streaming            = settings.streaming
+        batch_size           = settings.batch_size
+        batch_interval_ms    = settings.batch_interval_ms
+        ingest               = settings.ingest
+        wakeup_watermark     = settings.wakeup_watermark
+        read_interval_ms     = settings.read_interval_ms
+        detection_settings   = settings.detection
+        transport            = settings.transport
+        shm_path             = settings.shm_path
+        trace_buffer         = settings.trace_buffer
+        trace_path           = settings.trace_path
+        metrics_address      = settings.metrics
+        socket_mode          = settings.socket_mode
+        source_settings      = settings.source
+        client_mode          = settings.client_mode
+        # No sensors listed - sensor 0 with the top level settings
+        sensors              = {sensor["id"]: sensor for sensor in settings.sensors} or {0: {}}
+        sample_rate          = settings.sample_rate
+        average_window       = settings.average_window
+        read_mode            = settings.read_mode
+        historian_settings   = settings.historian
+        aggregation_settings = settings.aggregation
+        channel_settings     = settings.channel
+        main_worker_addresses = settings.main_workers
     except Exception as e:
         logging.critical(f"An error occurred while getting config data: {e}")
         raise
 
 
 """
-    Opens driver and returns file descriptor (fd)
+    Opens driver (or other sample source) and returns file descriptor (fd)
     
-    :param device_path: Path to driver file (e.g. /dev/mydevice)
-    :return:            File descriptor (fd) or None if failed to open 
+    :param source: Sample source (sample_source.create_source())
+    :return:       File descriptor (fd) samples are read from
 """
-def open_driver(device_path):
+def open_driver(source):
     try:
-        fd = os.open(device_path, os.O_RDWR) 
-        logging.info(f"Driver {device_path} opened successfully. File descriptor: {fd}.")
+        fd = source.open()
+        logging.info(f"Driver {source.describe()} opened successfully. File descriptor: {fd}.")
         return fd
     except OSError as e:
-        logging.critical(f"Failed to open driver {device_path}: {e}.")
+        logging.critical(f"Failed to open driver {source.describe()}: {e}.")
         raise
 
 
 """
-    Closes driver
+    Closes driver (or other sample source)
     
-    :param fd: File descriptor (fd)
+    :param source: Sample source
 """
-def close_driver(fd):
+def close_driver(source):
     try:
-        os.close(fd)
-        logging.info(f"Driver {fd} closed successfully.")
+        if source.overruns():
+            logging.warning(f"Sample source {source.describe()} dropped {source.overruns()} samples.")
+        source.close()
+        logging.info(f"Driver {source.describe()} closed successfully.")
     except OSError as e:
-        logging.critical(f"Failed to close driver {fd}: {e}.")
+        logging.critical(f"Failed to close driver {source.describe()}: {e}.")
         raise
 
 
@@ -105,7 +293,7 @@ def read_adc(fd, num_bytes):
         # Interpretation of array of bytes into integer
         data_num = int.from_bytes(data_raw, byteorder='little')  # little-endian format
 
-        logging.info(f"Data received from ADC: {data_num}.")
+        logging.debug("Data received from ADC: %d.", data_num)
         return data_num
         
     except OSError as e:
@@ -113,6 +301,632 @@ def read_adc(fd, num_bytes):
         return None
 
 
+"""
+    Sets continuous acquisition of the driver - samples per second of every sensor,
+    number of samples averaged by read() of one value and read mode of this file
+    
+    :param fd: File descriptor
+    :return:   None
+"""
+def configure_acquisition(fd):
+    try:
+        adc_source.ioctl(ADC_IOC_SET_RATE, struct.pack('I', sample_rate))
+        adc_source.ioctl(ADC_IOC_SET_AVERAGE, struct.pack('I', average_window))
+        adc_source.ioctl(ADC_IOC_SET_READ_MODE, struct.pack('I', ADC_READ_MODES[read_mode]))
+        logging.info(f"Driver {fd} acquires {sample_rate} samples/s, reads {read_mode} values (window {average_window}).")
+    except OSError as e:
+        logging.critical(f"Failed to configure acquisition on driver {fd}: {e}.")
+        raise
+
+
+"""
+    Starts continuous acquisition of the driver into its ring buffer
+    
+    :param fd: File descriptor
+    :return:   None
+"""
+def start_ring(fd):
+    try:
+        adc_source.ioctl(ADC_IOC_RING_START)
+        logging.info(f"Driver {fd} started ring buffer acquisition.")
+    except OSError as e:
+        logging.critical(f"Failed to start ring buffer acquisition on driver {fd}: {e}.")
+        raise
+
+
+"""
+    Stops continuous acquisition of the driver
+    
+    :param fd: File descriptor
+    :return:   None
+"""
+def stop_ring(fd):
+    try:
+        adc_source.ioctl(ADC_IOC_RING_STOP)
+        logging.info(f"Driver {fd} stopped ring buffer acquisition.")
+    except OSError as e:
+        logging.error(f"Failed to stop ring buffer acquisition on driver {fd}: {e}.")
+
+
+"""
+    Reads block of samples from the ring buffer of the driver with a single read()
+    and decodes it at once. A writer of a FIFO may split a sample between its writes -
+    bytes of the split sample are kept and decoded with the rest of it by the next read.
+    
+    :param fd:          File descriptor
+    :param max_samples: Max number of samples to be read
+    :return:            array('i') of samples (empty if no new samples), None if failed
+"""
+def read_adc_block(fd, max_samples=ADC_BLOCK_SAMPLES):
+    global block_remainder
+    
+    try:
+        data_raw = block_remainder + os.read(fd, max_samples * 4 - len(block_remainder))
+        
+        # Whole block interpreted at once, samples are 32-bit little-endian words
+        whole           = len(data_raw) - len(data_raw) % 4
+        block_remainder = data_raw[whole:]
+        samples = array('i')
+        samples.frombytes(data_raw[:whole])
+        
+        return samples
+        
+    except OSError as e:
+        logging.error(f"Failed to receive data block from ADC: {e}.")
+        return None
+
+
+"""
+    Maps the ring buffer of the driver into the address space of the process
+    
+    :param fd: File descriptor
+    :return:   None
+"""
+def map_ring(fd):
+    global ring, ring_words
+    
+    try:
+        # Header tells where samples start and how many slots there are
+        with mmap.mmap(fd, mmap.PAGESIZE, mmap.MAP_SHARED, mmap.PROT_READ) as header:
+            _, _, size, _, data_offset = ADC_RING_HEADER.unpack_from(header)
+        
+        ring       = mmap.mmap(fd, data_offset + size * 4, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        ring_words = memoryview(ring).cast('I')
+        logging.info(f"Driver {fd} ring buffer mapped: {size} samples.")
+    except (OSError, ValueError) as e:
+        logging.critical(f"Failed to map ring buffer of driver {fd}: {e}.")
+        raise
+
+
+"""
+    Unmaps the ring buffer of the driver
+    
+    :param : None
+    :return: None
+"""
+def unmap_ring():
+    global ring, ring_words
+    
+    if ring_words is not None:
+        ring_words.release()
+    if ring is not None:
+        ring.close()
+    ring       = None
+    ring_words = None
+
+
+"""
+    Takes all new samples directly from the mmap-ed ring buffer, without a syscall
+    
+    :param : None
+    :return: array('i') of samples (empty if no new samples)
+"""
+def read_ring():
+    head, tail, size, overruns, data_offset = ring_words[0], ring_words[1], ring_words[2], ring_words[3], ring_words[4]
+    
+    count = (head - tail) & 0xFFFFFFFF
+    start = tail & (size - 1)
+    first = min(count, size - start)
+    
+    # Ring may wrap around - copy in two chunks
+    samples = array('i')
+    samples.frombytes(ring[data_offset + start * 4 : data_offset + (start + first) * 4])
+    samples.frombytes(ring[data_offset : data_offset + (count - first) * 4])
+    
+    # Slots are released to the driver only after they have been copied
+    ring_words[1] = (tail + count) & 0xFFFFFFFF
+    
+    if overruns:
+        logging.warning(f"ADC ring buffer overruns: {overruns}.")
+    
+    return samples
+
+
+"""
+    Selects sensors the driver samples into its ring buffer
+    
+    :param fd: File descriptor
+    :return:   None
+"""
+def select_sensors(fd):
+    mask = 0
+    for sensor_id in sensors:
+        mask |= 1 << sensor_id
+    
+    try:
+        adc_source.ioctl(ADC_IOC_SET_SENSORS, struct.pack('I', mask))
+        logging.info(f"Driver {fd} samples sensors {sorted(sensors)}.")
+    except OSError as e:
+        if list(sensors) == [0]:
+            # Driver without sensors samples sensor 0 only
+            logging.warning(f"Driver {fd} does not select sensors ({e}), sensor 0 is read.")
+            return
+        logging.critical(f"Failed to select sensors {sorted(sensors)} on driver {fd}: {e}.")
+        raise
+
+
+"""
+    Configures driver readiness (threshold crossing and watermark) and registers
+    driver in epoll, so the process sleeps until there is something to read
+    
+    :param fd: File descriptor
+    :return:   None
+"""
+def open_epoll(fd):
+    global adc_epoll
+    
+    # Driver has one threshold for all sensors - it wakes up on the lowest one
+    wakeup_threshold = min(engine.threshold for engine, _ in engines.values())
+    
+    try:
+        adc_source.ioctl(ADC_IOC_SET_THRESHOLD, struct.pack('I', max(wakeup_threshold, 0)))
+        adc_source.ioctl(ADC_IOC_SET_WATERMARK, struct.pack('I', wakeup_watermark))
+        
+        adc_epoll = select.epoll()
+        adc_epoll.register(fd, select.EPOLLIN | select.EPOLLPRI)
+        logging.info(f"Driver {fd} registered in epoll: threshold = {wakeup_threshold}, watermark = {wakeup_watermark}.")
+    except OSError as e:
+        logging.critical(f"Failed to set up readiness notification on driver {fd}: {e}.")
+        raise
+
+
+"""
+    Closes epoll object
+    
+    :param : None
+    :return: None
+"""
+def close_epoll():
+    global adc_epoll
+    
+    if adc_epoll is not None:
+        adc_epoll.close()
+    adc_epoll = None
+
+
+"""
+    Blocks until the driver has new samples or a threshold crossing. In "single" ingest
+    mode (no ring buffer to wait on) sleeps read_interval_ms instead.
+    Waiting is limited by batch_interval_ms while a batch is pending, so the batch is
+    flushed in time, and by the end of the aggregation window.
+    
+    :param : None
+    :return: None
+"""
+def wait_for_samples():
+    if ingest == "single":
+        time.sleep(read_interval_ms / 1000)
+        return
+    
+    timeouts = []
+    if batch_size > 0 and len(batch_distances) > 0:
+        timeouts.append(max(batch_interval_ms / 1000 - (time.monotonic_ns() // 1000 - batch_base_us) / 1e6, 0))
+    if aggregators:
+        timeouts.append(max(aggregation_settings["window_ms"] / 1000 - (time.monotonic_ns() // 1000 - window_start_us) / 1e6, 0))
+    if pending_batches:
+        # Undelivered batches are retried every batch interval
+        timeouts.append(batch_interval_ms / 1000)
+    timeout = min(timeouts) if timeouts else None
+    
+    for fd, events in adc_epoll.poll(timeout):
+        if events & select.EPOLLPRI:
+            logging.debug("ADC driver reported threshold crossing.")
+        if events & select.EPOLLERR:
+            logging.error("ADC driver reported error - ring buffer acquisition is not running.")
+            time.sleep(1)
+
+
+"""
+    Reads all new samples from the driver according to the configured ingest mode
+    
+    :param fd: File descriptor
+    :return:   array('i') of samples
+"""
+def read_samples(fd):
+    if ingest == "mmap":
+        return read_ring()
+    
+    if ingest == "block":
+        samples = read_adc_block(fd)
+        return samples if samples is not None else array('i')
+    
+    data = read_adc(fd, 4)
+    return array('i', [data]) if data is not None else array('i')
+
+
+"""
+    Splits block of ring samples into the samples of each sensor
+    
+    :param samples: array('i') of ring samples (sensor id and converted value)
+    :return:        Dict sensor id -> array('i') of its values, in the order they were taken
+"""
+def split_sensors(samples):
+    if list(sensors) == [0] and (len(samples) == 0 or max(samples) <= ADC_SAMPLE_VALUE_MASK):
+        # Samples of sensor 0 are plain values
+        return {0: samples}
+    
+    per_sensor = {}
+    for sample in samples:
+        sensor_id = sample >> ADC_SAMPLE_SENSOR_SHIFT
+        values    = per_sensor.get(sensor_id)
+        if values is None:
+            values = per_sensor[sensor_id] = array('i')
+        values.append(sample & ADC_SAMPLE_VALUE_MASK)
+    return per_sensor
+
+
+"""
+    Starts the historian, if enabled in config (historian path)
+    
+    :param : None
+    :return: None
+"""
+def start_historian():
+    global sample_history
+    
+    path = historian_settings.get("path", "")
+    if not path:
+        return
+    
+    sample_history = historian.Historian(path,
+                                         block_samples=historian_settings.get("block_samples", 4096),
+                                         segment_bytes=historian_settings.get("segment_mb", 16) * 2**20,
+                                         segment_seconds=historian_settings.get("segment_seconds", 3600),
+                                         max_bytes=historian_settings.get("max_mb", 512) * 2**20,
+                                         max_age=historian_settings.get("max_days", 7) * 86400)
+    sample_history.start()
+    logging.info(f"ADC client keeps samples in historian {path}.")
+
+
+"""
+    Writes samples waiting in memory and stops the historian
+    
+    :param : None
+    :return: None
+"""
+def stop_historian():
+    if sample_history is not None:
+        sample_history.stop()
+
+
+"""
+    Starts aggregation windows of all sensors, if enabled in config (aggregation window_ms)
+    
+    :param : None
+    :return: None
+"""
+def start_aggregation():
+    global window_start_us
+    
+    if aggregation_settings.get("window_ms", 0) <= 0:
+        return
+    
+    for sensor_id, (engine, _) in engines.items():
+        aggregators[sensor_id] = aggregation.WindowAggregator(engine.threshold,
+                                                              aggregation_settings.get("percentiles", []),
+                                                              aggregation_settings.get("pre_event_samples", 0),
+                                                              aggregation_settings.get("post_event_samples", 0))
+    window_start_us = time.monotonic_ns() // 1000
+    logging.info(f"ADC client sends summaries of {aggregation_settings['window_ms']} ms windows to the Main server "
+                 f"({'NumPy' if aggregation.numpy is not None else 'pure Python'} aggregation).")
+
+
+"""
+    Checks whether the aggregation window is over
+    
+    :param : None
+    :return: True if summaries have to be sent
+"""
+def summary_due():
+    return (time.monotonic_ns() // 1000 - window_start_us) >= aggregation_settings["window_ms"] * 1000
+
+
+"""
+    Sends summaries of the window of all sensors to the Main server in one gRPC-request
+    (one per worker of the Main server) and starts the next window
+    
+    :param : None
+    :return: None
+"""
+def send_summary():
+    global sequence_number, window_start_us
+    
+    now_us    = time.monotonic_ns() // 1000
+    # With shared memory transport summaries go on the control channel, there are no workers
+    stubs     = worker_stubs if transport == "grpc" else [control_stub]
+    summaries = [[] for _ in stubs]
+    for sensor_id, aggregator in aggregators.items():
+        summary = aggregator.summary()
+        if summary is not None:
+            summaries[sensor_id % len(stubs)].append(objectProximityDetectionService_pb2.SensorSummary(sensor_id=sensor_id, **summary))
+    
+    for worker, worker_summaries in enumerate(summaries):
+        sequence_number += 1
+        request = objectProximityDetectionService_pb2.ObjectProximitySummaryRequest(sequence_number=sequence_number,
+                                                                                   start_timestamp_us=window_start_us,
+                                                                                   window_us=now_us - window_start_us,
+                                                                                   percentiles=aggregation_settings.get("percentiles", []),
+                                                                                   sensors=worker_summaries)
+        logging.debug("ADC client sends summary to Main server: seq=%d, sensors=%d", sequence_number, len(worker_summaries))
+        
+        try:
+            with metrics.track_call(request_latency, requests_ok, requests_error):
+                stubs[worker].ObjectProximitySummary(request)
+            summaries_total.inc()
+        except grpc.RpcError as e:
+            # Summary of the window is lost, samples keep being aggregated into the next one
+            logging.error(f"RPC error occurred while sending summary to the Main server : {e.code()} - {e.details()}")
+    window_start_us = now_us
+
+
+"""
+    Handles a sample over the threshold - batches it or sends it to the Main server
+    
+    :param sensor_id: Id of the sensor which detected the object
+    :param data:      Detected object proximity distance
+    :return: None
+"""
+def handle_detection(sensor_id, data):
+    logging.info("Object Detected: ADC client sends request to Main server. sensor = %d, distance = %d", sensor_id, data)
+    if batch_size > 0:
+        add_to_batch(sensor_id, data)
+    else:
+        send_sample(sensor_id, data)
+
+
+"""
+    Yields samples queued by sensor_run() as requests on the stream to Main server.
+    Stream is half-closed when None is queued.
+    
+    :param sample_queue: Queue of the stream
+    :return: Generator of ObjectProximityDetectionRequest
+"""
+def sample_stream(sample_queue):
+    while True:
+        request = sample_queue.get()
+        if request is None:
+            return
+        yield request
+
+
+"""
+    Opens long-lived sample stream to the Main server (its worker) and starts thread
+    which consumes acknowledgements sent back by the Main server
+    
+    :param worker: Index of the Main server worker
+    :return: None
+"""
+def open_stream(worker=0):
+    sample_queue = sample_queues[worker] = queue.Queue()
+    
+    def consume_replies():
+        try:
+            for reply in worker_stubs[worker].ObjectProximityDetectionStream(sample_stream(sample_queue)):
+                logging.debug("ADC client received reply from Main server: seq=%d, sensor=%d, action=%d, %s", reply.sequence_number, reply.sensor_id, reply.action, reply.message)
+        except grpc.RpcError as e:
+            logging.error(f"RPC error occurred on ADC - MAIN sample stream : {e.code()} - {e.details()}")
+    
+    stream_threads[worker] = threading.Thread(target=consume_replies, name=f"ADC-stream-{worker}", daemon=True)
+    stream_threads[worker].start()
+    logging.info(f"ADC client opened sample stream to the Main server running on {worker_channels[worker].address}.")
+
+
+"""
+    Half-closes sample streams and waits for the Main server to acknowledge remaining samples
+    
+    :param timeout: Max number of seconds to wait for remaining acknowledgements of each stream
+    :return: None
+"""
+def close_stream(timeout=5):
+    for sample_queue in sample_queues.values():
+        sample_queue.put(None)
+    for stream_thread in stream_threads.values():
+        stream_thread.join(timeout)
+    logging.info("ADC client closed sample stream to the Main server.")
+
+
+"""
+    Sends detected distance to the Main server - pushes it on the stream
+    if streaming is enabled, otherwise sends unary gRPC-request
+    
+    :param sensor_id: Id of the sensor which detected the object
+    :param data:      Detected object proximity distance
+    :return: None
+"""
+def send_sample(sensor_id, data):
+    global sequence_number
+    
+    sequence_number += 1
+    request = objectProximityDetectionService_pb2.ObjectProximityDetectionRequest(message="Object Detected",
+                                                                                 object_proximity_distance=data,
+                                                                                 sequence_number=sequence_number,
+                                                                                 sensor_id=sensor_id)
+    # Sensor is pinned to one worker of the Main server, which keeps its detection engines
+    worker = sensor_id % len(worker_stubs)
+    if streaming:
+        if not stream_threads[worker].is_alive():
+            # Stream ended with the connection, it is reopened once the Main server is back
+            if not worker_channels[worker].available():
+                samples_dropped.inc()
+                return
+            open_stream(worker)
+        # Stream metadata is sent once per stream - samples on it are not traced
+        sample_queues[worker].put(request)
+    else:
+        trace   = tracing.start(sequence_number)
+        sent_us = tracing.now_us()
+        tracing.record(trace, "adc.read", read_started_us, read_finished_us)
+        tracing.record(trace, "adc.detect", read_finished_us, sent_us)
+        
+        try:
+            with metrics.track_call(request_latency, requests_ok, requests_error):
+                reply = worker_stubs[worker].ObjectProximityDetection(request, metadata=tracing.metadata(trace, sent_us))
+        except grpc.RpcError as e:
+            # Detection is lost, ADC client keeps reading - samples are in the historian if it is enabled
+            samples_dropped.inc()
+            logging.error(f"RPC error occurred at ADC - MAIN line : {e.code()} - {e.details()}")
+            return
+        tracing.record(trace, "adc.rpc", sent_us, tracing.now_us())
+        logging.info("ADC client received reply from Main server: %s", reply.message)
+
+
+"""
+    Splits batched samples among the Main server workers their sensors are pinned to
+    
+    :param : None
+    :return: Dict worker -> (base timestamp, distances, timestamp deltas, sensor ids) of its samples
+"""
+def split_batch():
+    if len(worker_stubs) == 1:
+        return {0: (batch_base_us, batch_distances, batch_deltas, batch_sensors)}
+    
+    parts     = {}
+    last_us   = {}      # worker -> timestamp of the last sample of its part
+    sample_us = batch_base_us
+    for distance, delta, sensor_id in zip(batch_distances, batch_deltas, batch_sensors):
+        sample_us += delta
+        worker     = sensor_id % len(worker_stubs)
+        if worker not in parts:
+            parts[worker]   = (sample_us, array('i'), array('I'), array('I'))
+            last_us[worker] = sample_us
+        _, distances, deltas, sensor_ids = parts[worker]
+        distances.append(distance)
+        # Deltas are taken again between the samples of the part
+        deltas.append(sample_us - last_us[worker])
+        sensor_ids.append(sensor_id)
+        last_us[worker] = sample_us
+    return parts
+
+
+"""
+    Sends all batched samples to the Main server in one gRPC-request (one per worker of the Main server)
+    
+    :param : None
+    :return: None
+"""
+def flush_batch():
+    global sequence_number, batch_distances, batch_deltas, batch_sensors
+    
+    if len(batch_distances) == 0:
+        return
+    
+    for worker, (base_us, distances, deltas, sensor_ids) in split_batch().items():
+        sequence_number += 1
+        request = objectProximityDetectionService_pb2.ObjectProximityDetectionBatchRequest(sequence_number=sequence_number,
+                                                                                          base_timestamp_us=base_us,
+                                                                                          object_proximity_distances=distances,
+                                                                                          timestamp_deltas_us=deltas,
+                                                                                          sensor_ids=sensor_ids)
+        logging.info("ADC client sends batch to Main server: seq=%d, samples=%d", sequence_number, len(distances))
+        pending_batches.append((worker, request))
+    
+    batch_distances = array('i')
+    batch_deltas    = array('I')
+    batch_sensors   = array('I')
+    
+    max_pending = channel_settings.get("pending_batches", 1000)
+    while len(pending_batches) > max(max_pending, 1):
+        _, dropped = pending_batches.popleft()
+        samples_dropped.inc(len(dropped.object_proximity_distances))
+        logging.warning("ADC client dropped undelivered batch seq=%d, %d batches wait for the Main server.", dropped.sequence_number, max_pending)
+    send_pending_batches()
+
+
+"""
+    Sends batches waiting for the Main server, oldest first, while it is reachable.
+    Batches of a worker which is down wait, those of the other workers are sent.
+    
+    :param : None
+    :return: None
+"""
+def send_pending_batches():
+    waiting = set()     # workers which are down
+    for entry in list(pending_batches):
+        worker, request = entry
+        if worker in waiting:
+            continue
+        # Main server is down, batches wait until it is back - attached to shared memory again
+        # or connected (closes the circuit)
+        if transport == "shm":
+            down = not stub.available()
+        else:
+            down = worker_channels[worker].breaker.is_open()
+        if down:
+            waiting.add(worker)
+            continue
+        
+        trace   = tracing.start(request.sequence_number)
+        sent_us = tracing.now_us()
+        # Oldest sample of the batch waited from its detection until now
+        tracing.record(trace, "adc.batch", request.base_timestamp_us, sent_us)
+        
+        try:
+            with metrics.track_call(request_latency, requests_ok, requests_error):
+                reply = worker_stubs[worker].ObjectProximityDetectionBatch(request, metadata=tracing.metadata(trace, sent_us))
+        except grpc.RpcError as e:
+            logging.error(f"RPC error occurred at ADC - MAIN line : {e.code()} - {e.details()}, {len(pending_batches)} batches wait for the Main server")
+            waiting.add(worker)
+            continue
+        pending_batches.remove(entry)
+        tracing.record(trace, "adc.rpc", sent_us, tracing.now_us())
+        logging.info("ADC client received reply from Main server: seq=%d, action=%d, %s", reply.sequence_number, reply.action, reply.message)
+
+
+"""
+    Adds detected distance to the batch, batch is sent when it holds batch_size samples
+    
+    :param sensor_id: Id of the sensor which detected the object
+    :param data:      Detected object proximity distance
+    :return: None
+"""
+def add_to_batch(sensor_id, data):
+    global batch_base_us, batch_last_us
+    
+    now_us = time.monotonic_ns() // 1000
+    
+    if len(batch_distances) == 0:
+        batch_base_us = now_us
+        batch_last_us = now_us
+    
+    batch_distances.append(data)
+    batch_sensors.append(sensor_id)
+    batch_deltas.append(now_us - batch_last_us)
+    batch_last_us = now_us
+    
+    if len(batch_distances) >= batch_size:
+        flush_batch()
+
+
+"""
+    Checks whether the oldest batched sample waits longer than batch_interval_ms
+    
+    :param : None
+    :return: True if batch has to be sent
+"""
+def batch_due():
+    return len(batch_distances) > 0 and (time.monotonic_ns() // 1000 - batch_base_us) >= batch_interval_ms * 1000
+
+
 """
     Checks whether a nearby object has been detected.
     Sends gRPC-request to the Main gRPC-server if nearby object has been detected.
@@ -122,32 +936,99 @@ def read_adc(fd, num_bytes):
 """
 def sensor_run():
     
-    global adc_fd, stub, channel, threshold   # Access global variables
+    global adc_fd, adc_source, stub, channel, threshold, engines, read_started_us, read_finished_us   # Access global variables
+    
+    for sensor_id, entry in sensors.items():
+        settings = entry.get("detection", detection_settings)
+        # Aggregating client sends raw samples around crossings with the summaries, detections only on transitions
+        engines[sensor_id] = (detection.create_engine(entry.get("threshold", threshold), settings),
+                              not settings.get("edge_triggered", False) and aggregation_settings.get("window_ms", 0) <= 0)
+    if ingest == "single" and list(sensors) != [0]:
+        raise ValueError(f"Ingest 'single' reads sensor 0 only, sensors {sorted(sensors)} need ingest 'block' or 'mmap'.")
 
-    # Opens ADC driver
+    # Opens ADC driver, or the sample source replacing it
+    adc_source = sample_source.create_source(source_settings, ADC_DRIVER_DEVICE)
+    if ingest == "mmap" and not adc_source.mmap_ring:
+        raise ValueError(f"Ingest 'mmap' needs the ADC driver, sample source {adc_source.describe()} has no ring buffer to map.")
     try:
-        adc_fd = open_driver(ADC_DRIVER_DEVICE)
+        adc_fd = open_driver(adc_source)
     except Exception:
         raise
+    
+    configure_acquisition(adc_fd)
+    if ingest != "single":
+        select_sensors(adc_fd)
+        start_ring(adc_fd)
+    if ingest == "mmap":
+        map_ring(adc_fd)
+    if ingest != "single":
+        open_epoll(adc_fd)
+    
+    if streaming:
+        for worker in range(len(worker_stubs)):
+            open_stream(worker)
+    start_historian()
+    start_aggregation()
      
     try:    
         while True:
-            data = read_adc(adc_fd, 4)
-
-            if data > threshold:
-                logging.info(f"Object Detected: ADC client sends request to Main server. distance = {data}")
-                
-                request  = objectProximityDetectionService_pb2.ObjectProximityDetectionRequest(message="Object Detected",object_proximity_distance=data)
-                reply    = stub.ObjectProximityDetection(request)
-                    
-                logging.info(f"ADC client received reply from Main server: {reply.message}")
+            read_started_us  = time.monotonic_ns() // 1000
+            samples          = read_samples(adc_fd)
+            read_finished_us = time.monotonic_ns() // 1000
+            reads_total.inc()
+            samples_total.inc(len(samples))
+            
+            # Quiet blocks are skipped at once, only state transitions (and samples in range if level triggered) are sent
+            for sensor_id, values in split_sensors(samples).items():
+                if sample_history is not None:
+                    # Samples of a block were taken one acquisition period apart, the last one just now
+                    sample_history.append(sensor_id, values, time.time_ns() // 1000, 0 if ingest == "single" else 1_000_000 // sample_rate)
+                engine, level = engines.get(sensor_id, (None, False))
+                if engine is None:
+                    continue
+                if aggregators:
+                    aggregators[sensor_id].add(values)
+                for data, event in engine.update_block(values, level):
+                    if event == detection.EXIT:
+                        crossings_exit.inc()
+                        logging.info("Object left the range: sensor = %d, distance = %d", sensor_id, data)
+                    else:
+                        if event == detection.ENTER:
+                            crossings_enter.inc()
+                        handle_detection(sensor_id, data)
+            
+            if batch_size > 0 and batch_due():
+                flush_batch()
+            elif pending_batches:
+                send_pending_batches()
+            if aggregators and summary_due():
+                send_summary()
             
-            time.sleep(5)
+            wait_for_samples()
                 
     except KeyboardInterrupt:
         logging.info("ADC client is shuting down.")
-        close_driver(adc_fd)
-        channel.close()
+        if batch_size > 0:
+            flush_batch()
+            if pending_batches:
+                logging.warning(f"{len(pending_batches)} batches were not delivered to the Main server.")
+        if aggregators:
+            send_summary()
+        if streaming:
+            close_stream()
+        if ingest != "single":
+            close_epoll()
+        if ingest == "mmap":
+            unmap_ring()
+        if ingest != "single":
+            stop_ring(adc_fd)
+        close_driver(adc_source)
+        stop_historian()
+        if transport == "shm":
+            stub.close()
+        for worker_channel in worker_channels:
+            worker_channel.close()
+        stop_metrics()
         return  
 
 def test():
@@ -159,60 +1040,119 @@ def test():
             logging.info(f"Object Detected: ADC client sends request to Main server. Message: object_proximity_distance = {data}")
                 
             request  = objectProximityDetectionService_pb2.ObjectProximityDetectionRequest(message="Object Detected",object_proximity_distance=data)
-            reply    = stub.ObjectProximityDetection(request)
-                
-            logging.info(f"ADC client received reply from Main server: {reply.message}")
+            try:
+                reply = stub.ObjectProximityDetection(request)
+                logging.info(f"ADC client received reply from Main server: {reply.message}")
+            except grpc.RpcError as e:
+                logging.error(f"RPC error occurred at ADC - MAIN line : {e.code()} - {e.details()}")
             
             time.sleep(100)
     except KeyboardInterrupt:
         logging.info("ADC client is shuting down.")
-        channel.close()
+        for worker_channel in worker_channels:
+            worker_channel.close()
+        stop_metrics()
         return   
         
 
 """
-    Connects to the local main gRPC server
+    Starts serving metrics, if enabled in config (metrics_address)
+    
+    :param : None
+    :return: None
+"""
+def start_metrics():
+    global metrics_server
+    
+    if metrics_address:
+        metrics_server = metrics.start_server(metrics_address, socket_mode)
+
+"""
+    Stops serving metrics
+    
+    :param : None
+    :return: None
+"""
+def stop_metrics():
+    if metrics_server is not None:
+        metrics.stop_server(metrics_server, metrics_address)
+
+"""
+    Counts connection failures of the Main server channel, called by the channel supervisor
     
-    :param max_retries: Max number of connection retries 
+    :param state: New grpc.ChannelConnectivity of the channel
+    :return: None
+"""
+def main_state_changed(state):
+    if state == grpc.ChannelConnectivity.TRANSIENT_FAILURE:
+        connect_retries.inc()
+
+"""
+    Connects to the local main gRPC server. Channel is supervised (config section "channel") -
+    ADC client does not wait for the Main server, channel reconnects in the background
+    and requests fail fast while the Main server is down.
+    
+    :param max_retries: Max number of attempts to attach to the shared memory ring of the Main server
     :return: None
 """
 def use_MAIN(max_retries=3):
     
     attempt = 1
-    global stub, channel, main_server_address, connection_time
+    global stub, control_stub, channel, worker_channels, worker_stubs, main_server_address, connection_time
     
-    while attempt <= max_retries:
+    if main_worker_addresses and transport == "shm":
+        raise ValueError("Transport 'shm' delivers samples to one Main server process, 'main_worker_addresses' need transport 'grpc'.")
+    
+    logging.info(f"ADC client trying to connect to the Main server...")
+    
+    # Every worker of the Main server has its own channel, the Main server without workers one
+    worker_channels = [channel_supervisor.ChannelSupervisor(f"Main server worker {worker}" if main_worker_addresses else "Main server",
+                                                            address, channel_settings, on_state_change=main_state_changed)
+                       for worker, address in enumerate(main_worker_addresses or [main_server_address])]
+    for worker_channel in worker_channels:
+        worker_channel.start()
+    worker_stubs = [worker_channel.stub(objectProximityDetectionService_pb2_grpc.ObjectProximityDetectionServiceStub)
+                    for worker_channel in worker_channels]
+    channel      = worker_channels[0]
+    stub         = worker_stubs[0]
+    control_stub = stub
+    
+    # Workers are waited for together - connection_time in all
+    deadline = time.monotonic() + connection_time
+    for worker_channel in worker_channels:
+        if worker_channel.wait_ready(max(deadline - time.monotonic(), 0)):
+            logging.info(f"ADC client connected to the Main server running on {worker_channel.address}.")
+        else:
+            logging.error(f"Timeout limit exceeded. ADC client couldnt establish connection with Main server running on {worker_channel.address}, "
+                          f"it keeps connecting in the background.")
+    
+    while transport == "shm":
         try:
-            logging.info(f"ADC client trying to connect to the Main server...")
-            
-            # Creates channel
-            channel = grpc.insecure_channel(main_server_address)
-            # Checks if channel is ready for communication
-            grpc.channel_ready_future(channel).result(timeout=connection_time)
-            # Stub creating
-            stub    = objectProximityDetectionService_pb2_grpc.ObjectProximityDetectionServiceStub(channel)
-            
-            logging.info(f"ADC client connected to the Main server running on {main_server_address}.")
+            # Samples go through shared memory, Main server creates the ring when it starts
+            stub = shm_transport.ShmSampleStub(shm_path)
+            worker_stubs = [stub]
+            logging.info(f"ADC client sends samples to the Main server through shared memory {shm_path}.")
             return
-            
-        except grpc.FutureTimeoutError:
-            logging.error(f"Timeout limit exceeded. ADC client couldnt establish connection with Main server running on {main_server_address}")
-        except grpc.RpcError as e:
-            logging.error(f"RPC error occurred at ADC - MAIN line : {e.code()} - {e.details()}")
-        except Exception as e:
-            logging.error(f"ADC client failed to connect to the Main server running on {main_server_address}: {e}")
-            
+        except ConnectionError as e:
+            logging.error(f"ADC client failed to attach to the Main server shared memory: {e}")
+        
         attempt += 1
+        connect_retries.inc()
         
         if attempt <= max_retries:
-            logging.warning(f"ADC Retrying to connect to the Main server running on {main_server_address} in 3 seconds...")
-            time.sleep(3)
+            delay = channel_supervisor.jitter(min(channel.reconnect_initial * 2 ** attempt, channel.reconnect_max))
+            logging.warning(f"ADC Retrying to attach to the Main server shared memory in {delay:.1f} seconds...")
+            time.sleep(delay)
         else:
-            logging.critical(f"ADC reached max connection retries. Unable to connect to the Main server running on {main_server_address}  after multiple attempts!")
-            if 'channel' in globals() and channel is not None:
-                channel.close()
-            raise RuntimeError("ADC failed to connect to the Main server after multiple attempts.")
+            logging.critical(f"ADC reached max attach retries. Unable to attach to the Main server shared memory {shm_path} after multiple attempts!")
+            channel.close()
+            raise RuntimeError("ADC failed to attach to the Main server shared memory after multiple attempts.")
 
 get_configs()        
+tracing.setup("adc", trace_buffer, trace_path)
+start_metrics()
 use_MAIN()
-test()
+if client_mode == "sensor":
+    sensor_run()
+else:
+    test()
@@ -6,44 +6,128 @@
 #include <linux/ktime.h>
 #include <linux/delay.h>
 #include <linux/hrtimer.h>
+#include <linux/mm.h>
+#include <linux/mutex.h>
+#include <linux/vmalloc.h>
+#include <linux/workqueue.h>
+#include <linux/uaccess.h>
+#include <linux/poll.h>
+#include <linux/wait.h>
+#include <linux/slab.h>
+#include <linux/spinlock.h>
+#include "ADC_driver.h"
 
 
 MODULE_LICENSE("GPL");
 MODULE_AUTHOR("Anja Dj.");
 MODULE_DESCRIPTION("ADC Driver");
-MODULE_VERSION("4.0");
+MODULE_VERSION("6.0");
 
 #define I2C_CLIENT_NAME ("CLIENT_ADC")
 #define I2C_CLIENT_ADDR (0x48)
 
 static struct i2c_adapter *i2c_client_adapter = NULL;
-static struct i2c_client  *i2c_client_device  = NULL;
+static struct i2c_client  *i2c_client_devices[ADC_MAX_DEVICES];
 
-/* Timer dependencies */
-static struct hrtimer mytimer;
-static ktime_t kt;
+/* Sensor table (see ADC_driver.h), e.g. two converters with 3 sensors:
+ *   insmod ADC_driver.ko addresses=0x48,0x49 channels=1,2,0 devices=0,0,1 */
+static int i2c_bus = 1;
+module_param(i2c_bus, int, 0444);
+MODULE_PARM_DESC(i2c_bus, "I2C adapter the A/D converters are connected to");
+
+static unsigned short addresses[ADC_MAX_DEVICES] = { I2C_CLIENT_ADDR };
+static int num_addresses = 1;
+module_param_array(addresses, ushort, &num_addresses, 0444);
+MODULE_PARM_DESC(addresses, "I2C addresses of the A/D converters");
+
+static unsigned int channels[ADC_MAX_SENSORS] = { 1 };
+static int num_sensors = 1;
+module_param_array(channels, uint, &num_sensors, 0444);
+MODULE_PARM_DESC(channels, "Channel of every sensor, sensor id is its position in the list");
+
+static unsigned int devices[ADC_MAX_SENSORS] = { 0 };
+static int num_devices = 0;
+module_param_array(devices, uint, &num_devices, 0444);
+MODULE_PARM_DESC(devices, "Index in addresses of the A/D converter of every sensor, missing - 0");
+
+/* Sensors sampled into the ring (ADC_IOC_SET_SENSORS), set to all sensors at init */
+static u32 adc_sensor_mask = 1;
 
 /* message for turning on the A/D conversion
  *   SD      - 1   (Single Ended Input)
- *   C2-C0   - 001 (CH1 Selected)
+ *   C2-C0   - channel (001 - CH1 Selected, 0x9c)
  *   PD1-PD0 - 11  (Internal Reference ON and A/D Converter ON)
  */
-const char INIT_ADC_CONVERSION_MESSAGE = 0x9c;
+#define ADC_CONVERSION_ON  (0x0c)
 
 /* message for turning off the A/D conversion
  *   SD      - 1   (Single Ended Input)
- *   C2-C0   - 001 (CH1 Selected)
+ *   C2-C0   - channel (001 - CH1 Selected, 0x90)
  *   PD1-PD0 - 00  (Power Down Between A/D Converter Conversions)
  */
-const char SHUTDOWN_ADC_CONVERSION_MESSAGE = 0x90;
+#define ADC_CONVERSION_OFF (0x00)
+
+static inline char adc_command(unsigned int channel, char power)
+{
+    return 0x80 | ((channel & 0x7) << 4) | power;
+}
 
 int adc_driver_major; 
 
-/*  Each 12-bit data word is returned in two bytes */
-char digital_voltage_value[2];
+/* Continuous acquisition dependencies
+ *   While the Device file is open, acquire_timer fires every acquisition period and
+ *   queues acquire_work, which converts every enabled sensor once, keeps the values
+ *   in the averaging history and, while the ring is running, stores them in the ring.
+ */
+static struct hrtimer acquire_timer;
+static struct work_struct acquire_work;
+static DEFINE_MUTEX(acquire_users_lock);
+static int acquire_users = 0;                     /* open Device files */
+static u64 adc_period_ns = NSEC_PER_SEC / ADC_DEFAULT_RATE;
+static u32 adc_missed_periods = 0;                /* periods skipped because the previous conversions were still running */
+static u32 adc_failed_conversions = 0;            /* conversions skipped because an I2C transfer failed */
+
+/* Averaging history - last ADC_MAX_AVERAGE values of every sensor */
+static DEFINE_SPINLOCK(history_lock);
+static u16 adc_history[ADC_MAX_SENSORS][ADC_MAX_AVERAGE];
+static u32 adc_history_count[ADC_MAX_SENSORS];    /* values acquired since acquisition started */
+static u32 adc_average = ADC_DEFAULT_AVERAGE;     /* values averaged by read() of one value */
+static DECLARE_WAIT_QUEUE_HEAD(history_wq);       /* read() of one value waits here for the first value */
+
+/* State of one open Device file */
+struct adc_file {
+    bool ring_owner;    /* ring was started through this file */
+    u32  read_mode;     /* ADC_READ_AVERAGED or ADC_READ_RAW */
+};
 
-/* Timer callback function */
-enum hrtimer_restart timer_callback(struct hrtimer* timer);
+/* Ring buffer dependencies
+ *   Acquired samples are stored in the ring buffer while the ring is running.
+ *   User space drains the ring in large chunks with read() or directly through mmap().
+ */
+static struct adc_ring_header *adc_ring = NULL;
+static u32 *adc_ring_samples = NULL;
+static unsigned long adc_ring_bytes = 0;
+static atomic_t ring_running = ATOMIC_INIT(0);
+
+/* Header page is mapped writable into every process which opened the Device file - the
+ * driver keeps head and overruns here and only publishes them in the header, indexes
+ * the slots with ADC_RING_SAMPLES and reads back only tail, clamped (adc_ring_tail()). */
+static u32 adc_ring_head = 0;
+static u32 adc_ring_overruns = 0;
+
+/* Readiness dependencies
+ *   Readers sleeping in poll()/select()/epoll are woken up only when watermark
+ *   samples are available or when a sample crossed the threshold.
+ */
+static DECLARE_WAIT_QUEUE_HEAD(adc_wq);
+static u32 adc_threshold = 0;           /* 0 - threshold crossing events disabled */
+static u32 adc_watermark = 1;           /* samples needed for POLLIN */
+static u32 adc_last_sample[ADC_MAX_SENSORS];  /* previous value of every sensor, for crossing detection */
+static u32 adc_crossing_index = 0;      /* ring index of the last crossing sample */
+static atomic_t adc_crossing_pending = ATOMIC_INIT(0);
+
+/* Serializes INIT/RECV/SHUTDOWN conversion sequences on the I2C client */
+static DEFINE_MUTEX(adc_lock);
 
 /* List of I2C devices supported by this driver (ADC driver) */
 static const struct i2c_device_id supported_devices[] = {
@@ -59,7 +143,9 @@ static int driver_probe(struct i2c_client *client)
 /* Function called when the slave (ADC) has been removed */
 static void  driver_remove(struct i2c_client *client )
 {
-	i2c_master_send(i2c_client_device, &SHUTDOWN_ADC_CONVERSION_MESSAGE, 1);
+	char off = adc_command(0, ADC_CONVERSION_OFF);
+
+	i2c_master_send(client, &off, 1);
 	return;
 }
 
@@ -75,23 +161,279 @@ static struct i2c_driver driver = {
     .id_table   = supported_devices    // @id_table:  List of I2C devices supported by this driver
 };
 
-static struct i2c_board_info   board_info = {
-	.type = I2C_CLIENT_NAME,
-	.addr = I2C_CLIENT_ADDR
-};
+/* One conversion of the sensor into *value, caller holds adc_lock.
+ * Returns 0, or a negative error code if an I2C transfer failed - *value is not set then. */
+static int adc_convert(unsigned int sensor, bool power_down, u16 *value)
+{
+    struct i2c_client *client = i2c_client_devices[devices[sensor]];
+    char on  = adc_command(channels[sensor], ADC_CONVERSION_ON);
+    char off = adc_command(channels[sensor], ADC_CONVERSION_OFF);
+    u8 raw[2];
+    int ret;
+
+    ret = i2c_master_send(client, &on, 1);
+    if (ret != 1)
+        return ret < 0 ? ret : -EIO;
+    ret = i2c_master_recv(client, raw, 2);
+    if (ret != 2)
+        return ret < 0 ? ret : -EIO;
+    if (power_down)
+        i2c_master_send(client, &off, 1);
+
+    // ADC as first byte sends the MOST SIGNIFICANT byte
+    *value = raw[0] << 8 | raw[1];
+    return 0;
+}
+
+
+/* Tail written by the reader, clamped so that at most ADC_RING_SAMPLES samples are unread -
+ * user space may write any value into the header */
+static u32 adc_ring_tail(u32 head)
+{
+    u32 tail = smp_load_acquire(&adc_ring->tail);
+
+    if (head - tail > ADC_RING_SAMPLES)
+        tail = head - ADC_RING_SAMPLES;
+    return tail;
+}
+
+/* Stores one sample of the sensor in the ring buffer, sample is dropped if the ring is full */
+static void adc_ring_push(unsigned int sensor, u32 value)
+{
+    u32 head = adc_ring_head;
+    u32 tail = adc_ring_tail(head);
+
+    if (head - tail >= ADC_RING_SAMPLES)
+    {
+        WRITE_ONCE(adc_ring->overruns, ++adc_ring_overruns);
+        return;
+    }
+
+    adc_ring_samples[head & (ADC_RING_SAMPLES - 1)] = ADC_SAMPLE(sensor, value);
+    /* Sample must be visible before the new head */
+    smp_store_release(&adc_ring_head, head + 1);
+    smp_store_release(&adc_ring->head, head + 1);
+
+    /* Threshold crossing - readers are woken up immediately */
+    if (adc_threshold != 0 && adc_last_sample[sensor] <= adc_threshold && value > adc_threshold)
+    {
+        adc_crossing_index = head;
+        atomic_set(&adc_crossing_pending, 1);
+        wake_up_interruptible(&adc_wq);
+    }
+    else if (head + 1 - tail >= adc_watermark)
+    {
+        wake_up_interruptible(&adc_wq);
+    }
+    adc_last_sample[sensor] = value;
+}
+
+/* Checks whether the last threshold crossing sample has not been consumed yet */
+static bool adc_crossing_unread(u32 tail)
+{
+    if (!atomic_read(&adc_crossing_pending))
+        return false;
+
+    if ((s32)(adc_crossing_index - tail) >= 0)
+        return true;
+
+    atomic_set(&adc_crossing_pending, 0);
+    return false;
+}
+
+/* Work queued by acquire_timer: one A/D conversion of every enabled sensor kept in the
+ * averaging history and stored in the ring buffer while the ring is running.
+ * A failed conversion is skipped (and counted), it is not stored as a value of 0.
+ * A/D converters stay powered on while the acquisition is running. */
+static void acquire_work_handler(struct work_struct *work)
+{
+    u16 values[ADC_MAX_SENSORS];
+    u32 mask = READ_ONCE(adc_sensor_mask);
+    int sensor, ret;
+
+    mutex_lock(&adc_lock);
+    for (sensor = 0; sensor < num_sensors; sensor++)
+    {
+        if (!(mask & BIT(sensor)))
+            continue;
+        ret = adc_convert(sensor, false, &values[sensor]);
+        if (ret < 0)
+        {
+            mask &= ~BIT(sensor);
+            adc_failed_conversions++;
+            printk_ratelimited(KERN_WARNING "adc_driver: conversion of sensor %d failed (%d), skipped\n", sensor, ret);
+        }
+    }
+    mutex_unlock(&adc_lock);
+
+    spin_lock_bh(&history_lock);
+    for (sensor = 0; sensor < num_sensors; sensor++)
+    {
+        if (mask & BIT(sensor))
+        {
+            adc_history[sensor][adc_history_count[sensor] % ADC_MAX_AVERAGE] = values[sensor];
+            /* Wrapped counter stays non-zero - history is full */
+            if (++adc_history_count[sensor] == 0)
+                adc_history_count[sensor] = ADC_MAX_AVERAGE;
+        }
+    }
+    spin_unlock_bh(&history_lock);
+    wake_up_interruptible(&history_wq);
+
+    if (!atomic_read(&ring_running))
+        return;
+    for (sensor = 0; sensor < num_sensors; sensor++)
+        if (mask & BIT(sensor))
+            adc_ring_push(sensor, values[sensor]);
+}
+
+/* Acquisition timer callback, fires every acquisition period while the acquisition is running */
+static enum hrtimer_restart acquire_timer_callback(struct hrtimer *timer)
+{
+    /* Conversions of the previous period still running - this period is skipped */
+    if (!schedule_work(&acquire_work))
+        adc_missed_periods++;
+    hrtimer_forward_now(timer, ns_to_ktime(READ_ONCE(adc_period_ns)));
+    return HRTIMER_RESTART;
+}
+
+/* Starts continuous acquisition when the first Device file is opened */
+static void adc_acquire_get(void)
+{
+    mutex_lock(&acquire_users_lock);
+    if (acquire_users++ == 0)
+    {
+        spin_lock_bh(&history_lock);
+        memset(adc_history_count, 0, sizeof(adc_history_count));
+        spin_unlock_bh(&history_lock);
+        adc_missed_periods = 0;
+        adc_failed_conversions = 0;
+        hrtimer_start(&acquire_timer, ns_to_ktime(READ_ONCE(adc_period_ns)), HRTIMER_MODE_REL);
+        printk(KERN_INFO "adc_driver: acquisition started, period %llu ns\n", READ_ONCE(adc_period_ns));
+    }
+    mutex_unlock(&acquire_users_lock);
+}
+
+/* Stops continuous acquisition when the last Device file is closed and powers the A/D converters down */
+static void adc_acquire_put(void)
+{
+    mutex_lock(&acquire_users_lock);
+    if (--acquire_users == 0)
+    {
+        hrtimer_cancel(&acquire_timer);
+        cancel_work_sync(&acquire_work);
+
+        mutex_lock(&adc_lock);
+        for (int i = 0; i < num_addresses; i++)
+        {
+            char off = adc_command(0, ADC_CONVERSION_OFF);
+
+            i2c_master_send(i2c_client_devices[i], &off, 1);
+        }
+        mutex_unlock(&adc_lock);
+        printk(KERN_INFO "adc_driver: acquisition stopped, %u periods missed, %u conversions failed\n",
+               adc_missed_periods, adc_failed_conversions);
+    }
+    mutex_unlock(&acquire_users_lock);
+}
+
+/* Starts storing acquired samples in the ring buffer */
+static void adc_ring_start(void)
+{
+    if (atomic_read(&ring_running))
+        return;
+
+    adc_ring_head      = 0;
+    adc_ring_overruns  = 0;
+    adc_ring->head     = 0;
+    adc_ring->tail     = 0;
+    adc_ring->overruns = 0;
+    memset(adc_last_sample, 0, sizeof(adc_last_sample));
+    atomic_set(&adc_crossing_pending, 0);
+    /* Ring is reset before the acquisition work sees it running */
+    atomic_set_release(&ring_running, 1);
+    printk(KERN_INFO "adc_driver: ring acquisition started\n");
+}
+
+/* Stops storing samples in the ring buffer */
+static void adc_ring_stop(void)
+{
+    if (!atomic_xchg(&ring_running, 0))
+        return;
+
+    /* Samples of a running conversion are not stored after the stop */
+    flush_work(&acquire_work);
+    wake_up_interruptible(&adc_wq);
+    printk(KERN_INFO "adc_driver: ring acquisition stopped\n");
+}
+
+/* Value of sensor 0 for read() of one value
+ *   ADC_READ_AVERAGED - average of the last adc_average values (fewer right after the start)
+ *   ADC_READ_RAW      - last value
+ */
+static u32 adc_history_value(u32 read_mode)
+{
+    u32 count, window, sum = 0;
+
+    spin_lock_bh(&history_lock);
+    count  = adc_history_count[0];
+    window = (read_mode == ADC_READ_RAW) ? 1 : min3(READ_ONCE(adc_average), count, (u32)ADC_MAX_AVERAGE);
+    for (u32 i = 1; i <= window; i++)
+        sum += adc_history[0][(count - i) % ADC_MAX_AVERAGE];
+    spin_unlock_bh(&history_lock);
 
+    return sum / window;
+}
+
+/* Copies up to len bytes of whole samples from the ring buffer to user space */
+static ssize_t adc_ring_read(char __user *buf, size_t len)
+{
+    u32 head  = smp_load_acquire(&adc_ring_head);
+    u32 tail  = adc_ring_tail(head);
+    u32 count = min_t(u32, head - tail, len / sizeof(u32));
+    u32 start = tail & (ADC_RING_SAMPLES - 1);
+    u32 first = min_t(u32, count, ADC_RING_SAMPLES - start);
+
+    if (count == 0)
+        return 0;
+
+    /* Ring may wrap around - copy in two chunks */
+    if (copy_to_user(buf, &adc_ring_samples[start], first * sizeof(u32)) != 0)
+        return -EFAULT;
+    if (count > first &&
+        copy_to_user(buf + first * sizeof(u32), adc_ring_samples, (count - first) * sizeof(u32)) != 0)
+        return -EFAULT;
+
+    /* Slots may be reused only after they have been copied */
+    smp_store_release(&adc_ring->tail, tail + count);
+    return count * sizeof(u32);
+}
 
 /*FILE OPERATIONS*/
 
 
-/* Function called when the Device file has been opened */
+/* Function called when the Device file has been opened - acquisition runs while any file is open */
 static int etx_open(struct inode *inode, struct file *filp)
 {
+    struct adc_file *file = kzalloc(sizeof(*file), GFP_KERNEL);
+
+    if (file == NULL)
+        return -ENOMEM;
+    file->read_mode    = ADC_READ_AVERAGED;
+    filp->private_data = file;
+    adc_acquire_get();
     return 0;
 }
 /* Function called when the Device file has been closed */
 static int etx_release(struct inode *inode, struct file *filp)
 {
+    struct adc_file *file = filp->private_data;
+
+    /* Ring started through this file is stopped when the file is closed */
+    if (file->ring_owner)
+        adc_ring_stop();
+    adc_acquire_put();
+    kfree(file);
     return 0;
 }
 /* Function called when the Device file has been written in */
@@ -99,45 +441,50 @@ static ssize_t etx_write(struct file *filp, const char *buf, size_t len, loff_t
 {
     return 0;
 }
-/* Function called when the Device file has been read from */
+/* Function called when the Device file has been read from
+ *   len == 4         - one value of sensor 0 taken from the acquisition (read mode of the file:
+ *                      average of the last averaging window samples or the last sample),
+ *                      waits only for the first sample after the acquisition started
+ *   len  > 4         - block of raw samples of the enabled sensors drained from the ring buffer
+ *                      (ring must be running)
+ */
 static ssize_t etx_read(struct file *filp, char *buf, size_t len, loff_t *f_pos)
 {
+    struct adc_file *file = filp->private_data;
+
     /* Size of valid data in bytes received from ADC */
-    int data_size = 0;
+    int data_size = 2;
 
     /* Average data value */
     uint32_t avg = 0;
-	
-    // 20 conversions
-	for(int i = 0; i < 20; i++)
-	{
-    
-	    /* Master (RPi) sends a message to the client (ADC) to start AD conversion */
-	    i2c_master_send(i2c_client_device, &INIT_ADC_CONVERSION_MESSAGE, 1);
-	    
-	    hrtimer_start(&mytimer, ktime_set(1,0), CLOCK_MONOTONIC);
-
-	    /* Receiving 2bytes raw converted data from ADC */
-	    i2c_master_recv(i2c_client_device, digital_voltage_value, 2);
-		
-        /* Master (RPi) sends a message to the client (ADC) to end AD conversion */
-	    i2c_master_send(i2c_client_device, &SHUTDOWN_ADC_CONVERSION_MESSAGE, 1);
-	
-	    data_size = strlen(digital_voltage_value);
-	    
-	    // ADC as first byte sends the MOST SIGNIFICANT byte
-	    uint16_t temp = digital_voltage_value[0]<<8 | digital_voltage_value[1];
-	    avg += temp;
-	}
-    
-	avg /= 20;
+
+    if (len > 4)
+    {
+        if (!atomic_read(&ring_running))
+            return -EINVAL;
+        return adc_ring_read(buf, len);
+    }
+
+    /* Sensor 0 is not acquired - no value will come */
+    if (!(READ_ONCE(adc_sensor_mask) & BIT(0)))
+        return -ENODATA;
+
+    if (READ_ONCE(adc_history_count[0]) == 0)
+    {
+        if (filp->f_flags & O_NONBLOCK)
+            return -EAGAIN;
+        if (wait_event_interruptible(history_wq, READ_ONCE(adc_history_count[0]) != 0))
+            return -ERESTARTSYS;
+    }
+
+    avg = adc_history_value(file->read_mode);
 	char uradi[4];
 	uradi[0] = avg & 0x000000ff;
 	uradi[1] = (avg >> 8)  & 0x000000ff;
 	uradi[2] = (avg >> 16) & 0x000000ff;
 	uradi[3] = (avg >> 24) & 0x000000ff;
 	
-	printk("avg = %x\n", avg);
+	pr_debug("avg = %x\n", avg);
 	
 	/* Sends data from kernel to user space */
 	if (copy_to_user(buf, uradi, 4) != 0)
@@ -153,6 +500,114 @@ static ssize_t etx_read(struct file *filp, char *buf, size_t len, loff_t *f_pos)
     }
 }
 
+/* Function called when the Device file has been mmap-ed: maps the ring buffer into user space */
+static int etx_mmap(struct file *filp, struct vm_area_struct *vma)
+{
+    if (vma->vm_pgoff != 0 || vma->vm_end - vma->vm_start > adc_ring_bytes)
+        return -EINVAL;
+
+    return remap_vmalloc_range(vma, adc_ring, 0);
+}
+
+/* Function called on poll()/select()/epoll on the Device file */
+static __poll_t etx_poll(struct file *filp, poll_table *wait)
+{
+    __poll_t mask = 0;
+    u32 head, tail;
+
+    poll_wait(filp, &adc_wq, wait);
+
+    if (!atomic_read(&ring_running))
+        return EPOLLERR;
+
+    head = smp_load_acquire(&adc_ring_head);
+    tail = adc_ring_tail(head);
+
+    if (head - tail >= adc_watermark)
+        mask |= EPOLLIN | EPOLLRDNORM;
+    if (adc_crossing_unread(tail))
+        mask |= EPOLLPRI | EPOLLIN | EPOLLRDNORM;
+
+    return mask;
+}
+
+/* Function called on ioctl() on the Device file */
+static long etx_ioctl(struct file *filp, unsigned int cmd, unsigned long arg)
+{
+    switch (cmd)
+    {
+    case ADC_IOC_RING_START:
+        adc_ring_start();
+        ((struct adc_file *)filp->private_data)->ring_owner = true;  // this file owns the ring acquisition
+        return 0;
+    case ADC_IOC_RING_STOP:
+        adc_ring_stop();
+        ((struct adc_file *)filp->private_data)->ring_owner = false;
+        return 0;
+    case ADC_IOC_SET_THRESHOLD:
+        return get_user(adc_threshold, (u32 __user *)arg);
+    case ADC_IOC_SET_SENSORS:
+    {
+        u32 mask;
+
+        if (get_user(mask, (u32 __user *)arg))
+            return -EFAULT;
+        /* Only configured sensors, at least one */
+        if (mask == 0 || (num_sensors < 32 && (mask >> num_sensors) != 0))
+            return -EINVAL;
+        WRITE_ONCE(adc_sensor_mask, mask);
+        return 0;
+    }
+    case ADC_IOC_SET_RATE:
+    {
+        u32 rate;
+
+        if (get_user(rate, (u32 __user *)arg))
+            return -EFAULT;
+        if (rate == 0 || rate > ADC_MAX_RATE)
+            return -EINVAL;
+        /* Running acquisition takes the new period from its next period on */
+        WRITE_ONCE(adc_period_ns, div_u64(NSEC_PER_SEC, rate));
+        return 0;
+    }
+    case ADC_IOC_SET_AVERAGE:
+    {
+        u32 average;
+
+        if (get_user(average, (u32 __user *)arg))
+            return -EFAULT;
+        if (average == 0 || average > ADC_MAX_AVERAGE)
+            return -EINVAL;
+        WRITE_ONCE(adc_average, average);
+        return 0;
+    }
+    case ADC_IOC_SET_READ_MODE:
+    {
+        u32 read_mode;
+
+        if (get_user(read_mode, (u32 __user *)arg))
+            return -EFAULT;
+        if (read_mode != ADC_READ_AVERAGED && read_mode != ADC_READ_RAW)
+            return -EINVAL;
+        ((struct adc_file *)filp->private_data)->read_mode = read_mode;
+        return 0;
+    }
+    case ADC_IOC_SET_WATERMARK:
+    {
+        u32 watermark;
+
+        if (get_user(watermark, (u32 __user *)arg))
+            return -EFAULT;
+        if (watermark == 0 || watermark > ADC_RING_SAMPLES)
+            return -EINVAL;
+        adc_watermark = watermark;
+        return 0;
+    }
+    default:
+        return -ENOTTY;
+    }
+}
+
 /* Structure declaring usual file access functions */
 static struct file_operations adc_fops =
 {
@@ -161,6 +616,9 @@ static struct file_operations adc_fops =
     .write    = etx_write, 			/* Function called when the Device file has been written in */
     .open     = etx_open,			/* Function called when the Device file has been opened */
     .release  = etx_release,        /* Function called when the Device file has been closed */
+    .mmap     = etx_mmap,           /* Function called when the Device file has been mmap-ed */
+    .unlocked_ioctl = etx_ioctl,    /* Function called on ioctl() on the Device file */
+    .poll     = etx_poll,           /* Function called on poll()/select()/epoll on the Device file */
 };
 
 
@@ -170,39 +628,89 @@ static int      __init etx_driver_init(void)
 {
     int ret = -1;
     int result = -1;
-    i2c_client_adapter = i2c_get_adapter(1);
+
+    /* Every sensor must name a channel of a configured converter */
+    for (int sensor = 0; sensor < num_sensors; sensor++)
+    {
+        if (channels[sensor] >= ADC_CHANNELS_PER_DEVICE || devices[sensor] >= num_addresses)
+        {
+            printk(KERN_ERR "adc_driver: sensor %d - invalid channel %u or device %u\n", sensor, channels[sensor], devices[sensor]);
+            return -EINVAL;
+        }
+    }
+    adc_sensor_mask = (num_sensors == 32) ? 0xffffffff : BIT(num_sensors) - 1;
+
+    /* Ring buffer: header page followed by sample slots, zeroed and mmap-able.
+     * Ring, work and timer are ready before the device can be opened */
+    adc_ring_bytes = PAGE_ALIGN(PAGE_SIZE + ADC_RING_SAMPLES * sizeof(u32));
+    adc_ring = vmalloc_user(adc_ring_bytes);
+    if (adc_ring == NULL)
+        return -ENOMEM;
+    adc_ring->size        = ADC_RING_SAMPLES;
+    adc_ring->data_offset = PAGE_SIZE;
+    adc_ring_samples      = (u32 *)((char *)adc_ring + PAGE_SIZE);
+
+    INIT_WORK(&acquire_work, acquire_work_handler);
+    hrtimer_init(&acquire_timer, CLOCK_MONOTONIC, HRTIMER_MODE_REL);
+    acquire_timer.function = &acquire_timer_callback;
+
+    i2c_client_adapter = i2c_get_adapter(i2c_bus);
 
     if( i2c_client_adapter != NULL )
     {
-        i2c_client_device = i2c_new_client_device(i2c_client_adapter, &board_info);
- 
-        if( i2c_client_device != NULL )
+        ret = 0;
+        for (int i = 0; i < num_addresses; i++)
         {
-	    int result = i2c_register_driver(THIS_MODULE, &driver);
-            ret = 0;
+            struct i2c_board_info board_info = {
+                .type = I2C_CLIENT_NAME,
+                .addr = addresses[i]
+            };
+
+            i2c_client_devices[i] = i2c_new_client_device(i2c_client_adapter, &board_info);
+            if (IS_ERR(i2c_client_devices[i]))
+            {
+                printk(KERN_ERR "adc_driver: no A/D converter at 0x%02x\n", addresses[i]);
+                i2c_client_devices[i] = NULL;
+                ret = -ENODEV;
+            }
         }
+        if (ret == 0)
+            ret = i2c_register_driver(THIS_MODULE, &driver);
 
         i2c_put_adapter(i2c_client_adapter);
     }
 
-    pr_info("I2C driver added\n");
+    if (ret != 0)
+        goto err_clients;
+
+    pr_info("I2C driver added: %d sensors on %d A/D converters\n", num_sensors, num_addresses);
     printk(KERN_INFO "Inserting ADC driver module\n");
 
-    /* Registering device. */
+    /* Registering device - last, it can be opened right away */
     result = register_chrdev(0, "adc_driver", &adc_fops);
     if (result < 0)
     {
         printk(KERN_INFO "adc_driver: cannot obtain major number %d\n", adc_driver_major);
-        return result;
+        ret = result;
+        goto err_driver;
     }
 
     adc_driver_major = result;
     printk(KERN_INFO "adc_driver major number is %d\n", adc_driver_major);
 
-    /* Initialize timer to a given clock */
-    hrtimer_init(&mytimer, CLOCK_MONOTONIC, HRTIMER_MODE_REL);
-    mytimer.function = &timer_callback;
+    return 0;
 
+err_driver:
+    i2c_del_driver(&driver);
+err_clients:
+    for (int i = 0; i < num_addresses; i++)
+    {
+        if (i2c_client_devices[i] != NULL)
+            i2c_unregister_device(i2c_client_devices[i]);
+        i2c_client_devices[i] = NULL;
+    }
+    vfree(adc_ring);
+    adc_ring = NULL;
     return ret;
 }
 
@@ -210,17 +718,12 @@ static int      __init etx_driver_init(void)
 static void __exit etx_driver_exit(void)
 {
 	printk(KERN_INFO "Removing adc_driver module\n");
-	hrtimer_cancel(&mytimer);
+	/* Device goes first - nothing can reach the ring or the converters after it */
 	unregister_chrdev(adc_driver_major, "adc_driver"); 
-	i2c_unregister_device(i2c_client_device); 
+	for (int i = 0; i < num_addresses; i++)
+	    i2c_unregister_device(i2c_client_devices[i]);
 	i2c_del_driver(&driver);
-}
-
-/* Timer callback, called with hrtimer_start  */
-enum hrtimer_restart timer_callback(struct hrtimer* timer)
-{
-    printk(KERN_INFO "hrtimer handler called!\n");
-    return HRTIMER_NORESTART;
+	vfree(adc_ring);
 }
 
 module_init(etx_driver_init);
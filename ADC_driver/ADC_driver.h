@@ -0,0 +1,86 @@
+/* ADC_driver.h
+ *
+ * Interface shared between the ADC driver and user space (ADC.py):
+ *   - ioctl commands
+ *   - layout of the sample ring buffer exposed through read() and mmap()
+ *   - continuous acquisition: rate, averaging window and read mode
+ *   - sensors: channels of one or more A/D converters, each with an id
+ */
+#ifndef ADC_DRIVER_H
+#define ADC_DRIVER_H
+
+#include <linux/ioctl.h>
+#include <linux/types.h>
+
+/* Number of sample slots in the ring buffer (must be power of two) */
+#define ADC_RING_SAMPLES (16384)
+
+/* Continuous acquisition
+ *   While the Device file is open the driver samples every enabled sensor at the
+ *   acquisition rate (each period each enabled sensor is converted once), keeps the
+ *   last samples of every sensor for averaging and, while the ring is running,
+ *   stores them in the ring buffer. read() of one value never waits for a conversion.
+ */
+#define ADC_DEFAULT_RATE    (1000)    /* samples per second of every sensor */
+#define ADC_MAX_RATE        (10000)
+#define ADC_DEFAULT_AVERAGE (20)      /* samples averaged by read() of one value */
+#define ADC_MAX_AVERAGE     (256)
+
+/* Read mode of read() of one value (len == 4) of sensor 0 */
+#define ADC_READ_AVERAGED   (0)       /* average of the last averaging window samples */
+#define ADC_READ_RAW        (1)       /* last sample */
+
+/* Sensors
+ *   Sensor id n is channel channels[n] of the A/D converter at I2C address
+ *   addresses[devices[n]] (module parameters, default - sensor 0 is CH1 of 0x48).
+ */
+#define ADC_CHANNELS_PER_DEVICE (8)
+#define ADC_MAX_DEVICES         (4)
+#define ADC_MAX_SENSORS         (32)
+
+/* Ring samples carry the id of their sensor:
+ *   bits 31-16 - sensor id
+ *   bits 15-0  - converted value
+ * Samples of sensor 0 are the plain values.
+ */
+#define ADC_SAMPLE(sensor, value) ((((__u32)(sensor)) << 16) | ((value) & 0xffff))
+#define ADC_SAMPLE_SENSOR(sample) ((sample) >> 16)
+#define ADC_SAMPLE_VALUE(sample)  ((sample) & 0xffff)
+
+/* Header placed at the beginning of the mmap-ed ring buffer.
+ *
+ * head and tail are free running counters, slot of a sample is (counter & (size - 1)).
+ * Driver is the only writer of head, the reader (read() or user space via mmap) is
+ * the only writer of tail. Samples are __u32 values starting at data_offset bytes
+ * from the beginning of the mapping.
+ *
+ * head, size, overruns and data_offset are published by the driver only - it never
+ * reads them back from the mapping. tail is read back and clamped, so that at most
+ * size samples are unread.
+ */
+struct adc_ring_header {
+    __u32 head;         /* index of the next sample to be produced */
+    __u32 tail;         /* index of the next sample to be consumed */
+    __u32 size;         /* number of sample slots */
+    __u32 overruns;     /* samples dropped because the ring was full */
+    __u32 data_offset;  /* offset of the first sample slot in bytes */
+};
+
+#define ADC_IOC_MAGIC      ('a')
+#define ADC_IOC_RING_START _IO(ADC_IOC_MAGIC, 1)  /* starts storing acquired samples in the ring */
+#define ADC_IOC_RING_STOP  _IO(ADC_IOC_MAGIC, 2)  /* stops storing samples in the ring */
+
+/* poll()/select()/epoll readiness of the Device file while the ring is running:
+ *   POLLIN  - at least watermark unread samples are in the ring
+ *   POLLPRI - an unread sample crossed the threshold upwards (previous sample of the same
+ *             sensor <= threshold < sample)
+ */
+#define ADC_IOC_SET_THRESHOLD _IOW(ADC_IOC_MAGIC, 3, __u32)  /* threshold for POLLPRI, 0 disables it */
+#define ADC_IOC_SET_WATERMARK _IOW(ADC_IOC_MAGIC, 4, __u32)  /* number of samples for POLLIN, at least 1 */
+#define ADC_IOC_SET_SENSORS   _IOW(ADC_IOC_MAGIC, 5, __u32)  /* bit mask of sensors sampled into the ring, default all */
+
+#define ADC_IOC_SET_RATE      _IOW(ADC_IOC_MAGIC, 6, __u32)  /* acquisition rate in samples per second, 1 - ADC_MAX_RATE */
+#define ADC_IOC_SET_AVERAGE   _IOW(ADC_IOC_MAGIC, 7, __u32)  /* averaging window in samples, 1 - ADC_MAX_AVERAGE */
+#define ADC_IOC_SET_READ_MODE _IOW(ADC_IOC_MAGIC, 8, __u32)  /* ADC_READ_AVERAGED or ADC_READ_RAW, per open file */
+
+#endif /* ADC_DRIVER_H */
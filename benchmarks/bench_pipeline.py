@@ -0,0 +1,659 @@
+"""bench_pipeline.py
+
+This Python script benchmarks the IPC pipeline ADC client -> Main server -> Modem server:
+
+    1. Starts main.py and a stub Modem server (stub_modem.py, or the Modem
+       server given by --modem-command) for every scenario in its own
+       temporary directory - config_main.json of the repository with the
+       addresses of the scenario and the --set overrides. Camera server is
+       not started ("camera_server_address": "", triggers are only logged)
+
+    2. Drives the Main server from concurrent clients at a configurable
+       sample rate with a configurable distance distribution - unary
+       requests, one sample stream per client or batches of samples, over
+       TCP, Unix domain socket or the shared memory transport
+
+    3. Reports for every scenario (transport x method x server mode)
+       throughput, latency percentiles, CPU and RSS of main.py, the Modem
+       server and the load generator, and the counters of the Main server
+       (metrics.py) - printed and written to a JSON results file, which
+       compare_results.py compares with the results of another commit
+
+Latency is measured from the time the request was due, not the time it was
+actually sent - when the Main server falls behind the rate, the time the
+request waited is part of its latency. With the shm transport there is no
+reply: latency is the time to publish the samples into the ring and
+throughput is measured until the Main server has drained the ring.
+
+Usage:
+    python3 benchmarks/bench_pipeline.py [--transports tcp,unix,shm] [--methods unary,stream,batch]
+                                         [--servers threads,asyncio] [--clients 4] [--rate 1000]
+                                         [--distribution uniform:0:3000] [--duration 10] [-o results.json]
+
+"""
+
+import os
+import sys
+import json
+import mmap
+import time
+import random
+import shlex
+import shutil
+import signal
+import socket
+import argparse
+import platform
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+
+REPO          = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LIBRARIES     = os.path.join(REPO, "supporting libraries")
+GENERATED     = os.path.join(REPO, "executables", "main")
+MAIN_SCRIPT   = os.path.join(REPO, "main.py")
+STUB_MODEM    = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stub_modem.py")
+MAIN_CONFIG   = os.path.join(LIBRARIES, "config_main.json")
+MODEM_CONFIG  = os.path.join(LIBRARIES, "config_modem.json")
+
+sys.path[:0] = [REPO, LIBRARIES, GENERATED]
+
+import grpc
+import shm_transport
+import trace_report
+import objectProximityDetectionService_pb2
+import objectProximityDetectionService_pb2_grpc
+
+TRANSPORTS       = ("tcp", "unix", "shm")
+METHODS          = ("unary", "stream", "batch")
+SERVERS          = ("threads", "asyncio")
+STARTUP_TIMEOUT  = 30       # seconds main.py has to start serving
+REQUEST_TIMEOUT  = 10       # seconds, request not answered in time is counted as error
+DRAIN_TIMEOUT    = 60       # seconds the Main server has to drain the shared memory ring
+SAMPLE_INTERVAL  = 0.1      # seconds between two RSS samples
+PERCENTILES      = (50, 90, 99, 99.9)
+CLOCK_TICKS      = os.sysconf("SC_CLK_TCK")
+
+"""
+    :param value:   Comma separated list
+    :param allowed: Allowed items
+    :return:        List of items
+"""
+def comma_list(value, allowed):
+    items = [item.strip() for item in value.split(",") if item.strip()]
+    unknown = [item for item in items if item not in allowed]
+    if unknown or not items:
+        raise argparse.ArgumentTypeError(f"expected comma separated list of {', '.join(allowed)}, got '{value}'")
+    return items
+
+"""
+    :param value: "KEY=VALUE" - VALUE is JSON, anything else is taken as string
+    :return:      (KEY, VALUE)
+"""
+def config_override(value):
+    key, separator, raw = value.partition("=")
+    if not separator or not key:
+        raise argparse.ArgumentTypeError(f"expected KEY=VALUE, got '{value}'")
+    try:
+        return key, json.loads(raw)
+    except ValueError:
+        return key, raw
+
+"""
+    Creates generator of object proximity distances
+
+    :param spec: "constant:VALUE", "uniform:LOW:HIGH", "normal:MEAN:STDDEV" or "file:PATH"
+                 (whitespace separated distances, repeated when exhausted)
+    :param seed: Seed of the random generator - same seed gives same distances
+    :return:     Function returning next distance
+"""
+def distance_source(spec, seed):
+    kind, _, params = spec.partition(":")
+    generator = random.Random(seed)
+
+    try:
+        if kind == "constant":
+            value = int(params)
+            return lambda: value
+        if kind == "uniform":
+            low, high = (int(param) for param in params.split(":"))
+            return lambda: generator.randint(low, high)
+        if kind == "normal":
+            mean, stddev = (float(param) for param in params.split(":"))
+            return lambda: max(int(generator.gauss(mean, stddev)), 0)
+        if kind == "file":
+            with open(params) as distances_file:
+                distances = [int(distance) for distance in distances_file.read().split()]
+            if not distances:
+                raise ValueError(f"no distances in {params}")
+            position = iter(range(sys.maxsize))
+            return lambda: distances[next(position) % len(distances)]
+    except (ValueError, OSError) as e:
+        raise argparse.ArgumentTypeError(f"invalid distance distribution '{spec}': {e}")
+
+    raise argparse.ArgumentTypeError(f"unknown distance distribution '{spec}' (constant, uniform, normal, file)")
+
+"""
+    :return: Free TCP port on localhost
+"""
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+"""
+    :return: (commit of the repository, True if tracked files are modified), (None, False) outside of git
+"""
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO, capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO, capture_output=True, text=True, check=True).stdout
+        return commit, bool(status.strip())
+    except (OSError, subprocess.CalledProcessError):
+        return None, False
+
+
+"""
+    CPU time and resident memory of one process, read from /proc
+"""
+class ProcessSampler:
+
+    """
+        :param pid: Process id ("self" - the load generator)
+    """
+    def __init__(self, pid):
+        self.pid     = pid
+        self.rss     = []
+        self.stopped = threading.Event()
+        self.thread  = None
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as stat_file:
+            # Fields after the command name - utime and stime are fields 14 and 15 of stat
+            fields = stat_file.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+
+    def rss_kb(self):
+        with open(f"/proc/{self.pid}/status") as status_file:
+            for line in status_file:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+        return 0
+
+    def _sample(self):
+        while not self.stopped.wait(SAMPLE_INTERVAL):
+            try:
+                self.rss.append(self.rss_kb())
+            except OSError:
+                return
+
+    def start(self):
+        self.started     = time.monotonic()
+        self.started_cpu = self.cpu_seconds()
+        self.rss.append(self.rss_kb())
+        self.thread = threading.Thread(target=self._sample, name="process-sampler", daemon=True)
+        self.thread.start()
+
+    """
+        :return: Dict with CPU utilization in % of one core and average and max RSS since start()
+    """
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        try:
+            cpu = self.cpu_seconds() - self.started_cpu
+            self.rss.append(self.rss_kb())
+        except OSError:
+            return None
+        return {"cpu_percent": round(100 * cpu / (time.monotonic() - self.started), 1),
+                "rss_avg_kb":  sum(self.rss) // len(self.rss),
+                "rss_max_kb":  max(self.rss)}
+
+
+"""
+    One client of the Main server (one ADC client) - sends samples at its
+    share of the rate until the end of the benchmark and records latency of
+    the requests due after the warm-up
+"""
+class LoadClient(threading.Thread):
+
+    """
+        :param stub:       ObjectProximityDetectionServiceStub (or shm_transport.ShmSampleStub)
+        :param method:     "unary", "stream" or "batch"
+        :param rate:       Samples per second of this client, 0 - next request is sent as soon as previous is answered
+        :param batch_size: Samples per batch request
+        :param distance:   Function returning next distance (distance_source())
+    """
+    def __init__(self, stub, method, rate, batch_size, distance):
+        super().__init__(name="load-client", daemon=True)
+        self.stub       = stub
+        self.method     = method
+        self.batch_size = batch_size if method == "batch" else 1
+        self.interval   = self.batch_size / rate if rate > 0 else 0
+        self.distance   = distance
+        self.latencies  = []    # us, requests due after the warm-up
+        self.samples    = 0
+        self.requests   = 0
+        self.errors     = 0
+
+    """
+        :param started:    Monotonic time the first request is due
+        :param warmup_end: Monotonic time results start to be recorded
+        :param end:        Monotonic time no more requests are due
+    """
+    def schedule(self, started, warmup_end, end):
+        self.started    = started
+        self.warmup_end = warmup_end
+        self.end        = end
+
+    """
+        Waits until request number n is due
+
+        :return: Monotonic time the request was due
+    """
+    def _due(self, n):
+        if self.interval == 0:
+            return time.monotonic()
+        due   = self.started + n * self.interval
+        delay = due - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        return due
+
+    def _record(self, due, ok):
+        if due < self.warmup_end:
+            return
+        if ok:
+            self.latencies.append(int((time.monotonic() - due) * 1e6))
+            self.samples  += self.batch_size
+            self.requests += 1
+        else:
+            self.errors += 1
+
+    def _request(self, sequence_number):
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionRequest(message="Benchmark sample.",
+                                                                                   object_proximity_distance=self.distance(),
+                                                                                   sequence_number=sequence_number)
+
+    def _run_unary(self):
+        for n in range(sys.maxsize):
+            due = self._due(n)
+            if due >= self.end:
+                return
+            try:
+                self.stub.ObjectProximityDetection(self._request(n + 1), timeout=REQUEST_TIMEOUT)
+                self._record(due, True)
+            except (grpc.RpcError, ConnectionError):
+                # ConnectionError - shared memory consumer is gone
+                self._record(due, False)
+
+    def _run_batch(self):
+        step_us = int(self.interval / self.batch_size * 1e6)
+        for n in range(sys.maxsize):
+            due = self._due(n)
+            if due >= self.end:
+                return
+            request = objectProximityDetectionService_pb2.ObjectProximityDetectionBatchRequest(
+                sequence_number=n + 1,
+                base_timestamp_us=time.monotonic_ns() // 1000,
+                object_proximity_distances=[self.distance() for _ in range(self.batch_size)],
+                timestamp_deltas_us=[0] + [step_us] * (self.batch_size - 1))
+            try:
+                self.stub.ObjectProximityDetectionBatch(request, timeout=REQUEST_TIMEOUT)
+                self._record(due, True)
+            except (grpc.RpcError, ConnectionError):
+                self._record(due, False)
+
+    def _run_stream(self):
+        due_times = {}   # sequence number -> due time of samples waiting for their reply
+
+        def requests():
+            for n in range(sys.maxsize):
+                due = self._due(n)
+                if due >= self.end:
+                    return
+                due_times[n + 1] = due
+                yield self._request(n + 1)
+
+        try:
+            for reply in self.stub.ObjectProximityDetectionStream(requests()):
+                due = due_times.pop(reply.sequence_number, None)
+                if due is not None:
+                    self._record(due, True)
+        except grpc.RpcError:
+            for due in due_times.values():
+                self._record(due, False)
+
+    def run(self):
+        {"unary": self._run_unary, "stream": self._run_stream, "batch": self._run_batch}[self.method]()
+
+
+"""
+    Starts process with its output written to a file in the scenario directory
+
+    :param command: Command line (list)
+    :param workdir: Working directory of the process
+    :param output:  File name of stdout and stderr
+    :param env:     Environment of the process
+    :return:        subprocess.Popen
+"""
+def start_process(command, workdir, output, env):
+    with open(os.path.join(workdir, output), "w") as output_file:
+        # SIGINT may be ignored when the benchmark runs in background - processes are stopped with it
+        return subprocess.Popen(command, cwd=workdir, env=env, stdout=output_file, stderr=subprocess.STDOUT,
+                                preexec_fn=lambda: signal.signal(signal.SIGINT, signal.SIG_DFL))
+
+"""
+    Stops process with SIGINT (servers shut down cleanly), kills it if it does not exit in time
+
+    :param process: subprocess.Popen
+    :return:        None
+"""
+def stop_process(process):
+    if process.poll() is not None:
+        return
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+"""
+    :param path:  Log file
+    :param lines: Number of lines
+    :return:      Last lines of the file
+"""
+def tail(path, lines=20):
+    try:
+        with open(path, errors="replace") as log_file:
+            return "".join(log_file.readlines()[-lines:])
+    except OSError:
+        return ""
+
+"""
+    Waits until the Main server accepts requests
+
+    :param main:    subprocess.Popen of main.py
+    :param address: Address of the Main server
+    :param workdir: Directory of the scenario (main.log is reported if main.py fails)
+    :return:        None
+"""
+def wait_for_main(main, address, workdir):
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    with grpc.insecure_channel(address) as channel:
+        while time.monotonic() < deadline:
+            if main.poll() is not None:
+                raise RuntimeError(f"main.py exited with status {main.returncode}:\n{tail(os.path.join(workdir, 'main.log'))}")
+            try:
+                grpc.channel_ready_future(channel).result(timeout=1)
+                return
+            except grpc.FutureTimeoutError:
+                pass
+    raise RuntimeError(f"Main server did not start in {STARTUP_TIMEOUT} s:\n{tail(os.path.join(workdir, 'main.log'))}")
+
+"""
+    Reads metrics of the Main server over its Unix domain socket
+
+    :param path: Socket path of metrics_address
+    :return:     Dict series -> (type, value), histograms are left out
+"""
+def scrape_metrics(path):
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.settimeout(5)
+        connection.connect(path)
+        connection.sendall(b"GET /metrics HTTP/1.0\r\n\r\n")
+        response = b""
+        while chunk := connection.recv(65536):
+            response += chunk
+
+    types  = {}
+    series = {}
+    for line in response.decode().split("\r\n\r\n", 1)[-1].splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split()
+            types[name] = kind
+        elif line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            kind = types.get(name.split("{")[0])
+            if kind in ("counter", "gauge"):
+                series[name] = (kind, float(value))
+    return series
+
+"""
+    :param before: scrape_metrics() at the start of the measurement
+    :param after:  scrape_metrics() at its end
+    :return:       Dict series -> counter increase or last gauge value
+"""
+def metrics_delta(before, after):
+    return {name: value - before.get(name, (kind, 0))[1] if kind == "counter" else value
+            for name, (kind, value) in sorted(after.items())}
+
+"""
+    Waits until the Main server has taken all samples from the shared memory ring
+
+    :param path: Ring file
+    :return:     Samples dropped because the ring was full
+"""
+def drain_ring(path):
+    with open(path, "r+b") as ring_file:
+        ring = mmap.mmap(ring_file.fileno(), 0)
+    try:
+        deadline = time.monotonic() + DRAIN_TIMEOUT
+        while time.monotonic() < deadline:
+            head, tail, _, overruns, _ = shm_transport.HEADER.unpack_from(ring, 0)
+            if head == tail:
+                return overruns
+            time.sleep(0.001)
+        raise RuntimeError(f"Main server did not drain shared memory ring in {DRAIN_TIMEOUT} s")
+    finally:
+        ring.close()
+
+"""
+    :param latencies: Latencies in us
+    :return:          Dict of percentiles, max and mean, None if there are no latencies
+"""
+def latency_summary(latencies):
+    if not latencies:
+        return None
+    latencies = sorted(latencies)
+    summary = {f"p{p:g}": trace_report.percentile(latencies, p) for p in PERCENTILES}
+    summary["max"]  = latencies[-1]
+    summary["mean"] = round(sum(latencies) / len(latencies), 1)
+    return summary
+
+"""
+    Runs one scenario - starts the Modem server and main.py, drives the load and stops them
+
+    :param args:      Parsed command line
+    :param transport: "tcp", "unix" or "shm"
+    :param method:    "unary", "stream" or "batch"
+    :param server:    "threads" or "asyncio"
+    :param workdir:   Empty directory of the scenario
+    :return:          Dict with results of the scenario
+"""
+def run_scenario(args, transport, method, server, workdir):
+    # Shared memory ring is single producer - one client
+    clients = 1 if transport == "shm" else args.clients
+
+    if transport == "unix":
+        main_address  = f"unix:{workdir}/main.sock"
+        modem_address = f"unix:{workdir}/modem.sock"
+    else:
+        main_address  = f"127.0.0.1:{free_port()}"
+        modem_address = f"127.0.0.1:{free_port()}"
+    shm_path     = f"/dev/shm/bench_adc_samples_{os.getpid()}" if os.path.isdir("/dev/shm") else os.path.join(workdir, "adc_samples")
+    metrics_path = os.path.join(workdir, "main_metrics.sock")
+
+    with open(args.config) as config_file:
+        main_config = json.load(config_file)
+    main_config.update({"main_server_address": main_address, "modem_server_address": modem_address,
+                        "camera_server_address": "", "asyncio": server == "asyncio",
+                        "transport": "shm" if transport == "shm" else "grpc", "shm_path": shm_path,
+                        "metrics_address": f"unix:{metrics_path}", "trace_buffer": 0, "config_watch_ms": 0})
+    main_config.update(args.set)
+    with open(os.path.join(workdir, "config_main.json"), "w") as config_file:
+        json.dump(main_config, config_file, indent=4)
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [LIBRARIES, GENERATED, os.environ.get("PYTHONPATH")])))
+
+    if args.modem_command:
+        with open(MODEM_CONFIG) as config_file:
+            modem_config = json.load(config_file)
+        # No SMS is sent in a benchmark - the fake modem answers after --modem-latency-ms
+        modem_config.update({"modem_server_address": modem_address, "metrics_address": "", "trace_buffer": 0,
+                             "modem_backend": "fake", "fake_modem_latency_ms": int(args.modem_latency_ms)})
+        with open(os.path.join(workdir, "config_modem.json"), "w") as config_file:
+            json.dump(modem_config, config_file, indent=4)
+        modem_command = shlex.split(args.modem_command)
+    else:
+        modem_command = [sys.executable, STUB_MODEM, modem_address, "--latency-ms", str(args.modem_latency_ms)]
+
+    result = {"name": f"{transport}/{method}/{server}/c{clients}", "transport": transport, "method": method,
+              "server": server, "clients": clients, "rate": args.rate,
+              "batch_size": args.batch_size if method == "batch" else 1,
+              "distribution": args.distribution, "duration_s": args.duration,
+              "latency_kind": "publish" if transport == "shm" else "round-trip"}
+
+    modem = start_process(modem_command, workdir, "modem.out", env)
+    main  = start_process([sys.executable, MAIN_SCRIPT], workdir, "main.out", env)
+    stubs = []
+    try:
+        wait_for_main(main, main_address, workdir)
+
+        for index in range(clients):
+            if transport == "shm":
+                stubs.append(shm_transport.ShmSampleStub(shm_path))
+            else:
+                stubs.append(grpc.insecure_channel(main_address))
+        load = [LoadClient(stub if transport == "shm" else objectProximityDetectionService_pb2_grpc.ObjectProximityDetectionServiceStub(stub),
+                           method, args.rate / clients, args.batch_size, distance_source(args.distribution, args.seed + index))
+                for index, stub in enumerate(stubs)]
+
+        started    = time.monotonic() + 0.1
+        warmup_end = started + args.warmup
+        end        = warmup_end + args.duration
+        for client in load:
+            client.schedule(started, warmup_end, end)
+            client.start()
+
+        time.sleep(max(warmup_end - time.monotonic(), 0))
+        metrics_before = scrape_metrics(metrics_path)
+        samplers = {"main": ProcessSampler(main.pid), "modem": ProcessSampler(modem.pid), "load": ProcessSampler("self")}
+        for sampler in samplers.values():
+            sampler.start()
+
+        for client in load:
+            client.join()
+        if transport == "shm":
+            drain_started     = time.monotonic()
+            result["dropped"] = drain_ring(shm_path)
+            result["drain_s"] = round(time.monotonic() - drain_started, 3)
+        elapsed = time.monotonic() - warmup_end
+
+        result["processes"]    = {name: sampler.stop() for name, sampler in samplers.items()}
+        result["main_metrics"] = metrics_delta(metrics_before, scrape_metrics(metrics_path))
+    finally:
+        for stub in stubs:
+            stub.close()
+        stop_process(main)
+        stop_process(modem)
+
+    latencies = [latency for client in load for latency in client.latencies]
+    result["samples"]               = sum(client.samples for client in load)
+    result["requests"]              = sum(client.requests for client in load)
+    result["errors"]                = sum(client.errors for client in load)
+    result["throughput_samples_s"]  = round(result["samples"] / elapsed, 1)
+    result["throughput_requests_s"] = round(result["requests"] / elapsed, 1)
+    result["latency_us"]            = latency_summary(latencies)
+    return result
+
+"""
+    Prints one line per scenario
+
+    :param results: Results of the scenarios
+    :return:        None
+"""
+def print_summary(results):
+    print(f"\n{'scenario':<28} {'samples/s':>10} {'p50 us':>9} {'p99 us':>9} {'max us':>9} {'errors':>7} {'main cpu %':>10} {'main rss MB':>11}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['name']:<28} failed: {result['error'].splitlines()[0]}")
+            continue
+        latency = result["latency_us"] or {"p50": "-", "p99": "-", "max": "-"}
+        main    = result["processes"]["main"] or {"cpu_percent": "-", "rss_max_kb": 0}
+        print(f"{result['name']:<28} {result['throughput_samples_s']:>10} {latency['p50']:>9} {latency['p99']:>9} {latency['max']:>9} "
+              f"{result['errors']:>7} {main['cpu_percent']:>10} {main['rss_max_kb'] / 1024:>11.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks Main server with a stub Modem server over all transports and modes.")
+    parser.add_argument("--transports", type=lambda value: comma_list(value, TRANSPORTS), default=list(TRANSPORTS),
+                        help="transports between client and Main server (default: tcp,unix,shm)")
+    parser.add_argument("--methods", type=lambda value: comma_list(value, METHODS), default=list(METHODS),
+                        help="request methods (default: unary,stream,batch)")
+    parser.add_argument("--servers", type=lambda value: comma_list(value, SERVERS), default=list(SERVERS),
+                        help="Main server modes - thread pool or asyncio (default: threads,asyncio)")
+    parser.add_argument("--clients", type=int, default=4, help="concurrent clients, each with its own channel (shm: always 1)")
+    parser.add_argument("--rate", type=float, default=1000, help="samples per second of all clients together, 0 - as fast as possible")
+    parser.add_argument("--batch-size", type=int, default=64, help="samples per batch request")
+    parser.add_argument("--distribution", default="uniform:0:3000",
+                        help="distances - constant:VALUE, uniform:LOW:HIGH, normal:MEAN:STDDEV or file:PATH")
+    parser.add_argument("--duration", type=float, default=10, help="seconds measured per scenario")
+    parser.add_argument("--warmup", type=float, default=2, help="seconds of load before the measurement")
+    parser.add_argument("--seed", type=int, default=1, help="seed of the distances (client n uses seed + n)")
+    parser.add_argument("--config", default=MAIN_CONFIG, help="config of the Main server the scenarios start from")
+    parser.add_argument("--set", type=config_override, action="append", default=[], metavar="KEY=VALUE",
+                        help='overrides key of the Main server config, e.g. --set dispatch_queue_size=0 --set outbox_path=""')
+    parser.add_argument("--modem-latency-ms", type=float, default=0, help="time the stub Modem server (or the fake modem of --modem-command) holds every request")
+    parser.add_argument("--modem-command", help="runs this Modem server (e.g. build/modem_daemon) instead of the stub")
+    parser.add_argument("--keep", action="store_true", help="keeps the scenario directories with configs and logs")
+    parser.add_argument("-o", "--output", help="results file (default: bench-<commit>.json)")
+    args = parser.parse_args()
+
+    if args.clients < 1 or args.batch_size < 1 or args.rate < 0 or args.duration <= 0 or args.warmup < 0:
+        parser.error("--clients and --batch-size must be positive, --rate and --warmup not negative, --duration positive")
+    distance_source(args.distribution, args.seed)
+    args.set = dict(args.set)
+
+    commit, dirty = git_revision()
+    output  = args.output or f"bench-{commit[:12] if commit else 'nocommit'}{'-dirty' if dirty else ''}.json"
+    root    = tempfile.mkdtemp(prefix="bench_pipeline_")
+    results = []
+
+    for transport in args.transports:
+        for method in args.methods:
+            for server in args.servers:
+                if transport == "shm" and method == "stream":
+                    # Shared memory stub publishes every streamed sample on its own - same as unary
+                    continue
+                workdir = os.path.join(root, f"{transport}-{method}-{server}")
+                os.mkdir(workdir)
+                print(f"Running {transport}/{method}/{server}...", flush=True)
+                try:
+                    results.append(run_scenario(args, transport, method, server, workdir))
+                except Exception as e:
+                    results.append({"name": f"{transport}/{method}/{server}", "transport": transport,
+                                    "method": method, "server": server, "error": str(e)})
+                    print(f"Scenario {transport}/{method}/{server} failed: {e}", file=sys.stderr)
+
+    report = {"benchmark": "ipc-pipeline", "format": 1,
+              "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+              "commit": commit, "dirty": dirty,
+              "host": {"name": platform.node(), "machine": platform.machine(), "kernel": platform.release(),
+                       "cpus": os.cpu_count(), "python": platform.python_version(), "grpc": grpc.__version__},
+              "settings": {key: value for key, value in vars(args).items() if key not in ("output", "keep")},
+              "scenarios": results}
+    with open(output, "w") as output_file:
+        json.dump(report, output_file, indent=2)
+
+    print_summary(results)
+    print(f"\nResults written to {output}")
+
+    if args.keep:
+        print(f"Scenario directories kept in {root}")
+    else:
+        shutil.rmtree(root, ignore_errors=True)
+
+    sys.exit(1 if any("error" in result for result in results) else 0)
@@ -0,0 +1,102 @@
+"""compare_results.py
+
+This Python script compares two results files of bench_pipeline.py, e.g. of
+the parent commit and of a change:
+
+    1. Prints throughput, p50 and p99 latency, CPU and peak RSS of main.py of
+       every scenario found in both files, with the change in percent
+
+    2. Exits with status 1 if throughput of a scenario dropped, or its p99
+       latency rose, by more than --max-regression percent
+
+Results are comparable only when they were measured on the same host with
+the same settings - differing settings are reported.
+
+Usage:
+    python3 benchmarks/compare_results.py baseline.json current.json [--max-regression 10]
+
+"""
+
+import sys
+import json
+import argparse
+
+# (name, function reading the value from scenario results, True if higher is better)
+COLUMNS = (("samples/s",   lambda result: result["throughput_samples_s"],                  True),
+           ("p50 us",      lambda result: result["latency_us"]["p50"],                     False),
+           ("p99 us",      lambda result: result["latency_us"]["p99"],                     False),
+           ("main cpu %",  lambda result: result["processes"]["main"]["cpu_percent"],      False),
+           ("main rss kB", lambda result: result["processes"]["main"]["rss_max_kb"],       False))
+# Columns checked against --max-regression
+GATED = ("samples/s", "p99 us")
+
+"""
+    :param path: Results file
+    :return:     (report, dict scenario name -> results of successful scenarios)
+"""
+def load_results(path):
+    with open(path) as results_file:
+        report = json.load(results_file)
+    return report, {result["name"]: result for result in report["scenarios"] if "error" not in result}
+
+"""
+    :param read:   Function reading the value from scenario results
+    :param result: Scenario results
+    :return:       Value, None if the scenario has none (e.g. no latency without replies)
+"""
+def value(read, result):
+    try:
+        return read(result)
+    except (KeyError, TypeError):
+        return None
+
+"""
+    :return: Change from old to new in percent, None if it cannot be computed
+"""
+def change(old, new):
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old * 100
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compares two results files of bench_pipeline.py.")
+    parser.add_argument("baseline", help="results of the reference commit")
+    parser.add_argument("current", help="results of the commit under test")
+    parser.add_argument("--max-regression", type=float, default=10,
+                        help="percent throughput may drop or p99 latency rise before exit status is 1 (default: 10)")
+    args = parser.parse_args()
+
+    baseline_report, baseline = load_results(args.baseline)
+    current_report, current   = load_results(args.current)
+
+    print(f"baseline: {baseline_report.get('commit')}{' (dirty)' if baseline_report.get('dirty') else ''}")
+    print(f"current:  {current_report.get('commit')}{' (dirty)' if current_report.get('dirty') else ''}")
+    if baseline_report.get("host") != current_report.get("host"):
+        print("warning: results were measured on different hosts")
+    for key in sorted(set(baseline_report.get("settings", {})) | set(current_report.get("settings", {}))):
+        if baseline_report["settings"].get(key) != current_report["settings"].get(key):
+            print(f"warning: setting {key} differs: {baseline_report['settings'].get(key)} -> {current_report['settings'].get(key)}")
+
+    print(f"\n{'scenario':<28}" + "".join(f" {name:>24}" for name, _, _ in COLUMNS))
+    regressions = []
+    for name in sorted(set(baseline) & set(current)):
+        cells = []
+        for column, read, higher_is_better in COLUMNS:
+            old, new = value(read, baseline[name]), value(read, current[name])
+            percent  = change(old, new)
+            cells.append(f"{old if old is not None else '-'} -> {new if new is not None else '-'}"
+                         + (f" ({percent:+.1f}%)" if percent is not None else ""))
+            if column in GATED and percent is not None and (-percent if higher_is_better else percent) > args.max_regression:
+                regressions.append(f"{name}: {column} {old} -> {new} ({percent:+.1f}%)")
+        print(f"{name:<28}" + "".join(f" {cell:>24}" for cell in cells))
+
+    for name in sorted(set(baseline) ^ set(current)):
+        print(f"{name:<28} only in {'baseline' if name in baseline else 'current'}")
+        if name in baseline:
+            regressions.append(f"{name}: missing or failed in current results")
+
+    if regressions:
+        print(f"\nRegressions over {args.max_regression:g}%:")
+        print("\n".join(f"    {regression}" for regression in regressions))
+        sys.exit(1)
@@ -0,0 +1,108 @@
+"""stub_modem.py
+
+This Python script implements a stub Modem gRPC-server for benchmarks:
+
+    1. Answers ModemCommunication, ModemCommunicationBatch and ModemJobStatus
+       like the Modem server - every alert gets an SMS job, alerts of a batch
+       seen before are acknowledged as duplicates
+
+    2. Optionally holds every request for a fixed time (--latency-ms), so the
+       Main server can be measured against a slow modem
+
+No SMS is sent and no modem is needed - the Main server is benchmarked alone.
+
+Usage:
+    python3 stub_modem.py 127.0.0.1:50052 [--latency-ms 0] [--workers 4]
+
+"""
+
+import os
+import sys
+import time
+import argparse
+import itertools
+import threading
+from concurrent import futures
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "executables", "main"))
+
+import grpc
+import modemCommunication_pb2
+import modemCommunication_pb2_grpc
+
+
+class StubModemCommunicationService(modemCommunication_pb2_grpc.ModemCommunicationServiceServicer):
+
+    """
+        :param latency: Seconds every request is held before the reply
+    """
+    def __init__(self, latency):
+        self.latency = latency
+        self.job_ids = itertools.count(1)
+        self.jobs    = {}       # job id -> (contact number, alert count)
+        self.seen    = set()    # (outbox epoch, alert id) delivered before
+        self.lock    = threading.Lock()
+
+    def _queue(self, alert):
+        with self.lock:
+            job_id = next(self.job_ids)
+            self.jobs[job_id] = (alert.contact_number, max(alert.alert_count, 1))
+        return job_id
+
+    def ModemCommunication(self, request, context):
+        if self.latency:
+            time.sleep(self.latency)
+        return modemCommunication_pb2.ModemCommunicationReply(message="Stub modem queued the SMS.",
+                                                              job_id=self._queue(request))
+
+    def ModemCommunicationBatch(self, request, context):
+        if self.latency:
+            time.sleep(self.latency)
+
+        job_ids    = []
+        duplicates = 0
+        for alert in request.alerts:
+            with self.lock:
+                key       = (request.outbox_epoch, alert.alert_id)
+                duplicate = alert.alert_id != 0 and key in self.seen
+                self.seen.add(key)
+            if duplicate:
+                duplicates += 1
+            else:
+                job_ids.append(self._queue(alert))
+
+        return modemCommunication_pb2.ModemCommunicationBatchReply(message="Stub modem queued the SMS.",
+                                                                   delivered=len(job_ids),
+                                                                   duplicates=duplicates,
+                                                                   job_ids=job_ids)
+
+    def ModemJobStatus(self, request, context):
+        with self.lock:
+            job = self.jobs.get(request.job_id)
+        if job is None:
+            return modemCommunication_pb2.ModemJobStatusReply(job_id=request.job_id, state=modemCommunication_pb2.JOB_UNKNOWN)
+        return modemCommunication_pb2.ModemJobStatusReply(job_id=request.job_id, state=modemCommunication_pb2.JOB_SENT,
+                                                          contact_number=job[0], alert_count=job[1])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub Modem server answering the Main server without a modem.")
+    parser.add_argument("address", help='"host:port" or "unix:path" the stub listens on')
+    parser.add_argument("--latency-ms", type=float, default=0, help="time every request is held before the reply")
+    parser.add_argument("--workers", type=int, default=4, help="worker threads of the gRPC server")
+    args = parser.parse_args()
+
+    # Keepalive pings of the Main client (config section "channel") are accepted like by the Modem server
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=args.workers),
+                         options=[("grpc.keepalive_permit_without_calls", 1),
+                                  ("grpc.http2.min_recv_ping_interval_without_data_ms", 5000),
+                                  ("grpc.http2.max_ping_strikes", 0)])
+    modemCommunication_pb2_grpc.add_ModemCommunicationServiceServicer_to_server(StubModemCommunicationService(args.latency_ms / 1000), server)
+    server.add_insecure_port(args.address)
+    server.start()
+    print(f"Stub modem is running on {args.address}", flush=True)
+
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(0)
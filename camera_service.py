@@ -0,0 +1,224 @@
+"""camera_service.py
+
+This Python script implements Camera gRPC-server:
+
+    1. Keeps the camera pipeline warm - one rpicam-still process runs in
+       signal mode for the whole lifetime of the server, so a capture costs
+       one frame instead of process start, sensor init and autoexposure
+
+    2. Serves capture requests from Main gRPC-client - pictures are saved to
+       output_dir as <timestamp>_<sequence number>.jpg
+
+    3. Clip mode (config key "capture_mode": "clip") - rpicam-vid streams frames
+       into a bounded ring of preallocated buffers holding the last
+       clip_pre_seconds; a capture request returns at once and the frames from
+       before and after the trigger are written to <timestamp>_<sequence number>.mjpeg
+       in the background
+
+    4. Fake camera backend (config key "camera_backend": "fake") for testing
+       without camera
+
+    5. Reading config file in JSON format in order to get
+        - camera server address (TCP "host:port" or "unix:path")
+        - camera backend, capture mode and output directory
+
+"""
+
+import os
+import grpc
+import time
+import logging
+import threading
+import config
+import endpoints
+import camera
+import frame_ring
+import log_pipeline
+import timestamp
+import cameraService_pb2
+import cameraService_pb2_grpc
+from concurrent import futures
+
+server  = None
+backend = None # camera.RpicamCamera or camera.FakeCamera (still mode)
+source  = None # camera.RpicamVideoSource or camera.FakeVideoSource (clip mode)
+ring    = None # frame_ring.FrameRing with the last frames (clip mode)
+clips   = None # frame_ring.ClipRecorder (clip mode)
+
+# path to the config file in JSON format
+config_path = "config_camera.json"
+
+# Configure logging - records are formatted and written in batches by a background thread
+log_pipeline.setup_logging('camera.log',
+                           fmt=config.get_config(config_path, 'log_format', default="text"),
+                           rate_limit=config.get_config(config_path, 'log_rate_limit', default=0))
+# config keys and their defaults (None - key is required)
+CONFIG_KEYS = {'camera': None, 'camera_backend': "rpicam", 'output_dir': "pictures",
+               'capture_timeout_ms': 2000, 'capture_mode': "still", 'clip_pre_seconds': 5,
+               'clip_post_seconds': 5, 'clip_fps': 10, 'clip_frame_bytes': 262144,
+               'log_format': "text", 'log_rate_limit': 0, 'socket_mode': "0660"}
+
+camera_server_address = None
+camera_backend        = None
+output_dir            = None
+capture_timeout_ms    = None
+capture_mode          = None
+clip_pre_seconds      = None
+clip_post_seconds     = None
+clip_fps              = None
+clip_frame_bytes      = None
+socket_mode           = None
+
+def get_configs():
+    global camera_server_address, camera_backend, output_dir, capture_timeout_ms
+    global capture_mode, clip_pre_seconds, clip_post_seconds, clip_fps, clip_frame_bytes, socket_mode
+
+    try:
+        settings              = config.Config(config_path, CONFIG_KEYS)
+        camera_server_address = settings.camera
+        camera_backend        = settings.camera_backend
+        output_dir            = settings.output_dir
+        capture_timeout_ms    = settings.capture_timeout_ms
+        capture_mode          = settings.capture_mode
+        clip_pre_seconds      = settings.clip_pre_seconds
+        clip_post_seconds     = settings.clip_post_seconds
+        clip_fps              = settings.clip_fps
+        clip_frame_bytes      = settings.clip_frame_bytes
+        socket_mode           = settings.socket_mode
+    except Exception as e:
+        logging.critical(f"An error occurred while getting config data: {e}")
+        raise
+
+"""
+    Creates output directory and starts the camera backend
+
+    :param : None
+    :return: None
+"""
+def start_camera():
+
+    global backend, source, ring, clips
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    if capture_mode == "clip":
+        # Ring holds the pre-event frames plus one second for the writer to fall behind
+        slots  = clip_fps * (clip_pre_seconds + 1)
+        ring   = frame_ring.FrameRing(slots, clip_frame_bytes)
+        clips  = frame_ring.ClipRecorder(ring, clip_fps * clip_pre_seconds, clip_fps * clip_post_seconds)
+        source = camera.FakeVideoSource(clip_fps) if camera_backend == "fake" else camera.RpicamVideoSource(clip_fps)
+        source.start(ring)
+        clips.start()
+        logging.info(f"Camera '{camera_backend}' records clips: {clip_pre_seconds} s before and {clip_post_seconds} s after trigger "
+                     f"at {clip_fps} fps, ring of {slots} x {clip_frame_bytes} bytes, clips are saved to {output_dir}")
+        return
+
+    if camera_backend == "fake":
+        backend = camera.FakeCamera()
+    else:
+        backend = camera.RpicamCamera(output_dir, timeout=capture_timeout_ms / 1000)
+
+    backend.start()
+    logging.info(f"Camera backend '{camera_backend}' started, pictures are saved to {output_dir}")
+
+"""
+    Stops the camera backend, clips being recorded are finished with the frames read so far
+
+    :param : None
+    :return: None
+"""
+def stop_camera():
+    if clips is not None:
+        source.stop()
+        clips.stop()
+    else:
+        backend.stop()
+
+class CameraServiceServicer(cameraService_pb2_grpc.CameraServiceServicer):
+
+    def __init__(self):
+        # Camera takes one picture at a time
+        self.lock = threading.Lock()
+
+    def Capture(self, request, context):
+
+        received = time.monotonic()
+        logging.info("Camera server received capture request from Main client: reason=%s, seq=%d", request.reason, request.sequence_number)
+
+        if clips is not None:
+            # Frames before the trigger are already in memory, clip is written in the background
+            filename = clips.trigger(os.path.join(output_dir, f"{timestamp.create_time_stamp()}_{request.sequence_number}.mjpeg"))
+            return cameraService_pb2.CaptureReply(message="Camera is saving clip.",
+                                                  filename=filename,
+                                                  latency_us=int((time.monotonic() - received) * 1_000_000))
+
+        filename = os.path.join(output_dir, f"{timestamp.create_time_stamp()}_{request.sequence_number}.jpg")
+
+        try:
+            with self.lock:
+                backend.capture(filename)
+        except Exception as e:
+            logging.error(f"Camera failed to capture picture: {e}")
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"Camera failed to capture picture: {e}")
+
+        latency_us = int((time.monotonic() - received) * 1_000_000)
+        logging.info("Camera saved picture %s in %d us", filename, latency_us)
+
+        return cameraService_pb2.CaptureReply(message="Camera captured picture.",
+                                              filename=filename,
+                                              latency_us=latency_us)
+
+"""
+    Sets up and runs a gRPC server for capture requests from Main client
+
+    :param max_retries: Max number of connection retries
+    :return: None
+"""
+def serve_MAIN(max_retries=3):
+
+    attempt = 1
+    global camera_server_address, server
+
+    while attempt <= max_retries:
+        try:
+            logging.info(f"Starting Camera server...")
+
+            endpoints.prepare_server(camera_server_address)
+
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+            cameraService_pb2_grpc.add_CameraServiceServicer_to_server(CameraServiceServicer(), server)
+
+            with endpoints.binding(camera_server_address, socket_mode):
+                server.add_insecure_port(camera_server_address)
+                server.start()
+            endpoints.secure_server(camera_server_address, socket_mode)
+
+            logging.info(f"Camera server is running on {camera_server_address}")
+            break
+
+        except grpc.RpcError as e:
+            logging.error(f"Camera server failed to start: grpc.RpcError: {e.code()} - {e.details()}")
+        except Exception as e:
+            logging.error(f"Camera server failed to start: {e}")
+
+        attempt += 1
+
+        if attempt <= max_retries:
+            logging.warning(f"Camera server retrying to start in 3 seconds...")
+            time.sleep(3)
+        else:
+            logging.critical(f"Camera reached max startup retries. Unable to start Camera server after multiple attempts!")
+            raise RuntimeError("Camera server failed to start after multiple attempts.")
+
+    try:
+        while True:
+            time.sleep(86400)  # Keep server active one day
+    except KeyboardInterrupt:
+        logging.info("Camera server is shuting down.")
+        server.stop(0)
+        endpoints.cleanup_server(camera_server_address)
+        stop_camera()
+
+get_configs()
+start_camera()
+serve_MAIN()
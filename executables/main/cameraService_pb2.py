@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: cameraService.proto
+# Protobuf Python Version: 5.27.2
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    5,
+    27,
+    2,
+    '',
+    'cameraService.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13\x63\x61meraService.proto\x12\rcameraService\"9\n\x0e\x43\x61ptureRequest\x12\x0e\n\x06reason\x18\x01 \x01(\t\x12\x17\n\x0fsequence_number\x18\x02 \x01(\r\"E\n\x0c\x43\x61ptureReply\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x10\n\x08\x66ilename\x18\x02 \x01(\t\x12\x12\n\nlatency_us\x18\x03 \x01(\x04\x32V\n\rCameraService\x12\x45\n\x07\x43\x61pture\x12\x1d.cameraService.CaptureRequest\x1a\x1b.cameraService.CaptureReplyb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'cameraService_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_CAPTUREREQUEST']._serialized_start=38
+  _globals['_CAPTUREREQUEST']._serialized_end=95
+  _globals['_CAPTUREREPLY']._serialized_start=97
+  _globals['_CAPTUREREPLY']._serialized_end=166
+  _globals['_CAMERASERVICE']._serialized_start=168
+  _globals['_CAMERASERVICE']._serialized_end=254
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,98 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+import cameraService_pb2 as cameraService__pb2
+
+GRPC_GENERATED_VERSION = '1.67.0'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + f' but the generated code in cameraService_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class CameraServiceStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Capture = channel.unary_unary(
+                '/cameraService.CameraService/Capture',
+                request_serializer=cameraService__pb2.CaptureRequest.SerializeToString,
+                response_deserializer=cameraService__pb2.CaptureReply.FromString,
+                _registered_method=True)
+
+
+class CameraServiceServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def Capture(self, request, context):
+        """Captures one frame with the already running (warm) camera pipeline
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_CameraServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Capture': grpc.unary_unary_rpc_method_handler(
+                    servicer.Capture,
+                    request_deserializer=cameraService__pb2.CaptureRequest.FromString,
+                    response_serializer=cameraService__pb2.CaptureReply.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'cameraService.CameraService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('cameraService.CameraService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class CameraService(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def Capture(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/cameraService.CameraService/Capture',
+            cameraService__pb2.CaptureRequest.SerializeToString,
+            cameraService__pb2.CaptureReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
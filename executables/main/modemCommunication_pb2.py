@@ -24,17 +24,27 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18modemCommunication.proto\x12\x12modemCommunication\"D\n\x19ModemCommunicationRequest\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x16\n\x0e\x63ontact_number\x18\x02 \x01(\x05\"*\n\x17ModemCommunicationReply\x12\x0f\n\x07message\x18\x01 \x01(\t2\x8d\x01\n\x19ModemCommunicationService\x12p\n\x12ModemCommunication\x12-.modemCommunication.ModemCommunicationRequest\x1a+.modemCommunication.ModemCommunicationReplyb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x18modemCommunication.proto\x12\x12modemCommunication\"k\n\x19ModemCommunicationRequest\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x16\n\x0e\x63ontact_number\x18\x02 \x01(\x05\x12\x13\n\x0b\x61lert_count\x18\x03 \x01(\x05\x12\x10\n\x08\x61lert_id\x18\x04 \x01(\x04\":\n\x17ModemCommunicationReply\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x0e\n\x06job_id\x18\x02 \x01(\x04\"u\n\x1eModemCommunicationBatchRequest\x12=\n\x06\x61lerts\x18\x01 \x03(\x0b\x32-.modemCommunication.ModemCommunicationRequest\x12\x14\n\x0coutbox_epoch\x18\x02 \x01(\t\"g\n\x1cModemCommunicationBatchReply\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x11\n\tdelivered\x18\x02 \x01(\r\x12\x12\n\nduplicates\x18\x03 \x01(\r\x12\x0f\n\x07job_ids\x18\x04 \x03(\x04\"\'\n\x15ModemJobStatusRequest\x12\x0e\n\x06job_id\x18\x01 \x01(\x04\"\x8f\x01\n\x13ModemJobStatusReply\x12\x0e\n\x06job_id\x18\x01 \x01(\x04\x12+\n\x05state\x18\x02 \x01(\x0e\x32\x1c.modemCommunication.JobState\x12\x16\n\x0e\x63ontact_number\x18\x03 \x01(\x05\x12\x13\n\x0b\x61lert_count\x18\x04 \x01(\x05\x12\x0e\n\x06\x64\x65tail\x18\x05 \x01(\t*Z\n\x08JobState\x12\x0f\n\x0bJOB_UNKNOWN\x10\x00\x12\x0e\n\nJOB_QUEUED\x10\x01\x12\x0f\n\x0bJOB_SENDING\x10\x02\x12\x0c\n\x08JOB_SENT\x10\x03\x12\x0e\n\nJOB_FAILED\x10\x04\x32\xf4\x02\n\x19ModemCommunicationService\x12p\n\x12ModemCommunication\x12-.modemCommunication.ModemCommunicationRequest\x1a+.modemCommunication.ModemCommunicationReply\x12\x7f\n\x17ModemCommunicationBatch\x12\x32.modemCommunication.ModemCommunicationBatchRequest\x1a\x30.modemCommunication.ModemCommunicationBatchReply\x12\x64\n\x0eModemJobStatus\x12).modemCommunication.ModemJobStatusRequest\x1a\'.modemCommunication.ModemJobStatusReplyb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'modemCommunication_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_JOBSTATE']._serialized_start=628
+  _globals['_JOBSTATE']._serialized_end=718
   _globals['_MODEMCOMMUNICATIONREQUEST']._serialized_start=48
-  _globals['_MODEMCOMMUNICATIONREQUEST']._serialized_end=116
-  _globals['_MODEMCOMMUNICATIONREPLY']._serialized_start=118
-  _globals['_MODEMCOMMUNICATIONREPLY']._serialized_end=160
-  _globals['_MODEMCOMMUNICATIONSERVICE']._serialized_start=163
-  _globals['_MODEMCOMMUNICATIONSERVICE']._serialized_end=304
+  _globals['_MODEMCOMMUNICATIONREQUEST']._serialized_end=155
+  _globals['_MODEMCOMMUNICATIONREPLY']._serialized_start=157
+  _globals['_MODEMCOMMUNICATIONREPLY']._serialized_end=215
+  _globals['_MODEMCOMMUNICATIONBATCHREQUEST']._serialized_start=217
+  _globals['_MODEMCOMMUNICATIONBATCHREQUEST']._serialized_end=334
+  _globals['_MODEMCOMMUNICATIONBATCHREPLY']._serialized_start=336
+  _globals['_MODEMCOMMUNICATIONBATCHREPLY']._serialized_end=439
+  _globals['_MODEMJOBSTATUSREQUEST']._serialized_start=441
+  _globals['_MODEMJOBSTATUSREQUEST']._serialized_end=480
+  _globals['_MODEMJOBSTATUSREPLY']._serialized_start=483
+  _globals['_MODEMJOBSTATUSREPLY']._serialized_end=626
+  _globals['_MODEMCOMMUNICATIONSERVICE']._serialized_start=721
+  _globals['_MODEMCOMMUNICATIONSERVICE']._serialized_end=1093
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,16 @@ class ModemCommunicationServiceStub(object):
                 request_serializer=modemCommunication__pb2.ModemCommunicationRequest.SerializeToString,
                 response_deserializer=modemCommunication__pb2.ModemCommunicationReply.FromString,
                 _registered_method=True)
+        self.ModemCommunicationBatch = channel.unary_unary(
+                '/modemCommunication.ModemCommunicationService/ModemCommunicationBatch',
+                request_serializer=modemCommunication__pb2.ModemCommunicationBatchRequest.SerializeToString,
+                response_deserializer=modemCommunication__pb2.ModemCommunicationBatchReply.FromString,
+                _registered_method=True)
+        self.ModemJobStatus = channel.unary_unary(
+                '/modemCommunication.ModemCommunicationService/ModemJobStatus',
+                request_serializer=modemCommunication__pb2.ModemJobStatusRequest.SerializeToString,
+                response_deserializer=modemCommunication__pb2.ModemJobStatusReply.FromString,
+                _registered_method=True)
 
 
 class ModemCommunicationServiceServicer(object):
@@ -50,6 +60,23 @@ class ModemCommunicationServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ModemCommunicationBatch(self, request, context):
+        """Alerts delivered from the Main server outbox, possibly more than once - alerts
+        with an alert_id sent or queued before are not queued again. Outbox deletes the
+        alerts when all job_ids are JOB_SENT; alerts of a failed job are queued again
+        when they are delivered again
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ModemJobStatus(self, request, context):
+        """State of the SMS job returned by ModemCommunication / ModemCommunicationBatch
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ModemCommunicationServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +85,16 @@ def add_ModemCommunicationServiceServicer_to_server(servicer, server):
                     request_deserializer=modemCommunication__pb2.ModemCommunicationRequest.FromString,
                     response_serializer=modemCommunication__pb2.ModemCommunicationReply.SerializeToString,
             ),
+            'ModemCommunicationBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.ModemCommunicationBatch,
+                    request_deserializer=modemCommunication__pb2.ModemCommunicationBatchRequest.FromString,
+                    response_serializer=modemCommunication__pb2.ModemCommunicationBatchReply.SerializeToString,
+            ),
+            'ModemJobStatus': grpc.unary_unary_rpc_method_handler(
+                    servicer.ModemJobStatus,
+                    request_deserializer=modemCommunication__pb2.ModemJobStatusRequest.FromString,
+                    response_serializer=modemCommunication__pb2.ModemJobStatusReply.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'modemCommunication.ModemCommunicationService', rpc_method_handlers)
@@ -95,3 +132,57 @@ class ModemCommunicationService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def ModemCommunicationBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/modemCommunication.ModemCommunicationService/ModemCommunicationBatch',
+            modemCommunication__pb2.ModemCommunicationBatchRequest.SerializeToString,
+            modemCommunication__pb2.ModemCommunicationBatchReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ModemJobStatus(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/modemCommunication.ModemCommunicationService/ModemJobStatus',
+            modemCommunication__pb2.ModemJobStatusRequest.SerializeToString,
+            modemCommunication__pb2.ModemJobStatusReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -24,17 +24,37 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n%objectProximityDetectionService.proto\"U\n\x1fObjectProximityDetectionRequest\x12\x0f\n\x07message\x18\x01 \x01(\t\x12!\n\x19object_proximity_distance\x18\x02 \x01(\x05\"0\n\x1dObjectProximityDetectionReply\x12\x0f\n\x07message\x18\x01 \x01(\t2\x7f\n\x1fObjectProximityDetectionService\x12\\\n\x18ObjectProximityDetection\x12 .ObjectProximityDetectionRequest\x1a\x1e.ObjectProximityDetectionReplyb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n%objectProximityDetectionService.proto\"\x81\x01\n\x1fObjectProximityDetectionRequest\x12\x0f\n\x07message\x18\x01 \x01(\t\x12!\n\x19object_proximity_distance\x18\x02 \x01(\x05\x12\x17\n\x0fsequence_number\x18\x03 \x01(\r\x12\x11\n\tsensor_id\x18\x04 \x01(\r\"\xbb\x01\n$ObjectProximityDetectionBatchRequest\x12\x17\n\x0fsequence_number\x18\x01 \x01(\r\x12\x19\n\x11\x62\x61se_timestamp_us\x18\x02 \x01(\x04\x12&\n\x1aobject_proximity_distances\x18\x03 \x03(\x05\x42\x02\x10\x01\x12\x1f\n\x13timestamp_deltas_us\x18\x04 \x03(\rB\x02\x10\x01\x12\x16\n\nsensor_ids\x18\x05 \x03(\rB\x02\x10\x01\"\xa2\x01\n\rSensorSummary\x12\x11\n\tsensor_id\x18\x01 \x01(\r\x12\r\n\x05\x63ount\x18\x02 \x01(\r\x12\x0b\n\x03min\x18\x03 \x01(\x05\x12\x0b\n\x03max\x18\x04 \x01(\x05\x12\x0c\n\x04mean\x18\x05 \x01(\x01\x12\x17\n\x0bpercentiles\x18\x06 \x03(\x01\x42\x02\x10\x01\x12\x11\n\tcrossings\x18\x07 \x01(\r\x12\x1b\n\x0f\x65vent_distances\x18\x08 \x03(\x05\x42\x02\x10\x01\"\xa1\x01\n\x1dObjectProximitySummaryRequest\x12\x17\n\x0fsequence_number\x18\x01 \x01(\r\x12\x1a\n\x12start_timestamp_us\x18\x02 \x01(\x04\x12\x11\n\twindow_us\x18\x03 \x01(\r\x12\x17\n\x0bpercentiles\x18\x04 \x03(\x01\x42\x02\x10\x01\x12\x1f\n\x07sensors\x18\x05 \x03(\x0b\x32\x0e.SensorSummary\"~\n\x1dObjectProximityDetectionReply\x12\x0f\n\x07message\x18\x01 \x01(\t\x12\x17\n\x0fsequence_number\x18\x02 \x01(\r\x12 \n\x06\x61\x63tion\x18\x03 \x01(\x0e\x32\x10.ProximityAction\x12\x11\n\tsensor_id\x18\x04 \x01(\r*J\n\x0fProximityAction\x12\r\n\tNO_ACTION\x10\x00\x12\x12\n\x0eMODEM_NOTIFIED\x10\x01\x12\x14\n\x10\x43\x41MERA_TRIGGERED\x10\x02\x32\xa9\x03\n\x1fObjectProximityDetectionService\x12\\\n\x18ObjectProximityDetection\x12 .ObjectProximityDetectionRequest\x1a\x1e.ObjectProximityDetectionReply\x12\x66\n\x1eObjectProximityDetectionStream\x12 .ObjectProximityDetectionRequest\x1a\x1e.ObjectProximityDetectionReply(\x01\x30\x01\x12\x66\n\x1dObjectProximityDetectionBatch\x12%.ObjectProximityDetectionBatchRequest\x1a\x1e.ObjectProximityDetectionReply\x12X\n\x16ObjectProximitySummary\x12\x1e.ObjectProximitySummaryRequest\x1a\x1e.ObjectProximityDetectionReplyb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'objectProximityDetectionService_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
-  _globals['_OBJECTPROXIMITYDETECTIONREQUEST']._serialized_start=41
-  _globals['_OBJECTPROXIMITYDETECTIONREQUEST']._serialized_end=126
-  _globals['_OBJECTPROXIMITYDETECTIONREPLY']._serialized_start=128
-  _globals['_OBJECTPROXIMITYDETECTIONREPLY']._serialized_end=176
-  _globals['_OBJECTPROXIMITYDETECTIONSERVICE']._serialized_start=178
-  _globals['_OBJECTPROXIMITYDETECTIONSERVICE']._serialized_end=305
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST'].fields_by_name['object_proximity_distances']._loaded_options = None
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST'].fields_by_name['object_proximity_distances']._serialized_options = b'\020\001'
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST'].fields_by_name['timestamp_deltas_us']._loaded_options = None
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST'].fields_by_name['timestamp_deltas_us']._serialized_options = b'\020\001'
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST'].fields_by_name['sensor_ids']._loaded_options = None
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST'].fields_by_name['sensor_ids']._serialized_options = b'\020\001'
+  _globals['_SENSORSUMMARY'].fields_by_name['percentiles']._loaded_options = None
+  _globals['_SENSORSUMMARY'].fields_by_name['percentiles']._serialized_options = b'\020\001'
+  _globals['_SENSORSUMMARY'].fields_by_name['event_distances']._loaded_options = None
+  _globals['_SENSORSUMMARY'].fields_by_name['event_distances']._serialized_options = b'\020\001'
+  _globals['_OBJECTPROXIMITYSUMMARYREQUEST'].fields_by_name['percentiles']._loaded_options = None
+  _globals['_OBJECTPROXIMITYSUMMARYREQUEST'].fields_by_name['percentiles']._serialized_options = b'\020\001'
+  _globals['_PROXIMITYACTION']._serialized_start=820
+  _globals['_PROXIMITYACTION']._serialized_end=894
+  _globals['_OBJECTPROXIMITYDETECTIONREQUEST']._serialized_start=42
+  _globals['_OBJECTPROXIMITYDETECTIONREQUEST']._serialized_end=171
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST']._serialized_start=174
+  _globals['_OBJECTPROXIMITYDETECTIONBATCHREQUEST']._serialized_end=361
+  _globals['_SENSORSUMMARY']._serialized_start=364
+  _globals['_SENSORSUMMARY']._serialized_end=526
+  _globals['_OBJECTPROXIMITYSUMMARYREQUEST']._serialized_start=529
+  _globals['_OBJECTPROXIMITYSUMMARYREQUEST']._serialized_end=690
+  _globals['_OBJECTPROXIMITYDETECTIONREPLY']._serialized_start=692
+  _globals['_OBJECTPROXIMITYDETECTIONREPLY']._serialized_end=818
+  _globals['_OBJECTPROXIMITYDETECTIONSERVICE']._serialized_start=897
+  _globals['_OBJECTPROXIMITYDETECTIONSERVICE']._serialized_end=1322
 # @@protoc_insertion_point(module_scope)
@@ -39,6 +39,21 @@ class ObjectProximityDetectionServiceStub(object):
                 request_serializer=objectProximityDetectionService__pb2.ObjectProximityDetectionRequest.SerializeToString,
                 response_deserializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.FromString,
                 _registered_method=True)
+        self.ObjectProximityDetectionStream = channel.stream_stream(
+                '/ObjectProximityDetectionService/ObjectProximityDetectionStream',
+                request_serializer=objectProximityDetectionService__pb2.ObjectProximityDetectionRequest.SerializeToString,
+                response_deserializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.FromString,
+                _registered_method=True)
+        self.ObjectProximityDetectionBatch = channel.unary_unary(
+                '/ObjectProximityDetectionService/ObjectProximityDetectionBatch',
+                request_serializer=objectProximityDetectionService__pb2.ObjectProximityDetectionBatchRequest.SerializeToString,
+                response_deserializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.FromString,
+                _registered_method=True)
+        self.ObjectProximitySummary = channel.unary_unary(
+                '/ObjectProximityDetectionService/ObjectProximitySummary',
+                request_serializer=objectProximityDetectionService__pb2.ObjectProximitySummaryRequest.SerializeToString,
+                response_deserializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.FromString,
+                _registered_method=True)
 
 
 class ObjectProximityDetectionServiceServicer(object):
@@ -50,6 +65,27 @@ class ObjectProximityDetectionServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def ObjectProximityDetectionStream(self, request_iterator, context):
+        """One long-lived stream per ADC client: every pushed sample is answered with an acknowledgement
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ObjectProximityDetectionBatch(self, request, context):
+        """Many samples in one request, Main server decides on the whole batch at once
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ObjectProximitySummary(self, request, context):
+        """Statistics of every sensor over one aggregation window of ADC client, sent on a fixed cadence
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_ObjectProximityDetectionServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -58,6 +94,21 @@ def add_ObjectProximityDetectionServiceServicer_to_server(servicer, server):
                     request_deserializer=objectProximityDetectionService__pb2.ObjectProximityDetectionRequest.FromString,
                     response_serializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.SerializeToString,
             ),
+            'ObjectProximityDetectionStream': grpc.stream_stream_rpc_method_handler(
+                    servicer.ObjectProximityDetectionStream,
+                    request_deserializer=objectProximityDetectionService__pb2.ObjectProximityDetectionRequest.FromString,
+                    response_serializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.SerializeToString,
+            ),
+            'ObjectProximityDetectionBatch': grpc.unary_unary_rpc_method_handler(
+                    servicer.ObjectProximityDetectionBatch,
+                    request_deserializer=objectProximityDetectionService__pb2.ObjectProximityDetectionBatchRequest.FromString,
+                    response_serializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.SerializeToString,
+            ),
+            'ObjectProximitySummary': grpc.unary_unary_rpc_method_handler(
+                    servicer.ObjectProximitySummary,
+                    request_deserializer=objectProximityDetectionService__pb2.ObjectProximitySummaryRequest.FromString,
+                    response_serializer=objectProximityDetectionService__pb2.ObjectProximityDetectionReply.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'ObjectProximityDetectionService', rpc_method_handlers)
@@ -95,3 +146,84 @@ class ObjectProximityDetectionService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def ObjectProximityDetectionStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_stream(
+            request_iterator,
+            target,
+            '/ObjectProximityDetectionService/ObjectProximityDetectionStream',
+            objectProximityDetectionService__pb2.ObjectProximityDetectionRequest.SerializeToString,
+            objectProximityDetectionService__pb2.ObjectProximityDetectionReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ObjectProximityDetectionBatch(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ObjectProximityDetectionService/ObjectProximityDetectionBatch',
+            objectProximityDetectionService__pb2.ObjectProximityDetectionBatchRequest.SerializeToString,
+            objectProximityDetectionService__pb2.ObjectProximityDetectionReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ObjectProximitySummary(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/ObjectProximityDetectionService/ObjectProximitySummary',
+            objectProximityDetectionService__pb2.ObjectProximitySummaryRequest.SerializeToString,
+            objectProximityDetectionService__pb2.ObjectProximityDetectionReply.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
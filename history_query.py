@@ -0,0 +1,102 @@
+"""history_query.py
+
+This Python script queries the sample historian of ADC client (config section
+"historian", see historian.py):
+
+    1. Lists the segments - time range, size and number of blocks
+    2. Prints count, min, max and mean of the samples of a sensor in a time
+       range, and how many samples were over a threshold (--threshold)
+    3. Optionally writes the samples in the range as CSV lines
+       "timestamp_us,sensor,distance" (--csv samples.csv), which can be played
+       back by the "replay" sample source
+
+Times are local ISO 8601 ("2026-10-18T10:00:00") or microseconds since the
+epoch, the range defaults to the last hour.
+
+Usage:
+    python3 history_query.py adc_history [--sensor 0] [--from TIME] [--to TIME] [--threshold 1000] [--csv samples.csv] [--segments]
+
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "supporting libraries"))
+
+import historian
+
+"""
+    :param text: ISO 8601 local time or microseconds since the epoch
+    :return:     Microseconds since the epoch
+"""
+def parse_time(text):
+    if text.isdigit():
+        return int(text)
+    return int(datetime.fromisoformat(text).timestamp() * 1_000_000)
+
+"""
+    :param timestamp_us: Microseconds since the epoch
+    :return:             Local time with milliseconds
+"""
+def format_time(timestamp_us):
+    return datetime.fromtimestamp(timestamp_us / 1_000_000).isoformat(sep=" ", timespec="milliseconds")
+
+"""
+    Prints the segments of the historian
+
+    :param history: historian.Historian
+    :return:        None
+"""
+def print_segments(history):
+    print(f"{'first sample':<25} {'last sample':<25} {'kB':>8} {'blocks':>8}  segment")
+    for _, path in history.segments():
+        _, blocks  = historian.read_segment(path)
+        time_range = historian.segment_range(path)
+        first, last = (format_time(time_range[0]), format_time(time_range[1])) if time_range else ("-", "-")
+        print(f"{first:<25} {last:<25} {os.path.getsize(path) // 1024:>8} {len(blocks):>8}  {os.path.basename(path)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Queries the sample historian of ADC client.")
+    parser.add_argument("directory", help="historian directory (historian.path in config_adc.json)")
+    parser.add_argument("--sensor", type=int, default=0, help="sensor id (default: 0)")
+    parser.add_argument("--from", dest="start", help="start of the range (default: an hour ago)")
+    parser.add_argument("--to", dest="end", help="end of the range (default: now)")
+    parser.add_argument("--threshold", type=int, help="count samples over this value")
+    parser.add_argument("--csv", help="write the samples of the range to this file")
+    parser.add_argument("--segments", action="store_true", help="list the segments")
+    args = parser.parse_args()
+
+    history  = historian.Historian(args.directory)
+    end_us   = parse_time(args.end) if args.end else time.time_ns() // 1000
+    start_us = parse_time(args.start) if args.start else end_us - 3600 * 1_000_000
+
+    if args.segments:
+        print_segments(history)
+        print()
+
+    started = time.perf_counter()
+    if args.csv is None and args.threshold is None:
+        # Blocks inside the range are answered from their headers
+        count, low, high = history.summary(start_us, end_us, args.sensor)
+        mean = None
+    else:
+        timestamps, values = history.query(start_us, end_us, args.sensor)
+        count = len(values)
+        low, high, mean = (min(values), max(values), sum(values) / count) if count else (None, None, None)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    print(f"sensor {args.sensor}, {format_time(start_us)} - {format_time(end_us)}")
+    print(f"    samples {count}, min {low}, max {high}" + (f", mean {mean:.1f}" if mean is not None else ""))
+    if args.threshold is not None and count:
+        over = sum(1 for value in values if value > args.threshold)
+        print(f"    over {args.threshold}: {over} ({over / count * 100:.2f}%)")
+    print(f"    queried in {elapsed_ms:.1f} ms")
+
+    if args.csv is not None:
+        with open(args.csv, "w") as csv_file:
+            csv_file.writelines(f"{timestamp},{args.sensor},{value}\n" for timestamp, value in zip(timestamps, values))
+        print(f"    {count} samples written to {args.csv}")
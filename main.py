@@ -6,84 +6,1021 @@ This Python script implements several functionalities:
 
     2. Communication with Modem gRPC-server
     
-    3. Communication with Camera via D-Bus
+    3. Communication with Camera gRPC-server (camera_service.py) - capture
+       requests are sent without waiting for the picture
     
     4. Reading config file in JSON format in order to get
         - contact number
-        - servers addresses
+        - servers addresses - TCP "host:port" or Unix domain socket "unix:path";
+          socket file of the Main server is created with permissions "socket_mode"
+          and removed on shutdown
+       config file is parsed once and watched - thresholds, detection settings
+       and contact number are swapped into the running server when it changes
+    
+    5. Background dispatch of modem alerts (modem_dispatch.ModemDispatcher):
+       ADC client gets its reply right away, repeated alerts for the same
+       contact are merged into one modem request carrying their count
+    
+    6. Detection engines (detection.DetectionEngine) for threshold0 and
+       threshold1 - filtering, hysteresis, N-of-M confirmation and optionally
+       edge triggered actions (config section "detection")
+    
+    7. Running either on a thread pool (grpc.server) or on asyncio
+       (grpc.aio, config key "asyncio") - in asyncio mode modem requests
+       do not block a worker thread while the Modem server is busy
+    
+    8. Shared memory sample transport (config "transport": "shm") - ADC client
+       writes samples into a ring in shared memory, a consumer thread takes
+       them in blocks; gRPC server keeps running as control plane
+    
+    9. Persistent outbox for modem alerts (outbox.AlertOutbox, config key
+       "outbox_path") - alerts are committed to a local SQLite database and
+       delivered in batches when the Modem server is reachable, so they
+       survive restarts of the Modem server and of the Main server; they are
+       deleted only when the Modem server reports their SMS jobs as sent
+    
+    10. Latency tracing (config key "trace_buffer" > 0) - trace context of
+        ADC requests is taken from gRPC metadata and passed on to the Modem
+        server, spans of decision and actions are written to "trace_path"
+    
+    11. Metrics (config key "metrics_address") - requests and handler latency,
+        busy workers, actions, modem call outcomes and latency, dispatch queue
+        depth and outbox backlog served in Prometheus text format (metrics.py)
+    
+    12. Multiple sensors - samples carry the id of their sensor, every sensor
+        has its own detection engines; thresholds and detection settings of a
+        sensor come from its entry in config section "sensors", sensors
+        without an entry use THRESHOLD0, THRESHOLD1 and "detection"
+    
+    13. Window summaries of aggregating ADC client (its config section
+        "aggregation") - statistics of every sensor per window and raw samples
+        around threshold crossings; the last summary of every sensor is kept,
+        summarized samples and crossings are counted in metrics
+    
+    14. Supervised channels to the Modem server (config section "channel",
+        see channel_supervisor.py) - keepalive pings, reconnection in the
+        background with jittered exponential backoff, deadline of every
+        request and a circuit breaker; Main server starts and keeps answering
+        ADC client while the Modem server is down, alerts not delivered are
+        logged (or wait in the outbox). Main server accepts keepalive pings
+        of ADC client down to "keepalive_min_ping_ms" apart
+    
+    15. Worker processes (config key "worker_addresses", see main_workers.py) -
+        N whole Main servers in their own processes, each with its own modem,
+        camera and outbox channels and detection engines; they listen on
+        main_server_address together (TCP, SO_REUSEPORT) and each on its own
+        worker address, ADC client sends samples of sensor s to worker s % N.
+        Main server itself only supervises the workers and serves their
+        metrics summed; shared memory samples are consumed by worker 0
     
 Scripts assignment is to receive data from ADC client and depending on 
 the proximity of the object, to send gRPC-request to Modem gRPC-server
-or to send D-Bus message to Camera
+or to Camera gRPC-server
 
 """
 
 import grpc
 import time
+import asyncio
 import logging
+import contextlib
 import config
+import endpoints
+import itertools
+import threading
+import detection
+import log_pipeline
+import modem_dispatch
+import outbox
+import shm_transport
+import channel_supervisor
+import main_workers
+import tracing
+import metrics
+import cameraService_pb2
+import cameraService_pb2_grpc
 import modemCommunication_pb2
 import modemCommunication_pb2_grpc
 import objectProximityDetectionService_pb2
 import objectProximityDetectionService_pb2_grpc
 from concurrent import futures
 
-channel = None # connection to modem gRPC server
+channel = None # channel_supervisor.ChannelSupervisor of the connection to modem gRPC server
 server  = None
 stub    = None # connection to modem gRPC server
+aio_channel = None # channel_supervisor.AsyncChannelSupervisor of the asyncio connection to modem gRPC server
+aio_server  = None
+aio_stub    = None # asyncio connection to modem gRPC server
+aio_loop    = None # event loop running in asyncio mode
+dispatcher  = None # background dispatch of alerts to modem gRPC server
+settings    = None # config.Config read from config_path
+sensor_engines = {} # sensor id -> (engine for threshold0, engine for threshold1, edge triggered)
+engines_lock   = threading.Lock() # engines of a new sensor are created once
+camera_channel = None # connection to camera gRPC server
+camera_stub    = None # connection to camera gRPC server
+camera_busy    = threading.Lock()  # held while capture request is in flight
+camera_seq     = itertools.count(1) # sequence numbers of capture requests
+shm_consumer   = None # shared memory sample transport from ADC client
+alert_outbox   = None # outbox.AlertOutbox with alerts waiting for the Modem server
+outbox_channel = None # connection to modem gRPC server used by the outbox
+outbox_stub    = None # connection to modem gRPC server used by the outbox
+metrics_server = None # HTTP server of metrics
+sensor_summaries = {} # sensor id -> last SensorSummary received from ADC client
+supervisor       = None # main_workers.WorkerSupervisor of the worker processes
+worker_index     = main_workers.worker_index() # index of this worker process, None - not a worker
 
-# Configure logging
-logging.basicConfig(filename='main.log',
-                    level=logging.DEBUG,
-                    format='%(asctime)s - %(levelname)s - %(message)s')
-                    
 # path to the config file in JSON format                    
 config_path = "config_main.json"
 
+# Configure logging - records are formatted and written in batches by a background thread
+log_pipeline.setup_logging('main.log',
+                           fmt=config.get_config(config_path, 'log_format', default="text"),
+                           rate_limit=config.get_config(config_path, 'log_rate_limit', default=0))
+# config keys and their defaults (None - key is required)
+CONFIG_KEYS = {'modem': None, 'main': None, 'threshold0': None, 'threshold1': None,
+               'connection_time': None, 'contact': None,
+               'asyncio': False, 'dispatch_queue_size': 0, 'coalesce_window_ms': 0,
+               'drop_policy': "drop_oldest", 'detection': {}, 'config_watch_ms': 2000,
+               'log_format': "text", 'log_rate_limit': 0, 'camera': "",
+               'transport': "grpc", 'shm_path': "/dev/shm/adc_samples", 'shm_slots': 4096,
+               'socket_mode': "0660", 'outbox_path': "", 'outbox_batch_size': 32,
+               'outbox_commit_ms': 10, 'outbox_max_backoff_ms': 30000, 'outbox_sent_timeout_ms': 120000,
+               'trace_buffer': 0, 'trace_path': "main_trace.jsonl", 'metrics': "", 'sensors': [],
+               'channel': {}, 'keepalive_min_ping_ms': 5000, 'workers': []}
+# config keys which can be changed without restarting Main server
+RELOADABLE_KEYS = ('threshold0', 'threshold1', 'contact', 'detection', 'sensors')
+# worker threads of the gRPC server (thread pool mode)
+MAX_WORKERS = 10
+
+# Metrics served on metrics_address
+requests_unary        = metrics.Counter("main_requests_total", "Requests received from ADC client", {"method": "unary"})
+requests_stream       = metrics.Counter("main_requests_total", "Requests received from ADC client", {"method": "stream"})
+requests_batch        = metrics.Counter("main_requests_total", "Requests received from ADC client", {"method": "batch"})
+requests_shm          = metrics.Counter("main_requests_total", "Requests received from ADC client", {"method": "shm"})
+requests_summary      = metrics.Counter("main_requests_total", "Requests received from ADC client", {"method": "summary"})
+summary_samples       = metrics.Counter("main_summary_samples_total", "Samples summarized by ADC client")
+summary_crossings     = metrics.Counter("main_summary_crossings_total", "Threshold crossings reported in summaries of ADC client")
+handler_latency_unary = metrics.Histogram("main_handler_latency_seconds", "Time spent handling requests of ADC client", labels={"method": "unary"})
+handler_latency_batch = metrics.Histogram("main_handler_latency_seconds", "Time spent handling requests of ADC client", labels={"method": "batch"})
+workers_busy          = metrics.Gauge("main_workers_busy", "Requests of ADC client in progress (busy worker threads in thread pool mode)")
+workers               = metrics.GaugeFunction("main_workers", "Worker threads of the gRPC server (0 in asyncio mode)", lambda: 0 if use_asyncio else MAX_WORKERS)
+actions_total         = {objectProximityDetectionService_pb2.NO_ACTION:        metrics.Counter("main_actions_total", "Actions taken", {"action": "none"}),
+                         objectProximityDetectionService_pb2.CAMERA_TRIGGERED: metrics.Counter("main_actions_total", "Actions taken", {"action": "camera"}),
+                         objectProximityDetectionService_pb2.MODEM_NOTIFIED:   metrics.Counter("main_actions_total", "Actions taken", {"action": "modem"})}
+modem_calls_ok        = metrics.Counter("main_modem_calls_total", "Requests sent to the Modem server", {"outcome": "ok"})
+modem_calls_error     = metrics.Counter("main_modem_calls_total", "Requests sent to the Modem server", {"outcome": "error"})
+modem_call_latency    = metrics.Histogram("main_modem_call_latency_seconds", "Latency of successful requests to the Modem server")
+modem_retries         = metrics.Counter("main_modem_connect_retries_total", "Failed attempts to connect to the Modem server")
+modem_available       = metrics.GaugeFunction("main_modem_available", "1 while the Modem server is connected and its circuit is closed (summed over worker processes)", lambda: int((aio_channel or channel or outbox_channel).available()))
+alerts_lost           = metrics.Counter("main_modem_alerts_lost_total", "Alerts not delivered because the Modem server was unreachable")
+camera_triggers_sent  = metrics.Counter("main_camera_triggers_total", "Camera triggers", {"outcome": "sent"})
+camera_triggers_skip  = metrics.Counter("main_camera_triggers_total", "Camera triggers", {"outcome": "skipped"})
+dispatch_queue_depth  = metrics.GaugeFunction("main_dispatch_queue_depth", "Alerts waiting in the modem dispatch queue", lambda: dispatcher.queue.qsize())
+dispatch_dropped      = metrics.CounterFunction("main_dispatch_dropped_total", "Alerts dropped because the dispatch queue was full", lambda: dispatcher.dropped)
+outbox_pending        = metrics.GaugeFunction("main_outbox_pending", "Alerts in the outbox waiting for delivery", lambda: alert_outbox.pending())
+shm_overruns          = metrics.CounterFunction("main_shm_overruns_total", "Samples dropped by ADC client because the shared memory ring was full", lambda: shm_consumer.overruns())
+
 modem_server_address = None
 main_server_address  = None
 connection_time      = None
 threshold0           = None
 threshold1           = None
 number               = None
+use_asyncio          = None
+dispatch_queue_size  = None
+coalesce_window_ms   = None
+drop_policy          = None
+detection_settings   = None
+camera_server_address = None
+transport            = None
+shm_path             = None
+shm_slots            = None
+socket_mode          = None
+outbox_path          = None
+outbox_batch_size    = None
+outbox_commit_ms     = None
+outbox_max_backoff_ms = None
+outbox_sent_timeout_ms = None
+trace_buffer         = None
+trace_path           = None
+metrics_address      = None
+sensors              = None # sensor id -> entry of config section "sensors"
+channel_settings     = None
+keepalive_min_ping_ms = None
+worker_addresses     = None
 
 def get_configs():
-    global modem_server_address, main_server_address, threshold0, threshold1, connection_time, number
+    global modem_server_address, main_server_address, threshold0, threshold1, connection_time, number, use_asyncio
+    global dispatch_queue_size, coalesce_window_ms, drop_policy, detection_settings, settings, camera_server_address
+    global transport, shm_path, shm_slots, socket_mode
+    global outbox_path, outbox_batch_size, outbox_commit_ms, outbox_max_backoff_ms, outbox_sent_timeout_ms
+    global trace_buffer, trace_path, metrics_address
+    global sensors, channel_settings, keepalive_min_ping_ms, worker_addresses
     
     try:
-        modem_server_address = config.get_config(config_path, 'modem')
-        main_server_address  = config.get_config(config_path, 'main')
-        threshold0           = config.get_config(config_path, 'threshold0')
-        threshold1           = config.get_config(config_path, 'threshold1')
-        connection_time      = config.get_config(config_path, 'connection_time')
-        number               = config.get_config(config_path, 'contact')
+        settings             = config.Config(config_path, CONFIG_KEYS)
+        modem_server_address = settings.modem
+        main_server_address  = settings.main
+        threshold0           = settings.threshold0
+        threshold1           = settings.threshold1
+        connection_time      = settings.connection_time
+        number               = settings.contact
+        use_asyncio          = settings.asyncio
+        dispatch_queue_size  = settings.dispatch_queue_size
+        coalesce_window_ms   = settings.coalesce_window_ms
+        drop_policy          = settings.drop_policy
+        detection_settings   = settings.detection
+        camera_server_address = settings.camera
+        transport            = settings.transport
+        shm_path             = settings.shm_path
+        shm_slots            = settings.shm_slots
+        socket_mode          = settings.socket_mode
+        outbox_path          = settings.outbox_path
+        outbox_batch_size    = settings.outbox_batch_size
+        outbox_commit_ms     = settings.outbox_commit_ms
+        outbox_max_backoff_ms = settings.outbox_max_backoff_ms
+        outbox_sent_timeout_ms = settings.outbox_sent_timeout_ms
+        trace_buffer         = settings.trace_buffer
+        trace_path           = settings.trace_path
+        metrics_address      = settings.metrics
+        sensors              = {sensor["id"]: sensor for sensor in settings.sensors}
+        channel_settings     = settings.channel
+        keepalive_min_ping_ms = settings.keepalive_min_ping_ms
+        worker_addresses     = settings.workers
     except Exception as e:
         logging.critical(f"An error occurred while getting config data: {e}")
         raise
 
+"""
+    Applies changed config values to the running server, called by the config watcher
+    
+    :param settings: config.Config with new values
+    :param changed:  Dict key -> new value of changed keys
+    :return: None
+"""
+def apply_config_change(settings, changed):
+    global threshold0, threshold1, number, detection_settings, sensors
+    
+    for key in changed:
+        if key not in RELOADABLE_KEYS:
+            logging.warning(f"Config '{key}' changed in {config_path} - Main server has to be restarted to apply it.")
+    
+    if 'contact' in changed:
+        number = settings.contact
+    
+    if 'detection' in changed or 'sensors' in changed:
+        # Filter and confirmation settings change engine state - new engines are swapped in.
+        # They are created first, settings which fail to create them leave everything running as it was
+        configuration = (settings.threshold0, settings.threshold1, settings.detection,
+                         {sensor["id"]: sensor for sensor in settings.sensors})
+        engines = create_engines(configuration)
+        threshold0, threshold1, detection_settings, sensors = configuration
+        swap_engines(engines)
+    elif 'threshold0' in changed or 'threshold1' in changed:
+        threshold0, threshold1 = settings.threshold0, settings.threshold1
+        for sensor_id, (engine0, engine1, _) in list(sensor_engines.items()):
+            sensor_threshold0, sensor_threshold1, _ = sensor_settings(sensor_id)
+            engine0.set_threshold(sensor_threshold0)
+            engine1.set_threshold(sensor_threshold1)
+    
+    applied = {key: value for key, value in changed.items() if key in RELOADABLE_KEYS}
+    if applied:
+        logging.info(f"Main server applied new configuration: {applied}")
+
+"""
+    Starts watching the config file, if enabled in config (config_watch_ms > 0)
+    
+    :param : None
+    :return: None
+"""
+def watch_config():
+    if settings.config_watch_ms > 0:
+        settings.watch(apply_config_change, interval=settings.config_watch_ms / 1000)
+        logging.info(f"Main server watches {config_path} for changes every {settings.config_watch_ms} ms.")
+
+# Priority of actions when one action is taken for a whole batch
+ACTION_PRIORITY = {objectProximityDetectionService_pb2.NO_ACTION: 0,
+                   objectProximityDetectionService_pb2.CAMERA_TRIGGERED: 1,
+                   objectProximityDetectionService_pb2.MODEM_NOTIFIED: 2}
+
+"""
+    Gets thresholds and detection settings of a sensor - its entry in config
+    section "sensors", missing values are taken from THRESHOLD0, THRESHOLD1 and "detection"
+    
+    :param sensor_id:     Id of the sensor
+    :param configuration: (threshold0, threshold1, detection settings, sensors), None - the running configuration
+    :return:              (threshold0, threshold1, detection settings)
+"""
+def sensor_settings(sensor_id, configuration=None):
+    default0, default1, default_detection, entries = configuration or (threshold0, threshold1, detection_settings, sensors)
+    entry = entries.get(sensor_id, {})
+    return entry.get("THRESHOLD0", default0), entry.get("THRESHOLD1", default1), entry.get("detection", default_detection)
+
+"""
+    Creates detection engines for threshold0 and threshold1 of a sensor
+    
+    :param sensor_id:     Id of the sensor
+    :param configuration: See sensor_settings()
+    :return:              (engine for threshold0, engine for threshold1, edge triggered)
+"""
+def create_sensor_engines(sensor_id, configuration=None):
+    sensor_threshold0, sensor_threshold1, settings = sensor_settings(sensor_id, configuration)
+    return (detection.create_engine(sensor_threshold0, settings),
+            detection.create_engine(sensor_threshold1, settings),
+            settings.get("edge_triggered", False))
+
+"""
+    Creates detection engines of sensor 0 and of the configured sensors, engines
+    of other sensors are created when their first sample arrives
+    
+    :param configuration: See sensor_settings()
+    :return:              Dict sensor id -> engines, see create_sensor_engines()
+"""
+def create_engines(configuration=None):
+    entries = (configuration or (threshold0, threshold1, detection_settings, sensors))[3]
+    return {sensor_id: create_sensor_engines(sensor_id, configuration) for sensor_id in {0, *entries}}
+
+"""
+    Makes engines the running detection engines
+    
+    :param engines: Dict sensor id -> engines, see create_engines()
+    :return: None
+"""
+def swap_engines(engines):
+    
+    global sensor_engines
+    
+    # Swapped in at once - samples being decided keep the engines they got
+    sensor_engines = engines
+
+"""
+    Gets detection engines of a sensor, creates them on the first sample of the sensor
+    
+    :param sensor_id: Id of the sensor
+    :return:          (engine for threshold0, engine for threshold1, edge triggered)
+"""
+def get_engines(sensor_id):
+    engines = sensor_engines.get(sensor_id)
+    if engines is None:
+        with engines_lock:
+            engines = sensor_engines.get(sensor_id)
+            if engines is None:
+                engines = sensor_engines[sensor_id] = create_sensor_engines(sensor_id)
+                logging.info(f"Main server created detection engines of sensor {sensor_id}.")
+    return engines
+
+"""
+    Checks whether detection engine requires action for the last sample - on transition
+    into range only if "edge_triggered", otherwise for every sample while in range
+    
+    :param engine:         DetectionEngine
+    :param event:          Event returned by engine for the last sample
+    :param edge_triggered: Action is taken only on transition into range
+    :return:               True if action is to be taken
+"""
+def engine_fires(engine, event, edge_triggered):
+    if edge_triggered:
+        return event == detection.ENTER
+    return engine.active
+
+"""
+    Decides which action is to be taken depending on the proximity of the detected object
+    
+    :param distance:  Object proximity distance received from ADC client
+    :param sensor_id: Id of the sensor the distance was measured by
+    :return:          ProximityAction to be taken by the Main server
+"""
+def decide_action(distance, sensor_id=0):
+    
+    engine0, engine1, edge_triggered = get_engines(sensor_id)
+    
+    # Both engines see every sample, so their state is kept up to date
+    event0 = engine0.update(distance)
+    event1 = engine1.update(distance)
+    
+    ########## OBRADA #############
+    if engine_fires(engine0, event0, edge_triggered):
+        return objectProximityDetectionService_pb2.MODEM_NOTIFIED
+    
+    elif engine_fires(engine1, event1, edge_triggered):
+        return objectProximityDetectionService_pb2.CAMERA_TRIGGERED
+    ########## OBRADA #############
+    
+    return objectProximityDetectionService_pb2.NO_ACTION
+
+"""
+    Decides on the whole batch of samples in one pass - every sample goes through
+    the detection engines of its sensor and the highest priority action of the batch is taken once
+    
+    :param distances:  Object proximity distances received from ADC client
+    :param sensor_ids: Sensor ids of the distances, empty - all of sensor 0
+    :return:           (ProximityAction to be taken by the Main server, id of the sensor it was decided for)
+"""
+def decide_batch(distances, sensor_ids=()):
+    
+    action = objectProximityDetectionService_pb2.NO_ACTION
+    sensor = 0
+    
+    for distance, sensor_id in zip(distances, sensor_ids or itertools.repeat(0)):
+        sample_action = decide_action(distance, sensor_id)
+        if ACTION_PRIORITY[sample_action] > ACTION_PRIORITY[action]:
+            action, sensor = sample_action, sensor_id
+    
+    return action, sensor
+
+"""
+    :param sensor_id: Id of the sensor which detected the object
+    :return:          Alert message for the Modem server
+"""
+def alert_message(sensor_id):
+    return "Object Detected" if sensor_id == 0 else f"Object Detected (sensor {sensor_id})"
+
+"""
+    Sends one (possibly merged) alert to the Modem server, called by the dispatcher thread
+    
+    :param contact_number: Contact to be alerted
+    :param message:        Alert message
+    :param count:          Number of alerts merged into this request
+    :return:               None
+"""
+def send_to_modem(contact_number, message, count):
+    
+    logging.info("Main client sends request to Modem server: contact=%d, alerts=%d", contact_number, count)
+    
+    request_for_modem = modemCommunication_pb2.ModemCommunicationRequest(message=message,contact_number=contact_number,alert_count=count)
+    
+    # Merged alert is not one sample - new trace follows it to the Modem server
+    trace    = tracing.start(0)
+    sent_us  = tracing.now_us()
+    metadata = tracing.metadata(trace, sent_us)
+    
+    if use_asyncio:
+        # Modem channel belongs to the event loop - request is made and awaited on it
+        async def modem_call():
+            return await aio_stub.ModemCommunication(request_for_modem, metadata=metadata)
+        with metrics.track_call(modem_call_latency, modem_calls_ok, modem_calls_error):
+            reply_from_modem = asyncio.run_coroutine_threadsafe(modem_call(), aio_loop).result()
+    else:
+        with metrics.track_call(modem_call_latency, modem_calls_ok, modem_calls_error):
+            reply_from_modem = stub.ModemCommunication(request_for_modem, metadata=metadata)
+    
+    tracing.record(trace, "main.modem_rpc", sent_us, tracing.now_us())
+    logging.info("Main client received reply from Modem server: %s (job %d)", reply_from_modem.message, reply_from_modem.job_id)
+
+"""
+    Delivers batch of alerts from the outbox to the Modem server, called by the outbox delivery thread
+    
+    :param alerts: List of (alert_id, contact_number, message, count)
+    :param epoch:  Epoch of the outbox database the alert ids belong to
+    :return:       None, raises ConnectionError if the SMS of the batch were not sent
+"""
+def send_outbox_batch(alerts, epoch):
+    
+    request_for_modem = modemCommunication_pb2.ModemCommunicationBatchRequest(
+        alerts=[modemCommunication_pb2.ModemCommunicationRequest(alert_id=alert_id, contact_number=contact_number,
+                                                                 message=message, alert_count=count)
+                for alert_id, contact_number, message, count in alerts],
+        outbox_epoch=epoch)
+    
+    # Batch is traced under the id of its first alert
+    trace   = tracing.start(alerts[0][0])
+    sent_us = tracing.now_us()
+    
+    try:
+        with metrics.track_call(modem_call_latency, modem_calls_ok, modem_calls_error):
+            reply_from_modem = outbox_stub.ModemCommunicationBatch(request_for_modem, timeout=connection_time,
+                                                                   metadata=tracing.metadata(trace, sent_us))
+    except grpc.RpcError as e:
+        raise ConnectionError(f"RPC error occurred at MAIN - MODEM line : {e.code()} - {e.details()}") from None
+    
+    tracing.record(trace, "main.modem_rpc", sent_us, tracing.now_us())
+    logging.info("Main client received reply from Modem server: %s (delivered=%d, duplicates=%d)",
+                 reply_from_modem.message, reply_from_modem.delivered, reply_from_modem.duplicates)
+    
+    # Queued is not sent - alerts leave the outbox only when their SMS were sent,
+    # otherwise the batch is delivered again and the Modem server queues failed alerts again
+    wait_until_sent(set(reply_from_modem.job_ids))
+
+"""
+    Waits until the Modem server sent SMS jobs, called by the outbox delivery thread
+    
+    :param job_ids: Set of SMS job ids
+    :return:        None, raises ConnectionError if a job failed, is unknown to the Modem server
+                    (it restarted) or was not sent within outbox_sent_timeout_ms
+"""
+def wait_until_sent(job_ids):
+    
+    deadline = time.monotonic() + outbox_sent_timeout_ms / 1000
+    
+    while True:
+        for job_id in sorted(job_ids):
+            try:
+                status = outbox_stub.ModemJobStatus(modemCommunication_pb2.ModemJobStatusRequest(job_id=job_id),
+                                                    timeout=connection_time)
+            except grpc.RpcError as e:
+                raise ConnectionError(f"RPC error occurred at MAIN - MODEM line : {e.code()} - {e.details()}") from None
+            
+            if status.state == modemCommunication_pb2.JOB_SENT:
+                job_ids.discard(job_id)
+            elif status.state not in (modemCommunication_pb2.JOB_QUEUED, modemCommunication_pb2.JOB_SENDING):
+                raise ConnectionError(f"SMS job {job_id} was not sent: "
+                                      f"{modemCommunication_pb2.JobState.Name(status.state)} {status.detail}".rstrip())
+        
+        if not job_ids:
+            return
+        if time.monotonic() >= deadline:
+            raise ConnectionError(f"{len(job_ids)} SMS jobs were not sent within {outbox_sent_timeout_ms} ms")
+        # Stopped outbox keeps the alerts for the next run
+        if alert_outbox.stopped.wait(0.5):
+            raise ConnectionError("Outbox stopped before the SMS were sent")
+
+"""
+    Opens outbox and starts delivering its alerts, if enabled in config (outbox_path).
+    Channel to the Modem server connects in the background - Main server does not
+    wait for the Modem server, alerts stay in the outbox until it is reachable.
+    
+    :param : None
+    :return: None
+"""
+def start_outbox():
+    
+    global alert_outbox, outbox_channel, outbox_stub
+    
+    if not outbox_path:
+        return
+    
+    outbox_channel = channel_supervisor.ChannelSupervisor("Modem server", modem_server_address, channel_settings,
+                                                          on_state_change=modem_state_changed)
+    outbox_channel.start()
+    outbox_stub    = outbox_channel.stub(modemCommunication_pb2_grpc.ModemCommunicationServiceStub)
+    alert_outbox   = outbox.AlertOutbox(outbox_path, send_outbox_batch,
+                                        batch_size=outbox_batch_size,
+                                        commit_interval=outbox_commit_ms / 1000,
+                                        max_backoff=outbox_max_backoff_ms / 1000)
+    alert_outbox.start()
+    logging.info(f"Modem alerts go through outbox {outbox_path}, {alert_outbox.pending()} alerts waiting for delivery.")
+
+"""
+    Stops outbox, undelivered alerts stay in it for the next run
+    
+    :param : None
+    :return: None
+"""
+def stop_outbox():
+    if alert_outbox is not None:
+        alert_outbox.stop()
+        outbox_channel.close()
+        logging.info(f"Outbox stopped, {alert_outbox.pending()} alerts waiting for delivery.")
+
+"""
+    Starts serving metrics, if enabled in config (metrics_address)
+    
+    :param : None
+    :return: None
+"""
+def start_metrics():
+    global metrics_server
+    
+    if worker_index is not None:
+        # Supervisor serves metrics of all workers
+        main_workers.serve_supervisor()
+    elif metrics_address:
+        metrics_server = metrics.start_server(metrics_address, socket_mode)
+
+"""
+    Stops serving metrics
+    
+    :param : None
+    :return: None
+"""
+def stop_metrics():
+    if metrics_server is not None:
+        metrics.stop_server(metrics_server, metrics_address)
+
+"""
+    Starts background dispatch of alerts to the Modem server, if enabled in config
+    (dispatch_queue_size > 0)
+    
+    :param : None
+    :return: None
+"""
+def start_dispatcher():
+    
+    global dispatcher
+    
+    if dispatch_queue_size == 0:
+        return
+    
+    # With outbox, merged alerts are stored and delivered by the outbox
+    send       = alert_outbox.submit if alert_outbox is not None else send_to_modem
+    dispatcher = modem_dispatch.ModemDispatcher(send,
+                                                max_queue=dispatch_queue_size,
+                                                coalesce_window=coalesce_window_ms / 1000,
+                                                drop_policy=drop_policy)
+    dispatcher.start()
+    logging.info(f"Modem dispatcher started: queue={dispatch_queue_size}, window={coalesce_window_ms} ms, policy={drop_policy}")
+
+"""
+    Logs result of capture request, called by gRPC when the Camera server replies
+    
+    :param call: Completed capture call (grpc.Future)
+    :return:     None
+"""
+def camera_done(call):
+    camera_busy.release()
+    try:
+        reply = call.result()
+        logging.info("Camera saved picture %s, latency %d us", reply.filename, reply.latency_us)
+    except grpc.RpcError as e:
+        logging.error(f"RPC error occurred at MAIN - CAMERA line : {e.code()} - {e.details()}")
+
+"""
+    Sends capture request to the Camera server without waiting for the picture.
+    While a capture is in flight further triggers are skipped - camera takes
+    one picture at a time and the object is on the picture being taken anyway.
+    
+    :param : None
+    :return: None
+"""
+def trigger_camera():
+    if camera_stub is None:
+        logging.info("Object Detected. Camera server is not configured.")
+        return
+    
+    # Server threads trigger concurrently - checking and taking the camera is one step
+    if not camera_busy.acquire(blocking=False):
+        camera_triggers_skip.inc()
+        logging.debug("Object Detected. Capture already in progress.")
+        return
+    
+    camera_triggers_sent.inc()
+    request_for_camera = cameraService_pb2.CaptureRequest(reason="Object Detected", sequence_number=next(camera_seq))
+    logging.info("Object Detected. Main client sends capture request %d to Camera server.", request_for_camera.sequence_number)
+    
+    try:
+        call = camera_stub.Capture.future(request_for_camera, timeout=connection_time)
+    except Exception:
+        camera_busy.release()
+        raise
+    call.add_done_callback(camera_done)
+
+"""
+    Takes decided action - alerts Modem server or Camera
+    
+    :param action:    ProximityAction to be taken
+    :param trace:     TraceContext of the sample (None - not traced)
+    :param sensor_id: Id of the sensor which detected the object
+    :return:          ProximityAction taken by the Main server
+"""
+def take_action(action, trace=None, sensor_id=0):
+    
+    global stub, number
+    
+    actions_total[action].inc()
+    
+    if action == objectProximityDetectionService_pb2.MODEM_NOTIFIED and dispatcher is not None:
+        dispatcher.submit(number, alert_message(sensor_id))
+    
+    elif action == objectProximityDetectionService_pb2.MODEM_NOTIFIED and alert_outbox is not None:
+        alert_outbox.submit(number, alert_message(sensor_id))
+    
+    elif action == objectProximityDetectionService_pb2.MODEM_NOTIFIED:
+        logging.info("Main client sends request to Modem server.")
+        
+        request_for_modem   = modemCommunication_pb2.ModemCommunicationRequest(message=alert_message(sensor_id),contact_number=number)
+        sent_us             = tracing.now_us()
+        try:
+            with metrics.track_call(modem_call_latency, modem_calls_ok, modem_calls_error):
+                reply_from_modem = stub.ModemCommunication(request_for_modem, metadata=tracing.metadata(trace, sent_us))
+            tracing.record(trace, "main.modem_rpc", sent_us, tracing.now_us())
+            logging.info("Main client received reply from Modem server: %s (job %d)", reply_from_modem.message, reply_from_modem.job_id)
+        except grpc.RpcError as e:
+            # ADC client still gets its reply, the alert is lost
+            alerts_lost.inc()
+            logging.error(f"RPC error occurred at MAIN - MODEM line : {e.code()} - {e.details()}")
+    
+    elif action == objectProximityDetectionService_pb2.CAMERA_TRIGGERED:
+        trigger_camera()
+    
+    return action
+
+"""
+    Takes decided action (asyncio mode).
+    Modem request is awaited, event loop keeps serving other ADC requests meanwhile.
+    
+    :param action:    ProximityAction to be taken
+    :param trace:     TraceContext of the sample (None - not traced)
+    :param sensor_id: Id of the sensor which detected the object
+    :return:          ProximityAction taken by the Main server
+"""
+async def take_action_async(action, trace=None, sensor_id=0):
+    
+    global aio_stub, number
+    
+    actions_total[action].inc()
+    
+    if action == objectProximityDetectionService_pb2.MODEM_NOTIFIED and dispatcher is not None:
+        if drop_policy == "block":
+            # Waiting for room in the queue must not stall the event loop
+            await asyncio.to_thread(dispatcher.submit, number, alert_message(sensor_id))
+        else:
+            dispatcher.submit(number, alert_message(sensor_id))
+    
+    elif action == objectProximityDetectionService_pb2.MODEM_NOTIFIED and alert_outbox is not None:
+        alert_outbox.submit(number, alert_message(sensor_id))
+    
+    elif action == objectProximityDetectionService_pb2.MODEM_NOTIFIED:
+        logging.info("Main client sends request to Modem server.")
+        
+        request_for_modem   = modemCommunication_pb2.ModemCommunicationRequest(message=alert_message(sensor_id),contact_number=number)
+        sent_us             = tracing.now_us()
+        try:
+            with metrics.track_call(modem_call_latency, modem_calls_ok, modem_calls_error):
+                reply_from_modem = await aio_stub.ModemCommunication(request_for_modem, metadata=tracing.metadata(trace, sent_us))
+            tracing.record(trace, "main.modem_rpc", sent_us, tracing.now_us())
+            logging.info("Main client received reply from Modem server: %s (job %d)", reply_from_modem.message, reply_from_modem.job_id)
+        except grpc.RpcError as e:
+            # ADC client still gets its reply, the alert is lost
+            alerts_lost.inc()
+            logging.error(f"RPC error occurred at MAIN - MODEM line : {e.code()} - {e.details()}")
+    
+    elif action == objectProximityDetectionService_pb2.CAMERA_TRIGGERED:
+        trigger_camera()
+    
+    return action
+
+"""
+    Takes action depending on the proximity of the detected object
+    
+    :param distance:  Object proximity distance received from ADC client
+    :param trace:     TraceContext of the sample (None - not traced)
+    :param sensor_id: Id of the sensor the distance was measured by
+    :return:          ProximityAction taken by the Main server
+"""
+def process_distance(distance, trace=None, sensor_id=0):
+    if trace is None:
+        return take_action(decide_action(distance, sensor_id), sensor_id=sensor_id)
+    
+    started_us = tracing.now_us()
+    action     = decide_action(distance, sensor_id)
+    tracing.record(trace, "main.decide", started_us, tracing.now_us())
+    return take_action(action, trace, sensor_id)
+
+"""
+    Takes action depending on the proximity of the detected object (asyncio mode)
+    
+    :param distance:  Object proximity distance received from ADC client
+    :param trace:     TraceContext of the sample (None - not traced)
+    :param sensor_id: Id of the sensor the distance was measured by
+    :return:          ProximityAction taken by the Main server
+"""
+async def process_distance_async(distance, trace=None, sensor_id=0):
+    if trace is None:
+        return await take_action_async(decide_action(distance, sensor_id), sensor_id=sensor_id)
+    
+    started_us = tracing.now_us()
+    action     = decide_action(distance, sensor_id)
+    tracing.record(trace, "main.decide", started_us, tracing.now_us())
+    return await take_action_async(action, trace, sensor_id)
+
+"""
+    Takes one action for the whole batch of samples
+    
+    :param distances:  Object proximity distances received from ADC client
+    :param trace:      TraceContext of the batch (None - not traced)
+    :param sensor_ids: Sensor ids of the distances, empty - all of sensor 0
+    :return:           (ProximityAction taken by the Main server, id of the sensor it was taken for)
+"""
+def process_batch(distances, trace=None, sensor_ids=()):
+    if trace is None:
+        action, sensor_id = decide_batch(distances, sensor_ids)
+        return take_action(action, sensor_id=sensor_id), sensor_id
+    
+    started_us        = tracing.now_us()
+    action, sensor_id = decide_batch(distances, sensor_ids)
+    tracing.record(trace, "main.decide", started_us, tracing.now_us())
+    return take_action(action, trace, sensor_id), sensor_id
+
+"""
+    Takes one action for block of samples taken from the shared memory ring,
+    called by the consumer thread
+    
+    :param distances:  Object proximity distances written by ADC client
+    :param sensor_ids: Sensor ids of the distances
+    :return:           None
+"""
+def process_shm_samples(distances, sensor_ids):
+    
+    logging.debug("Main server took %d samples from shared memory.", len(distances))
+    requests_shm.inc()
+    
+    if use_asyncio:
+        # Actions use the channels of the event loop
+        action, sensor_id = decide_batch(distances, sensor_ids)
+        asyncio.run_coroutine_threadsafe(take_action_async(action, sensor_id=sensor_id), aio_loop).result()
+    else:
+        process_batch(distances, sensor_ids=sensor_ids)
+
+"""
+    Keeps window summaries of the sensors sent by aggregating ADC client
+    
+    :param request: ObjectProximitySummaryRequest
+    :return:        None
+"""
+def process_summary(request):
+    
+    requests_summary.inc()
+    logging.info("Main server received summary from ADC client: seq=%d, window=%d ms, sensors=%d", request.sequence_number, request.window_us // 1000, len(request.sensors))
+    
+    for summary in request.sensors:
+        sensor_summaries[summary.sensor_id] = summary
+        summary_samples.inc(summary.count)
+        summary_crossings.inc(summary.crossings)
+        logging.debug("Summary of sensor %d: count=%d, min=%d, max=%d, mean=%.1f, percentiles=%s, crossings=%d, event samples=%d",
+                      summary.sensor_id, summary.count, summary.min, summary.max, summary.mean,
+                      dict(zip(request.percentiles, summary.percentiles)), summary.crossings, len(summary.event_distances))
+
+"""
+    Creates shared memory ring for samples from ADC client and starts consuming it,
+    if enabled in config ("transport": "shm")
+    
+    :param : None
+    :return: None
+"""
+def start_shm_consumer():
+    
+    global shm_consumer
+    
+    # There is one ring - of worker 0 if there are workers
+    if transport != "shm" or worker_index not in (None, 0):
+        return
+    
+    shm_consumer = shm_transport.ShmSampleConsumer(shm_path, shm_slots, process_shm_samples)
+    shm_consumer.start()
+    logging.info(f"Main server receives samples through shared memory {shm_path} ({shm_slots} slots).")
+
+"""
+    Stops shared memory consumer and removes the ring
+    
+    :param : None
+    :return: None
+"""
+def stop_shm_consumer():
+    if shm_consumer is not None:
+        logging.info(f"Shared memory consumer stopped, samples dropped by ADC client: {shm_consumer.overruns()}")
+        shm_consumer.stop()
+
 class ObjectProximityDetectionServiceServicer(objectProximityDetectionService_pb2_grpc.ObjectProximityDetectionServiceServicer):
     def ObjectProximityDetection(self, request, context):
         
-        global stub, channel, threshold0, threshold1, number
+        with workers_busy.in_progress():
+            started     = time.perf_counter()
+            received_us = tracing.now_us()
+            trace       = tracing.extract(context.invocation_metadata(), received_us)
+            requests_unary.inc()
+            logging.info("Main server received request from ADC client: Message=%s, sensor=%d, distance=%d", request.message, request.sensor_id, request.object_proximity_distance)
+            
+            action = process_distance(request.object_proximity_distance, trace, request.sensor_id)
+            tracing.record(trace, "main.handler", received_us, tracing.now_us())
+            handler_latency_unary.observe(time.perf_counter() - started)
+        
+        reply_for_ADC = "Main server took action."
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message=reply_for_ADC,
+                                                                                 sequence_number=request.sequence_number,
+                                                                                 action=action,
+                                                                                 sensor_id=request.sensor_id)
+    
+    def ObjectProximityDetectionStream(self, request_iterator, context):
+        
+        logging.info("Main server accepted sample stream from ADC client.")
         
-        logging.info(f"Main server received request from ADC client: Message={request.message}, distance={request.object_proximity_distance}")
+        # Worker thread is taken for the whole life of the stream
+        with workers_busy.in_progress():
+            # Every sample pushed on the stream is acknowledged with the action taken for it
+            for request in request_iterator:
+                requests_stream.inc()
+                logging.debug("Main server received sample from ADC client: seq=%d, sensor=%d, distance=%d", request.sequence_number, request.sensor_id, request.object_proximity_distance)
+                
+                action = process_distance(request.object_proximity_distance, sensor_id=request.sensor_id)
+                
+                yield objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message="Main server took action.",
+                                                                                        sequence_number=request.sequence_number,
+                                                                                        action=action,
+                                                                                        sensor_id=request.sensor_id)
         
-        ########## OBRADA #############
-        if request.object_proximity_distance > threshold0:
-            logging.info("Main client sends request to Modem server.")
+        logging.info("ADC client closed sample stream.")
+    
+    def ObjectProximityDetectionBatch(self, request, context):
+        
+        with workers_busy.in_progress():
+            started     = time.perf_counter()
+            received_us = tracing.now_us()
+            trace       = tracing.extract(context.invocation_metadata(), received_us)
+            requests_batch.inc()
+            logging.info("Main server received batch from ADC client: seq=%d, samples=%d", request.sequence_number, len(request.object_proximity_distances))
             
-            request_for_modem   = modemCommunication_pb2.ModemCommunicationRequest(message="Object Detected",contact_number=number)
-            reply_from_modem    = stub.ModemCommunication(request_for_modem)
+            action, sensor_id = process_batch(request.object_proximity_distances, trace, request.sensor_ids)
+            tracing.record(trace, "main.handler", received_us, tracing.now_us())
+            handler_latency_batch.observe(time.perf_counter() - started)
+        
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message="Main server took action.",
+                                                                                 sequence_number=request.sequence_number,
+                                                                                 action=action,
+                                                                                 sensor_id=sensor_id)
+    
+    def ObjectProximitySummary(self, request, context):
+        
+        process_summary(request)
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message="Main server kept summary.",
+                                                                                 sequence_number=request.sequence_number)
+        
+
+class AsyncObjectProximityDetectionServiceServicer(objectProximityDetectionService_pb2_grpc.ObjectProximityDetectionServiceServicer):
+    async def ObjectProximityDetection(self, request, context):
+        
+        with workers_busy.in_progress():
+            started     = time.perf_counter()
+            received_us = tracing.now_us()
+            trace       = tracing.extract(context.invocation_metadata(), received_us)
+            requests_unary.inc()
+            logging.info("Main server received request from ADC client: Message=%s, sensor=%d, distance=%d", request.message, request.sensor_id, request.object_proximity_distance)
             
-            logging.info(f"Main client received reply from Modem server: {reply_from_modem.message}")
+            action = await process_distance_async(request.object_proximity_distance, trace, request.sensor_id)
+            tracing.record(trace, "main.handler", received_us, tracing.now_us())
+            handler_latency_unary.observe(time.perf_counter() - started)
         
-        elif request.object_proximity_distance > threshold1:
-            logging.info("Object Detected. Main client sends D-Bus message to Camera.")
-        ########## OBRADA #############
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message="Main server took action.",
+                                                                                 sequence_number=request.sequence_number,
+                                                                                 action=action,
+                                                                                 sensor_id=request.sensor_id)
+    
+    async def ObjectProximityDetectionStream(self, request_iterator, context):
         
-        reply_for_ADC = "Main server took action."
-        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message=reply_for_ADC)
+        logging.info("Main server accepted sample stream from ADC client.")
+        
+        with workers_busy.in_progress():
+            async for request in request_iterator:
+                requests_stream.inc()
+                logging.debug("Main server received sample from ADC client: seq=%d, sensor=%d, distance=%d", request.sequence_number, request.sensor_id, request.object_proximity_distance)
+                
+                action = await process_distance_async(request.object_proximity_distance, sensor_id=request.sensor_id)
+                
+                yield objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message="Main server took action.",
+                                                                                        sequence_number=request.sequence_number,
+                                                                                        action=action,
+                                                                                        sensor_id=request.sensor_id)
+        
+        logging.info("ADC client closed sample stream.")
+    
+    async def ObjectProximityDetectionBatch(self, request, context):
+        
+        with workers_busy.in_progress():
+            started     = time.perf_counter()
+            received_us = tracing.now_us()
+            trace       = tracing.extract(context.invocation_metadata(), received_us)
+            requests_batch.inc()
+            logging.info("Main server received batch from ADC client: seq=%d, samples=%d", request.sequence_number, len(request.object_proximity_distances))
+            
+            decided_us        = tracing.now_us()
+            action, sensor_id = decide_batch(request.object_proximity_distances, request.sensor_ids)
+            tracing.record(trace, "main.decide", decided_us, tracing.now_us())
+            action            = await take_action_async(action, trace, sensor_id)
+            tracing.record(trace, "main.handler", received_us, tracing.now_us())
+            handler_latency_batch.observe(time.perf_counter() - started)
         
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message="Main server took action.",
+                                                                                 sequence_number=request.sequence_number,
+                                                                                 action=action,
+                                                                                 sensor_id=sensor_id)
+    
+    async def ObjectProximitySummary(self, request, context):
+        
+        process_summary(request)
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message="Main server kept summary.",
+                                                                                 sequence_number=request.sequence_number)
+        
+
+"""
+    :return: Addresses the gRPC server of this process listens on - main_server_address
+             and, in a worker, its worker address. Workers share a TCP main_server_address,
+             a Unix domain socket is listened on by worker 0 only
+"""
+def server_addresses():
+    if worker_index is None:
+        return [main_server_address]
+    if endpoints.is_unix(main_server_address) and worker_index != 0:
+        return [worker_addresses[worker_index]]
+    return [main_server_address, worker_addresses[worker_index]]
+
+"""
+    :return: Options of the gRPC server for communication with ADC client
+"""
+def server_options():
+    options = channel_supervisor.server_options(keepalive_min_ping_ms)
+    if worker_index is not None:
+        # Workers bind main_server_address together, the kernel spreads connections over them
+        options.append(("grpc.so_reuseport", 1))
+    return options
 
 """
     Sets up and runs a gRPC server for communication with ADC client
@@ -100,13 +1037,22 @@ def serve_ADC(max_retries=3):
         try:
             logging.info(f"Starting Main server...")
             
-            server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+            addresses = server_addresses()
+            for address in addresses:
+                endpoints.prepare_server(address)
+            
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=MAX_WORKERS), options=server_options())
             objectProximityDetectionService_pb2_grpc.add_ObjectProximityDetectionServiceServicer_to_server(ObjectProximityDetectionServiceServicer(), server)
             
-            server.add_insecure_port(main_server_address)
-            server.start()
+            with contextlib.ExitStack() as bindings:
+                for address in addresses:
+                    bindings.enter_context(endpoints.binding(address, socket_mode))
+                    server.add_insecure_port(address)
+                server.start()
+            for address in addresses:
+                endpoints.secure_server(address, socket_mode)
             
-            logging.info(f"Main server is running on {main_server_address}")
+            logging.info(f"Main server is running on {', '.join(addresses)}")
             break
             
         except grpc.RpcError as e:
@@ -129,50 +1075,217 @@ def serve_ADC(max_retries=3):
     except KeyboardInterrupt:
         logging.info("Main server is shuting down.")
         server.stop(0) # Stops the server immediately when a KeyboardInterrupt is raised (e.g., CTRL+C)
+        for address in addresses:
+            endpoints.cleanup_server(address)
+        stop_shm_consumer()
+        if dispatcher is not None:
+            dispatcher.stop()
+        stop_outbox()
+        if channel is not None:
+            channel.close()
+        stop_metrics()
+
+"""
+    Counts connection failures of a Modem server channel, called by the channel supervisor
+    
+    :param state: New grpc.ChannelConnectivity of the channel
+    :return: None
+"""
+def modem_state_changed(state):
+    if state == grpc.ChannelConnectivity.TRANSIENT_FAILURE:
+        modem_retries.inc()
+
+"""
+    Connects to the local modem gRPC server. Channel is supervised (config section "channel") -
+    Main server does not wait for the Modem server longer than connection_time, channel
+    reconnects in the background and modem requests fail fast while the Modem server is down.
+    
+    :param : None
+    :return: None
+"""
+def use_MODEM():
+    
+    global stub, channel, modem_server_address, connection_time
+    
+    logging.info(f"Main client trying to connect to the Modem server...")
+    
+    channel = channel_supervisor.ChannelSupervisor("Modem server", modem_server_address, channel_settings,
+                                                   on_state_change=modem_state_changed)
+    channel.start()
+    stub    = channel.stub(modemCommunication_pb2_grpc.ModemCommunicationServiceStub)
+    
+    if channel.wait_ready(connection_time):
+        logging.info(f"Main client connected to the Modem server running on {modem_server_address}.")
+    else:
+        logging.error(f"Timeout limit exceeded. Main client couldnt establish connection with Modem server {modem_server_address}, "
+                      f"it keeps connecting in the background.")
+
+"""
+    Opens channel to the Camera server, if configured (config key "camera").
+    Channel connects in the background, Main server does not wait for the
+    Camera server to be up - capture requests fail until it is.
+    
+    :param : None
+    :return: None
+"""
+def use_CAMERA():
+    
+    global camera_channel, camera_stub
+    
+    if not camera_server_address:
+        logging.info("Camera server is not configured, camera triggers are only logged.")
+        return
+    
+    camera_channel = grpc.insecure_channel(camera_server_address)
+    camera_stub    = cameraService_pb2_grpc.CameraServiceStub(camera_channel)
+    logging.info(f"Main client uses Camera server on {camera_server_address}.")
 
 """
-    Connects to the local modem gRPC server
+    Sets up and runs a grpc.aio server for communication with ADC client (asyncio mode)
     
     :param max_retries: Max number of connection retries 
     :return: None
 """
-def use_MODEM(max_retries=3):
+async def serve_ADC_async(max_retries=3):
     
     attempt = 1
-    global stub, channel, modem_server_address, connection_time
+    global main_server_address, aio_server
     
     while attempt <= max_retries:
         try:
-            logging.info(f"Main client trying to connect to the Modem server...")
-                  
-            # Creates channel
-            channel = grpc.insecure_channel(modem_server_address)
-            # Checks if channel is ready for communication
-            grpc.channel_ready_future(channel).result(timeout=connection_time)
-            # Stub creating
-            stub    = modemCommunication_pb2_grpc.ModemCommunicationServiceStub(channel)
+            logging.info(f"Starting Main server (asyncio)...")
             
-            logging.info(f"Main client connected to the Modem server running on {modem_server_address}.")
-            return
+            addresses = server_addresses()
+            for address in addresses:
+                endpoints.prepare_server(address)
+            
+            aio_server = grpc.aio.server(options=server_options())
+            objectProximityDetectionService_pb2_grpc.add_ObjectProximityDetectionServiceServicer_to_server(AsyncObjectProximityDetectionServiceServicer(), aio_server)
+            
+            with contextlib.ExitStack() as bindings:
+                for address in addresses:
+                    bindings.enter_context(endpoints.binding(address, socket_mode))
+                    aio_server.add_insecure_port(address)
+                await aio_server.start()
+            for address in addresses:
+                endpoints.secure_server(address, socket_mode)
+            
+            logging.info(f"Main server (asyncio) is running on {', '.join(addresses)}")
+            break
             
-        except grpc.FutureTimeoutError:
-            logging.error(f"Timeout limit exceeded. Main client couldnt establish connection with Modem server {modem_server_address}")
         except grpc.RpcError as e:
-            logging.error(f"RPC error occurred at MAIN - MODEM line : {e.code()} - {e.details()}")
+            logging.error(f"Main server failed to start: grpc.RpcError: {e.code()} - {e.details()}")
         except Exception as e:
-            logging.error(f"Main client failed to connect to the Modem server running on {modem_server_address}: {e}")
-            
+            logging.error(f"Main server failed to start: {e}")
+    
         attempt += 1
         
         if attempt <= max_retries:
-            logging.warning(f"Main Retrying to connect to the Modem server running on {modem_server_address} in 3 seconds...")
-            time.sleep(3)
+            logging.warning(f"Main server retrying to start in 3 seconds...")
+            await asyncio.sleep(3)
         else:
-            logging.critical(f"MAIN reached max connection retries. Unable to connect to the Modem server running on {modem_server_address}  after multiple attempts")
-            if 'channel' in globals() and channel is not None:
-                channel.close()
-            raise RuntimeError("Failed to connect to the Modem server after multiple attempts.")
+            logging.critical(f"Main reached max startup retries. Unable to start Main server after multiple attempts!")
+            raise RuntimeError("Main server failed to start after multiple attempts.")
+    
+    try:
+        await aio_server.wait_for_termination()
+    finally:
+        logging.info("Main server is shuting down.")
+        await aio_server.stop(0)
+        for address in addresses:
+            endpoints.cleanup_server(address)
+
+"""
+    Connects to the local modem gRPC server with supervised grpc.aio channel (asyncio mode)
+    
+    :param : None
+    :return: None
+"""
+async def use_MODEM_async():
+    
+    global aio_stub, aio_channel, modem_server_address, connection_time
+    
+    logging.info(f"Main client trying to connect to the Modem server...")
+    
+    aio_channel = channel_supervisor.AsyncChannelSupervisor("Modem server", modem_server_address, channel_settings,
+                                                            on_state_change=modem_state_changed)
+    aio_channel.start()
+    aio_stub    = aio_channel.stub(modemCommunication_pb2_grpc.ModemCommunicationServiceStub)
+    
+    if await aio_channel.wait_ready(connection_time):
+        logging.info(f"Main client connected to the Modem server running on {modem_server_address}.")
+    else:
+        logging.error(f"Timeout limit exceeded. Main client couldnt establish connection with Modem server {modem_server_address}, "
+                      f"it keeps connecting in the background.")
+
+"""
+    Runs Modem client and ADC server on one asyncio event loop
+    
+    :param : None
+    :return: None
+"""
+async def run_async():
+    global aio_loop
+    
+    aio_loop = asyncio.get_running_loop()
+    start_outbox()
+    if alert_outbox is None:
+        await use_MODEM_async()
+    start_dispatcher()
+    start_shm_consumer()
+    try:
+        await serve_ADC_async()
+    finally:
+        await asyncio.to_thread(stop_shm_consumer)
+        if dispatcher is not None:
+            # Remaining alerts are sent through the event loop - it must keep running meanwhile
+            await asyncio.to_thread(dispatcher.stop)
+        await asyncio.to_thread(stop_outbox)
+        if aio_channel is not None:
+            await aio_channel.close()
+        stop_metrics()
+
+"""
+    Runs worker processes of the Main server until KeyboardInterrupt, serves their metrics
+    
+    :param : None
+    :return: None
+"""
+def run_workers():
+    
+    global supervisor, metrics_server
+    
+    if main_server_address in worker_addresses:
+        raise ValueError(f"'worker_addresses' in '{config_path}' must not list main_server_address {main_server_address}.")
+    
+    supervisor = main_workers.WorkerSupervisor(len(worker_addresses))
+    if metrics_address:
+        metrics_server = metrics.start_server(metrics_address, socket_mode, source=supervisor.snapshot)
+    logging.info(f"Main server runs {len(worker_addresses)} workers on {main_server_address}: {', '.join(worker_addresses)}")
+    
+    supervisor.run()
+    stop_metrics()
 
 get_configs()
-use_MODEM()
-serve_ADC()
+
+if worker_addresses and worker_index is None:
+    run_workers()
+else:
+    tracing.setup("main", trace_buffer, trace_path)
+    start_metrics()
+    swap_engines(create_engines())
+    watch_config()
+    use_CAMERA()
+    
+    if use_asyncio:
+        try:
+            asyncio.run(run_async())
+        except KeyboardInterrupt:
+            pass
+    else:
+        start_outbox()
+        if alert_outbox is None:
+            use_MODEM()
+        start_dispatcher()
+        start_shm_consumer()
+        serve_ADC()
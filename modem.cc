@@ -6,7 +6,12 @@
 #include <grpcpp/grpcpp.h>
 #include "logger.h"
 #include "config.h"
+#include "endpoint.h"
+#include "alert_dedup.h"
+#include "tracing.h"
+#include "metrics.h"
 #include "modemCommunication.grpc.pb.h"
+#include <algorithm>
 #include <chrono>   
 #include <thread>    
 #include <unistd.h>
@@ -20,6 +25,8 @@ using grpc::Status;
 using modemCommunication::ModemCommunicationService;
 using modemCommunication::ModemCommunicationReply;
 using modemCommunication::ModemCommunicationRequest;
+using modemCommunication::ModemCommunicationBatchReply;
+using modemCommunication::ModemCommunicationBatchRequest;
 
 std::atomic<bool> server_running(true); // flag
 
@@ -27,25 +34,101 @@ Logger logger("modem.log");
 
 // path to the config file in JSON format  
 std::string config_path = "config_modem.json";                  
+// spans of traced requests, created from config in serve_main()
+std::unique_ptr<SpanBuffer> tracer;
+
+// Metrics served on metrics_address
+MetricsRegistry  metrics;
+MetricCounter&   requests_single   = metrics.counter("modem_requests_total", "Requests received from Main client", {{"method", "single"}});
+MetricCounter&   requests_batch    = metrics.counter("modem_requests_total", "Requests received from Main client", {{"method", "batch"}});
+MetricCounter&   alert_duplicates  = metrics.counter("modem_alert_duplicates_total", "Alerts skipped because they had already been received");
+MetricHistogram& handler_latency   = metrics.histogram("modem_handler_latency_seconds", "Time spent handling requests of Main client");
+
+// Trace context sent by the Main server, transport span is recorded ("" - request is not traced)
+std::string trace_context(const ServerContext* context, uint64_t received_us)
+{
+    auto metadata = context->client_metadata().find(SpanBuffer::METADATA_KEY);
+    if (metadata == context->client_metadata().end())
+        return "";
+    return tracer->extract(std::string(metadata->second.data(), metadata->second.size()), received_us);
+}
 
 
 class ModemCommunicationServiceImpl final : public ModemCommunicationService::Service {
 public:
     Status ModemCommunication(ServerContext* context, const ModemCommunicationRequest* request, ModemCommunicationReply* reply) override
     {
+        uint64_t received_us = SpanBuffer::now_us();
+        std::string trace    = trace_context(context, received_us);
+        requests_single.inc();
         logger.log(INFO, "Modem server received gRPC-request from Main client. Request message: "+request->message());
         
         // Send SMS to contact_number
         int32_t contact_number = request->contact_number();
-        logger.log(INFO, "Sending SMS to " + std::to_string(contact_number));
+        // Main server merges repeated alerts into one request, SMS reports how many there were
+        int32_t alert_count = std::max<int32_t>(request->alert_count(), 1);
+        logger.log(INFO, "Sending SMS to " + std::to_string(contact_number) + " (alerts: " + std::to_string(alert_count) + ")");
         // Send SMS to contact_number
     
         std::string reply_for_main = "Modem server took action. SMS sent to " + std::to_string(contact_number);
         logger.log(INFO, "Modem server sends gRPC-reply to Main client. Reply message: "+reply_for_main);
         reply->set_message(reply_for_main);
+        uint64_t finished_us = SpanBuffer::now_us();
+        tracer->record(trace, "modem.handler", received_us, finished_us);
+        handler_latency.observe((finished_us - received_us) / 1e6);
 
         return Status::OK;
     }
+
+    Status ModemCommunicationBatch(ServerContext* context, const ModemCommunicationBatchRequest* request, ModemCommunicationBatchReply* reply) override
+    {
+        uint64_t received_us = SpanBuffer::now_us();
+        std::string trace    = trace_context(context, received_us);
+        requests_batch.inc();
+        logger.log(INFO, "Modem server received batch of " + std::to_string(request->alerts_size()) + " alerts from Main client outbox.");
+
+        // Alert ids of a new outbox database start from 1 again
+        if (!dedup.delivered_in(request->outbox_epoch()))
+            logger.log(ERROR, "Outbox epoch " + request->outbox_epoch() + " could not be saved in the alert state file.");
+
+        // Outbox delivers its oldest alerts first - alerts before the batch were sent and deleted
+        uint64_t first_id = 0;
+        for (const ModemCommunicationRequest& alert : request->alerts())
+            if (alert.alert_id() != 0 && (first_id == 0 || alert.alert_id() < first_id))
+                first_id = alert.alert_id();
+        if (!dedup.delivered_from(first_id))
+            logger.log(ERROR, "Alerts before " + std::to_string(first_id) + " could not be saved in the alert state file.");
+
+        uint32_t delivered = 0, duplicates = 0;
+        for (const ModemCommunicationRequest& alert : request->alerts()) {
+            if (dedup.sent(alert.alert_id())) {
+                logger.log(INFO, "Alert " + std::to_string(alert.alert_id()) + " has already been sent, skipped.");
+                alert_duplicates.inc();
+                duplicates++;
+                continue;
+            }
+
+            int32_t alert_count = std::max<int32_t>(alert.alert_count(), 1);
+            logger.log(INFO, "Sending SMS to " + std::to_string(alert.contact_number()) + " (alert id: " + std::to_string(alert.alert_id()) + ", alerts: " + std::to_string(alert_count) + ")");
+            // Send SMS to contact_number
+            // SMS is sent before the reply - the outbox has no job to wait for
+            if (!dedup.mark_sent({alert.alert_id()}))
+                logger.log(ERROR, "Sent alert " + std::to_string(alert.alert_id()) + " could not be saved in the alert state file.");
+            delivered++;
+        }
+
+        reply->set_message("Modem server took action. SMS sent for " + std::to_string(delivered) + " alerts.");
+        reply->set_delivered(delivered);
+        reply->set_duplicates(duplicates);
+        uint64_t finished_us = SpanBuffer::now_us();
+        tracer->record(trace, "modem.handler", received_us, finished_us);
+        handler_latency.observe((finished_us - received_us) / 1e6);
+        return Status::OK;
+    }
+
+private:
+    // Alerts sent before a restart are still recognized when the outbox delivers them again
+    AlertDeduplicator dedup{read_string_from_config_file(config_path, "dedup_state_path", "modem_dedup.state")};
 };
 
 void serve_main(int max_retries=3) {
@@ -54,6 +137,8 @@ void serve_main(int max_retries=3) {
     ServerBuilder builder;
     ModemCommunicationServiceImpl service;
     std::unique_ptr<Server> server;
+    MetricsServer metrics_server(metrics);
+    std::string   metrics_address;
     
     int attempt = 1;
     
@@ -61,15 +146,42 @@ void serve_main(int max_retries=3) {
         try{
         
             server_address = read_server_address_from_config_file(config_path, "modem_server_address");
+            mode_t socket_mode = std::stoi(read_string_from_config_file(config_path, "socket_mode", "0660"), nullptr, 8);
+            tracer.reset(new SpanBuffer("modem", std::max(read_int_from_config_file(config_path, "trace_buffer", 0), 0),
+                                        read_string_from_config_file(config_path, "trace_path", "modem_trace.jsonl")));
             
+            prepare_server_endpoint(server_address);
             builder.AddListeningPort(server_address, grpc::InsecureServerCredentials());
             builder.RegisterService(&service);
+            // Main client pings idle connections (its config section "channel") - pings down to
+            // keepalive_min_ping_ms apart are accepted instead of being answered with GOAWAY
+            builder.AddChannelArgument(GRPC_ARG_KEEPALIVE_PERMIT_WITHOUT_CALLS, 1);
+            builder.AddChannelArgument(GRPC_ARG_HTTP2_MIN_RECV_PING_INTERVAL_WITHOUT_DATA_MS,
+                                       read_int_from_config_file(config_path, "keepalive_min_ping_ms", 5000));
+            builder.AddChannelArgument(GRPC_ARG_HTTP2_MAX_PING_STRIKES, 0);
             
-            server = builder.BuildAndStart();
+            {
+                BindingUmask binding(server_address, socket_mode);
+                server = builder.BuildAndStart();
+            }
             
             if (!server) 
                 throw std::runtime_error("Modem server failed to start");
             
+            secure_server_endpoint(server_address, socket_mode);
+            
+            // Metrics are served only if metrics_address is set
+            metrics_address = read_string_from_config_file(config_path, "metrics_address", "");
+            if (!metrics_address.empty()) {
+                prepare_server_endpoint(metrics_address);
+                {
+                    BindingUmask binding(metrics_address, socket_mode);
+                    metrics_server.start(metrics_address);
+                }
+                secure_server_endpoint(metrics_address, socket_mode);
+                logger.log(INFO, "Modem metrics are served on " + metrics_address);
+            }
+            
             logger.log(INFO, "Modem server is running on " + server_address);
             break;
 
@@ -89,11 +201,20 @@ void serve_main(int max_retries=3) {
         }
     }
 
-    while (server_running)
+    for (int tick = 1; server_running; tick++) {
             std::this_thread::sleep_for(std::chrono::milliseconds(100));
+            // Recorded spans are written to the trace file every 5 s
+            if (tick % 50 == 0)
+                tracer->flush();
+    }
         
     logger.log(INFO, "Modem server is shutting down.");
     server->Shutdown();
+    tracer->flush();
+    metrics_server.stop();
+    cleanup_server_endpoint(server_address);
+    if (!metrics_address.empty())
+        cleanup_server_endpoint(metrics_address);
 }
 
 // Signal handler for SIGINT (CTRL+C)
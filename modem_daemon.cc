@@ -7,58 +7,261 @@
 #include <unistd.h>
 #include <syslog.h>
 #include <string.h>
+#include <signal.h>
+#include <pthread.h>
 
 #include <iostream>
 #include <string>
 #include <memory>
-#include <csignal> 
-#include <atomic>
+#include <vector>
+#include <functional>
 #include <grpcpp/grpcpp.h>
 #include "logger.h"
 #include "config.h"
+#include "endpoint.h"
+#include "alert_dedup.h"
+#include "at_modem.h"
+#include "sms_queue.h"
+#include "tracing.h"
+#include "metrics.h"
 #include "modemCommunication.grpc.pb.h"
+#include <algorithm>
 #include <chrono>   
 #include <thread>  
 
 using grpc::Server;
+using grpc::ServerAsyncResponseWriter;
 using grpc::ServerBuilder;
+using grpc::ServerCompletionQueue;
 using grpc::ServerContext;
 using grpc::Status;
 
 using modemCommunication::ModemCommunicationService;
 using modemCommunication::ModemCommunicationReply;
 using modemCommunication::ModemCommunicationRequest;
+using modemCommunication::ModemCommunicationBatchReply;
+using modemCommunication::ModemCommunicationBatchRequest;
+using modemCommunication::ModemJobStatusReply;
+using modemCommunication::ModemJobStatusRequest;
 
-std::atomic<bool> server_running(true); // flag
 // Create logger instance
 Logger logger("modem.log");
 // path to the config file in JSON format  
 std::string config_path = "config_modem.json";                  
 
+// Metrics served on metrics_address
+MetricsRegistry  metrics;
+MetricCounter&   requests_single   = metrics.counter("modem_requests_total", "Requests received from Main client", {{"method", "single"}});
+MetricCounter&   requests_batch    = metrics.counter("modem_requests_total", "Requests received from Main client", {{"method", "batch"}});
+MetricCounter&   requests_status   = metrics.counter("modem_requests_total", "Requests received from Main client", {{"method", "status"}});
+MetricCounter&   alert_duplicates  = metrics.counter("modem_alert_duplicates_total", "Alerts skipped because they had already been received");
+MetricHistogram& handler_latency   = metrics.histogram("modem_handler_latency_seconds", "Time spent handling requests of Main client");
+MetricCounter&   sms_sent          = metrics.counter("modem_sms_total", "SMS jobs sent by the modem", {{"outcome", "sent"}});
+MetricCounter&   sms_failed        = metrics.counter("modem_sms_total", "SMS jobs sent by the modem", {{"outcome", "failed"}});
+MetricHistogram& sms_send_latency  = metrics.histogram("modem_sms_send_seconds", "Time the modem takes to send a SMS");
 
-class ModemCommunicationServiceImpl final : public ModemCommunicationService::Service {
+
+// Tag of a call on a completion queue
+class Call {
+public:
+    virtual ~Call() {}
+    // ok is false when the completion queue is shutting down
+    virtual void Proceed(bool ok) = 0;
+};
+
+// One unary call: requested -> handled and answered -> finished (deleted).
+// Handlers only queue work and never block, so a few completion queue threads serve all clients.
+template <class Request, class Reply>
+class UnaryCall : public Call {
 public:
-    Status ModemCommunication(ServerContext* context, const ModemCommunicationRequest* request, ModemCommunicationReply* reply) override
+    using Requester = std::function<void(ServerContext*, Request*, ServerAsyncResponseWriter<Reply>*, void*)>;
+    using Handler   = std::function<void(const ServerContext&, const Request&, Reply&)>;
+
+    UnaryCall(Requester requester, Handler handler)
+        : requester(requester), handler(handler), responder(&context), finished(false)
     {
-        logger.log(INFO, "Modem gRPC-server received gRPC-request from Main gRPC-client. Request message: "+request->message());
-        
-        // Send SMS to contact_number
-        int32_t contact_number = request->contact_number();
-        logger.log(INFO, "Sending SMS to " + std::to_string(contact_number));
-        // Send SMS to contact_number
-    
-        std::string reply_for_main = "Modem gRPC-server took action. SMS send.";
+        requester(&context, &request, &responder, this);
+    }
+
+    void Proceed(bool ok) override
+    {
+        if (finished || !ok) {
+            delete this;
+            return;
+        }
+
+        // Next call of this method is accepted while this one is handled
+        new UnaryCall(requester, handler);
+
+        handler(context, request, reply);
+        finished = true;
+        responder.Finish(reply, Status::OK, this);
+    }
+
+private:
+    Requester                        requester;
+    Handler                          handler;
+    ServerContext                    context;
+    Request                          request;
+    Reply                            reply;
+    ServerAsyncResponseWriter<Reply> responder;
+    bool                             finished;
+};
+
+class ModemCommunicationServiceImpl {
+public:
+    ModemCommunicationServiceImpl(SmsQueue& sms_queue, AlertDeduplicator& dedup, SpanBuffer& tracer)
+        : sms_queue(sms_queue), dedup(dedup), tracer(tracer) {}
+
+    void Register(ServerBuilder& builder) { builder.RegisterService(&service); }
+
+    // Puts first calls of every method on the completion queue
+    void Listen(ServerCompletionQueue* cq)
+    {
+        new UnaryCall<ModemCommunicationRequest, ModemCommunicationReply>(
+            [this, cq](ServerContext* context, ModemCommunicationRequest* request, ServerAsyncResponseWriter<ModemCommunicationReply>* responder, void* tag) {
+                service.RequestModemCommunication(context, request, responder, cq, cq, tag);
+            },
+            [this](const ServerContext& context, const ModemCommunicationRequest& request, ModemCommunicationReply& reply) { ModemCommunication(context, request, reply); });
+
+        new UnaryCall<ModemCommunicationBatchRequest, ModemCommunicationBatchReply>(
+            [this, cq](ServerContext* context, ModemCommunicationBatchRequest* request, ServerAsyncResponseWriter<ModemCommunicationBatchReply>* responder, void* tag) {
+                service.RequestModemCommunicationBatch(context, request, responder, cq, cq, tag);
+            },
+            [this](const ServerContext& context, const ModemCommunicationBatchRequest& request, ModemCommunicationBatchReply& reply) { ModemCommunicationBatch(context, request, reply); });
+
+        new UnaryCall<ModemJobStatusRequest, ModemJobStatusReply>(
+            [this, cq](ServerContext* context, ModemJobStatusRequest* request, ServerAsyncResponseWriter<ModemJobStatusReply>* responder, void* tag) {
+                service.RequestModemJobStatus(context, request, responder, cq, cq, tag);
+            },
+            [this](const ServerContext& context, const ModemJobStatusRequest& request, ModemJobStatusReply& reply) { ModemJobStatus(request, reply); });
+    }
+
+    // Completion queue thread
+    static void HandleCalls(ServerCompletionQueue* cq)
+    {
+        void* tag;
+        bool  ok;
+        while (cq->Next(&tag, &ok))
+            static_cast<Call*>(tag)->Proceed(ok);
+    }
+
+private:
+    ModemCommunicationService::AsyncService service;
+    SmsQueue&                               sms_queue;
+    AlertDeduplicator&                      dedup;
+    SpanBuffer&                             tracer;
+
+    // Trace context sent by the Main server, transport span is recorded ("" - request is not traced)
+    std::string TraceContext(const ServerContext& context, uint64_t received_us)
+    {
+        auto metadata = context.client_metadata().find(SpanBuffer::METADATA_KEY);
+        if (metadata == context.client_metadata().end())
+            return "";
+        return tracer.extract(std::string(metadata->second.data(), metadata->second.size()), received_us);
+    }
+
+    void ModemCommunication(const ServerContext& context, const ModemCommunicationRequest& request, ModemCommunicationReply& reply)
+    {
+        uint64_t received_us = SpanBuffer::now_us();
+        std::string trace    = TraceContext(context, received_us);
+        requests_single.inc();
+        logger.log(INFO, "Modem gRPC-server received gRPC-request from Main gRPC-client. Request message: "+request.message());
+
+        // Main server merges repeated alerts into one request, SMS reports how many there were
+        int32_t alert_count = std::max<int32_t>(request.alert_count(), 1);
+        uint64_t job_id     = sms_queue.submit(request.contact_number(), request.message(), alert_count, trace);
+        logger.log(INFO, "SMS to " + std::to_string(request.contact_number()) + " queued as job " + std::to_string(job_id) + " (alerts: " + std::to_string(alert_count) + ")");
+
+        std::string reply_for_main = "Modem gRPC-server took action. SMS queued.";
         logger.log(INFO, "Modem gRPC-server sends gRPC-reply to Main gRPC-client. Reply message: "+reply_for_main);
-        reply->set_message(reply_for_main);
+        reply.set_message(reply_for_main);
+        reply.set_job_id(job_id);
+        uint64_t finished_us = SpanBuffer::now_us();
+        tracer.record(trace, "modem.handler", received_us, finished_us);
+        handler_latency.observe((finished_us - received_us) / 1e6);
+    }
+
+    void ModemCommunicationBatch(const ServerContext& context, const ModemCommunicationBatchRequest& request, ModemCommunicationBatchReply& reply)
+    {
+        uint64_t received_us = SpanBuffer::now_us();
+        std::string trace    = TraceContext(context, received_us);
+        requests_batch.inc();
+        logger.log(INFO, "Modem gRPC-server received batch of " + std::to_string(request.alerts_size()) + " alerts from Main gRPC-client outbox.");
+
+        // Alert ids of a new outbox database start from 1 again
+        if (!dedup.delivered_in(request.outbox_epoch()))
+            logger.log(ERROR, "Outbox epoch " + request.outbox_epoch() + " could not be saved in the alert state file.");
 
-        return Status::OK;
+        // Outbox delivers its oldest alerts first - alerts before the batch were sent and deleted
+        uint64_t first_id = 0;
+        for (const ModemCommunicationRequest& alert : request.alerts())
+            if (alert.alert_id() != 0 && (first_id == 0 || alert.alert_id() < first_id))
+                first_id = alert.alert_id();
+        if (!dedup.delivered_from(first_id))
+            logger.log(ERROR, "Alerts before " + std::to_string(first_id) + " could not be saved in the alert state file.");
+
+        // Outbox deletes the alerts only after all job_ids of the reply were sent
+        uint32_t delivered = 0, duplicates = 0;
+        for (const ModemCommunicationRequest& alert : request.alerts()) {
+            uint64_t alert_id = alert.alert_id();
+            if (dedup.sent(alert_id)) {
+                logger.log(INFO, "Alert " + std::to_string(alert_id) + " has already been sent, skipped.");
+                alert_duplicates.inc();
+                duplicates++;
+                continue;
+            }
+
+            uint64_t job_id = dedup.job(alert_id);
+            if (job_id != 0) {
+                JobState state = sms_queue.status(job_id).state;
+                if (state != modemCommunication::JOB_FAILED && state != modemCommunication::JOB_UNKNOWN) {
+                    logger.log(INFO, "Alert " + std::to_string(alert_id) + " is already queued as job " + std::to_string(job_id) + ", skipped.");
+                    alert_duplicates.inc();
+                    duplicates++;
+                    reply.add_job_ids(job_id);
+                    continue;
+                }
+                // Alerts of a failed job are sent again when the outbox delivers them again
+                logger.log(WARNING, "Alert " + std::to_string(alert_id) + " was not sent by job " + std::to_string(job_id) + ", queued again.");
+            }
+
+            int32_t alert_count = std::max<int32_t>(alert.alert_count(), 1);
+            job_id              = sms_queue.submit(alert.contact_number(), alert.message(), alert_count, trace, alert_id);
+            dedup.queued(alert_id, job_id);
+            logger.log(INFO, "SMS to " + std::to_string(alert.contact_number()) + " queued as job " + std::to_string(job_id) + " (alert id: " + std::to_string(alert_id) + ", alerts: " + std::to_string(alert_count) + ")");
+            reply.add_job_ids(job_id);
+            delivered++;
+        }
+
+        reply.set_message("Modem gRPC-server took action. SMS queued.");
+        reply.set_delivered(delivered);
+        reply.set_duplicates(duplicates);
+        uint64_t finished_us = SpanBuffer::now_us();
+        tracer.record(trace, "modem.handler", received_us, finished_us);
+        handler_latency.observe((finished_us - received_us) / 1e6);
+    }
+
+    void ModemJobStatus(const ModemJobStatusRequest& request, ModemJobStatusReply& reply)
+    {
+        requests_status.inc();
+        SmsJob job = sms_queue.status(request.job_id());
+        reply.set_job_id(job.id);
+        reply.set_state(job.state);
+        reply.set_contact_number(job.contact_number);
+        reply.set_alert_count(job.alert_count);
+        reply.set_detail(job.detail);
     }
 };
 
-// Signal handler for SIGINT (CTRL+C)
-void SignalHandler(int signal) {
-    std::cout << "\nReceived command to shutdown the Modem gRPC-server - " << signal << ". Stopping the Modem server..." << std::endl;
-    server_running = false;
+// Backend which sends the SMS - "serial" modem on modem_device or "fake" modem answering after fake_modem_latency_ms
+std::unique_ptr<AtTransport> open_modem(const std::string& backend)
+{
+    if (backend == "serial")
+        return std::unique_ptr<AtTransport>(new SerialAtTransport(read_string_from_config_file(config_path, "modem_device", "/dev/ttyUSB2")));
+    if (backend == "fake")
+        return std::unique_ptr<AtTransport>(new FakeAtTransport(read_int_from_config_file(config_path, "fake_modem_latency_ms", 2000)));
+    throw std::runtime_error("Value error: 'modem_backend' must be 'serial' or 'fake', not '" + backend + "'");
 }
 
 int main(void) {
@@ -103,37 +306,137 @@ int main(void) {
         close(STDERR_FILENO);
         
         /* Daemon-specific initialization goes here */
-        std::signal(SIGINT, SignalHandler);
+        // SIGINT/SIGTERM are taken by sigwait() below, threads started from here on inherit the mask
+        sigset_t shutdown_signals;
+        sigemptyset(&shutdown_signals);
+        sigaddset(&shutdown_signals, SIGINT);
+        sigaddset(&shutdown_signals, SIGTERM);
+        pthread_sigmask(SIG_BLOCK, &shutdown_signals, nullptr);
         
         std::string   server_address;
         ServerBuilder builder;
-        ModemCommunicationServiceImpl service;
         std::unique_ptr<Server> server;
+        std::unique_ptr<SmsQueue> sms_queue;
+        std::unique_ptr<AlertDeduplicator> dedup;
+        std::unique_ptr<SpanBuffer> tracer;
+        MetricsServer metrics_server(metrics);
+        std::string   metrics_address;
+        std::unique_ptr<ModemCommunicationServiceImpl> service;
+        std::vector<std::unique_ptr<ServerCompletionQueue>> cqs;
+        std::vector<std::thread> cq_threads;
+        mode_t        socket_mode;
         
         try{
             server_address = read_server_address_from_config_file(config_path, "modem_server_address");
+            // umask(0) above would leave the socket file writable for everyone
+            socket_mode    = std::stoi(read_string_from_config_file(config_path, "socket_mode", "0660"), nullptr, 8);
+            int cq_workers = std::max(read_int_from_config_file(config_path, "cq_workers", 2), 1);
+            int min_interval_ms = read_int_from_config_file(config_path, "sms_min_interval_ms", 60000);
+            tracer.reset(new SpanBuffer("modem", std::max(read_int_from_config_file(config_path, "trace_buffer", 0), 0),
+                                        read_string_from_config_file(config_path, "trace_path", "modem_trace.jsonl")));
+
+            // Alerts sent before a restart are still recognized when the outbox delivers them again
+            dedup.reset(new AlertDeduplicator(read_string_from_config_file(config_path, "dedup_state_path", "modem_dedup.state")));
+
+            // Modem is used only by the sender thread of the queue
+            std::shared_ptr<AtModem> modem = std::make_shared<AtModem>(open_modem(read_string_from_config_file(config_path, "modem_backend", "serial")));
+            SpanBuffer* spans = tracer.get();
+            AlertDeduplicator* alerts = dedup.get();
+            sms_queue.reset(new SmsQueue([modem, spans, alerts](const SmsJob& job) {
+                uint64_t started_us = SpanBuffer::now_us();
+                spans->record(job.trace, "modem.queue", job.queued_us, started_us);
+                std::string text = job.message;
+                if (job.alert_count > 1)
+                    text += " (" + std::to_string(job.alert_count) + " alerts)";
+                logger.log(INFO, "Sending SMS job " + std::to_string(job.id) + " to " + std::to_string(job.contact_number) + ": " + text);
+                try {
+                    modem->send_sms(std::to_string(job.contact_number), text);
+                } catch (std::exception& e) {
+                    sms_failed.inc();
+                    logger.log(ERROR, "SMS job " + std::to_string(job.id) + " failed -> " + e.what());
+                    throw;
+                }
+                uint64_t sent_us = SpanBuffer::now_us();
+                if (!alerts->mark_sent(job.alert_ids, job.id))
+                    logger.log(ERROR, "Sent alerts of SMS job " + std::to_string(job.id) + " could not be saved in the alert state file.");
+                sms_sent.inc();
+                sms_send_latency.observe((sent_us - started_us) / 1e6);
+                spans->record(job.trace, "modem.sms", started_us, sent_us);
+                logger.log(INFO, "SMS job " + std::to_string(job.id) + " sent.");
+            }, std::chrono::milliseconds(min_interval_ms)));
+            service.reset(new ModemCommunicationServiceImpl(*sms_queue, *dedup, *tracer));
+            SmsQueue* queue = sms_queue.get();
+            metrics.gauge("modem_sms_queue_depth", "SMS jobs waiting to be sent", [queue]() { return static_cast<double>(queue->queued()); });
+            metrics.gauge("modem_cq_workers", "Completion queue threads", [cq_workers]() { return static_cast<double>(cq_workers); });
             
+            prepare_server_endpoint(server_address);
             builder.AddListeningPort(server_address, grpc::InsecureServerCredentials());
-            builder.RegisterService(&service);
+            service->Register(builder);
+            // Main client pings idle connections (its config section "channel") - pings down to
+            // keepalive_min_ping_ms apart are accepted instead of being answered with GOAWAY
+            builder.AddChannelArgument(GRPC_ARG_KEEPALIVE_PERMIT_WITHOUT_CALLS, 1);
+            builder.AddChannelArgument(GRPC_ARG_HTTP2_MIN_RECV_PING_INTERVAL_WITHOUT_DATA_MS,
+                                       read_int_from_config_file(config_path, "keepalive_min_ping_ms", 5000));
+            builder.AddChannelArgument(GRPC_ARG_HTTP2_MAX_PING_STRIKES, 0);
+            for (int i = 0; i < cq_workers; i++)
+                cqs.emplace_back(builder.AddCompletionQueue());
             
-            server = builder.BuildAndStart();
+            {
+                // umask(0) above would leave the socket open to everyone until it is secured
+                BindingUmask binding(server_address, socket_mode);
+                server = builder.BuildAndStart();
+            }
             
             if (!server) 
                 throw std::runtime_error("Failed to start the Modem server.");
+            
+            secure_server_endpoint(server_address, socket_mode);
+            
+            // Metrics are served only if metrics_address is set
+            metrics_address = read_string_from_config_file(config_path, "metrics_address", "");
+            if (!metrics_address.empty()) {
+                prepare_server_endpoint(metrics_address);
+                {
+                    BindingUmask binding(metrics_address, socket_mode);
+                    metrics_server.start(metrics_address);
+                }
+                secure_server_endpoint(metrics_address, socket_mode);
+                logger.log(INFO, "Modem metrics are served on " + metrics_address);
+            }
 
         }catch (std::exception& e) {
             logger.log(CRITICAL, std::string("Modem gRPC-server failed to start -> ") + e.what());
             throw; // propagation
         }
         
-        logger.log(INFO, "Modem gRPC server is running on " + server_address);
+        sms_queue->start();
+        for (auto& cq : cqs) {
+            service->Listen(cq.get());
+            cq_threads.emplace_back(&ModemCommunicationServiceImpl::HandleCalls, cq.get());
+        }
+        logger.log(INFO, "Modem gRPC server is running on " + server_address + " (" + std::to_string(cqs.size()) + " completion queue threads)");
         
         /* The Big Loop */
-        while (server_running)
-           std::this_thread::sleep_for(std::chrono::milliseconds(100));
+        // Wakes up every 5 s to write recorded spans to the trace file
+        struct timespec flush_interval = {5, 0};
+        int received;
+        while ((received = sigtimedwait(&shutdown_signals, nullptr, &flush_interval)) < 0)
+            tracer->flush();
         
-        logger.log(INFO, "Modem gRPC server is shutting down.");
+        logger.log(INFO, "Modem gRPC server is shutting down (signal " + std::to_string(received) + ").");
         server->Shutdown();
+        // Calls still waiting on the queues come back with ok == false and are deleted
+        for (auto& cq : cqs)
+            cq->Shutdown();
+        for (auto& thread : cq_threads)
+            thread.join();
+        // SMS already queued are sent before exit
+        sms_queue->stop();
+        tracer->flush();
+        metrics_server.stop();
+        cleanup_server_endpoint(server_address);
+        if (!metrics_address.empty())
+            cleanup_server_endpoint(metrics_address);
     
    exit(EXIT_SUCCESS);
 }
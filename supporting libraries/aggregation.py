@@ -0,0 +1,166 @@
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""
+    Edge aggregation of raw ADC samples.
+
+    A WindowAggregator takes the blocks of samples of one sensor as they are
+    read and turns a window of them into one summary: count, min, max, mean,
+    percentiles and the number of times the samples rose over the threshold.
+    ADC client sends the summaries of all sensors in one request per window,
+    so the load of the Main server does not grow with the sample rate.
+
+    Raw samples are kept only around the crossings - pre_event_samples before
+    and post_event_samples after every rise over the threshold (overlapping
+    ranges are merged, at most MAX_EVENT_SAMPLES per window) - and go with the
+    summary of the window.
+
+    With NumPy installed the blocks are processed as whole vectors, without it
+    the same statistics are computed in pure Python. Percentiles are linearly
+    interpolated in both cases (numpy.percentile default), so the results do
+    not depend on NumPy being installed. Samples of a window are kept in
+    memory only when percentiles are configured.
+"""
+MAX_EVENT_SAMPLES = 4096        # raw samples around crossings sent with one window summary
+
+
+"""
+    :param ordered:    Ordered samples of the window
+    :param percentile: 0 - 100
+    :return:           Linearly interpolated value at the percentile
+"""
+def _percentile(ordered, percentile):
+    position = (len(ordered) - 1) * percentile / 100
+    low      = int(position)
+    high     = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class WindowAggregator:
+
+    """
+        :param threshold:          Rise over this value is a crossing
+        :param percentiles:        Percentiles (0 - 100) of the summary
+        :param pre_event_samples:  Raw samples kept before a crossing
+        :param post_event_samples: Raw samples kept after a crossing
+    """
+    def __init__(self, threshold, percentiles=(), pre_event_samples=0, post_event_samples=0):
+        self.threshold    = threshold
+        self.percentiles  = list(percentiles)
+        self.pre          = pre_event_samples
+        self.post         = post_event_samples
+        self.above        = False           # last sample of the previous block was over the threshold
+        self.recent       = array('i')      # last pre_event_samples samples, context of the next crossing
+        self.position     = 0               # number of samples added before the current block
+        self.kept_until   = 0               # samples up to this position are kept already (or not needed)
+        self._reset()
+
+    def _reset(self):
+        self.count     = 0
+        self.low       = None
+        self.high      = None
+        self.total     = 0
+        self.crossings = 0
+        self.blocks    = []                 # samples of the window, only with percentiles
+        self.events    = array('i')         # raw samples around crossings
+
+    """
+        Adds block of samples to the window
+
+        :param values: array('i') of samples, in the order they were taken
+        :return:       None
+    """
+    def add(self, values):
+        if len(values) == 0:
+            return
+
+        if numpy is not None:
+            vector = numpy.frombuffer(values, dtype=numpy.int32)
+            low, high, total = int(vector.min()), int(vector.max()), int(vector.sum(dtype=numpy.int64))
+            above = vector > self.threshold
+            rises = numpy.flatnonzero(above[1:] & ~above[:-1]) + 1
+            if above[0] and not self.above:
+                rises = numpy.concatenate(([0], rises))
+            rises = rises.tolist()
+            self.above = bool(above[-1])
+        else:
+            low, high, total = min(values), max(values), sum(values)
+            rises, above = [], self.above
+            for index, value in enumerate(values):
+                if value > self.threshold:
+                    if not above:
+                        rises.append(index)
+                    above = True
+                else:
+                    above = False
+            self.above = above
+
+        self.count    += len(values)
+        self.low       = low if self.low is None else min(self.low, low)
+        self.high      = high if self.high is None else max(self.high, high)
+        self.total    += total
+        self.crossings += len(rises)
+        if self.percentiles:
+            self.blocks.append(values)
+        if self.pre or self.post:
+            self._keep_events(values, rises)
+
+    """
+        Keeps raw samples around the crossings of a block
+
+        :param values: array('i') of samples of the block
+        :param rises:  Indexes of the samples rising over the threshold
+        :return:       None
+    """
+    def _keep_events(self, values, rises):
+        base = self.position
+        # Samples after a crossing of an earlier block
+        pending = min(self.kept_until - base, len(values))
+        if pending > 0:
+            self._keep(values[:pending])
+
+        for index in rises:
+            start = max(base + index - self.pre, self.kept_until)
+            end   = base + index + max(self.post, 1)
+            if start < base:
+                # Context of a crossing at the start of the block comes from the previous blocks
+                self._keep(self.recent[max(len(self.recent) - (base - start), 0):])
+            self._keep(values[max(start - base, 0):min(end - base, len(values))])
+            self.kept_until = end
+
+        self.position += len(values)
+        if self.pre:
+            self.recent = (self.recent + values)[-self.pre:]
+
+    def _keep(self, values):
+        room = MAX_EVENT_SAMPLES - len(self.events)
+        if room > 0:
+            self.events.extend(values[:room])
+
+    """
+        Summary of the window, the next window starts empty
+
+        :return: Dict count, min, max, mean, percentiles, crossings, event_distances
+                 (fields of SensorSummary), None if the window has no samples
+    """
+    def summary(self):
+        if self.count == 0:
+            return None
+
+        percentiles = []
+        if self.percentiles:
+            if numpy is not None:
+                window      = numpy.concatenate([numpy.frombuffer(block, dtype=numpy.int32) for block in self.blocks])
+                percentiles = numpy.percentile(window, self.percentiles).tolist()
+            else:
+                ordered     = sorted(value for block in self.blocks for value in block)
+                percentiles = [_percentile(ordered, percentile) for percentile in self.percentiles]
+
+        result = {"count": self.count, "min": self.low, "max": self.high, "mean": self.total / self.count,
+                  "percentiles": percentiles, "crossings": self.crossings, "event_distances": self.events}
+        self._reset()
+        return result
@@ -0,0 +1,184 @@
+// Remembers alerts delivered from the Main server outbox.
+// Outbox delivers at-least-once and deletes an alert only after the SMS job it
+// waits in was sent - an alert delivered again is recognized here, it is not
+// queued a second time while its job is waiting and no second SMS is sent.
+//
+// Outbox alert ids grow (AUTOINCREMENT) and the oldest alerts are delivered first,
+// so sent alerts are kept as the last contiguous alert id sent plus the ids sent
+// above it. They are written to state_path on every change - an alert delivered
+// again after a restart of the Modem server is still recognized.
+//
+// Alert ids are unique within one outbox database only - a new database starts
+// from id 1 again with a new random epoch. Batches carry the epoch, the state of
+// a previous epoch is dropped when a batch of a new one arrives.
+#include <algorithm>
+#include <cstdint>
+#include <cstddef>
+#include <cstdio>
+#include <fstream>
+#include <iterator>
+#include <mutex>
+#include <set>
+#include <string>
+#include <vector>
+#include <stdexcept>
+#include <unordered_map>
+#include <fcntl.h>
+#include <unistd.h>
+
+class AlertDeduplicator {
+public:
+    // state_path "" - state is kept in memory only
+    explicit AlertDeduplicator(const std::string& state_path = "", size_t capacity = 4096)
+        : state_path(state_path), capacity(capacity)
+    {
+        load();
+    }
+
+    // Returns true if the SMS of the alert has been sent (alert_id 0 is never deduplicated)
+    bool sent(uint64_t alert_id)
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        return alert_id != 0 && (alert_id <= last_contiguous || sent_ids.count(alert_id) != 0);
+    }
+
+    // SMS job the alert was queued into, 0 if it was not queued
+    uint64_t job(uint64_t alert_id)
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        auto queued = jobs.find(alert_id);
+        return queued == jobs.end() ? 0 : queued->second;
+    }
+
+    // Alert was queued into SMS job job_id
+    void queued(uint64_t alert_id, uint64_t job_id)
+    {
+        if (alert_id == 0)
+            return;
+
+        std::lock_guard<std::mutex> lock(mutex);
+        jobs[alert_id] = job_id;
+    }
+
+    // Outbox delivers a batch of alerts of database epoch outbox_epoch - a new epoch
+    // drops the alerts of the previous one. Returns false if the state was not saved
+    bool delivered_in(const std::string& outbox_epoch)
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (outbox_epoch == epoch)
+            return true;
+
+        // Jobs of the previous epoch may still be sent - their alert ids mean other alerts now
+        stale_jobs.clear();
+        for (const auto& queued : jobs)
+            stale_jobs.insert(queued.second);
+        jobs.clear();
+        epoch           = outbox_epoch;
+        last_contiguous = 0;
+        sent_ids.clear();
+        return save();
+    }
+
+    // Outbox delivers a batch starting with alert first_id - it deleted the alerts
+    // before it, so their SMS were sent. Returns false if the state was not saved
+    bool delivered_from(uint64_t first_id)
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (first_id <= last_contiguous + 1)
+            return true;
+
+        last_contiguous = first_id - 1;
+        advance();
+        return save();
+    }
+
+    // SMS job job_id reporting the alerts has been sent (job_id 0 - alerts were sent
+    // without a job). Returns false if the state was not saved
+    bool mark_sent(const std::vector<uint64_t>& alert_ids, uint64_t job_id = 0)
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        if (job_id != 0 && stale_jobs.erase(job_id) != 0)
+            return true;    // job of a previous epoch
+
+        bool changed = false;
+        for (uint64_t alert_id : alert_ids) {
+            jobs.erase(alert_id);
+            if (alert_id != 0 && alert_id > last_contiguous)
+                changed |= sent_ids.insert(alert_id).second;
+        }
+        if (!changed)
+            return true;
+
+        advance();
+        // Highest ids are forgotten - outbox resends only its oldest undelivered batch
+        while (sent_ids.size() > capacity)
+            sent_ids.erase(std::prev(sent_ids.end()));
+        return save();
+    }
+
+private:
+    std::string state_path;
+    size_t capacity;
+    std::mutex mutex;
+    std::unordered_map<uint64_t, uint64_t> jobs;    // alert id -> SMS job it waits in
+    std::set<uint64_t> stale_jobs;                  // SMS jobs of the previous epoch
+    std::string epoch;                              // outbox database epoch of the alert ids
+    uint64_t last_contiguous = 0;                   // alerts up to this id were sent
+    std::set<uint64_t> sent_ids;                    // alerts above last_contiguous which were sent
+
+    // Ids which joined the contiguous part leave sent_ids
+    void advance()
+    {
+        while (!sent_ids.empty() && *sent_ids.begin() <= last_contiguous + 1) {
+            last_contiguous = std::max(last_contiguous, *sent_ids.begin());
+            sent_ids.erase(sent_ids.begin());
+        }
+    }
+
+    // State file: outbox epoch on the first line, last contiguous id followed by
+    // the ids sent above it on the second line
+    void load()
+    {
+        if (state_path.empty())
+            return;
+
+        std::ifstream file(state_path);
+        if (!file)
+            return;     // nothing sent yet
+
+        uint64_t alert_id;
+        if (!std::getline(file, epoch) || !(file >> last_contiguous))
+            throw std::runtime_error("Value error: alert state file '" + state_path + "' is damaged");
+        while (file >> alert_id)
+            sent_ids.insert(alert_id);
+        if (!file.eof())
+            throw std::runtime_error("Value error: alert state file '" + state_path + "' is damaged");
+        advance();
+    }
+
+    // Written to a temporary file and renamed, a crash leaves the old or the new state.
+    // Only the owner may write it - an id written by someone else would suppress alerts
+    bool save()
+    {
+        if (state_path.empty())
+            return true;
+
+        std::string temp = state_path + ".tmp";
+        int fd = open(temp.c_str(), O_WRONLY | O_CREAT | O_TRUNC, 0600);
+        if (fd < 0)
+            return false;
+        FILE* file = fdopen(fd, "w");
+        if (file == nullptr) {
+            close(fd);
+            return false;
+        }
+
+        fprintf(file, "%s\n%llu", epoch.c_str(), static_cast<unsigned long long>(last_contiguous));
+        for (uint64_t alert_id : sent_ids)
+            fprintf(file, " %llu", static_cast<unsigned long long>(alert_id));
+        fprintf(file, "\n");
+        bool written = fflush(file) == 0 && fsync(fileno(file)) == 0;
+        written = fclose(file) == 0 && written;
+        return written && rename(temp.c_str(), state_path.c_str()) == 0;
+    }
+};
@@ -0,0 +1,161 @@
+// SMS over AT commands (3GPP TS 27.005 text mode).
+//
+// AtModem runs the AT dialogue of one SMS:
+//     AT+CMGF=1            -> OK        (text mode)
+//     AT+CMGS="<number>"   -> "> "      (modem asks for the text)
+//     <text> Ctrl-Z        -> +CMGS: <message reference> ... OK
+// over an AtTransport - a serial port of the modem (SerialAtTransport) or
+// FakeAtTransport, which answers like a modem after a configurable delay and
+// is used for testing without modem hardware.
+#include <string>
+#include <vector>
+#include <memory>
+#include <deque>
+#include <chrono>
+#include <thread>
+#include <stdexcept>
+#include <cerrno>
+#include <cstring>
+#include <fcntl.h>
+#include <poll.h>
+#include <termios.h>
+#include <unistd.h>
+
+class AtTransport {
+public:
+    virtual ~AtTransport() {}
+    // Writes raw bytes to the modem
+    virtual void write(const std::string& data) = 0;
+    // Reads until the data received contains one of the tokens, returns everything read
+    virtual std::string read_until(const std::vector<std::string>& tokens, int timeout_ms) = 0;
+};
+
+// Serial port of the modem (e.g. /dev/ttyUSB2), 115200 8N1 raw
+class SerialAtTransport : public AtTransport {
+public:
+    explicit SerialAtTransport(const std::string& device)
+    {
+        fd = open(device.c_str(), O_RDWR | O_NOCTTY | O_CLOEXEC);
+        if (fd < 0)
+            throw std::runtime_error("Unable to open modem device " + device + ": " + strerror(errno));
+
+        struct termios tty;
+        if (tcgetattr(fd, &tty) != 0) {
+            close(fd);
+            throw std::runtime_error("Unable to configure modem device " + device + ": " + strerror(errno));
+        }
+        cfmakeraw(&tty);
+        cfsetispeed(&tty, B115200);
+        cfsetospeed(&tty, B115200);
+        tty.c_cflag |= CLOCAL | CREAD;
+        tcsetattr(fd, TCSANOW, &tty);
+        tcflush(fd, TCIOFLUSH);
+    }
+
+    ~SerialAtTransport() override { close(fd); }
+
+    void write(const std::string& data) override
+    {
+        size_t written = 0;
+        while (written < data.size()) {
+            ssize_t n = ::write(fd, data.data() + written, data.size() - written);
+            if (n < 0 && errno != EINTR)
+                throw std::runtime_error(std::string("Write to modem failed: ") + strerror(errno));
+            if (n > 0)
+                written += n;
+        }
+    }
+
+    std::string read_until(const std::vector<std::string>& tokens, int timeout_ms) override
+    {
+        std::string received;
+        auto deadline = std::chrono::steady_clock::now() + std::chrono::milliseconds(timeout_ms);
+
+        while (true) {
+            for (const std::string& token : tokens)
+                if (received.find(token) != std::string::npos)
+                    return received;
+
+            int left = std::chrono::duration_cast<std::chrono::milliseconds>(deadline - std::chrono::steady_clock::now()).count();
+            if (left <= 0)
+                throw std::runtime_error("Modem did not answer in time, received: '" + received + "'");
+
+            struct pollfd pfd = {fd, POLLIN, 0};
+            if (poll(&pfd, 1, left) <= 0)
+                continue;
+
+            char buffer[256];
+            ssize_t n = ::read(fd, buffer, sizeof(buffer));
+            if (n > 0)
+                received.append(buffer, n);
+        }
+    }
+
+private:
+    int fd;
+};
+
+// Answers AT commands like a modem, SMS submission takes latency_ms
+class FakeAtTransport : public AtTransport {
+public:
+    explicit FakeAtTransport(int latency_ms) : latency_ms(latency_ms), reference(0) {}
+
+    void write(const std::string& data) override
+    {
+        if (!data.empty() && data.back() == '\x1A') {
+            // Message text terminated by Ctrl-Z - network takes its time to accept it
+            std::this_thread::sleep_for(std::chrono::milliseconds(latency_ms));
+            answers.push_back("\r\n+CMGS: " + std::to_string(++reference) + "\r\n\r\nOK\r\n");
+        }
+        else if (data.rfind("AT+CMGS=", 0) == 0)
+            answers.push_back("\r\n> ");
+        else if (data.rfind("AT", 0) == 0)
+            answers.push_back("\r\nOK\r\n");
+        else
+            answers.push_back("\r\nERROR\r\n");
+    }
+
+    std::string read_until(const std::vector<std::string>& tokens, int timeout_ms) override
+    {
+        if (answers.empty())
+            throw std::runtime_error("Modem did not answer in time, received: ''");
+        std::string answer = answers.front();
+        answers.pop_front();
+        return answer;
+    }
+
+private:
+    int latency_ms;
+    int reference;
+    std::deque<std::string> answers;
+};
+
+class AtModem {
+public:
+    explicit AtModem(std::unique_ptr<AtTransport> transport) : transport(std::move(transport)) {}
+
+    // Sends one SMS, throws std::runtime_error if the modem refuses it
+    void send_sms(const std::string& number, const std::string& text)
+    {
+        command("AT+CMGF=1\r", {"OK"}, 1000);
+        command("AT+CMGS=\"" + number + "\"\r", {"> "}, 5000);
+        // Network confirmation of the SMS can take long
+        std::string answer = command(text + "\x1A", {"OK"}, 60000);
+        if (answer.find("+CMGS:") == std::string::npos)
+            throw std::runtime_error("Modem did not confirm SMS: '" + answer + "'");
+    }
+
+private:
+    std::unique_ptr<AtTransport> transport;
+
+    std::string command(const std::string& data, const std::vector<std::string>& expected, int timeout_ms)
+    {
+        transport->write(data);
+        std::vector<std::string> tokens = expected;
+        tokens.push_back("ERROR");
+        std::string answer = transport->read_until(tokens, timeout_ms);
+        if (answer.find("ERROR") != std::string::npos)
+            throw std::runtime_error("Modem answered ERROR to '" + data.substr(0, data.size() - 1) + "': " + answer);
+        return answer;
+    }
+};
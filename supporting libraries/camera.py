@@ -1,4 +1,7 @@
 import os
+import time
+import signal
+import threading
 import subprocess
 
 pid = 0
@@ -28,3 +31,252 @@ def takePic(filename):
         # If fork fails
         print("Fork failed", file=os.stderr)
 
+
+RPICAM_STILL = "/usr/bin/rpicam-still"
+
+"""
+    Camera backend keeping one rpicam-still process running in signal mode.
+    
+    Sensor init and autoexposure are done once at start(), afterwards the
+    pipeline keeps streaming and every SIGUSR1 saves the current frame, so a
+    capture costs one frame instead of a process start. rpicam-still numbers the
+    saved frames (frame%05d.jpg), capture() waits for the next one and moves it
+    to the requested file name.
+"""
+class RpicamCamera:
+    
+    """
+        :param output_dir: Directory rpicam-still saves frames into
+        :param timeout:    Max seconds to wait for a frame after the trigger
+        :param warmup:     Seconds given to rpicam-still for sensor init and autoexposure
+    """
+    def __init__(self, output_dir, timeout=2.0, warmup=2.0):
+        self.pattern = os.path.join(output_dir, "frame%05d.jpg")
+        self.timeout = timeout
+        self.warmup  = warmup
+        self.process = None
+        self.frame   = 0
+    
+    """
+        Starts rpicam-still and waits for it to warm up, camera stays warm until stop()
+    """
+    def start(self):
+        # Frames left over from a previous run would be taken for new ones
+        for name in os.listdir(os.path.dirname(self.pattern) or "."):
+            if name.startswith("frame") and name.endswith(".jpg"):
+                os.remove(os.path.join(os.path.dirname(self.pattern), name))
+        
+        self.frame   = 0
+        self.process = subprocess.Popen([RPICAM_STILL, "-n", "-t", "0", "--signal", "-o", self.pattern],
+                                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        # SIGUSR1 sent before rpicam-still installs its handler would terminate it
+        time.sleep(self.warmup)
+    
+    """
+        Saves the current frame
+        
+        :param filename: File the picture is saved to
+        :return:         None
+    """
+    def capture(self, filename):
+        if self.process is None or self.process.poll() is not None:
+            # rpicam-still died - restarted for the next capture
+            self.start()
+            raise RuntimeError("rpicam-still was not running and has been restarted")
+        
+        frame = self.pattern % self.frame
+        self.frame += 1
+        self.process.send_signal(signal.SIGUSR1)
+        
+        # File is complete once its size stops changing
+        deadline = time.monotonic() + self.timeout
+        size     = -1
+        while time.monotonic() < deadline:
+            try:
+                current = os.path.getsize(frame)
+                if current > 0 and current == size:
+                    os.replace(frame, filename)
+                    return
+                size = current
+            except FileNotFoundError:
+                pass
+            time.sleep(0.005)
+        
+        raise TimeoutError(f"rpicam-still did not save frame within {self.timeout} s")
+    
+    """
+        Stops rpicam-still
+    """
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.send_signal(signal.SIGUSR2)    # rpicam-still quits on SIGUSR2
+            try:
+                self.process.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+
+"""
+    Camera backend for testing without camera - every capture writes
+    a small placeholder JPEG after `delay` seconds
+"""
+class FakeCamera:
+    
+    # SOI, APP0 "JFIF" and EOI markers - enough for the file to be recognized as JPEG
+    PICTURE = bytes.fromhex("ffd8ffe000104a46494600010100000100010000ffd9")
+    
+    """
+        :param delay: Seconds one capture takes
+    """
+    def __init__(self, delay=0.0):
+        self.delay = delay
+    
+    def start(self):
+        pass
+    
+    def capture(self, filename):
+        time.sleep(self.delay)
+        with open(filename, "wb") as picture:
+            picture.write(self.PICTURE)
+    
+    def stop(self):
+        pass
+
+
+
+RPICAM_VID = "/usr/bin/rpicam-vid"
+
+# JPEG end of image marker, frames of MJPEG stream end with it
+JPEG_EOI = b"\xff\xd9"
+
+"""
+    Continuous frame source - rpicam-vid streaming MJPEG to stdout.
+    
+    A reader thread copies the stream straight into the buffers of a
+    frame_ring.FrameRing and commits a frame at every JPEG end marker, so
+    frames are never allocated one by one. Frames larger than a ring buffer
+    are dropped.
+"""
+class RpicamVideoSource:
+    
+    """
+        :param fps:    Frames per second
+        :param width:  Frame width in pixels
+        :param height: Frame height in pixels
+    """
+    def __init__(self, fps=10, width=640, height=480):
+        self.fps     = fps
+        self.width   = width
+        self.height  = height
+        self.process = None
+        self.thread  = None
+    
+    """
+        Starts rpicam-vid and reading of its frames into the ring
+        
+        :param ring: frame_ring.FrameRing the frames are written into
+    """
+    def start(self, ring):
+        self.process = subprocess.Popen([RPICAM_VID, "-n", "-t", "0", "--codec", "mjpeg",
+                                         "--framerate", str(self.fps),
+                                         "--width", str(self.width), "--height", str(self.height),
+                                         "-o", "-"],
+                                        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+        self.thread  = threading.Thread(target=self._read_frames, args=(self.process.stdout, ring),
+                                        name="frame-reader", daemon=True)
+        self.thread.start()
+    
+    def _read_frames(self, stream, ring):
+        chunk    = bytearray(65536)
+        view     = memoryview(chunk)
+        frame    = ring.buffer()
+        fill     = 0        # bytes of the current frame in its buffer
+        skipping = False    # current frame did not fit into the buffer
+        
+        while True:
+            n = stream.readinto(chunk)
+            if not n:
+                break
+            
+            start = 0
+            while start < n:
+                if skipping:
+                    end = chunk.find(JPEG_EOI, start, n)
+                    if end < 0:
+                        break
+                    start    = end + len(JPEG_EOI)
+                    skipping = False
+                    continue
+                
+                take = min(n - start, len(frame) - fill)
+                if take == 0:
+                    ring.dropped += 1
+                    fill     = 0
+                    skipping = True
+                    continue
+                
+                frame[fill:fill + take] = view[start:start + take]
+                # End marker may be split between two reads - search from the last byte of the previous read
+                end = frame.find(JPEG_EOI, max(fill - 1, 0), fill + take)
+                if end < 0:
+                    fill  += take
+                    start += take
+                    continue
+                
+                length = end + len(JPEG_EOI)
+                start += length - fill
+                ring.commit(length)
+                frame = ring.buffer()
+                fill  = 0
+        
+        ring.close()
+    
+    """
+        Stops rpicam-vid, the ring is closed when its last frame has been read
+    """
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        if self.thread is not None:
+            self.thread.join(3)
+        self.process = None
+
+
+"""
+    Continuous frame source for testing without camera - writes placeholder
+    JPEG frames carrying their frame number into the ring at `fps`
+"""
+class FakeVideoSource:
+    
+    """
+        :param fps: Frames per second
+    """
+    def __init__(self, fps=10):
+        self.fps     = fps
+        self.running = False
+        self.thread  = None
+    
+    def start(self, ring):
+        self.running = True
+        self.thread  = threading.Thread(target=self._produce, args=(ring,), name="frame-reader", daemon=True)
+        self.thread.start()
+    
+    def _produce(self, ring):
+        number = 0
+        while self.running:
+            picture = FakeCamera.PICTURE[:-2] + number.to_bytes(4, "big") + JPEG_EOI
+            ring.buffer()[:len(picture)] = picture
+            ring.commit(len(picture))
+            number += 1
+            time.sleep(1 / self.fps)
+        ring.close()
+    
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(3)
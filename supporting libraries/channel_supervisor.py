@@ -0,0 +1,394 @@
+import time
+import random
+import asyncio
+import logging
+import threading
+import grpc
+
+"""
+    Supervised gRPC client channels.
+
+    A ChannelSupervisor owns the channel of a client to one server and keeps
+    it usable while the server comes and goes:
+
+        - HTTP/2 keepalive pings ("keepalive_ms", answered within
+          "keepalive_timeout_ms") find a dead peer on an idle connection, so
+          a killed server is noticed before the next request hangs on it
+        - the channel is reconnected in the background with jittered
+          exponential backoff growing from "reconnect_initial_ms" up to
+          "reconnect_max_ms" (backoff of gRPC core; the supervisor also
+          wakes up a channel gone IDLE), the client never waits for it
+        - every unary call gets a deadline ("call_timeout_ms") unless it
+          passes its own timeout
+        - circuit breaker - after "breaker_failures" calls in a row failed
+          with UNAVAILABLE or DEADLINE_EXCEEDED, calls fail at once with
+          CircuitOpenError for "breaker_reset_ms"; then one trial call is let
+          through, and the circuit closes when it succeeds or the channel is
+          READY again
+        - on_state_change(state) is called with every new connectivity state
+
+    CircuitOpenError is a grpc.RpcError with code UNAVAILABLE, so callers
+    handle it together with the errors of the calls themselves. Stubs of the
+    generated code are wrapped by stub(); streaming calls get no default
+    deadline and do not count for the breaker.
+
+    AsyncChannelSupervisor does the same for a grpc.aio channel and must be
+    started and closed on its event loop.
+
+    Servers accept the pings of the clients with server_options().
+"""
+DEFAULTS = {"call_timeout_ms": 2000, "keepalive_ms": 10000, "keepalive_timeout_ms": 5000,
+            "reconnect_initial_ms": 500, "reconnect_max_ms": 5000,
+            "breaker_failures": 5, "breaker_reset_ms": 10000}
+# Codes meaning the server is down or stalled - other codes are answers of a working server
+FAILURE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
+
+"""
+    :param min_ping_ms: Shortest interval of client pings the server accepts
+    :return:            Options of grpc.server() / grpc.aio.server()
+"""
+def server_options(min_ping_ms):
+    return [("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.min_recv_ping_interval_without_data_ms", min_ping_ms),
+            ("grpc.http2.max_ping_strikes", 0)]
+
+
+"""
+    :param delay: Delay before the next attempt in seconds
+    :return:      Delay randomized to 50 - 100 %, so clients restarted together do not reconnect in lockstep
+"""
+def jitter(delay):
+    return delay * random.uniform(0.5, 1.0)
+
+
+class CircuitOpenError(grpc.RpcError):
+
+    """
+        :param target:   Address of the server
+        :param retry_in: Seconds until a trial call is let through
+    """
+    def __init__(self, target, retry_in):
+        super().__init__()
+        self.target   = target
+        self.retry_in = retry_in
+
+    def code(self):
+        return grpc.StatusCode.UNAVAILABLE
+
+    def details(self):
+        return f"circuit to {self.target} is open, next trial call in {self.retry_in:.1f} s"
+
+    def __str__(self):
+        return self.details()
+
+
+class CircuitBreaker:
+
+    """
+        :param target:   Address of the server (for errors)
+        :param failures: Calls failed in a row opening the circuit, 0 - never opens
+        :param reset:    Seconds the circuit stays open before a trial call
+    """
+    def __init__(self, target, failures, reset):
+        self.target   = target
+        self.failures = failures
+        self.reset    = reset
+        self.failed   = 0               # calls failed in a row
+        self.opened   = None            # monotonic time the circuit opened, None - closed
+        self.trial    = False           # trial call of a half-open circuit is in flight
+        self.lock     = threading.Lock()
+
+    """
+        :return: True if the circuit is open and calls fail at once
+    """
+    def is_open(self):
+        return self.opened is not None and (self.trial or time.monotonic() - self.opened < self.reset)
+
+    """
+        Lets a call through or raises CircuitOpenError
+    """
+    def check(self):
+        with self.lock:
+            if self.opened is None:
+                return
+            retry_in = self.reset - (time.monotonic() - self.opened)
+            if self.trial or retry_in > 0:
+                raise CircuitOpenError(self.target, max(retry_in, 0))
+            self.trial = True
+
+    """
+        :param code: grpc.StatusCode the call ended with, None - succeeded
+        :return:     True if the call opened the circuit
+    """
+    def record(self, code):
+        with self.lock:
+            self.trial = False
+            if code not in FAILURE_CODES:
+                self.failed, self.opened = 0, None
+                return False
+            self.failed += 1
+            if self.failures and self.failed >= self.failures:
+                was_open, self.opened = self.opened is not None, time.monotonic()
+                return not was_open
+            return False
+
+    """
+        Closes the circuit - server is reachable again
+    """
+    def close(self):
+        with self.lock:
+            self.failed, self.opened, self.trial = 0, None, False
+
+
+class ChannelSupervisor:
+
+    """
+        :param name:            Name of the server (for logs)
+        :param address:         Address of the server
+        :param settings:        Dict with keys of DEFAULTS (config section "channel"), missing keys take defaults
+        :param on_state_change: Function on_state_change(grpc.ChannelConnectivity) called on every new state
+    """
+    def __init__(self, name, address, settings=None, on_state_change=None):
+        settings = {**DEFAULTS, **(settings or {})}
+        self.name            = name
+        self.address         = address
+        self.call_timeout    = settings["call_timeout_ms"] / 1000
+        self.keepalive_ms    = settings["keepalive_ms"]
+        self.keepalive_timeout_ms = settings["keepalive_timeout_ms"]
+        self.reconnect_initial = settings["reconnect_initial_ms"] / 1000
+        self.reconnect_max   = settings["reconnect_max_ms"] / 1000
+        self.breaker         = CircuitBreaker(address, settings["breaker_failures"], settings["breaker_reset_ms"] / 1000)
+        self.on_state_change = on_state_change
+        self.state           = None
+        self.channel         = None
+        self.ready           = threading.Event()
+        self.stopped         = threading.Event()
+        self.state_changed   = threading.Event()
+        self.thread          = None
+        self.task            = None
+        self.attempt         = None            # grpc.channel_ready_future of the running connection attempt
+        self.lock            = threading.Lock()
+
+    """
+        :return: Options of the channel - keepalive and reconnect backoff of gRPC core
+    """
+    def channel_options(self):
+        return [("grpc.keepalive_time_ms", self.keepalive_ms),
+                ("grpc.keepalive_timeout_ms", self.keepalive_timeout_ms),
+                ("grpc.http2.ping_timeout_ms", self.keepalive_timeout_ms),
+                ("grpc.keepalive_permit_without_calls", 1),
+                ("grpc.http2.max_pings_without_data", 0),
+                ("grpc.initial_reconnect_backoff_ms", int(self.reconnect_initial * 1000)),
+                ("grpc.min_reconnect_backoff_ms", int(self.reconnect_initial * 1000)),
+                ("grpc.max_reconnect_backoff_ms", int(self.reconnect_max * 1000))]
+
+    """
+        Creates the channel and starts connecting it in the background
+    """
+    def start(self):
+        self.channel = grpc.insecure_channel(self.address, options=self.channel_options())
+        self.channel.subscribe(self._state_changed)
+        self.thread  = threading.Thread(target=self._reconnect, name=f"channel-{self.name}", daemon=True)
+        self.thread.start()
+
+    """
+        :param timeout: Max seconds to wait
+        :return:        True if the channel is READY
+    """
+    def wait_ready(self, timeout):
+        return self.ready.wait(timeout)
+
+    """
+        :return: True if calls are expected to get through - channel is READY and the circuit is closed
+    """
+    def available(self):
+        return self.ready.is_set() and not self.breaker.is_open()
+
+    """
+        :param stub_class: Stub class of the generated code
+        :return:           Stub whose calls have deadlines and go through the circuit breaker
+    """
+    def stub(self, stub_class):
+        return _GuardedStub(stub_class(self.channel), self)
+
+    """
+        :param code: grpc.StatusCode the call ended with, None - succeeded
+    """
+    def record(self, code):
+        if self.breaker.record(code):
+            logging.error(f"{self.name} on {self.address} failed {self.breaker.failed} calls in a row, "
+                          f"calls fail at once for {self.breaker.reset:.0f} s.")
+
+    def close(self):
+        self.stopped.set()
+        self.state_changed.set()
+        # Subscriptions end before the channel closes - polling of a closed channel fails
+        with self.lock:
+            if self.attempt is not None:
+                self.attempt.cancel()
+            if self.channel is not None:
+                self.channel.unsubscribe(self._state_changed)
+        if self.channel is None:
+            return
+        try:
+            self.channel.close()
+        except ValueError as e:
+            # Connectivity poll of gRPC may still run once after unsubscribe - closing races with it, harmless
+            logging.debug(f"{self.name} channel on {self.address} closed while its state was polled: {e}")
+
+    def _state_changed(self, state):
+        if self.stopped.is_set():
+            return      # delivered after close()
+        previous, self.state = self.state, state
+        if state == previous:
+            return
+        if state == grpc.ChannelConnectivity.READY:
+            self.breaker.close()
+            self.ready.set()
+            logging.info(f"Connected to the {self.name} on {self.address}.")
+        else:
+            self.ready.clear()
+            if previous == grpc.ChannelConnectivity.READY:
+                logging.warning(f"Connection to the {self.name} on {self.address} lost ({state.name}), reconnecting in the background.")
+        self.state_changed.set()
+        if self.on_state_change is not None:
+            self.on_state_change(state)
+
+    def _reconnect(self):
+        delay = self.reconnect_initial
+        while not self.stopped.is_set():
+            if self.ready.is_set():
+                delay = self.reconnect_initial
+                self.state_changed.wait()
+                self.state_changed.clear()
+                continue
+
+            # Ready future asks the channel to connect, also when it went IDLE
+            with self.lock:
+                if self.stopped.is_set():
+                    return
+                attempt = self.attempt = grpc.channel_ready_future(self.channel)
+            try:
+                attempt.result(timeout=jitter(delay))
+                # READY is reported by the subscription callback
+                self.ready.wait(self.reconnect_initial)
+            except grpc.FutureTimeoutError:
+                attempt.cancel()
+                if not self.stopped.is_set():
+                    logging.debug(f"{self.name} on {self.address} is not reachable yet.")
+                delay = min(delay * 2, self.reconnect_max)
+            except Exception:
+                # Channel was closed
+                return
+
+
+class AsyncChannelSupervisor(ChannelSupervisor):
+
+    """
+        Creates the grpc.aio channel and starts connecting it in a task of the running event loop
+    """
+    def start(self):
+        self.channel = grpc.aio.insecure_channel(self.address, options=self.channel_options())
+        self.task    = asyncio.get_running_loop().create_task(self._watch())
+
+    async def wait_ready(self, timeout):
+        try:
+            await asyncio.wait_for(self.channel.channel_ready(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        self._state_changed(grpc.ChannelConnectivity.READY)
+        return True
+
+    def stub(self, stub_class):
+        return _GuardedStub(stub_class(self.channel), self, asynchronous=True)
+
+    async def close(self):
+        self.stopped.set()
+        if self.task is not None:
+            self.task.cancel()
+        if self.channel is not None:
+            await self.channel.close()
+
+    async def _watch(self):
+        delay = self.reconnect_initial
+        state = self.channel.get_state(try_to_connect=True)
+        while not self.stopped.is_set():
+            self._state_changed(state)
+            if state == grpc.ChannelConnectivity.READY:
+                delay = self.reconnect_initial
+                await self.channel.wait_for_state_change(state)
+            else:
+                try:
+                    await asyncio.wait_for(self.channel.wait_for_state_change(state), jitter(delay))
+                except asyncio.TimeoutError:
+                    delay = min(delay * 2, self.reconnect_max)
+            state = self.channel.get_state(try_to_connect=True)
+
+
+"""
+    Stub of the generated code whose calls go through the supervisor of its channel
+"""
+class _GuardedStub:
+
+    def __init__(self, stub, supervisor, asynchronous=False):
+        self._stub         = stub
+        self._supervisor   = supervisor
+        self._asynchronous = asynchronous
+
+    def __getattr__(self, name):
+        call = getattr(self._stub, name)
+        if isinstance(call, (grpc.UnaryStreamMultiCallable, grpc.StreamStreamMultiCallable,
+                             grpc.aio.UnaryStreamMultiCallable, grpc.aio.StreamStreamMultiCallable)):
+            guarded = _GuardedStreamCall(call, self._supervisor)
+        elif self._asynchronous:
+            guarded = _AsyncGuardedCall(call, self._supervisor)
+        else:
+            guarded = _GuardedCall(call, self._supervisor)
+        setattr(self, name, guarded)
+        return guarded
+
+
+class _GuardedCall:
+
+    def __init__(self, call, supervisor):
+        self.call       = call
+        self.supervisor = supervisor
+
+    def __call__(self, request, timeout=None, **kwargs):
+        self.supervisor.breaker.check()
+        try:
+            response = self.call(request, timeout=timeout or self.supervisor.call_timeout, **kwargs)
+        except grpc.RpcError as e:
+            self.supervisor.record(e.code())
+            raise
+        self.supervisor.record(None)
+        return response
+
+    def future(self, request, timeout=None, **kwargs):
+        self.supervisor.breaker.check()
+        call = self.call.future(request, timeout=timeout or self.supervisor.call_timeout, **kwargs)
+        call.add_done_callback(lambda done: self.supervisor.record(None if done.cancelled() or done.exception() is None
+                                                                  else done.code()))
+        return call
+
+
+class _AsyncGuardedCall(_GuardedCall):
+
+    async def __call__(self, request, timeout=None, **kwargs):
+        self.supervisor.breaker.check()
+        try:
+            response = await self.call(request, timeout=timeout or self.supervisor.call_timeout, **kwargs)
+        except grpc.RpcError as e:
+            self.supervisor.record(e.code())
+            raise
+        self.supervisor.record(None)
+        return response
+
+
+class _GuardedStreamCall(_GuardedCall):
+
+    # Streams live as long as the client - no default deadline
+    def __call__(self, request, timeout=None, **kwargs):
+        self.supervisor.breaker.check()
+        return self.call(request, timeout=timeout, **kwargs)
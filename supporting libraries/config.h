@@ -25,3 +25,39 @@ std::string read_server_address_from_config_file(const std::string& filePath, co
         throw;
     }
 }
+
+std::string read_string_from_config_file(const std::string& filePath, const std::string& key, const std::string& default_value) {
+    // Opens file
+    std::ifstream file(filePath);
+    // Checks if file is sucessfully opened
+    if (!file.is_open())
+        throw std::runtime_error("Unable to open file: " + filePath);
+
+    // Parsing JSON
+    json config;
+    file >> config;
+
+    if (!config.contains(key))
+        return default_value;
+    if (!config[key].is_string())
+        throw std::runtime_error("Value error: '" + key + "' is in wrong format in "+filePath);
+    return config[key].get<std::string>();
+}
+
+int read_int_from_config_file(const std::string& filePath, const std::string& key, int default_value) {
+    // Opens file
+    std::ifstream file(filePath);
+    // Checks if file is sucessfully opened
+    if (!file.is_open())
+        throw std::runtime_error("Unable to open file: " + filePath);
+
+    // Parsing JSON
+    json config;
+    file >> config;
+
+    if (!config.contains(key))
+        return default_value;
+    if (!config[key].is_number_integer())
+        throw std::runtime_error("Value error: '" + key + "' is in wrong format in "+filePath);
+    return config[key].get<int>();
+}
@@ -1,65 +1,385 @@
+import os
 import json
+import logging
+import threading
+import endpoints
 
 INT32_MIN = -2**31
 INT32_MAX = 2**31 - 1
+MAX_SENSORS = 32        # ADC_MAX_SENSORS from ADC_driver.h
 
-def get_config(file_path, key):
+"""
+    Validators - each checks one config value and returns it, or raises ValueError
+
+    :param value:     Value read from the JSON file
+    :param key:       Config key (for error message)
+    :param file_path: Path to the config file (for error message)
+    :return:          Validated value
+"""
+def _int32(value, key, file_path, minimum=INT32_MIN):
+    if not isinstance(value, int) or isinstance(value, bool) or not(minimum <= value <= INT32_MAX):
+        qualifier = {0: "non-negative ", 1: "positive "}.get(minimum, "")
+        raise ValueError(f"'{key}' value in '{file_path}' is not a valid {qualifier}int32 value.")
+    return value
+
+def _non_negative(value, key, file_path):
+    return _int32(value, key, file_path, minimum=0)
+
+def _positive(value, key, file_path):
+    return _int32(value, key, file_path, minimum=1)
+
+def _power_of_two(value, key, file_path):
+    if _positive(value, key, file_path) & (value - 1):
+        raise ValueError(f"'{key}' value in '{file_path}' is not a power of two.")
+    return value
+
+def _boolean(value, key, file_path):
+    if not isinstance(value, bool):
+        raise ValueError(f"'{key}' value in '{file_path}' is not a valid boolean value.")
+    return value
+
+def _string(value, key, file_path):
+    if not isinstance(value, str):
+        raise ValueError(f"'{key}' value in '{file_path}' is not a valid string value.")
+    return value
+
+def _address(value, key, file_path):
+    try:
+        endpoints.validate(_string(value, key, file_path))
+    except ValueError as e:
+        raise ValueError(f"'{key}' value in '{file_path}' is not a valid server address: {e}")
+    return value
+
+def _optional_address(value, key, file_path):
+    # Empty string - server is not used
+    return _address(value, key, file_path) if value != "" else value
+
+def _addresses(value, key, file_path):
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' value in '{file_path}' is not a valid JSON array.")
+    for index, address in enumerate(value):
+        _address(address, f"{key}[{index}]", file_path)
+    if len(set(value)) != len(value):
+        raise ValueError(f"'{key}' value in '{file_path}' lists an address more than once.")
+    return value
+
+def _mode(value, key, file_path):
+    try:
+        mode = int(_string(value, key, file_path), 8)
+    except ValueError:
+        mode = -1
+    if not (0 <= mode <= 0o777):
+        raise ValueError(f"'{key}' value in '{file_path}' is not a valid octal permission string (e.g. \"0660\").")
+    return mode
+
+def _choice(*choices):
+    def validate(value, key, file_path):
+        if value not in choices:
+            raise ValueError(f"'{key}' value in '{file_path}' must be one of {', '.join(repr(c) for c in choices)}.")
+        return value
+    return validate
+
+def _detection(value, key, file_path):
+    if not isinstance(value, dict):
+        raise ValueError(f"'{key}' section in '{file_path}' is not a valid JSON object.")
+    _non_negative(value.get("hysteresis", 0), f"{key}.hysteresis", file_path)
+    _positive(value.get("window", 1), f"{key}.window", file_path)
+    confirm_n = _positive(value.get("confirm_n", 1), f"{key}.confirm_n", file_path)
+    if _positive(value.get("confirm_m", 1), f"{key}.confirm_m", file_path) < confirm_n:
+        raise ValueError(f"'{key}.confirm_n' value in '{file_path}' is greater than '{key}.confirm_m'.")
+    _choice("none", "moving_average", "median")(value.get("filter", "none"), f"{key}.filter", file_path)
+    _boolean(value.get("edge_triggered", False), f"{key}.edge_triggered", file_path)
+    return value
+
+def _sample_source(value, key, file_path):
+    if not isinstance(value, dict):
+        raise ValueError(f"'{key}' section in '{file_path}' is not a valid JSON object.")
+    backend = _choice("device", "fifo", "simulator", "replay")(value.get("backend", "device"), f"{key}.backend", file_path)
+    for name in ('rate', 'low', 'high', 'noise'):
+        if name in value:
+            _non_negative(value[name], f"{key}.{name}", file_path)
+    if "period_ms" in value:
+        _positive(value["period_ms"], f"{key}.period_ms", file_path)
+    if "sensors" in value and not (1 <= _positive(value["sensors"], f"{key}.sensors", file_path) <= MAX_SENSORS):
+        raise ValueError(f"'{key}.sensors' value in '{file_path}' must not be greater than {MAX_SENSORS}.")
+    speed = value.get("speed", 1)
+    if not isinstance(speed, (int, float)) or isinstance(speed, bool) or speed < 0:
+        raise ValueError(f"'{key}.speed' value in '{file_path}' is not a valid non-negative number.")
+    _boolean(value.get("loop", False), f"{key}.loop", file_path)
+    if "path" in value or backend == "replay":
+        _string(value.get("path"), f"{key}.path", file_path)
+    return value
+
+def _sensors(value, key, file_path):
+    if not isinstance(value, list):
+        raise ValueError(f"'{key}' value in '{file_path}' is not a valid JSON array.")
+    ids = set()
+    for index, sensor in enumerate(value):
+        name = f"{key}[{index}]"
+        if not isinstance(sensor, dict):
+            raise ValueError(f"'{name}' in '{file_path}' is not a valid JSON object.")
+        sensor_id = _non_negative(sensor.get("id"), f"{name}.id", file_path)
+        if sensor_id >= MAX_SENSORS or sensor_id in ids:
+            raise ValueError(f"'{name}.id' value in '{file_path}' must be unique and less than {MAX_SENSORS}.")
+        ids.add(sensor_id)
+        for threshold in ('threshold', 'THRESHOLD0', 'THRESHOLD1'):
+            if threshold in sensor:
+                _int32(sensor[threshold], f"{name}.{threshold}", file_path)
+        if "detection" in sensor:
+            _detection(sensor["detection"], f"{name}.detection", file_path)
+    return value
+
+def _historian(value, key, file_path):
+    if not isinstance(value, dict):
+        raise ValueError(f"'{key}' section in '{file_path}' is not a valid JSON object.")
+    _string(value.get("path", ""), f"{key}.path", file_path)
+    for name in ('block_samples', 'segment_mb', 'segment_seconds'):
+        if name in value:
+            _positive(value[name], f"{key}.{name}", file_path)
+    for name in ('max_mb', 'max_days'):
+        if name in value:
+            _non_negative(value[name], f"{key}.{name}", file_path)
+    return value
+
+def _aggregation(value, key, file_path):
+    if not isinstance(value, dict):
+        raise ValueError(f"'{key}' section in '{file_path}' is not a valid JSON object.")
+    for name in ('window_ms', 'pre_event_samples', 'post_event_samples'):
+        if name in value:
+            _non_negative(value[name], f"{key}.{name}", file_path)
+    percentiles = value.get("percentiles", [])
+    if not isinstance(percentiles, list) or not all(isinstance(percentile, (int, float)) and not isinstance(percentile, bool)
+                                                    and 0 <= percentile <= 100 for percentile in percentiles):
+        raise ValueError(f"'{key}.percentiles' value in '{file_path}' is not a list of numbers from 0 to 100.")
+    return value
+
+def _channel(value, key, file_path):
+    if not isinstance(value, dict):
+        raise ValueError(f"'{key}' section in '{file_path}' is not a valid JSON object.")
+    for name in ('call_timeout_ms', 'keepalive_ms', 'keepalive_timeout_ms', 'reconnect_initial_ms', 'reconnect_max_ms', 'breaker_reset_ms'):
+        if name in value:
+            _positive(value[name], f"{key}.{name}", file_path)
+    for name in ('breaker_failures', 'pending_batches'):
+        if name in value:
+            _non_negative(value[name], f"{key}.{name}", file_path)
+    return value
+
+"""
+    Schema of all config keys: key -> (name in the JSON file, validator)
+"""
+SCHEMA = {
+    'main':                ("main_server_address",  _address),
+    'modem':               ("modem_server_address", _address),
+    'contact':             ("contact_number",       _int32),
+    'threshold0':          ("THRESHOLD0",           _int32),
+    'threshold1':          ("THRESHOLD1",           _int32),
+    'threshold':           ("threshold",            _int32),
+    'connection_time':     ("connection_time",      _int32),
+    'streaming':           ("streaming",            _boolean),
+    'asyncio':             ("asyncio",              _boolean),
+    'batch_size':          ("batch_size",           _non_negative),
+    'batch_interval_ms':   ("batch_interval_ms",    _non_negative),
+    'ingest':              ("ingest",               _choice("single", "block", "mmap")),
+    'wakeup_watermark':    ("wakeup_watermark",     _positive),
+    'read_interval_ms':    ("read_interval_ms",     _non_negative),
+    'dispatch_queue_size': ("dispatch_queue_size",  _non_negative),
+    'coalesce_window_ms':  ("coalesce_window_ms",   _non_negative),
+    'drop_policy':         ("drop_policy",          _choice("block", "drop_newest", "drop_oldest")),
+    'detection':           ("detection",            _detection),
+    'config_watch_ms':     ("config_watch_ms",      _non_negative),
+    'log_format':          ("log_format",           _choice("text", "jsonl")),
+    'log_rate_limit':      ("log_rate_limit",       _non_negative),
+    'camera':              ("camera_server_address", _optional_address),
+    'socket_mode':         ("socket_mode",          _mode),
+    'camera_backend':      ("camera_backend",       _choice("rpicam", "fake")),
+    'output_dir':          ("output_dir",           _string),
+    'capture_timeout_ms':  ("capture_timeout_ms",   _positive),
+    'capture_mode':        ("capture_mode",         _choice("still", "clip")),
+    'clip_pre_seconds':    ("clip_pre_seconds",     _non_negative),
+    'clip_post_seconds':   ("clip_post_seconds",    _non_negative),
+    'clip_fps':            ("clip_fps",             _positive),
+    'clip_frame_bytes':    ("clip_frame_bytes",     _positive),
+    'transport':           ("transport",            _choice("grpc", "shm")),
+    'shm_path':            ("shm_path",             _string),
+    'shm_slots':           ("shm_slots",            _power_of_two),
+    'outbox_path':         ("outbox_path",          _string),
+    'outbox_batch_size':   ("outbox_batch_size",    _positive),
+    'outbox_commit_ms':    ("outbox_commit_ms",     _non_negative),
+    'outbox_max_backoff_ms': ("outbox_max_backoff_ms", _positive),
+    'outbox_sent_timeout_ms': ("outbox_sent_timeout_ms", _positive),
+    'trace_buffer':        ("trace_buffer",         _non_negative),
+    'trace_path':          ("trace_path",           _string),
+    'metrics':             ("metrics_address",      _optional_address),
+    'source':              ("sample_source",        _sample_source),
+    'client_mode':         ("client_mode",          _choice("test", "sensor")),
+    'sensors':             ("sensors",              _sensors),
+    'sample_rate':         ("sample_rate",          _positive),
+    'average_window':      ("average_window",       _positive),
+    'read_mode':           ("read_mode",            _choice("averaged", "raw")),
+    'historian':           ("historian",            _historian),
+    'aggregation':         ("aggregation",          _aggregation),
+    'channel':             ("channel",              _channel),
+    'keepalive_min_ping_ms': ("keepalive_min_ping_ms", _positive),
+    'workers':             ("worker_addresses",     _addresses),
+    'main_workers':        ("main_worker_addresses", _addresses),
+}
+
+"""
+    Reads and parses JSON config file
+
+    :param file_path: Path to the config file
+    :return:          Parsed JSON object
+"""
+def _load(file_path):
     try:
         with open(file_path, 'r') as config_file:
-            configuration = json.load(config_file)
-
-        config_value = None
-        
-        if key == 'main':
-            config_value = configuration.get("main_server_address")
-            
-        elif key == 'modem':
-            config_value = configuration.get("modem_server_address")
-        
-        elif key == 'contact':
-            config_value = configuration.get("contact_number")
-            if not isinstance(config_value, int) or not(INT32_MIN <= config_value <= INT32_MAX):
-                raise ValueError(f"Contact number in '{file_path}' is not a valid int32 value.")
-        
-        elif key == 'threshold0':
-            config_value = configuration.get("THRESHOLD0")
-            if not isinstance(config_value, int) or not(INT32_MIN <= config_value <= INT32_MAX):
-                raise ValueError(f"'{key}' value in '{file_path}' is not a valid int32 value.")
-        
-        elif key == 'threshold1':
-            config_value = configuration.get("THRESHOLD1")
-            if not isinstance(config_value, int) or not(INT32_MIN <= config_value <= INT32_MAX):
-                raise ValueError(f"'{key}' value in '{file_path}' is not a valid int32 value.")
-        
-        elif key == 'threshold':
-            config_value = configuration.get("threshold")
-            if not isinstance(config_value, int) or not(INT32_MIN <= config_value <= INT32_MAX):
-                raise ValueError(f"'{key}' value in '{file_path}' is not a valid int32 value.")
-                
-        elif key == 'connection_time':
-            config_value = configuration.get("connection_time")
-            if not isinstance(config_value, int) or not(INT32_MIN <= config_value <= INT32_MAX):
-                raise ValueError(f"'{key}' value in '{file_path}' is not a valid int32 value.")
-        
-        else:
-            raise ValueError(f"Invalid key-search format in '{file_path}' file: Searched for {key}")
-            
-        if config_value is not None:
-            return config_value
-        else:
-            raise ValueError(f"An error occurred while getting config data '{key}' from '{file_path}'")
+            return json.load(config_file)
 
     except FileNotFoundError:
         raise FileNotFoundError(f"'{file_path}' not found.")
-    
+
     except PermissionError:
         raise PermissionError(f"Permission denied - attempt to access '{file_path}' without proper permissions.")
-    
+
     except OSError as e:
         raise OSError(f"An error occurred while opening the file '{file_path}' : {e}")
-            
+
     except json.JSONDecodeError as e:
         raise ValueError(f"Invalid JSON format in '{file_path}' file : {e}")
-        
-    except Exception:
-        raise
+
+"""
+    Validates requested keys of the parsed config in one pass
+
+    :param configuration: Parsed JSON object
+    :param file_path:     Path to the config file (for error messages)
+    :param keys:          Dict key -> default (None if the key is required)
+    :return:              Dict key -> validated value
+"""
+def _validate(configuration, file_path, keys):
+    values = {}
+
+    for key, default in keys.items():
+        if key not in SCHEMA:
+            raise ValueError(f"Invalid key-search format in '{file_path}' file: Searched for {key}")
+
+        name, validator = SCHEMA[key]
+        value = configuration.get(name, default)
+
+        if value is None:
+            raise ValueError(f"An error occurred while getting config data '{key}' from '{file_path}'")
+
+        values[key] = validator(value, key, file_path)
+
+    return values
+
+
+"""
+    Configuration read from a JSON file: parsed once, all keys validated in one
+    pass against SCHEMA and exposed as attributes (e.g. config.threshold0).
+
+    watch() polls the modification time of the file and reloads it in the
+    background. New values are validated as a whole and swapped in at once,
+    so readers never see a half-updated configuration; if the new file is
+    invalid or on_change fails to apply it, the running configuration is kept.
+"""
+class Config:
+
+    """
+        :param file_path: Path to the config file
+        :param keys:      Dict key -> default value (None if the key is required)
+    """
+    def __init__(self, file_path, keys):
+        self._file_path = file_path
+        self._keys      = keys
+        self._mtime     = os.stat(file_path).st_mtime_ns
+        self._values    = _validate(_load(file_path), file_path, keys)
+        self._watcher   = None
+        self._stop      = threading.Event()
+
+    def __getattr__(self, key):
+        try:
+            return self.__dict__['_values'][key]
+        except KeyError:
+            raise AttributeError(f"'{key}' is not a key of config '{self.__dict__.get('_file_path')}'")
+
+    """
+        :return: Dict key -> value of the current configuration (snapshot)
+    """
+    def values(self):
+        return dict(self._values)
+
+    """
+        Reloads the config file if it has been modified
+
+        :return: Dict key -> new value of changed keys (empty if nothing changed)
+    """
+    def reload(self):
+        mtime = os.stat(self._file_path).st_mtime_ns
+        if mtime == self._mtime:
+            return {}
+
+        # Modification time is taken only from a valid file - an editor may truncate and
+        # rewrite the file within one tick, its complete content is read on the next check
+        values  = _validate(_load(self._file_path), self._file_path, self._keys)
+        changed = {key: value for key, value in values.items() if self._values.get(key) != value}
+
+        self._mtime  = mtime
+        self._values = values   # swapped at once
+        return changed
+
+    """
+        Starts watching the config file in the background
+
+        :param on_change: Function on_change(config, changed) called after reload with changed keys
+        :param interval:  Seconds between checks of the file
+    """
+    def watch(self, on_change, interval=2.0):
+        def run():
+            failed = None   # error of the last check - an invalid file is read on every check, its error is logged once
+            while not self._stop.wait(interval):
+                running = (self._mtime, self._values)
+                try:
+                    changed = self.reload()
+                    if changed:
+                        on_change(self, changed)
+                    failed = None
+                except Exception as e:
+                    # Configuration on_change failed to apply is read again on the next check
+                    self._mtime, self._values = running
+                    if str(e) != failed:
+                        logging.error(f"Config '{self._file_path}' not reloaded, keeping running configuration: {e}")
+                    failed = str(e)
+
+        self._watcher = threading.Thread(target=run, name="config-watch", daemon=True)
+        self._watcher.start()
+
+    """
+        Stops watching the config file
+    """
+    def stop(self):
+        self._stop.set()
+
+
+# file_path -> (modification time, parsed JSON), so get_config() parses each file once
+_cache = {}
+
+"""
+    Gets one config value
+
+    :param file_path: Path to the config file
+    :param key:       Config key (one of SCHEMA)
+    :param default:   Value returned if key is not in the file (None if key is required)
+    :return:          Validated config value
+"""
+def get_config(file_path, key, default=None):
+    try:
+        mtime = os.stat(file_path).st_mtime_ns
+    except FileNotFoundError:
+        raise FileNotFoundError(f"'{file_path}' not found.")
+
+    cached = _cache.get(file_path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, _load(file_path))
+        _cache[file_path] = cached
+
+    return _validate(cached[1], file_path, {key: default})[key]
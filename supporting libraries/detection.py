@@ -0,0 +1,137 @@
+import threading
+import statistics
+from collections import deque
+
+FILTERS = ("none", "moving_average", "median")
+
+# Events returned by DetectionEngine.update()
+ENTER = "enter"     # object came into range
+EXIT  = "exit"      # object left the range
+
+"""
+    Turns raw ADC samples into detection state and edge events.
+
+    Pipeline for every sample:
+        1. filter   - "none", "moving_average" or "median" over the last window samples
+        2. hysteresis band - range is entered when filtered value > threshold and
+                      left when filtered value <= threshold - hysteresis
+        3. N-of-M confirmation - state changes only when confirm_n of the last
+                      confirm_m samples agree with the change
+
+    update() returns ENTER/EXIT only on state transitions, so callers can forward
+    transitions only (edge triggered) or every sample while active (level triggered).
+"""
+class DetectionEngine:
+
+    """
+        :param threshold:  Range is entered above this value
+        :param hysteresis: Range is left at or below threshold - hysteresis
+        :param filter:     One of FILTERS
+        :param window:     Number of samples the filter works on
+        :param confirm_n:  Number of agreeing samples needed for state change...
+        :param confirm_m:  ...out of the last confirm_m samples
+    """
+    def __init__(self, threshold, hysteresis=0, filter="none", window=1, confirm_n=1, confirm_m=1):
+        if filter not in FILTERS:
+            raise ValueError(f"Invalid detection filter '{filter}', expected one of {FILTERS}")
+        if window < 1 or not (1 <= confirm_n <= confirm_m):
+            raise ValueError(f"Invalid detection window={window} or confirmation {confirm_n}-of-{confirm_m}")
+
+        self.threshold  = threshold
+        self.hysteresis = hysteresis
+        self.filter     = filter
+        self.confirm_n  = confirm_n
+        self.samples    = deque(maxlen=window)      # last samples for the filter
+        self.votes      = deque(maxlen=confirm_m)   # last votes for state change
+        self.total      = 0                         # sum of self.samples for moving average
+        self.active     = False                     # object is in range
+        self.value      = None                      # last filtered value
+        self.lock       = threading.Lock()          # engines are shared by server threads
+
+    """
+        Changes thresholds of a running engine
+
+        :param threshold:  Range is entered above this value
+        :param hysteresis: Range is left at or below threshold - hysteresis
+    """
+    def set_threshold(self, threshold, hysteresis=None):
+        with self.lock:
+            self.threshold = threshold
+            if hysteresis is not None:
+                self.hysteresis = hysteresis
+
+    def _filtered(self, sample):
+        if self.filter == "none":
+            return sample
+
+        if len(self.samples) == self.samples.maxlen:
+            self.total -= self.samples[0]
+        self.samples.append(sample)
+        self.total += sample
+
+        if self.filter == "moving_average":
+            return self.total / len(self.samples)
+        return statistics.median(self.samples)
+
+    """
+        Feeds one sample to the engine
+
+        :param sample: Raw sample
+        :return:       ENTER or EXIT on state transition, otherwise None
+    """
+    def update(self, sample):
+        with self.lock:
+            self.value = self._filtered(sample)
+
+            if self.active:
+                self.votes.append(self.value <= self.threshold - self.hysteresis)
+            else:
+                self.votes.append(self.value > self.threshold)
+
+            if sum(self.votes) < self.confirm_n:
+                return None
+
+            self.active = not self.active
+            self.votes.clear()
+            return ENTER if self.active else EXIT
+
+    """
+        Feeds block of samples to the engine. Quiet blocks (unfiltered engine out of
+        range and no sample over threshold) are skipped without looking at every sample.
+
+        :param samples: Iterable of raw samples supporting len() and max()
+        :param level:   If True, samples taken while in range are reported too
+        :return:        List of (sample, event), event is ENTER, EXIT or None (level only)
+    """
+    def update_block(self, samples, level=False):
+        if len(samples) == 0:
+            return []
+
+        if self.filter == "none" and not self.active and max(samples) <= self.threshold:
+            with self.lock:
+                self.votes.extend([False] * min(len(samples), self.votes.maxlen))
+                self.value = samples[-1]
+            return []
+
+        result = []
+        for sample in samples:
+            event = self.update(sample)
+            if event is not None or (level and self.active):
+                result.append((sample, event))
+        return result
+
+
+"""
+    Creates detection engine from the "detection" section of a config file
+
+    :param threshold: Range is entered above this value
+    :param settings:  Dict with optional keys hysteresis, filter, window, confirm_n, confirm_m
+    :return:          DetectionEngine
+"""
+def create_engine(threshold, settings):
+    return DetectionEngine(threshold,
+                           hysteresis=settings.get("hysteresis", 0),
+                           filter=settings.get("filter", "none"),
+                           window=settings.get("window", 1),
+                           confirm_n=settings.get("confirm_n", 1),
+                           confirm_m=settings.get("confirm_m", 1))
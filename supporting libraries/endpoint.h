@@ -0,0 +1,89 @@
+// Unix domain socket endpoints of gRPC servers.
+//
+// Server addresses are either TCP "host:port" or "unix:path" / "unix:///absolute/path".
+// For Unix domain sockets the server looks after the socket file:
+//   - prepare_server_endpoint() before binding removes a stale socket file left by a
+//     crashed server and refuses to replace a live socket or another file
+//   - BindingUmask around binding creates the socket file with its final permissions,
+//     it is never open to other users
+//   - secure_server_endpoint() after binding sets permissions of the socket file
+//   - cleanup_server_endpoint() on shutdown removes the socket file
+// For TCP addresses these functions do nothing.
+#include <string>
+#include <stdexcept>
+#include <cerrno>
+#include <cstring>
+#include <sys/socket.h>
+#include <sys/stat.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+const std::string UNIX_PREFIX = "unix:";
+
+bool is_unix_address(const std::string& address) {
+    return address.compare(0, UNIX_PREFIX.size(), UNIX_PREFIX) == 0;
+}
+
+std::string unix_socket_path(const std::string& address) {
+    std::string path = address.substr(UNIX_PREFIX.size());
+    if (path.compare(0, 2, "//") == 0)
+        path = path.substr(2);
+    return path;
+}
+
+void prepare_server_endpoint(const std::string& address) {
+    if (!is_unix_address(address))
+        return;
+
+    std::string path = unix_socket_path(address);
+    struct stat st;
+    if (stat(path.c_str(), &st) != 0)
+        return;     // no socket file yet
+
+    if (!S_ISSOCK(st.st_mode))
+        throw std::runtime_error("'" + path + "' exists and is not a socket");
+
+    struct sockaddr_un addr = {};
+    addr.sun_family = AF_UNIX;
+    if (path.size() >= sizeof(addr.sun_path))
+        throw std::runtime_error("Socket path '" + path + "' is too long");
+    strncpy(addr.sun_path, path.c_str(), sizeof(addr.sun_path) - 1);
+
+    int probe = socket(AF_UNIX, SOCK_STREAM, 0);
+    if (probe < 0)
+        throw std::runtime_error(std::string("Unable to create socket: ") + strerror(errno));
+    int connected = connect(probe, (struct sockaddr*)&addr, sizeof(addr));
+    int error     = errno;
+    close(probe);
+
+    if (connected == 0)
+        throw std::runtime_error("'" + path + "' is in use by a running server");
+
+    // Nobody listens - socket file was left behind by a server which did not shut down cleanly
+    if (error == ECONNREFUSED && unlink(path.c_str()) != 0)
+        throw std::runtime_error("Unable to remove stale socket '" + path + "': " + strerror(errno));
+}
+
+// Narrows the umask while it exists - socket file of a Unix domain socket bound meanwhile
+// gets only the permission bits mode, no other user can connect before secure_server_endpoint().
+// Umask is process wide - files created by other threads meanwhile get at most mode too.
+class BindingUmask {
+public:
+    BindingUmask(const std::string& address, mode_t mode)
+        : active(is_unix_address(address)), previous(active ? umask(~mode & 0777) : 0) {}
+    ~BindingUmask() { if (active) umask(previous); }
+
+private:
+    bool   active;
+    mode_t previous;
+};
+
+void secure_server_endpoint(const std::string& address, mode_t mode) {
+    if (is_unix_address(address) && chmod(unix_socket_path(address).c_str(), mode) != 0)
+        throw std::runtime_error("Unable to set permissions of '" + unix_socket_path(address) + "': " + strerror(errno));
+}
+
+void cleanup_server_endpoint(const std::string& address) {
+    if (is_unix_address(address))
+        unlink(unix_socket_path(address).c_str());
+}
@@ -0,0 +1,138 @@
+import os
+import stat
+import socket
+import contextlib
+
+"""
+    gRPC endpoint addresses.
+
+    Addresses in the config files are either TCP "host:port" or Unix domain
+    socket "unix:path" / "unix:///absolute/path" (gRPC target syntax, accepted
+    as is by add_insecure_port() and insecure_channel()). Processes of the
+    gateway always run on one host, so Unix sockets avoid the TCP stack on
+    every hop; the server side has to look after the socket file:
+        - prepare_server() before binding: removes a stale socket file left
+          by a crashed server, refuses to replace a live socket or other file
+        - binding() around binding: socket file is created with its final
+          permissions, it is never open to other users
+        - secure_server() after binding: sets permissions of the socket file
+        - cleanup_server() on shutdown: removes the socket file
+    For TCP addresses these functions do nothing.
+"""
+UNIX_PREFIX = "unix:"
+
+"""
+    :param address: gRPC address from config
+    :return:        True if address is a Unix domain socket
+"""
+def is_unix(address):
+    return address.startswith(UNIX_PREFIX)
+
+"""
+    :param address: Unix domain socket address ("unix:path" or "unix:///absolute/path")
+    :return:        Path of the socket file
+"""
+def unix_path(address):
+    path = address[len(UNIX_PREFIX):]
+    if path.startswith("//"):
+        path = path[2:]
+    return path
+
+"""
+    Checks whether address is a valid TCP or Unix domain socket address
+
+    :param address: gRPC address from config
+    :return:        None, raises ValueError if the address is invalid
+"""
+def validate(address):
+    if is_unix(address):
+        if not unix_path(address):
+            raise ValueError(f"'{address}' has no socket path")
+        return
+
+    host, separator, port = address.rpartition(":")
+    if not separator or not host or not port.isdigit() or not (0 < int(port) < 65536):
+        raise ValueError(f"'{address}' is neither 'host:port' nor 'unix:path'")
+
+"""
+    Prepares socket file of a Unix domain socket server address before binding
+
+    :param address: Server address
+    :return:        None, raises RuntimeError if the socket is used by a running server
+"""
+def prepare_server(address):
+    if not is_unix(address):
+        return
+
+    path = unix_path(address)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+
+    if not stat.S_ISSOCK(mode):
+        raise RuntimeError(f"'{path}' exists and is not a socket")
+
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except (ConnectionRefusedError, FileNotFoundError):
+        # Nobody listens - socket file was left behind by a server which did not shut down cleanly
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        return
+    finally:
+        probe.close()
+
+    raise RuntimeError(f"'{path}' is in use by a running server")
+
+"""
+    Context manager around binding a server. For a Unix domain socket address the
+    umask lets the socket file get only the permission bits mode, so no other user
+    can connect before secure_server(). Umask is process wide - files created by
+    other threads meanwhile get at most mode too.
+
+    :param address: Server address
+    :param mode:    Permission bits (e.g. 0o660 - owner and group may connect)
+    :return:        Context manager
+"""
+@contextlib.contextmanager
+def binding(address, mode):
+    if not is_unix(address):
+        yield
+        return
+
+    previous = os.umask(~mode & 0o777)
+    try:
+        yield
+    finally:
+        os.umask(previous)
+
+"""
+    Sets permissions of the socket file of a started Unix domain socket server
+
+    :param address: Server address
+    :param mode:    Permission bits (e.g. 0o660 - owner and group may connect)
+    :return:        None
+"""
+def secure_server(address, mode):
+    if is_unix(address):
+        os.chmod(unix_path(address), mode)
+
+"""
+    Removes socket file of a stopped Unix domain socket server
+
+    :param address: Server address
+    :return:        None
+"""
+def cleanup_server(address):
+    if not is_unix(address):
+        return
+    try:
+        os.unlink(unix_path(address))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,193 @@
+import queue
+import logging
+import threading
+
+"""
+    Bounded ring of preallocated frame buffers.
+
+    Memory is allocated once: `slots` buffers of `frame_size` bytes each. The
+    producer (one frame source thread) fills the buffer returned by buffer() and
+    publishes it with commit(), after that the slot of the oldest frame is reused.
+
+    Frames are numbered by a free running counter (head = number of the next
+    frame). Frame n is available while head - slots < n < head; read() copies a
+    frame and checks afterwards that its slot was not reused during the copy.
+"""
+class FrameRing:
+
+    """
+        :param slots:      Number of frames kept in memory
+        :param frame_size: Max size of one frame in bytes
+    """
+    def __init__(self, slots, frame_size):
+        self.slots      = slots
+        self.frame_size = frame_size
+        self.buffers    = [bytearray(frame_size) for _ in range(slots)]
+        self.lengths    = [0] * slots
+        self.head       = 0     # number of the next frame
+        self.dropped    = 0     # frames larger than frame_size
+        self.closed     = False
+        self.cond       = threading.Condition()
+
+    """
+        :return: Buffer the producer writes the next frame into
+    """
+    def buffer(self):
+        return self.buffers[self.head % self.slots]
+
+    """
+        Publishes the frame written into buffer()
+
+        :param length: Size of the frame in bytes
+    """
+    def commit(self, length):
+        with self.cond:
+            self.lengths[self.head % self.slots] = length
+            self.head += 1
+            self.cond.notify_all()
+
+    """
+        Marks the end of the frame stream, wakes up waiting readers
+    """
+    def close(self):
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    """
+        Waits until frame is available
+
+        :param index:   Frame number
+        :param timeout: Max seconds to wait
+        :return:        True if the frame has been produced
+    """
+    def wait(self, index, timeout):
+        with self.cond:
+            return self.cond.wait_for(lambda: self.head > index or self.closed, timeout) and self.head > index
+
+    """
+        Copies frame into caller's buffer
+
+        :param index: Frame number
+        :param out:   Buffer of at least frame_size bytes
+        :return:      Size of the frame, or None if the frame has already been overwritten
+    """
+    def read(self, index, out):
+        with self.cond:
+            if index <= self.head - self.slots:
+                return None
+            length = self.lengths[index % self.slots]
+
+        memoryview(out)[:length] = memoryview(self.buffers[index % self.slots])[:length]
+
+        with self.cond:
+            # Producer is writing frame head into the slot of frame head - slots
+            if index <= self.head - self.slots:
+                return None
+        return length
+
+
+"""
+    Event triggered clips from a FrameRing.
+
+    trigger() returns right away; a writer thread saves `pre_frames` frames from
+    before the trigger and `post_frames` frames after it into one MJPEG file
+    (concatenated JPEG frames). A trigger while a clip is still being recorded
+    extends that clip instead of starting a new one.
+
+    The writer must keep up with the producer: frames overwritten before the
+    writer got to them are skipped and counted as lost.
+"""
+class ClipRecorder:
+
+    """
+        :param ring:        FrameRing with the frame source running
+        :param pre_frames:  Frames saved from before the trigger
+        :param post_frames: Frames saved after the trigger
+    """
+    def __init__(self, ring, pre_frames, post_frames):
+        self.ring        = ring
+        self.pre_frames  = pre_frames
+        self.post_frames = post_frames
+        self.jobs        = queue.Queue()
+        self.current     = None     # [filename, end frame] of the clip being recorded
+        self.lock        = threading.Lock()
+        self.scratch     = bytearray(ring.frame_size)
+        self.running     = False
+        self.thread      = None
+
+    """
+        Starts writer thread
+    """
+    def start(self):
+        self.running = True
+        self.thread  = threading.Thread(target=self._run, name="clip-writer", daemon=True)
+        self.thread.start()
+
+    """
+        Stops writer thread after the queued clips are written
+    """
+    def stop(self, timeout=10):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    """
+        Starts recording of a clip, or extends the clip being recorded
+
+        :param filename: File the clip is saved to
+        :return:         File the frames after this trigger go to
+    """
+    def trigger(self, filename):
+        with self.lock:
+            head = self.ring.head
+            if self.current is not None:
+                self.current[1] = head + self.post_frames
+                return self.current[0]
+
+            self.current = [filename, head + self.post_frames]
+            start        = max(head - self.pre_frames, head - self.ring.slots + 1, 0)
+            self.jobs.put((filename, start))
+            return filename
+
+    def _write(self, filename, start):
+        written = lost = 0
+        index   = start
+
+        with open(filename, "wb") as clip:
+            while True:
+                with self.lock:
+                    if index >= self.current[1]:
+                        self.current = None
+                        break
+
+                if not self.ring.wait(index, timeout=1.0):
+                    if self.ring.closed:
+                        with self.lock:
+                            self.current = None
+                        break
+                    continue
+
+                length = self.ring.read(index, self.scratch)
+                if length is None:
+                    lost += 1
+                else:
+                    clip.write(memoryview(self.scratch)[:length])
+                    written += 1
+                index += 1
+
+        logging.info("Clip %s saved: %d frames, %d lost", filename, written, lost)
+
+    def _run(self):
+        while self.running or not self.jobs.empty():
+            try:
+                filename, start = self.jobs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            try:
+                self._write(filename, start)
+            except Exception as e:
+                with self.lock:
+                    self.current = None
+                logging.error(f"Clip {filename} not saved: {e}")
@@ -0,0 +1,438 @@
+import os
+import mmap
+import time
+import zlib
+import queue
+import struct
+import logging
+import itertools
+import threading
+from array import array
+
+"""
+    Local time-series historian for raw ADC samples.
+
+    Samples are appended per sensor and written in blocks into segment files
+    in one directory. A segment is named after the timestamp of its first
+    block (seg-<first_us>.adch, segments are ordered by their names) and
+    starts with a header:
+        magic "ADCH", version, sealed flag, first_us, last_us, number of blocks
+    The time range and the block count are written when the segment is sealed
+    (rolled over or closed), so a query reads only the headers of segments
+    outside its range. A segment left unsealed by a crash is read to its last
+    complete block.
+
+    Block - header followed by the payload:
+        magic "ADCB", sensor id, value width, time width, count,
+        first_us, last_us, first value, min, max, crc32 of the payload
+        payload - count - 1 value deltas (int8/16/32, the narrowest fitting the
+                  block), then count - 1 timestamp deltas in us (uint8/16/32)
+    A 12-bit ADC sampled at 1 kHz costs about 3 bytes per sample. Header
+    min/max answer summary queries over whole blocks without decoding them,
+    blocks outside the queried range are skipped by their headers.
+
+    append() only puts the samples on a queue - encoding, writing and
+    retention run on the writer thread, so the sensor loop never waits for
+    the SD card. Retention deletes the oldest segments while the directory
+    holds more than max_bytes or while a segment is older than max_age.
+"""
+SEGMENT_HEADER = struct.Struct('<4sHHqqI')          # magic, version, sealed, first_us, last_us, blocks
+BLOCK_HEADER   = struct.Struct('<4sHBBIqqiiiI')     # magic, sensor, value width, time width, count, first_us, last_us, first value, min, max, crc32
+SEGMENT_MAGIC  = b"ADCH"
+BLOCK_MAGIC    = b"ADCB"
+VERSION        = 1
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".adch"
+# width in bytes -> array typecodes of value deltas (signed) and timestamp deltas (unsigned)
+VALUE_TYPES    = {1: 'b', 2: 'h', 4: 'i'}
+TIME_TYPES     = {1: 'B', 2: 'H', 4: 'I'}
+MAX_TIME_DELTA = 2**32 - 1                          # larger gap starts a new block
+
+
+"""
+    :param deltas: Iterable of integer deltas
+    :param types:  Width -> typecode, narrowest first
+    :return:       (width, array of the deltas)
+"""
+def _narrowest(deltas, types):
+    low, high = (min(deltas), max(deltas)) if deltas else (0, 0)
+    for width, typecode in types.items():
+        probe = array(typecode)
+        try:
+            probe.extend((low, high))
+        except OverflowError:
+            continue
+        return width, array(typecode, deltas)
+    raise OverflowError(f"Deltas {low} - {high} do not fit any width")
+
+
+"""
+    Encodes one block of samples of a sensor
+
+    :param sensor_id:  Id of the sensor
+    :param timestamps: Non-decreasing timestamps in us
+    :param values:     Sample values
+    :return:           Bytes of the block (header and payload)
+"""
+def encode_block(sensor_id, timestamps, values):
+    value_deltas = [b - a for a, b in zip(values, values[1:])]
+    time_deltas  = [b - a for a, b in zip(timestamps, timestamps[1:])]
+    value_width, value_array = _narrowest(value_deltas, VALUE_TYPES)
+    time_width, time_array   = _narrowest(time_deltas, TIME_TYPES)
+
+    payload = value_array.tobytes() + time_array.tobytes()
+    header  = BLOCK_HEADER.pack(BLOCK_MAGIC, sensor_id, value_width, time_width, len(values),
+                                timestamps[0], timestamps[-1], values[0], min(values), max(values),
+                                zlib.crc32(payload))
+    return header + payload
+
+
+"""
+    Block of one sensor found in a segment, decoded on demand
+"""
+class Block:
+
+    def __init__(self, data, offset):
+        (_, self.sensor_id, self.value_width, self.time_width, self.count, self.first_us, self.last_us,
+         self.first_value, self.min, self.max, self.crc) = BLOCK_HEADER.unpack_from(data, offset)
+        self.data    = data
+        self.payload = offset + BLOCK_HEADER.size
+        self.end     = self.payload + (self.count - 1) * (self.value_width + self.time_width)
+
+    """
+        :return: (array('q') of timestamps in us, array('i') of values)
+    """
+    def decode(self):
+        value_bytes = (self.count - 1) * self.value_width
+        deltas      = array(VALUE_TYPES[self.value_width])
+        deltas.frombytes(self.data[self.payload:self.payload + value_bytes])
+        steps       = array(TIME_TYPES[self.time_width])
+        steps.frombytes(self.data[self.payload + value_bytes:self.end])
+
+        # Running sums are computed in C by accumulate()
+        values     = array('i', itertools.accumulate(deltas, initial=self.first_value))
+        timestamps = array('q', itertools.accumulate(steps, initial=self.first_us))
+        return timestamps, values
+
+
+"""
+    Reads blocks of a segment file
+
+    :param path: Path of the segment
+    :return:     (segment header tuple, list of Block) - blocks up to the first incomplete or corrupted one
+"""
+def read_segment(path):
+    with open(path, "rb") as segment_file:
+        size = os.fstat(segment_file.fileno()).st_size
+        if size < SEGMENT_HEADER.size:
+            return None, []
+        data = mmap.mmap(segment_file.fileno(), size, access=mmap.ACCESS_READ)
+
+    header = SEGMENT_HEADER.unpack_from(data, 0)
+    if header[0] != SEGMENT_MAGIC or header[1] != VERSION:
+        raise ValueError(f"'{path}' is not a historian segment of version {VERSION}")
+
+    blocks = []
+    offset = SEGMENT_HEADER.size
+    while offset + BLOCK_HEADER.size <= size:
+        if data[offset:offset + 4] != BLOCK_MAGIC:
+            break
+        block = Block(data, offset)
+        if block.end > size:
+            break   # block being written
+        offset = block.end
+        if zlib.crc32(data[block.payload:block.end]) != block.crc:
+            logging.warning(f"Historian segment {path}: corrupted block at offset {block.payload - BLOCK_HEADER.size} skipped.")
+            continue
+        blocks.append(block)
+    return header, blocks
+
+
+"""
+    Time range of a segment - from the header of a sealed segment, by reading
+    the blocks of an unsealed one
+
+    :param path: Path of the segment
+    :return:     (first_us, last_us), None if the segment has no blocks
+"""
+def segment_range(path):
+    with open(path, "rb") as segment_file:
+        data = segment_file.read(SEGMENT_HEADER.size)
+    if len(data) < SEGMENT_HEADER.size:
+        return None
+    magic, version, sealed, first_us, last_us, count = SEGMENT_HEADER.unpack(data)
+    if magic != SEGMENT_MAGIC or version != VERSION:
+        raise ValueError(f"'{path}' is not a historian segment of version {VERSION}")
+    if sealed:
+        return (first_us, last_us) if count else None
+
+    _, blocks = read_segment(path)
+    if not blocks:
+        return None
+    return min(block.first_us for block in blocks), max(block.last_us for block in blocks)
+
+
+"""
+    Historian of one directory - writer (append) and range queries (query, summary).
+    Queries may run in any thread or process, also while the writer is running.
+"""
+class Historian:
+
+    """
+        :param directory:       Directory of the segment files (created if missing)
+        :param block_samples:   Samples of a sensor encoded into one block
+        :param flush_interval:  Max seconds samples wait in memory before their block is written
+        :param segment_bytes:   Segment is sealed when it reaches this size...
+        :param segment_seconds: ...or this age
+        :param max_bytes:       Oldest segments are deleted while all segments take more (0 - no limit)
+        :param max_age:         Segments whose last sample is older are deleted, in seconds (0 - no limit)
+    """
+    def __init__(self, directory, block_samples=4096, flush_interval=1.0, segment_bytes=16 * 2**20,
+                 segment_seconds=3600, max_bytes=512 * 2**20, max_age=7 * 86400):
+        self.directory       = directory
+        self.block_samples   = block_samples
+        self.flush_interval  = flush_interval
+        self.segment_bytes   = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.max_bytes       = max_bytes
+        self.max_age         = max_age
+        self.queue           = queue.SimpleQueue()
+        self.pending         = {}       # sensor id -> (array('q') of timestamps, array('i') of values)
+        self.segment         = None     # file object of the segment being written
+        self.segment_first   = 0        # first_us of the segment being written
+        self.segment_last    = 0        # last_us of the segment being written
+        self.segment_blocks  = 0
+        self.samples_written = 0
+        self.thread          = None
+        os.makedirs(directory, exist_ok=True)
+
+    """
+        Starts the writer thread
+    """
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name="historian", daemon=True)
+        self.thread.start()
+
+    """
+        Writes samples waiting in memory, seals the segment and stops the writer thread
+
+        :param timeout: Max number of seconds to wait for the writer thread
+    """
+    def stop(self, timeout=10):
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join(timeout)
+            self.thread = None
+
+    """
+        Queues samples of a sensor, does not wait for the disk
+
+        :param sensor_id: Id of the sensor
+        :param values:    Sample values (e.g. array('i') read from the driver)
+        :param end_us:    Wall clock time of the last sample in us
+        :param period_us: Time between the samples in us (samples of one read are spread back from end_us)
+    """
+    def append(self, sensor_id, values, end_us, period_us=0):
+        if len(values):
+            self.queue.put((sensor_id, values, end_us, period_us))
+
+    def _run(self):
+        self._retain()
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = ()
+
+            try:
+                if item is None:
+                    self._flush()
+                    self._seal()
+                    logging.info(f"Historian {self.directory} stopped: {self.samples_written} samples written.")
+                    return
+                if item:
+                    self._add(*item)
+                if time.monotonic() >= deadline:
+                    self._flush()
+                    deadline = time.monotonic() + self.flush_interval
+            except OSError as e:
+                # Samples of the failed block are lost, the historian keeps running
+                logging.error(f"Historian {self.directory} failed to write samples: {e}")
+                self._seal()
+
+    def _add(self, sensor_id, values, end_us, period_us):
+        timestamps, pending_values = self.pending.setdefault(sensor_id, (array('q'), array('i')))
+        start = end_us - (len(values) - 1) * period_us
+        if timestamps:
+            if start - timestamps[-1] > MAX_TIME_DELTA:
+                # Gap does not fit a timestamp delta - samples before it go into their own block
+                self._write_block(sensor_id)
+                timestamps, pending_values = self.pending.setdefault(sensor_id, (array('q'), array('i')))
+            else:
+                # Timestamps never go back within a sensor (wall clock may be stepped)
+                start = max(start, timestamps[-1])
+
+        if period_us:
+            timestamps.extend(range(start, start + len(values) * period_us, period_us))
+        else:
+            timestamps.extend(itertools.repeat(start, len(values)))
+        pending_values.extend(values)
+
+        if len(pending_values) >= self.block_samples:
+            self._write_block(sensor_id)
+
+    def _flush(self):
+        for sensor_id in list(self.pending):
+            self._write_block(sensor_id)
+
+    def _write_block(self, sensor_id):
+        timestamps, values = self.pending.pop(sensor_id, (None, None))
+        if not values:
+            return
+
+        for start in range(0, len(values), self.block_samples):
+            block_timestamps = timestamps[start:start + self.block_samples]
+            if self.segment is None or self._segment_full(block_timestamps[0]):
+                if self.segment is not None:
+                    self._seal()
+                    self._retain()
+                self._open_segment(block_timestamps[0])
+
+            self.segment.write(encode_block(sensor_id, block_timestamps, values[start:start + self.block_samples]))
+            self.segment.flush()
+            self.segment_first    = min(self.segment_first, block_timestamps[0])
+            self.segment_last     = max(self.segment_last, block_timestamps[-1])
+            self.segment_blocks  += 1
+            self.samples_written += len(block_timestamps)
+
+    def _segment_full(self, first_us):
+        return (self.segment.tell() >= self.segment_bytes or
+                first_us - self.segment_first >= self.segment_seconds * 1_000_000)
+
+    def _open_segment(self, first_us):
+        path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{first_us:016d}{SEGMENT_SUFFIX}")
+        # Name collision (e.g. clock stepped back) - existing segment is kept, a new file with a -<monotonic_ns> suffix is created
+        if os.path.exists(path):
+            path = os.path.join(self.directory, f"{SEGMENT_PREFIX}{first_us:016d}-{time.monotonic_ns()}{SEGMENT_SUFFIX}")
+        self.segment        = open(path, "wb")
+        self.segment_first  = first_us
+        self.segment_last   = first_us
+        self.segment_blocks = 0
+        self.segment.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, VERSION, 0, first_us, first_us, 0))
+
+    def _seal(self):
+        if self.segment is None:
+            return
+        try:
+            self.segment.seek(0)
+            self.segment.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, VERSION, 1, self.segment_first, self.segment_last, self.segment_blocks))
+            self.segment.close()
+        except OSError as e:
+            logging.error(f"Historian failed to seal segment {self.segment.name}: {e}")
+        self.segment = None
+
+    """
+        Deletes oldest segments while all segments take more than max_bytes or
+        while the last sample of the oldest segment is older than max_age
+    """
+    def _retain(self):
+        segments = self.segments()
+        current  = self.segment.name if self.segment is not None else None
+        sizes    = {path: os.path.getsize(path) for _, path in segments}
+        total    = sum(sizes.values())
+        horizon  = (time.time() - self.max_age) * 1_000_000 if self.max_age else None
+
+        for _, path in segments:
+            if path == current:
+                break
+            time_range = segment_range(path)
+            too_old    = horizon is not None and (time_range is None or time_range[1] < horizon)
+            if not too_old and not (self.max_bytes and total > self.max_bytes):
+                break
+            os.unlink(path)
+            total -= sizes[path]
+            logging.info(f"Historian deleted segment {path} ({'age' if too_old else 'size'} limit).")
+
+    """
+        :return: List of (first_us, path) of the segments, oldest first
+    """
+    def segments(self):
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                try:
+                    first_us = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)].split("-")[0])
+                except ValueError:
+                    continue
+                segments.append((first_us, os.path.join(self.directory, name)))
+        return sorted(segments)
+
+    """
+        Blocks overlapping a time range
+
+        :param start_us:  Start of the range (wall clock, us)
+        :param end_us:    End of the range, inclusive
+        :param sensor_id: Only blocks of this sensor (None - all sensors)
+        :return:          Generator of Block, in the order they were written
+    """
+    def blocks(self, start_us, end_us, sensor_id=None):
+        for _, path in self.segments():
+            try:
+                # Segments outside the range are skipped by their header
+                time_range = segment_range(path)
+                if time_range is None or time_range[1] < start_us or time_range[0] > end_us:
+                    continue
+                _, blocks = read_segment(path)
+            except FileNotFoundError:
+                continue    # deleted by retention meanwhile
+            for block in blocks:
+                if block.last_us >= start_us and block.first_us <= end_us and sensor_id in (None, block.sensor_id):
+                    yield block
+
+    """
+        Samples of a sensor in a time range
+
+        :param start_us:  Start of the range (wall clock, us)
+        :param end_us:    End of the range, inclusive
+        :param sensor_id: Id of the sensor
+        :return:          (array('q') of timestamps in us, array('i') of values)
+    """
+    def query(self, start_us, end_us, sensor_id=0):
+        timestamps, values = array('q'), array('i')
+        for block in self.blocks(start_us, end_us, sensor_id):
+            block_timestamps, block_values = block.decode()
+            if block.first_us >= start_us and block.last_us <= end_us:
+                timestamps.extend(block_timestamps)
+                values.extend(block_values)
+                continue
+            for timestamp, value in zip(block_timestamps, block_values):
+                if start_us <= timestamp <= end_us:
+                    timestamps.append(timestamp)
+                    values.append(value)
+        return timestamps, values
+
+    """
+        Count, min and max of the samples of a sensor in a time range - blocks
+        inside the range are answered from their headers without decoding
+
+        :param start_us:  Start of the range (wall clock, us)
+        :param end_us:    End of the range, inclusive
+        :param sensor_id: Id of the sensor
+        :return:          (count, min, max), min and max None without samples
+    """
+    def summary(self, start_us, end_us, sensor_id=0):
+        count, low, high = 0, None, None
+        for block in self.blocks(start_us, end_us, sensor_id):
+            if block.first_us >= start_us and block.last_us <= end_us:
+                block_count, block_low, block_high = block.count, block.min, block.max
+            else:
+                timestamps, values = block.decode()
+                inside = [value for timestamp, value in zip(timestamps, values) if start_us <= timestamp <= end_us]
+                if not inside:
+                    continue
+                block_count, block_low, block_high = len(inside), min(inside), max(inside)
+            count += block_count
+            low    = block_low if low is None else min(low, block_low)
+            high   = block_high if high is None else max(high, block_high)
+        return count, low, high
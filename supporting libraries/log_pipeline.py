@@ -0,0 +1,166 @@
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+import logging.handlers
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+"""
+    QueueHandler which only puts the record on the queue. Message is formatted
+    later in the listener thread, so a suppressed or queued line costs the
+    caller no string formatting. Arguments of log calls must therefore not be
+    modified after the call (true for the numbers and strings logged here).
+"""
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    def prepare(self, record):
+        return record
+
+
+"""
+    Limits repetitive lines: at most `rate` records per second from the same
+    source line (pathname, lineno). The number of suppressed records is added to
+    the next record let through from that line. Warnings and errors always pass.
+"""
+class RateLimitFilter(logging.Filter):
+
+    """
+        :param rate: Max records per second from one source line
+    """
+    def __init__(self, rate):
+        super().__init__()
+        self.rate       = rate
+        self.lines      = {}    # (pathname, lineno) -> [window start, records in window, suppressed]
+        self.lock       = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+
+        with self.lock:
+            line = self.lines.get(key)
+            if line is None or now - line[0] >= 1.0:
+                suppressed = line[2] if line is not None else 0
+                self.lines[key] = [now, 1, 0]
+            elif line[1] < self.rate:
+                line[1] += 1
+                suppressed = 0
+            else:
+                line[2] += 1
+                return False
+
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+"""
+    Formatter for text lines, reports suppressed repetitions of the line
+"""
+class TextFormatter(logging.Formatter):
+    def format(self, record):
+        line = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        return f"{line} (+{suppressed} similar suppressed)" if suppressed else line
+
+
+"""
+    Formatter for JSON lines - one compact JSON object per record
+"""
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {"ts": round(record.created, 6),
+                 "level": record.levelname,
+                 "msg": record.getMessage()}
+        if getattr(record, 'suppressed', 0):
+            entry["suppressed"] = record.suppressed
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, separators=(',', ':'))
+
+
+"""
+    File handler writing records in batches - one write() for batch_size records,
+    or for whatever is buffered when flush_interval seconds have passed.
+    Errors and critical records are written at once together with the buffer.
+"""
+class BatchingFileHandler(logging.FileHandler):
+
+    """
+        :param filename:       Log file
+        :param batch_size:     Number of records written at once
+        :param flush_interval: Max seconds a record waits in the buffer
+    """
+    def __init__(self, filename, batch_size=64, flush_interval=1.0):
+        super().__init__(filename, mode='a')
+        self.batch_size     = batch_size
+        self.flush_interval = flush_interval
+        self.buffer         = []
+        self.closed         = threading.Event()
+        self.flusher        = threading.Thread(target=self._flush_periodically, name="log-flush", daemon=True)
+        self.flusher.start()
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.format(record) + self.terminator)
+            if len(self.buffer) >= self.batch_size or record.levelno >= logging.ERROR:
+                self.flush()
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if self.buffer and self.stream is not None:
+                self.stream.write(''.join(self.buffer))
+                self.buffer.clear()
+                self.stream.flush()
+
+    def close(self):
+        self.closed.set()
+        self.flush()
+        super().close()
+
+    def _flush_periodically(self):
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+
+
+"""
+    Configures root logger with a non-blocking pipeline:
+        caller thread:   rate limit filter -> queue (no formatting, no I/O)
+        listener thread: formatting -> batched writes to the log file
+
+    :param filename:       Log file
+    :param level:          Root logger level
+    :param fmt:            "text" or "jsonl"
+    :param rate_limit:     Max records per second from one source line (0 - unlimited)
+    :param batch_size:     Number of records written at once
+    :param flush_interval: Max seconds a record waits before it is written
+    :return:               Started QueueListener (stopped automatically at exit)
+"""
+def setup_logging(filename, level=logging.DEBUG, fmt="text", rate_limit=0, batch_size=64, flush_interval=1.0):
+    file_handler = BatchingFileHandler(filename, batch_size=batch_size, flush_interval=flush_interval)
+    file_handler.setFormatter(JsonLinesFormatter() if fmt == "jsonl" else TextFormatter(TEXT_FORMAT))
+
+    queue_handler = LazyQueueHandler(queue.SimpleQueue())
+    if rate_limit > 0:
+        queue_handler.addFilter(RateLimitFilter(rate_limit))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(queue_handler.queue, file_handler)
+    listener.start()
+
+    def shutdown():
+        listener.stop()
+        file_handler.close()
+    atexit.register(shutdown)
+
+    return listener
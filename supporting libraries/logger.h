@@ -3,6 +3,7 @@
 #include <fstream>
 #include <iostream>
 #include <sstream>
+#include <mutex>
 using namespace std;
 
 // Enum to represent log levels
@@ -37,6 +38,9 @@ public:
                  << levelToString(level) << ": " << message
                  << endl;
 
+        // Entries of concurrent threads are written one after another
+        lock_guard<mutex> guard(lock);
+
         // Output to console
         cout << logEntry.str();
 
@@ -50,6 +54,7 @@ public:
 
 private:
     ofstream logFile; // File stream for the log file
+    mutex lock;       // Serializes writes of concurrent threads
 
     // Converts log level to a string for output
     string levelToString(LogLevel level)
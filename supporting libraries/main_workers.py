@@ -0,0 +1,191 @@
+import os
+import sys
+import json
+import time
+import signal
+import socket
+import struct
+import logging
+import threading
+import subprocess
+import metrics
+
+"""
+    Worker processes of the Main server (config key "worker_addresses").
+
+    Main server started with N worker addresses runs as a supervisor: it starts
+    N copies of itself as worker processes (MAIN_WORKER set to the index of the
+    worker) and starts a worker again when it exits. Every worker is a whole
+    Main server - its own gRPC server, detection engines, dispatcher and its own
+    channels to the Modem and Camera servers - so requests of the ADC client are
+    handled by N interpreters instead of one.
+
+    Workers listen on main_server_address together (SO_REUSEPORT, the kernel
+    spreads connections over them) and each on its own worker address.
+    Detection engines keep state per sensor, so the ADC client sends samples
+    on the worker addresses (its "main_worker_addresses", same addresses in the
+    same order): samples of sensor s always go to worker s % N.
+
+    Every worker inherits one end of a socket pair. The supervisor serves the
+    metrics: on a scrape it asks every worker for its snapshot over the socket
+    and sums them (metrics.merge()). A worker whose supervisor is gone (socket
+    closed) shuts down as on Ctrl+C.
+"""
+WORKER_ENV      = "MAIN_WORKER"             # index of the worker, not set in the supervisor
+SOCKET_ENV      = "MAIN_WORKER_SOCKET"      # file descriptor of the socket to the supervisor
+REQUEST         = struct.Struct("!I")       # snapshot request - its number, repeated in the reply
+MAX_SNAPSHOT    = 1 << 20                   # max bytes of a snapshot reply
+SNAPSHOT_TIMEOUT = 2.0                      # seconds a scrape waits for a worker
+
+"""
+    :return: Index of the worker this process is, None if it is not a worker
+"""
+def worker_index():
+    index = os.environ.get(WORKER_ENV)
+    return int(index) if index is not None else None
+
+"""
+    Answers snapshot requests of the supervisor on its own thread, called in a worker.
+    Worker is interrupted (SIGINT) when the supervisor is gone.
+
+    :param : None
+    :return: None
+"""
+def serve_supervisor():
+    connection = socket.socket(fileno=int(os.environ[SOCKET_ENV]))
+
+    def answer():
+        while True:
+            try:
+                request = connection.recv(REQUEST.size)
+            except OSError:
+                request = b""
+            if not request:
+                break
+            try:
+                connection.send(request + json.dumps(metrics.snapshot()).encode())
+            except OSError as e:
+                logging.error(f"Main server worker failed to send its metrics to the supervisor: {e}")
+
+        logging.warning("Main server supervisor is gone, worker shuts down.")
+        os.kill(os.getpid(), signal.SIGINT)
+
+    threading.Thread(target=answer, name="worker-supervisor", daemon=True).start()
+
+
+class WorkerSupervisor:
+
+    """
+        :param count:         Number of worker processes
+        :param command:       Command line of a worker (default - this script with its arguments)
+        :param restart_delay: Seconds before a worker which exited is started again
+    """
+    def __init__(self, count, command=None, restart_delay=1.0):
+        self.count         = count
+        self.command       = command or [sys.executable] + sys.argv
+        self.restart_delay = restart_delay
+        self.processes     = [None] * count
+        self.connections   = [None] * count
+        self.requests      = [0] * count
+        self.locks         = [threading.Lock() for _ in range(count)]    # one snapshot request at a time per worker
+        self.restarts      = metrics.Counter("main_worker_restarts_total", "Worker processes started again after they exited")
+        self.running       = metrics.GaugeFunction("main_worker_processes", "Worker processes running",
+                                                   lambda: sum(process.poll() is None for process in self.processes if process is not None))
+
+    def _spawn(self, index):
+        # Sequenced packets - a reply which came too late is read whole and skipped
+        connection, worker_end = socket.socketpair(socket.AF_UNIX, socket.SOCK_SEQPACKET)
+        connection.settimeout(SNAPSHOT_TIMEOUT)
+        environment = dict(os.environ, **{WORKER_ENV: str(index), SOCKET_ENV: str(worker_end.fileno())})
+        try:
+            # Own session - Ctrl+C in the terminal reaches the supervisor only, it stops the workers
+            process = subprocess.Popen(self.command, env=environment, pass_fds=(worker_end.fileno(),), start_new_session=True)
+        except OSError:
+            connection.close()
+            raise
+        finally:
+            worker_end.close()
+
+        with self.locks[index]:
+            if self.connections[index] is not None:
+                self.connections[index].close()
+            self.connections[index] = connection
+            self.processes[index]   = process
+        logging.info(f"Main server started worker {index} (pid {process.pid}).")
+
+    """
+        Starts the workers and keeps them running until KeyboardInterrupt, then stops them
+
+        :param : None
+        :return: None
+    """
+    def run(self):
+        for index in range(self.count):
+            self._spawn(index)
+
+        try:
+            while True:
+                time.sleep(0.5)
+                for index, process in enumerate(self.processes):
+                    if process.poll() is None:
+                        continue
+                    logging.error(f"Main server worker {index} (pid {process.pid}) exited with {process.returncode}, "
+                                  f"starting it again in {self.restart_delay} s.")
+                    time.sleep(self.restart_delay)
+                    self.restarts.inc()
+                    self._spawn(index)
+        except KeyboardInterrupt:
+            self.stop()
+
+    """
+        Stops the workers as on Ctrl+C, kills those which do not exit in time
+
+        :param timeout: Max number of seconds to wait for the workers
+        :return: None
+    """
+    def stop(self, timeout=20):
+        logging.info("Main server stops its workers.")
+        for process in self.processes:
+            if process is not None and process.poll() is None:
+                process.send_signal(signal.SIGINT)
+
+        deadline = time.monotonic() + timeout
+        for index, process in enumerate(self.processes):
+            if process is None:
+                continue
+            try:
+                process.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                logging.error(f"Main server worker {index} (pid {process.pid}) did not stop in {timeout} s, it is killed.")
+                process.kill()
+                process.wait()
+
+        for connection in self.connections:
+            if connection is not None:
+                connection.close()
+
+    """
+        :return: Metrics of the supervisor and of all workers summed, a worker which
+                 does not answer is left out
+    """
+    def snapshot(self):
+        snapshots = [metrics.snapshot([self.restarts, self.running])]
+        for index in range(self.count):
+            with self.locks[index]:
+                connection = self.connections[index]
+                if connection is None:
+                    continue
+                self.requests[index] = (self.requests[index] + 1) & 0xFFFFFFFF
+                request = REQUEST.pack(self.requests[index])
+                try:
+                    connection.send(request)
+                    reply = connection.recv(MAX_SNAPSHOT)
+                    # Replies to requests which timed out are skipped
+                    while reply and reply[:REQUEST.size] != request:
+                        reply = connection.recv(MAX_SNAPSHOT)
+                    if not reply:
+                        raise ConnectionError("worker exited")
+                    snapshots.append(json.loads(reply[REQUEST.size:]))
+                except (OSError, ValueError) as e:
+                    logging.warning(f"Main server worker {index} did not send its metrics: {e}")
+        return metrics.merge(snapshots)
@@ -0,0 +1,271 @@
+// Prometheus-style metrics of the Modem server - C++ side of metrics.py.
+//
+// Counters and histogram buckets are std::atomic, updated with relaxed
+// fetch_add - no lock on the request path. Gauges are read by a function when
+// the metrics are scraped. MetricsServer serves everything registered in a
+// MetricsRegistry in the Prometheus text format (version 0.0.4) over HTTP on
+// a TCP "host:port" or Unix domain socket "unix:path" address.
+#include <cstdint>
+#include <string>
+#include <vector>
+#include <memory>
+#include <atomic>
+#include <mutex>
+#include <thread>
+#include <sstream>
+#include <functional>
+#include <stdexcept>
+#include <algorithm>
+#include <cerrno>
+#include <cstring>
+#include <netdb.h>
+#include <poll.h>
+#include <sys/socket.h>
+#include <sys/stat.h>
+#include <sys/un.h>
+#include <unistd.h>
+
+using MetricLabels = std::vector<std::pair<std::string, std::string>>;
+
+class MetricCounter {
+public:
+    void inc(uint64_t amount = 1) { count.fetch_add(amount, std::memory_order_relaxed); }
+    uint64_t value() const { return count.load(std::memory_order_relaxed); }
+
+private:
+    std::atomic<uint64_t> count{0};
+};
+
+class MetricHistogram {
+public:
+    // Upper bounds in seconds, ascending (+Inf is added)
+    explicit MetricHistogram(std::vector<double> bounds)
+        : bounds(bounds), counts(new std::atomic<uint64_t>[bounds.size() + 1]), sum_ns(0)
+    {
+        for (size_t i = 0; i <= bounds.size(); i++)
+            counts[i] = 0;
+    }
+
+    void observe(double seconds)
+    {
+        size_t bucket = std::lower_bound(bounds.begin(), bounds.end(), seconds) - bounds.begin();
+        counts[bucket].fetch_add(1, std::memory_order_relaxed);
+        sum_ns.fetch_add(static_cast<uint64_t>(seconds * 1e9), std::memory_order_relaxed);
+    }
+
+    const std::vector<double>& upper_bounds() const { return bounds; }
+    uint64_t bucket(size_t i) const { return counts[i].load(std::memory_order_relaxed); }
+    double sum() const { return sum_ns.load(std::memory_order_relaxed) / 1e9; }
+
+private:
+    std::vector<double>                       bounds;
+    std::unique_ptr<std::atomic<uint64_t>[]>  counts;
+    std::atomic<uint64_t>                     sum_ns;
+};
+
+// Seconds - from 100 us up to 60 s (SMS confirmed by the network)
+const std::vector<double> LATENCY_BUCKETS = {0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                                             0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0};
+
+class MetricsRegistry {
+public:
+    // Returned metrics live as long as the registry
+    MetricCounter& counter(const std::string& name, const std::string& help, const MetricLabels& labels = {})
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        counters.emplace_back(new MetricCounter());
+        MetricCounter* counter = counters.back().get();
+        entries.push_back({name, help, "counter", labels, [counter]() { return static_cast<double>(counter->value()); }, nullptr});
+        return *counter;
+    }
+
+    void gauge(const std::string& name, const std::string& help, std::function<double()> read, const MetricLabels& labels = {})
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        entries.push_back({name, help, "gauge", labels, read, nullptr});
+    }
+
+    MetricHistogram& histogram(const std::string& name, const std::string& help,
+                               const std::vector<double>& bounds = LATENCY_BUCKETS, const MetricLabels& labels = {})
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        histograms.emplace_back(new MetricHistogram(bounds));
+        MetricHistogram* histogram = histograms.back().get();
+        entries.push_back({name, help, "histogram", labels, nullptr, histogram});
+        return *histogram;
+    }
+
+    // All metrics in Prometheus text format, series of one name under one HELP/TYPE
+    std::string render()
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        std::vector<const Entry*> sorted;
+        for (const Entry& entry : entries)
+            sorted.push_back(&entry);
+        std::stable_sort(sorted.begin(), sorted.end(), [](const Entry* a, const Entry* b) { return a->name < b->name; });
+
+        std::ostringstream out;
+        out.precision(12);
+        std::string described;
+        for (const Entry* entry : sorted) {
+            if (entry->name != described) {
+                described = entry->name;
+                out << "# HELP " << entry->name << " " << entry->help << "\n"
+                    << "# TYPE " << entry->name << " " << entry->type << "\n";
+            }
+
+            if (entry->histogram == nullptr) {
+                out << series(entry->name, entry->labels) << " " << entry->read() << "\n";
+                continue;
+            }
+
+            const MetricHistogram& histogram = *entry->histogram;
+            uint64_t cumulative = 0;
+            for (size_t i = 0; i <= histogram.upper_bounds().size(); i++) {
+                cumulative += histogram.bucket(i);
+                MetricLabels labels = entry->labels;
+                std::ostringstream bound;
+                if (i < histogram.upper_bounds().size())
+                    bound << histogram.upper_bounds()[i];
+                else
+                    bound << "+Inf";
+                labels.push_back({"le", bound.str()});
+                out << series(entry->name + "_bucket", labels) << " " << cumulative << "\n";
+            }
+            out << series(entry->name + "_sum", entry->labels) << " " << histogram.sum() << "\n"
+                << series(entry->name + "_count", entry->labels) << " " << cumulative << "\n";
+        }
+        return out.str();
+    }
+
+private:
+    struct Entry {
+        std::string             name;
+        std::string             help;
+        std::string             type;
+        MetricLabels            labels;
+        std::function<double()> read;
+        MetricHistogram*        histogram;
+    };
+
+    std::mutex                                    mutex;
+    std::vector<Entry>                            entries;
+    std::vector<std::unique_ptr<MetricCounter>>   counters;
+    std::vector<std::unique_ptr<MetricHistogram>> histograms;
+
+    static std::string series(const std::string& name, const MetricLabels& labels)
+    {
+        if (labels.empty())
+            return name;
+        std::string result = name + "{";
+        for (size_t i = 0; i < labels.size(); i++)
+            result += (i ? "," : "") + labels[i].first + "=\"" + labels[i].second + "\"";
+        return result + "}";
+    }
+};
+
+// Minimal HTTP/1.0 server answering every GET with the metrics of the registry
+class MetricsServer {
+public:
+    MetricsServer(MetricsRegistry& registry) : registry(registry), listen_fd(-1), running(false) {}
+    ~MetricsServer() { stop(); }
+
+    // address "host:port" or "unix:path" (socket file is prepared and removed like gRPC endpoints)
+    void start(const std::string& address)
+    {
+        if (address.compare(0, 5, "unix:") == 0) {
+            std::string path = address.substr(5);
+            if (path.compare(0, 2, "//") == 0)
+                path = path.substr(2);
+
+            struct sockaddr_un addr = {};
+            addr.sun_family = AF_UNIX;
+            if (path.size() >= sizeof(addr.sun_path))
+                throw std::runtime_error("Socket path '" + path + "' is too long");
+            strncpy(addr.sun_path, path.c_str(), sizeof(addr.sun_path) - 1);
+
+            listen_fd = socket(AF_UNIX, SOCK_STREAM | SOCK_CLOEXEC, 0);
+            if (listen_fd < 0 || bind(listen_fd, (struct sockaddr*)&addr, sizeof(addr)) != 0)
+                throw std::runtime_error("Unable to bind metrics socket '" + path + "': " + strerror(errno));
+        }
+        else {
+            size_t colon = address.rfind(':');
+            if (colon == std::string::npos)
+                throw std::runtime_error("Metrics address '" + address + "' is neither 'host:port' nor 'unix:path'");
+
+            struct addrinfo hints = {}, *found = nullptr;
+            hints.ai_family   = AF_UNSPEC;
+            hints.ai_socktype = SOCK_STREAM;
+            hints.ai_flags    = AI_PASSIVE;
+            int error = getaddrinfo(address.substr(0, colon).c_str(), address.substr(colon + 1).c_str(), &hints, &found);
+            if (error != 0)
+                throw std::runtime_error("Invalid metrics address '" + address + "': " + gai_strerror(error));
+
+            listen_fd = socket(found->ai_family, SOCK_STREAM | SOCK_CLOEXEC, 0);
+            int reuse = 1;
+            setsockopt(listen_fd, SOL_SOCKET, SO_REUSEADDR, &reuse, sizeof(reuse));
+            int bound = listen_fd < 0 ? -1 : bind(listen_fd, found->ai_addr, found->ai_addrlen);
+            freeaddrinfo(found);
+            if (bound != 0)
+                throw std::runtime_error("Unable to bind metrics address '" + address + "': " + strerror(errno));
+        }
+
+        if (listen(listen_fd, 8) != 0)
+            throw std::runtime_error(std::string("Unable to listen for metrics scrapes: ") + strerror(errno));
+
+        running = true;
+        worker  = std::thread(&MetricsServer::run, this);
+    }
+
+    void stop()
+    {
+        running = false;
+        if (worker.joinable())
+            worker.join();
+        if (listen_fd >= 0)
+            close(listen_fd);
+        listen_fd = -1;
+    }
+
+private:
+    MetricsRegistry&  registry;
+    int               listen_fd;
+    std::atomic<bool> running;
+    std::thread       worker;
+
+    void run()
+    {
+        while (running) {
+            struct pollfd pfd = {listen_fd, POLLIN, 0};
+            if (poll(&pfd, 1, 200) <= 0)
+                continue;
+
+            int client = accept4(listen_fd, nullptr, nullptr, SOCK_CLOEXEC);
+            if (client < 0)
+                continue;
+
+            // Scrapers send a short GET - request is read (up to the end of headers) and ignored
+            char request[2048];
+            std::string received;
+            struct pollfd cfd = {client, POLLIN, 0};
+            while (received.find("\r\n\r\n") == std::string::npos && received.size() < sizeof(request) && poll(&cfd, 1, 1000) > 0) {
+                ssize_t n = read(client, request, sizeof(request));
+                if (n <= 0)
+                    break;
+                received.append(request, n);
+            }
+
+            std::string body = registry.render();
+            std::string response = "HTTP/1.0 200 OK\r\nContent-Type: text/plain; version=0.0.4; charset=utf-8\r\nContent-Length: "
+                                   + std::to_string(body.size()) + "\r\nConnection: close\r\n\r\n" + body;
+            size_t written = 0;
+            while (written < response.size()) {
+                ssize_t n = send(client, response.data() + written, response.size() - written, MSG_NOSIGNAL);
+                if (n <= 0)
+                    break;
+                written += n;
+            }
+            close(client);
+        }
+    }
+};
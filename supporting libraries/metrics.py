@@ -0,0 +1,307 @@
+import time
+import bisect
+import logging
+import contextlib
+import threading
+import http.server
+import socketserver
+import endpoints
+
+"""
+    Prometheus-style metrics of a gateway process.
+
+    Counters, gauges and histograms keep one cell per thread: a thread only
+    ever adds to its own cell, so updating a metric takes no lock - one
+    thread-local lookup and one addition. Cells are summed when the metrics
+    are scraped. Gauges whose value already exists elsewhere (queue depth,
+    pending alerts) are read by a function at scrape time instead.
+
+    start_server() serves all metrics created in the process in the Prometheus
+    text format (version 0.0.4) on a TCP "host:port" or Unix domain socket
+    "unix:path" address, e.g.
+        curl http://127.0.0.1:9102/metrics
+        curl --unix-socket /run/gateway/main_metrics.sock http://localhost/metrics
+
+    snapshot() takes the values as plain JSON serializable data, so a process
+    can serve the metrics of several processes summed by merge() (worker
+    processes of the Main server, see main_workers.py).
+"""
+# Seconds - from 100 us (local RPC) up to 10 s (modem request timing out)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+                   0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+registry = []   # every metric created in this process, in order of creation
+
+
+"""
+    Per-thread cells of a metric - each thread adds only to its own cell
+"""
+class _Cells:
+
+    """
+        :param size: Number of values in a cell
+    """
+    def __init__(self, size):
+        self.size  = size
+        self.local = threading.local()
+        self.cells = []
+        self.lock  = threading.Lock()   # taken once per thread, when its cell is created
+
+    def cell(self):
+        try:
+            return self.local.cell
+        except AttributeError:
+            cell = [0] * self.size
+            with self.lock:
+                self.cells.append(cell)
+            self.local.cell = cell
+            return cell
+
+    """
+        :return: Sum of all cells (cells of finished threads keep counting)
+    """
+    def totals(self):
+        with self.lock:
+            cells = list(self.cells)
+        return [sum(column) for column in zip(*cells)] if cells else [0] * self.size
+
+
+class _Metric:
+    kind = None
+
+    """
+        :param name:   Metric name (e.g. "main_requests_total")
+        :param help:   Description of the metric
+        :param labels: Dict label -> value of this series
+    """
+    def __init__(self, name, help, labels=None):
+        self.name   = name
+        self.help   = help
+        self.labels = labels or {}
+        registry.append(self)
+
+    def _series(self, name=None, extra=None):
+        labels = dict(self.labels, **(extra or {}))
+        if not labels:
+            return name or self.name
+        return (name or self.name) + "{" + ",".join(f'{key}="{value}"' for key, value in labels.items()) + "}"
+
+    def samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labels=None):
+        super().__init__(name, help, labels)
+        self.cells = _Cells(1)
+
+    def inc(self, amount=1):
+        self.cells.cell()[0] += amount
+
+    def value(self):
+        return self.cells.totals()[0]
+
+    def samples(self):
+        return [(self._series(), self.value())]
+
+
+"""
+    Gauge changed by inc()/dec() (e.g. requests in progress)
+"""
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1):
+        self.cells.cell()[0] -= amount
+
+    """
+        Context manager - gauge is increased while the block runs
+    """
+    @contextlib.contextmanager
+    def in_progress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+"""
+    Gauge read by function() at scrape time (e.g. queue depth)
+"""
+class GaugeFunction(_Metric):
+    kind = "gauge"
+
+    """
+        :param function: Function returning current value
+    """
+    def __init__(self, name, help, function, labels=None):
+        super().__init__(name, help, labels)
+        self.function = function
+
+    def samples(self):
+        try:
+            return [(self._series(), self.function())]
+        except Exception:
+            # Part of the process the metric reads is not in use (e.g. no dispatcher)
+            return []
+
+
+"""
+    Counter read by function() at scrape time (e.g. alerts dropped by the dispatcher)
+"""
+class CounterFunction(GaugeFunction):
+    kind = "counter"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    """
+        :param buckets: Upper bounds of the buckets, ascending (+Inf is added)
+    """
+    def __init__(self, name, help, buckets=LATENCY_BUCKETS, labels=None):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        # bucket counts, +Inf bucket count, sum
+        self.cells   = _Cells(len(self.buckets) + 2)
+
+    def observe(self, value):
+        cell = self.cells.cell()
+        cell[bisect.bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def samples(self):
+        totals     = self.cells.totals()
+        samples    = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ("+Inf",), totals):
+            cumulative += count
+            samples.append((self._series(self.name + "_bucket", {"le": bound}), cumulative))
+        samples.append((self._series(self.name + "_sum"), totals[-1]))
+        samples.append((self._series(self.name + "_count"), cumulative))
+        return samples
+
+
+"""
+    Measures a call - its duration goes to histogram and it is counted as ok or,
+    if it raises an exception, as error (usable around await as well)
+
+    :param histogram: Histogram of call durations in seconds (successful calls)
+    :param ok:        Counter of successful calls
+    :param error:     Counter of failed calls
+"""
+@contextlib.contextmanager
+def track_call(histogram, ok, error):
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        error.inc()
+        raise
+    histogram.observe(time.perf_counter() - started)
+    ok.inc()
+
+"""
+    Takes current values of metrics
+
+    :param selected: Metrics to take (default - all metrics of the process)
+    :return:         List of (name, help, kind, samples) - one entry per metric name,
+                     samples are (series, value) of all its series
+"""
+def snapshot(selected=None):
+    families = {}
+    # Series of one metric (different labels) are listed under one name
+    for metric in sorted(registry if selected is None else selected, key=lambda metric: metric.name):
+        family = families.setdefault(metric.name, (metric.help, metric.kind, []))
+        family[2].extend(metric.samples())
+    return [(name, help, kind, samples) for name, (help, kind, samples) in families.items()]
+
+"""
+    Sums snapshots of several processes - values of the same series are added
+    (counts, sums and histogram buckets add up, gauges give the total)
+
+    :param snapshots: Snapshots returned by snapshot() (or decoded from JSON)
+    :return:          Snapshot of all of them
+"""
+def merge(snapshots):
+    families = {}
+    for taken in snapshots:
+        for name, help, kind, samples in taken:
+            family = families.setdefault(name, (help, kind, {}))
+            for series, value in samples:
+                family[2][series] = family[2].get(series, 0) + value
+    return [(name, help, kind, list(values.items())) for name, (help, kind, values) in sorted(families.items())]
+
+"""
+    :param families: Snapshot to render (default - snapshot of all metrics of the process)
+    :return:         Metrics in Prometheus text format
+"""
+def render(families=None):
+    lines = []
+    for name, help, kind, samples in snapshot() if families is None else families:
+        lines.append(f"# HELP {name} {help}")
+        lines.append(f"# TYPE {name} {kind}")
+        for series, value in samples:
+            lines.append(f"{series} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+
+        body = render(self.server.source()).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes are not logged
+        pass
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+"""
+    Starts serving metrics on its own thread
+
+    :param address:     "host:port" or "unix:path"
+    :param socket_mode: Permissions of the socket file of a Unix domain socket address
+    :param source:      Function returning the snapshot to serve (default - snapshot())
+    :return:            Server (pass to stop_server())
+"""
+def start_server(address, socket_mode=0o660, source=snapshot):
+    if endpoints.is_unix(address):
+        endpoints.prepare_server(address)
+        with endpoints.binding(address, socket_mode):
+            server = _UnixHTTPServer(endpoints.unix_path(address), _Handler)
+        endpoints.secure_server(address, socket_mode)
+    else:
+        host, _, port = address.rpartition(":")
+        server = http.server.ThreadingHTTPServer((host, int(port)), _Handler)
+    server.source = source
+
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logging.info(f"Metrics are served on {address}.")
+    return server
+
+"""
+    Stops serving metrics
+
+    :param server:  Server returned by start_server()
+    :param address: Address it was started on
+    :return:        None
+"""
+def stop_server(server, address):
+    server.shutdown()
+    server.server_close()
+    endpoints.cleanup_server(address)
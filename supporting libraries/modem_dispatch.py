@@ -0,0 +1,144 @@
+import time
+import queue
+import logging
+import threading
+
+DROP_POLICIES = ("block", "drop_newest", "drop_oldest")
+
+"""
+    Background dispatch of alerts to the Modem server.
+
+    Alerts are put into a bounded queue and the caller returns immediately.
+    A worker thread sends the first alert for a contact right away and
+    merges repeated alerts for the same contact within coalesce_window
+    seconds into one alert carrying the number of merged alerts, sent when
+    the window closes. So a contact gets at most one modem request per window.
+
+    When the queue is full (Modem server is slow) the drop policy decides:
+        - "block"        caller waits until there is room in the queue
+        - "drop_newest"  new alert is dropped
+        - "drop_oldest"  oldest queued alert is dropped to make room for the new one
+"""
+class ModemDispatcher:
+
+    """
+        :param send:            Function send(contact_number, message, count) sending one alert to Modem server
+        :param max_queue:       Max number of alerts waiting in the queue
+        :param coalesce_window: Seconds during which alerts for the same contact are merged
+        :param drop_policy:     One of DROP_POLICIES
+    """
+    def __init__(self, send, max_queue=64, coalesce_window=5.0, drop_policy="drop_oldest"):
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Invalid drop policy '{drop_policy}', expected one of {DROP_POLICIES}")
+
+        self.send            = send
+        self.coalesce_window = coalesce_window
+        self.drop_policy     = drop_policy
+        self.queue           = queue.Queue(maxsize=max_queue)
+        self.pending         = {}       # contact_number -> [message, count, window deadline]
+        self.dropped         = 0        # alerts dropped because of full queue
+        self.lock            = threading.Lock()     # dropped is counted by server threads
+        self.running         = False
+        self.thread          = None
+
+    """
+        Starts worker thread
+    """
+    def start(self):
+        self.running = True
+        self.thread  = threading.Thread(target=self._run, name="modem-dispatch", daemon=True)
+        self.thread.start()
+
+    """
+        Stops worker thread after all queued and pending alerts have been sent
+
+        :param timeout: Max number of seconds to wait for the worker thread
+    """
+    def stop(self, timeout=10):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+    """
+        Queues alert for the contact, does not wait for the Modem server
+
+        :param contact_number: Contact to be alerted
+        :param message:        Alert message
+        :return:               True if alert was queued, False if it was dropped
+    """
+    def submit(self, contact_number, message="Object Detected"):
+        item = (contact_number, message)
+
+        if self.drop_policy == "block":
+            self.queue.put(item)
+            return True
+
+        try:
+            self.queue.put_nowait(item)
+            return True
+        except queue.Full:
+            pass
+
+        if self.drop_policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(item)
+                self._dropped()
+                return True
+            except queue.Full:
+                pass
+
+        self._dropped()
+        return False
+
+    def _dropped(self):
+        with self.lock:
+            self.dropped += 1
+            dropped = self.dropped
+        logging.warning(f"Modem dispatch queue is full, alert dropped ({self.drop_policy}). Dropped so far: {dropped}")
+
+    def _send(self, contact_number, message, count):
+        try:
+            self.send(contact_number, message, count)
+        except Exception as e:
+            logging.error(f"Modem dispatch failed to send alert for {contact_number} (count={count}): {e}")
+
+    def _merge(self, item):
+        contact_number, message = item
+
+        if contact_number in self.pending:
+            self.pending[contact_number][0]  = message
+            self.pending[contact_number][1] += 1
+        else:
+            # First alert in the window is sent right away
+            self.pending[contact_number] = [message, 0, time.monotonic() + self.coalesce_window]
+            self._send(contact_number, message, 1)
+
+    def _send_due(self, now):
+        for contact_number in [c for c, p in self.pending.items() if p[2] <= now]:
+            message, count, _ = self.pending.pop(contact_number)
+            if count > 0:
+                # Alerts merged during the window - sent as one, next window starts
+                self._send(contact_number, message, count)
+                if self.running:
+                    self.pending[contact_number] = [message, 0, now + self.coalesce_window]
+
+    def _run(self):
+        while self.running or not self.queue.empty() or self.pending:
+            timeout = 0.1
+            if self.pending:
+                timeout = min(timeout, max(min(p[2] for p in self.pending.values()) - time.monotonic(), 0))
+
+            try:
+                self._merge(self.queue.get(timeout=timeout))
+                # Drains everything that is already queued before sending
+                while True:
+                    self._merge(self.queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            # On shutdown pending alerts are sent without waiting for their window
+            self._send_due(time.monotonic() if self.running else float("inf"))
@@ -0,0 +1,203 @@
+import time
+import uuid
+import fcntl
+import queue
+import random
+import sqlite3
+import logging
+import threading
+
+"""
+    Persistent outbox for modem alerts (SQLite database in WAL mode).
+
+    submit() only puts the alert on an in-memory queue, so the request path
+    never waits for the disk or the Modem server. Two threads do the rest:
+
+        writer   - takes every alert queued so far and inserts them in one
+                   transaction (group commit): one fsync for the whole group
+        delivery - reads the oldest undelivered alerts and sends them to the
+                   Modem server in one batch; they are deleted only after
+                   send_batch returned, i.e. the SMS of the batch were sent.
+                   If sending fails, the batch is retried with exponential
+                   backoff (with jitter)
+
+    Alerts survive restarts of the Modem server and of the Main server:
+    whatever was committed is delivered when the Modem server is reachable.
+    Delivery is at-least-once - a batch which was delivered but whose
+    acknowledgement got lost is sent again, as is a batch whose SMS failed.
+    Every alert carries its row id (never reused, AUTOINCREMENT) as alert_id
+    and the Modem server does not send an SMS again for ids it has already
+    sent or queued. Row ids start from 1 again in a new database, so the
+    database gets a random epoch when it is created; batches carry it and the
+    Modem server forgets the alert ids of an older epoch.
+
+    Several processes may share the database (worker processes of the Main
+    server). All of them store alerts, one delivers them at a time: delivery
+    holds a lock on path + ".lock" and the others take it over when that
+    process exits. Alerts committed by another process are picked up within
+    a second.
+"""
+class AlertOutbox:
+
+    """
+        :param path:            Path of the SQLite database
+        :param send_batch:      Function send_batch(alerts, epoch) delivering list of (alert_id, contact_number, message, count)
+                                of the database epoch, returns when their SMS were sent, raises an exception otherwise
+        :param batch_size:      Max number of alerts sent in one batch
+        :param commit_interval: Max seconds a queued alert waits before it is committed
+        :param max_backoff:     Max seconds between retries of a failed batch
+    """
+    def __init__(self, path, send_batch, batch_size=32, commit_interval=0.01, max_backoff=30.0):
+        self.path            = path
+        self.send_batch      = send_batch
+        self.batch_size      = batch_size
+        self.commit_interval = commit_interval
+        self.max_backoff     = max_backoff
+        self.queue           = queue.SimpleQueue()
+        self.committed       = threading.Event()    # set by writer when new alerts are in the database
+        self.running         = False
+        self.stopped         = threading.Event()    # interrupts backoff on shutdown
+        self.threads         = []
+
+        db = self._connect()
+        with db:
+            db.execute("""CREATE TABLE IF NOT EXISTS alerts (
+                              id      INTEGER PRIMARY KEY AUTOINCREMENT,
+                              contact INTEGER NOT NULL,
+                              message TEXT    NOT NULL,
+                              count   INTEGER NOT NULL,
+                              created REAL    NOT NULL)""")
+            db.execute("CREATE TABLE IF NOT EXISTS outbox (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            # Kept for the life of the database - the epoch of its alert ids
+            db.execute("INSERT OR IGNORE INTO outbox (key, value) VALUES ('epoch', ?)", (uuid.uuid4().hex,))
+        self.epoch = db.execute("SELECT value FROM outbox WHERE key = 'epoch'").fetchone()[0]
+        db.close()
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10)
+        db.execute("PRAGMA journal_mode=WAL")
+        # Group commit makes the fsync per transaction affordable - committed alerts survive power loss
+        db.execute("PRAGMA synchronous=FULL")
+        return db
+
+    """
+        Starts writer and delivery threads
+    """
+    def start(self):
+        self.running = True
+        self.threads = [threading.Thread(target=self._write, name="outbox-writer", daemon=True),
+                        threading.Thread(target=self._deliver, name="outbox-delivery", daemon=True)]
+        for thread in self.threads:
+            thread.start()
+        # Alerts left from a previous run are delivered right away
+        self.committed.set()
+
+    """
+        Stops threads. Queued alerts are committed first, undelivered alerts
+        stay in the database for the next run.
+
+        :param timeout: Max number of seconds to wait for each thread
+    """
+    def stop(self, timeout=10):
+        self.running = False
+        self.stopped.set()
+        self.committed.set()
+        for thread in self.threads:
+            thread.join(timeout)
+
+    """
+        Queues alert, does not wait for the disk or the Modem server
+
+        :param contact_number: Contact to be alerted
+        :param message:        Alert message
+        :param count:          Number of alerts merged into this one
+        :return:               True (alert is always accepted)
+    """
+    def submit(self, contact_number, message="Object Detected", count=1):
+        self.queue.put((contact_number, message, count, time.time()))
+        return True
+
+    """
+        :return: Number of alerts waiting for delivery in the database
+    """
+    def pending(self):
+        db = self._connect()
+        try:
+            return db.execute("SELECT COUNT(*) FROM alerts").fetchone()[0]
+        finally:
+            db.close()
+
+    def _write(self):
+        db = self._connect()
+
+        while self.running or not self.queue.empty():
+            try:
+                group = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+
+            # Alerts arriving within commit_interval join the group
+            deadline = time.monotonic() + self.commit_interval
+            while len(group) < 1000:
+                try:
+                    group.append(self.queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+
+            try:
+                with db:
+                    db.executemany("INSERT INTO alerts (contact, message, count, created) VALUES (?, ?, ?, ?)", group)
+                self.committed.set()
+            except sqlite3.Error as e:
+                logging.error(f"Outbox failed to store {len(group)} alerts: {e}")
+
+        db.close()
+
+    def _deliver(self):
+        with open(self.path + ".lock", "a") as lock_file:
+            # Lock of a process which exited is released by the kernel
+            waiting = False
+            while self.running:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if not waiting:
+                        waiting = True
+                        logging.info(f"Outbox {self.path} is delivered by another process, this one takes over when it exits.")
+                    self.stopped.wait(1.0)
+            else:
+                return
+
+            if waiting:
+                logging.info(f"Outbox {self.path} is delivered by this process now.")
+            self._deliver_locked()
+
+    def _deliver_locked(self):
+        db      = self._connect()
+        backoff = 0.0
+
+        while self.running:
+            # Cleared before reading, so a commit made meanwhile wakes the wait below
+            self.committed.clear()
+            alerts = db.execute("SELECT id, contact, message, count FROM alerts ORDER BY id LIMIT ?",
+                                (self.batch_size,)).fetchall()
+            if not alerts:
+                self.committed.wait(1.0)
+                continue
+
+            try:
+                self.send_batch(alerts, self.epoch)
+            except Exception as e:
+                backoff = min(max(backoff * 2, 0.5), self.max_backoff)
+                logging.warning(f"Outbox failed to deliver {len(alerts)} alerts, retrying in {backoff:.1f} s: {e}")
+                # Randomized, so restarted Modem server is not hit by all retries at once
+                self.stopped.wait(backoff * random.uniform(0.5, 1.0))
+                continue
+
+            backoff = 0.0
+            with db:
+                db.execute("DELETE FROM alerts WHERE id <= ?", (alerts[-1][0],))
+            logging.info("Outbox delivered %d alerts (up to id %d)", len(alerts), alerts[-1][0])
+
+        db.close()
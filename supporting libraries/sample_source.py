@@ -0,0 +1,344 @@
+import os
+import math
+import stat
+import time
+import fcntl
+import random
+import logging
+import threading
+from array import array
+
+BACKENDS = ("device", "fifo", "simulator", "replay")
+
+"""
+    Sources of samples for ADC client.
+
+    ADC client takes samples from a file descriptor in the format of the ADC
+    driver - 32-bit little-endian words, one per sample - with read(), waits
+    for them with epoll and controls acquisition with ioctl(). A source opens
+    such a descriptor:
+
+        "device"    - the ADC driver (/dev/ADC_driver)
+        "fifo"      - named FIFO (created if missing) written by another
+                      process, e.g. cat capture.bin > /tmp/adc_samples.fifo
+        "simulator" - synthetic object moving towards the sensor and away,
+                      generated at "rate" samples per second for each of
+                      "sensors" sensors (passes of the sensors are shifted)
+        "replay"    - recorded samples played back at "speed" times their
+                      recorded rate, 0 - as fast as ADC client takes them
+
+    Simulator and replay write the samples from a thread into a pipe. Paced
+    (rate, speed > 0) they behave like the ring of the driver when ADC client
+    falls behind - samples not fitting into the pipe are dropped and counted
+    in overruns(). Unpaced, the pipe blocks the thread instead: no sample is
+    lost and ADC client sets the rate.
+
+    Only the device knows the driver ioctl() requests (ring start/stop,
+    threshold, watermark) - other sources produce samples from open() on,
+    accept the requests and ignore them, so their descriptor is readable
+    whenever samples are waiting (no EPOLLPRI on threshold crossing) and the
+    mmap-ed ring ("ingest": "mmap") is available only with the device.
+
+    Like the samples of the driver ring, samples of sensor n > 0 carry the
+    sensor id in their upper 16 bits (ADC_SAMPLE() in ADC_driver.h).
+
+    Recorded samples (replay) are read from
+        *.txt, *.csv - one sample per line, "distance" (played at "rate"),
+                       "timestamp_us,distance" or "timestamp_us,sensor,distance"
+                       (played with recorded timing)
+        other files  - raw driver format, e.g. captured with
+                       dd if=/dev/ADC_driver of=capture.bin bs=16384 (played at "rate")
+"""
+SAMPLE_BYTES  = 4
+SENSOR_SHIFT  = 16      # sensor id in bits 31-16 of a sample, converted value in bits 15-0
+# Samples written into the pipe at once - not more than PIPE_BUF, so a write is never split
+CHUNK_SAMPLES = 4096 // SAMPLE_BYTES
+
+
+"""
+    ADC driver char device
+"""
+class DeviceSource:
+    mmap_ring = True    # ring buffer of the source can be mmap-ed
+
+    """
+        :param path: Path to driver file (e.g. /dev/ADC_driver)
+    """
+    def __init__(self, path):
+        self.path = path
+        self.fd   = None
+
+    def describe(self):
+        return self.path
+
+    """
+        :return: File descriptor samples are read from
+    """
+    def open(self):
+        self.fd = os.open(self.path, os.O_RDWR)
+        return self.fd
+
+    def ioctl(self, request, arg=0):
+        return fcntl.ioctl(self.fd, request, arg)
+
+    """
+        :return: Samples dropped by the source (driver reports its overruns in the ring header)
+    """
+    def overruns(self):
+        return 0
+
+    def close(self):
+        os.close(self.fd)
+
+
+"""
+    Named FIFO written by another process
+"""
+class FifoSource(DeviceSource):
+    mmap_ring = False
+
+    def describe(self):
+        return f"FIFO {self.path}"
+
+    def open(self):
+        if not os.path.exists(self.path):
+            os.mkfifo(self.path, 0o660)
+        elif not stat.S_ISFIFO(os.stat(self.path).st_mode):
+            raise OSError(f"'{self.path}' exists and is not a FIFO")
+
+        # Opened for writing as well - open() does not wait for a writer and
+        # the descriptor does not report end of file when the writer goes away
+        self.fd = os.open(self.path, os.O_RDWR)
+        return self.fd
+
+    def ioctl(self, request, arg=0):
+        return 0
+
+
+"""
+    Samples produced by a thread into a pipe - base of simulator and replay
+"""
+class _PipeSource:
+    mmap_ring = False
+
+    """
+        :param paced: Samples are due at times given by samples(), otherwise
+                      they are written as fast as the reader takes them
+    """
+    def __init__(self, paced):
+        self.paced    = paced
+        self.fd       = None
+        self.write_fd = None
+        self.dropped  = 0
+        self.written  = 0
+        self.stopped  = threading.Event()
+        self.thread   = None
+
+    """
+        Samples of the source
+
+        :return: Iterable of (seconds from start the sample is due, sample)
+    """
+    def samples(self):
+        raise NotImplementedError
+
+    def open(self):
+        self.fd, self.write_fd = os.pipe()
+        if self.paced:
+            # Full pipe drops samples like the ring of the driver, producer never waits for ADC client
+            os.set_blocking(self.write_fd, False)
+        self.thread = threading.Thread(target=self._run, name="sample-source", daemon=True)
+        self.thread.start()
+        return self.fd
+
+    def ioctl(self, request, arg=0):
+        return 0
+
+    def overruns(self):
+        return self.dropped
+
+    def _write(self, block):
+        if not block:
+            return
+        try:
+            os.write(self.write_fd, block.tobytes())
+            self.written += len(block)
+        except BlockingIOError:
+            self.dropped += len(block)
+
+    def _run(self):
+        started = time.monotonic()
+        block   = array('i')
+        try:
+            for due, sample in self.samples():
+                if self.stopped.is_set():
+                    return
+                if self.paced:
+                    wait = due - (time.monotonic() - started)
+                    if wait > 0:
+                        # Samples due until now go out at once, thread sleeps until the next one
+                        self._write(block)
+                        block = array('i')
+                        time.sleep(wait)
+                block.append(sample)
+                if len(block) == CHUNK_SAMPLES:
+                    self._write(block)
+                    block = array('i')
+            self._write(block)
+            # Write end stays open, so the reader does not see end of file
+            logging.info(f"Sample source {self.describe()} finished: {self.written} samples written, {self.dropped} dropped.")
+        except OSError as e:
+            if not self.stopped.is_set():
+                logging.error(f"Sample source {self.describe()} stopped: {e}")
+
+    def close(self):
+        self.stopped.set()
+        # Closed read end fails a blocked write() of the thread
+        os.close(self.fd)
+        self.thread.join(timeout=5)
+        os.close(self.write_fd)
+
+
+"""
+    Synthetic object passing by the sensor: distance follows a cosine between
+    low and high with a period of period_ms, with gaussian noise. With several
+    sensors every sensor is sampled at rate, the object passes them one after another.
+"""
+class SimulatorSource(_PipeSource):
+
+    """
+        :param rate:      Samples per second, 0 - as fast as ADC client reads them
+        :param low:       Distance of the object far from the sensor
+        :param high:      Distance of the object closest to the sensor
+        :param period_ms: Time of one pass of the object
+        :param noise:     Standard deviation of the noise
+        :param seed:      Seed of the noise
+        :param sensors:   Number of sensors, ids 0 to sensors - 1
+    """
+    def __init__(self, rate, low, high, period_ms, noise, seed=None, sensors=1):
+        super().__init__(paced=rate > 0)
+        self.rate      = rate
+        self.low       = low
+        self.high      = high
+        self.period_ms = period_ms
+        self.noise     = noise
+        self.random    = random.Random(seed)
+        self.sensors   = sensors
+
+    def describe(self):
+        return f"simulator ({self.rate} samples/s)" if self.rate else "simulator (unpaced)"
+
+    def samples(self):
+        # Position in the pass advances per sample, so unpaced samples follow the same waveform
+        step = 2 * math.pi / (self.period_ms / 1000 * (self.rate or 1000))
+        gauss, swing = self.random.gauss, (self.high - self.low) / 2
+        shift = 2 * math.pi / self.sensors
+        for n in range(2**63):
+            due = n / self.rate if self.rate else 0
+            for sensor in range(self.sensors):
+                distance = self.low + swing * (1 - math.cos(n * step - sensor * shift)) + (gauss(0, self.noise) if self.noise else 0)
+                yield due, sensor << SENSOR_SHIFT | min(max(int(distance), 0), 0xffff)
+
+
+"""
+    Recorded samples played back from a file
+"""
+class ReplaySource(_PipeSource):
+
+    """
+        :param path:  Recorded samples (see module description for the formats)
+        :param rate:  Samples per second of a recording without timestamps
+        :param speed: Multiple of the recorded rate, 0 - as fast as ADC client reads them
+        :param loop:  Recording is played again from the start when it ends
+    """
+    def __init__(self, path, rate, speed, loop):
+        super().__init__(paced=speed > 0)
+        self.path  = path
+        self.speed = speed
+        self.loop  = loop
+        self.distances, self.timestamps = load_recording(path)   # distances of a recording are samples
+        if not self.distances:
+            raise ValueError(f"Recording '{path}' has no samples")
+        if self.timestamps is None and rate <= 0 and speed > 0:
+            raise ValueError(f"Recording '{path}' has no timestamps - sample rate is needed to play it at speed {speed}")
+        self.interval = 1 / rate if rate > 0 else 0
+
+    def describe(self):
+        return f"replay of {self.path} ({self.speed}x)" if self.speed else f"replay of {self.path} (unpaced)"
+
+    def samples(self):
+        if self.timestamps is not None:
+            first    = self.timestamps[0]
+            # Next loop starts one average interval after the last sample
+            duration = (self.timestamps[-1] - first) / 1e6 * len(self.timestamps) / max(len(self.timestamps) - 1, 1)
+            offsets  = [(timestamp - first) / 1e6 for timestamp in self.timestamps]
+        else:
+            duration = len(self.distances) * self.interval
+            offsets  = [n * self.interval for n in range(len(self.distances))]
+
+        speed = self.speed or 1
+        for repetition in range(2**63):
+            start = repetition * duration
+            for offset, distance in zip(offsets, self.distances):
+                yield (start + offset) / speed, distance
+            if not self.loop:
+                return
+
+
+"""
+    Reads recorded samples
+
+    :param path: *.txt/*.csv with "distance", "timestamp_us,distance" or "timestamp_us,sensor,distance"
+                 lines, other files raw driver format
+    :return:     (array('i') of samples, array('q') of timestamps in us or None)
+"""
+def load_recording(path):
+    if not path.endswith((".txt", ".csv")):
+        distances = array('i')
+        with open(path, "rb") as recording:
+            data = recording.read()
+        distances.frombytes(data[:len(data) - len(data) % SAMPLE_BYTES])
+        return distances, None
+
+    distances  = array('i')
+    timestamps = array('q')
+    with open(path) as recording:
+        for line_number, line in enumerate(recording, 1):
+            fields = line.replace(",", " ").split()
+            if not fields or fields[0].startswith("#"):
+                continue
+            try:
+                if len(fields) >= 2:
+                    timestamps.append(int(fields[0]))
+                sensor = int(fields[1]) if len(fields) >= 3 else 0
+                distances.append(sensor << SENSOR_SHIFT | int(fields[-1]))
+            except ValueError:
+                raise ValueError(f"{path}:{line_number}: expected 'distance', 'timestamp_us,distance' or 'timestamp_us,sensor,distance', got '{line.strip()}'")
+
+    if timestamps and len(timestamps) != len(distances):
+        raise ValueError(f"Recording '{path}' mixes lines with and without timestamps")
+    return distances, timestamps or None
+
+
+"""
+    Creates sample source from the "sample_source" section of a config file
+
+    :param settings:     Dict with key backend and its settings (path, rate, speed, loop, low, high, period_ms, noise, sensors)
+    :param default_path: Path of the device if settings have none
+    :return:             Source, not opened yet
+"""
+def create_source(settings, default_path):
+    backend = settings.get("backend", "device")
+
+    if backend == "device":
+        return DeviceSource(settings.get("path", default_path))
+    if backend == "fifo":
+        return FifoSource(settings.get("path", "/tmp/adc_samples.fifo"))
+    if backend == "simulator":
+        return SimulatorSource(settings.get("rate", 1000), settings.get("low", 200), settings.get("high", 3000),
+                               settings.get("period_ms", 10000), settings.get("noise", 0), settings.get("seed"),
+                               settings.get("sensors", 1))
+    if backend == "replay":
+        return ReplaySource(settings["path"], settings.get("rate", 0), settings.get("speed", 1), settings.get("loop", False))
+
+    raise ValueError(f"Invalid sample source backend '{backend}', expected one of {BACKENDS}")
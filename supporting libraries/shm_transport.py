@@ -0,0 +1,376 @@
+import os
+import mmap
+import stat
+import time
+import select
+import struct
+import itertools
+import logging
+import threading
+import objectProximityDetectionService_pb2
+
+"""
+    Same-host sample transport between ADC client and Main server.
+
+    Samples are written into a single-producer/single-consumer ring in a
+    memory mapped file (normally in /dev/shm), laid out like the ring of the
+    ADC driver:
+        header  - head, tail, size, overruns, data_offset (__u32 each)
+        records - sequence number (__u32), distance (int32), timestamp in us (__u64),
+                  sensor id (__u32), padded to 24 bytes
+
+    head and overruns are written only by the producer, tail only by the
+    consumer, so no lock is shared between the processes. After publishing a
+    block of records the producer writes the new head into a named FIFO
+    (<path>.fifo) - the doorbell. The consumer sleeps in poll() on the FIFO and
+    processes records only up to the head it read from it, so the records are
+    always visible to it (the write()/read() pair orders the memory accesses).
+
+    There is no serialization and no socket: a sample costs one struct copy
+    into shared memory and a block of samples one 4 byte write() to the FIFO.
+    When the ring is full new samples are dropped and counted in overruns,
+    the producer (sensor loop) never waits for the consumer. The number of
+    records is a power of two, head and tail are free running __u32 counters
+    masked with size - 1, so they stay consistent when the counters wrap.
+
+    A consumer which stops or restarts does not stop the producer: samples
+    published while no consumer is attached are dropped and counted in
+    lost, and the producer attaches to the ring of the restarted consumer
+    (at most one attempt per RETRY_INTERVAL).
+"""
+HEADER      = struct.Struct('<5I')      # head, tail, size, overruns, data_offset
+RECORD      = struct.Struct('<IiQI4x')  # sequence number, distance, timestamp in us, sensor id
+DOORBELL    = struct.Struct('<I')       # head announced through the FIFO
+DATA_OFFSET = 64                        # records start on their own cache line
+MASK32      = 0xffffffff
+RETRY_INTERVAL = 1.0                    # seconds between attempts to attach to a consumer which is not running
+
+HEAD_OFFSET     = 0
+TAIL_OFFSET     = 4
+OVERRUNS_OFFSET = 12
+
+def _fifo_path(path):
+    return path + ".fifo"
+
+
+"""
+    Producer side - writes samples into the ring and rings the doorbell.
+    Consumer must be running: it creates the ring and the FIFO.
+"""
+class ShmSampleProducer:
+
+    """
+        :param path: Path of the ring file (FIFO is <path>.fifo)
+    """
+    def __init__(self, path):
+        self.path     = path
+        self.ring     = None
+        self.fifo     = None
+        self.lost     = 0               # samples published while no consumer was attached
+        self.retry_at = 0               # monotonic time of the next attempt to attach
+        self.attach()
+
+    """
+        Maps the ring and opens the doorbell FIFO
+
+        :raises ConnectionError: Consumer is not running
+    """
+    def attach(self):
+        self.close()
+        try:
+            with open(self.path, "r+b") as ring_file:
+                self.ring = mmap.mmap(ring_file.fileno(), 0)
+            # Opening FIFO for writing without reader fails with ENXIO
+            self.fifo = os.open(_fifo_path(self.path), os.O_WRONLY | os.O_NONBLOCK)
+        except (OSError, ValueError) as e:
+            # ValueError - ring file of a starting consumer is still empty
+            self.close()
+            raise ConnectionError(f"Shared memory consumer is not running on '{self.path}': {e}")
+
+        _, _, self.size, _, self.data_offset = HEADER.unpack_from(self.ring, 0)
+        if self.size == 0:
+            self.close()
+            raise ConnectionError(f"Shared memory consumer on '{self.path}' is starting")
+        if self.size & (self.size - 1):
+            size = self.size
+            self.close()
+            raise ConnectionError(f"Shared memory ring on '{self.path}' has {size} slots, not a power of two")
+
+    """
+        Attaches to the consumer again if the producer is detached, at most once per RETRY_INTERVAL
+
+        :return: True if the producer is attached
+    """
+    def reattach(self):
+        if self.ring is not None:
+            return True
+        now = time.monotonic()
+        if now < self.retry_at:
+            return False
+        self.retry_at = now + RETRY_INTERVAL
+        try:
+            self.attach()
+        except ConnectionError as e:
+            logging.debug(f"Shared memory producer not attached: {e}")
+            return False
+        logging.info(f"Shared memory producer attached to the consumer on '{self.path}'.")
+        return True
+
+    """
+        Unmaps the ring and closes the FIFO
+    """
+    def close(self):
+        if self.fifo is not None:
+            os.close(self.fifo)
+            self.fifo = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    """
+        Publishes block of samples
+
+        :param samples: Iterable of (sequence number, distance, timestamp in us, sensor id)
+        :return:        Number of samples dropped - the ring was full or no consumer was attached
+    """
+    def publish(self, samples):
+        if not self.reattach():
+            lost = sum(1 for _ in samples)
+            self.lost += lost
+            return lost
+
+        ring        = self.ring
+        size        = self.size
+        mask        = size - 1
+        head, tail  = struct.unpack_from('<2I', ring, HEAD_OFFSET)
+        free        = size - ((head - tail) & MASK32)
+        written     = dropped = 0
+
+        for sample in samples:
+            if written == free:
+                dropped += 1
+                continue
+            RECORD.pack_into(ring, self.data_offset + ((head + written) & mask) * RECORD.size, *sample)
+            written += 1
+
+        if dropped:
+            overruns = struct.unpack_from('<I', ring, OVERRUNS_OFFSET)[0]
+            struct.pack_into('<I', ring, OVERRUNS_OFFSET, (overruns + dropped) & MASK32)
+        if written == 0:
+            return dropped
+
+        head = (head + written) & MASK32
+        struct.pack_into('<I', ring, HEAD_OFFSET, head)
+
+        try:
+            os.write(self.fifo, DOORBELL.pack(head))
+        except BlockingIOError:
+            # FIFO is full of older heads - consumer is awake anyway, next doorbell announces these records
+            pass
+        except BrokenPipeError:
+            # Consumer stopped or restarted with a new ring - samples of this block are lost
+            logging.warning(f"Shared memory consumer on '{self.path}' is gone, samples are dropped until it is back.")
+            self.close()
+            self.retry_at = 0
+            self.reattach()
+            self.lost += written
+            return dropped + written
+
+        return dropped
+
+
+"""
+    Stub with the interface of ObjectProximityDetectionServiceStub which delivers
+    samples through the shared memory ring instead of gRPC. Requests are not
+    serialized; replies are produced locally and only acknowledge that the
+    sample has been queued - actions are taken by the Main server asynchronously.
+    Metadata (trace context) is not transported.
+"""
+class ShmSampleStub:
+
+    """
+        :param path: Path of the ring file
+    """
+    def __init__(self, path):
+        self.producer = ShmSampleProducer(path)
+
+    def _reply(self, sequence_number, dropped):
+        if not dropped:
+            message = "Sample queued in shared memory."
+        elif self.producer.ring is None:
+            message = "Sample dropped, Main server is not attached to shared memory."
+        else:
+            message = "Sample dropped, shared memory ring is full."
+        return objectProximityDetectionService_pb2.ObjectProximityDetectionReply(message=message,
+                                                                                 sequence_number=sequence_number)
+
+    def ObjectProximityDetection(self, request, timeout=None, metadata=None):
+        dropped = self.producer.publish(((request.sequence_number, request.object_proximity_distance, time.monotonic_ns() // 1000, request.sensor_id),))
+        return self._reply(request.sequence_number, dropped)
+
+    def ObjectProximityDetectionStream(self, request_iterator, timeout=None):
+        for request in request_iterator:
+            yield self.ObjectProximityDetection(request)
+
+    def ObjectProximityDetectionBatch(self, request, timeout=None, metadata=None):
+        samples   = []
+        timestamp = request.base_timestamp_us
+        # No sensor ids - all samples are of sensor 0
+        sensor_ids = request.sensor_ids or itertools.repeat(0)
+        for distance, delta, sensor_id in zip(request.object_proximity_distances, request.timestamp_deltas_us, sensor_ids):
+            timestamp += delta
+            samples.append((request.sequence_number, distance, timestamp, sensor_id))
+
+        dropped = self.producer.publish(samples)
+        return self._reply(request.sequence_number, dropped)
+
+    """
+        :return: True if the Main server is attached - samples published now reach it
+    """
+    def available(self):
+        return self.producer.reattach()
+
+    def close(self):
+        self.producer.close()
+
+
+"""
+    Consumer side - creates the ring and the FIFO and hands every published
+    block of samples to on_samples(distances, sensor_ids) on its own thread.
+"""
+class ShmSampleConsumer:
+
+    """
+        :param path:       Path of the ring file (FIFO is <path>.fifo)
+        :param slots:      Number of records in the ring, a power of two
+        :param on_samples: Function on_samples(distances, sensor_ids) called for each block of samples
+    """
+    def __init__(self, path, slots, on_samples):
+        if slots <= 0 or slots & (slots - 1):
+            raise ValueError(f"Shared memory ring slots {slots} is not a power of two")
+
+        self.path       = path
+        self.slots      = slots
+        self.on_samples = on_samples
+        self.ring       = None
+        self.fifo       = None
+        self.keep_open  = None
+        self.running    = False
+        self.thread     = None
+        self.resynced   = 0     # samples skipped because tail was not within a ring behind head
+
+    """
+        Creates ring and FIFO and starts consumer thread
+    """
+    def start(self):
+        fifo_path = _fifo_path(self.path)
+
+        # Leftovers of a previous run are replaced, a producer still attached to them gets EPIPE
+        for stale in (self.path, fifo_path):
+            try:
+                os.unlink(stale)
+            except FileNotFoundError:
+                pass
+
+        length = DATA_OFFSET + self.slots * RECORD.size
+        with open(self.path, "w+b") as ring_file:
+            ring_file.truncate(length)
+            self.ring = mmap.mmap(ring_file.fileno(), length)
+        HEADER.pack_into(self.ring, 0, 0, 0, self.slots, 0, DATA_OFFSET)
+
+        os.mkfifo(fifo_path, stat.S_IRUSR | stat.S_IWUSR)
+        self.fifo      = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+        # Own writer keeps the FIFO from reporting end of file while no producer is attached
+        self.keep_open = os.open(fifo_path, os.O_WRONLY | os.O_NONBLOCK)
+
+        self.running = True
+        self.thread  = threading.Thread(target=self._run, name="shm-consumer", daemon=True)
+        self.thread.start()
+
+    """
+        Stops consumer thread and removes ring and FIFO
+    """
+    def stop(self, timeout=5):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout)
+        for fd in (self.fifo, self.keep_open):
+            if fd is not None:
+                os.close(fd)
+        self.fifo = self.keep_open = None
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+        for path in (self.path, _fifo_path(self.path)):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    """
+        Takes records published up to head out of the ring
+
+        :param head: Head announced by the producer
+        :return:     (list of distances, list of sensor ids)
+    """
+    def _take(self, head):
+        tail  = struct.unpack_from('<I', self.ring, TAIL_OFFSET)[0]
+        count = (head - tail) & MASK32
+        if count == 0:
+            return [], []
+        if count > self.slots:
+            # Head and tail disagree (e.g. producer attached to an older ring) - records
+            # between them cannot be trusted, reading continues at head
+            logging.warning(f"Shared memory ring '{self.path}' out of sync (head {head}, tail {tail}), {count} samples skipped.")
+            self.resynced += count
+            struct.pack_into('<I', self.ring, TAIL_OFFSET, head)
+            return [], []
+
+        first = tail & (self.slots - 1)
+        view  = memoryview(self.ring)
+        try:
+            records = list(RECORD.iter_unpack(view[DATA_OFFSET + first * RECORD.size:DATA_OFFSET + min(first + count, self.slots) * RECORD.size]))
+            if first + count > self.slots:
+                records += RECORD.iter_unpack(view[DATA_OFFSET:DATA_OFFSET + (first + count - self.slots) * RECORD.size])
+        finally:
+            view.release()
+
+        struct.pack_into('<I', self.ring, TAIL_OFFSET, head)
+        return [distance for _, distance, _, _ in records], [sensor_id for _, _, _, sensor_id in records]
+
+    def _run(self):
+        poller = select.poll()
+        poller.register(self.fifo, select.POLLIN)
+        pending = b""
+
+        while self.running:
+            if not poller.poll(100):
+                continue
+
+            try:
+                pending += os.read(self.fifo, 4096)
+            except BlockingIOError:
+                continue
+
+            # Only the latest announced head matters
+            usable = len(pending) - len(pending) % DOORBELL.size
+            head   = DOORBELL.unpack_from(pending, usable - DOORBELL.size)[0] if usable else None
+            pending = pending[usable:]
+            if head is None:
+                continue
+
+            distances, sensor_ids = self._take(head)
+            if not distances:
+                continue
+
+            try:
+                self.on_samples(distances, sensor_ids)
+            except Exception as e:
+                logging.error(f"Shared memory consumer failed to process {len(distances)} samples: {e}")
+
+    """
+        :return: Number of samples dropped by the producer because the ring was full,
+                 plus the samples skipped when the consumer resynchronized with the producer
+    """
+    def overruns(self):
+        return struct.unpack_from('<I', self.ring, OVERRUNS_OFFSET)[0] + self.resynced
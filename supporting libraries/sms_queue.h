@@ -0,0 +1,206 @@
+// SMS send queue of the Modem server.
+//
+// submit() returns at once with a job id, a sender thread sends the SMS:
+//   - grouping: alerts for a contact which already has a queued (not yet sending)
+//     job are merged into that job - one SMS reports all of them
+//   - rate limiting: two SMS to the same contact are at least min_interval apart;
+//     a job waiting for its contact does not hold back jobs of other contacts
+//   - status: state of the last `history` jobs can be queried by job id; job ids
+//     are not reused by a restarted daemon, a job of the previous run is unknown
+//   - failed jobs are not retried here - the Main server outbox delivers their
+//     alerts again until the job it polls is sent
+//   - tracing: job keeps trace context of the alert which created it
+#include <cstdint>
+#include <string>
+#include <deque>
+#include <vector>
+#include <map>
+#include <unordered_map>
+#include <mutex>
+#include <condition_variable>
+#include <functional>
+#include <thread>
+#include <chrono>
+#include "modemCommunication.pb.h"
+
+using modemCommunication::JobState;
+
+struct SmsJob {
+    uint64_t    id;
+    int32_t     contact_number;
+    std::string message;
+    int32_t     alert_count;
+    JobState    state;
+    std::string detail;
+    std::string trace;          // trace context of the first alert of the job ("" - not traced)
+    uint64_t    queued_us;      // monotonic time the job was queued
+    std::vector<uint64_t> alert_ids; // outbox alerts reported by the SMS (alert_id != 0)
+};
+
+class SmsQueue {
+public:
+    using Clock  = std::chrono::steady_clock;
+    // Sends one SMS, throws std::exception if it was not sent
+    using Sender = std::function<void(const SmsJob&)>;
+
+    SmsQueue(Sender sender, std::chrono::milliseconds min_interval, size_t history = 1024)
+        : sender(std::move(sender)), min_interval(min_interval), history(history),
+          // Main server may still poll jobs of the previous run - ids start above them
+          last_id(std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::system_clock::now().time_since_epoch()).count()) {}
+
+    ~SmsQueue() { stop(); }
+
+    void start()
+    {
+        running = true;
+        worker  = std::thread(&SmsQueue::run, this);
+    }
+
+    // Sends jobs already queued and stops the sender thread
+    void stop()
+    {
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            running = false;
+        }
+        changed.notify_all();
+        if (worker.joinable())
+            worker.join();
+    }
+
+    // Queues alert, returns id of the SMS job it belongs to
+    uint64_t submit(int32_t contact_number, const std::string& message, int32_t alert_count, const std::string& trace = "",
+                    uint64_t alert_id = 0)
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+
+        auto queued = queued_jobs.find(contact_number);
+        if (queued != queued_jobs.end()) {
+            SmsJob& job = jobs.at(queued->second);
+            job.alert_count += alert_count;
+            job.message      = message;
+            if (alert_id != 0)
+                job.alert_ids.push_back(alert_id);
+            return job.id;
+        }
+
+        uint64_t id = ++last_id;
+        uint64_t queued_us = std::chrono::duration_cast<std::chrono::microseconds>(Clock::now().time_since_epoch()).count();
+        jobs[id]    = SmsJob{id, contact_number, message, alert_count, modemCommunication::JOB_QUEUED, "", trace, queued_us, {}};
+        if (alert_id != 0)
+            jobs[id].alert_ids.push_back(alert_id);
+        queued_jobs[contact_number] = id;
+        order.push_back(id);
+        forget_old_jobs();
+
+        changed.notify_all();
+        return id;
+    }
+
+    // Number of jobs waiting to be sent
+    size_t queued()
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        return queued_jobs.size();
+    }
+
+    // Copy of the job, state JOB_UNKNOWN if there is no such job
+    SmsJob status(uint64_t id)
+    {
+        std::lock_guard<std::mutex> lock(mutex);
+        auto job = jobs.find(id);
+        if (job == jobs.end())
+            return SmsJob{id, 0, "", 0, modemCommunication::JOB_UNKNOWN, "", "", 0, {}};
+        return job->second;
+    }
+
+private:
+    Sender                                  sender;
+    std::chrono::milliseconds               min_interval;
+    size_t                                  history;
+    std::mutex                              mutex;
+    std::condition_variable                 changed;
+    std::thread                             worker;
+    bool                                    running = false;
+    uint64_t                                last_id;
+    std::map<uint64_t, SmsJob>              jobs;           // job id -> job (last `history` jobs)
+    std::deque<uint64_t>                    order;          // job ids, oldest first
+    std::unordered_map<int32_t, uint64_t>   queued_jobs;    // contact -> its queued job
+    std::unordered_map<int32_t, Clock::time_point> next_allowed; // contact -> earliest time of its next SMS
+
+    void forget_old_jobs()
+    {
+        while (order.size() > history) {
+            auto job = jobs.find(order.front());
+            if (job != jobs.end() && job->second.state == modemCommunication::JOB_QUEUED)
+                break;      // queued jobs are never forgotten
+            if (job != jobs.end())
+                jobs.erase(job);
+            order.pop_front();
+        }
+    }
+
+    // Queued job which may be sent first and when; returns false if nothing is queued
+    bool next_job(uint64_t& id, Clock::time_point& ready)
+    {
+        bool found = false;
+        for (const auto& queued : queued_jobs) {
+            auto allowed = next_allowed.find(queued.first);
+            Clock::time_point when = allowed == next_allowed.end() ? Clock::time_point::min() : allowed->second;
+            // Equal times - older job (lower id) first
+            if (!found || when < ready || (when == ready && queued.second < id)) {
+                id    = queued.second;
+                ready = when;
+                found = true;
+            }
+        }
+        return found;
+    }
+
+    void run()
+    {
+        std::unique_lock<std::mutex> lock(mutex);
+
+        while (true) {
+            uint64_t id;
+            Clock::time_point ready;
+
+            if (!next_job(id, ready)) {
+                if (!running)
+                    return;
+                changed.wait(lock);
+                continue;
+            }
+
+            // Rate limit of the contact - on shutdown queued jobs are sent without waiting
+            if (running && ready > Clock::now()) {
+                changed.wait_until(lock, ready);
+                continue;
+            }
+
+            SmsJob& job = jobs.at(id);
+            queued_jobs.erase(job.contact_number);
+            job.state = modemCommunication::JOB_SENDING;
+            SmsJob sending = job;
+
+            lock.unlock();
+            JobState    state  = modemCommunication::JOB_SENT;
+            std::string detail;
+            try {
+                sender(sending);
+            } catch (std::exception& e) {
+                state  = modemCommunication::JOB_FAILED;
+                detail = e.what();
+            }
+            lock.lock();
+
+            next_allowed[sending.contact_number] = Clock::now() + min_interval;
+            auto finished = jobs.find(id);
+            if (finished != jobs.end()) {
+                finished->second.state  = state;
+                finished->second.detail = detail;
+            }
+            forget_old_jobs();
+        }
+    }
+};
@@ -0,0 +1,113 @@
+// Latency tracing of the Modem server - C++ side of tracing.py.
+//
+// Trace context arrives in the gRPC metadata "x-trace-context":
+//     <trace id>;<sample id>;<process>=<monotonic us>,<process>=<monotonic us>...
+// extract() records the transport span from the last hop ("main->modem"),
+// record() adds spans of the Modem server. Spans are kept in a bounded ring
+// (oldest dropped when full) and appended to the trace file as JSON lines by
+// flush(), in the same format as the spans of ADC client and Main server.
+// Timestamps come from std::chrono::steady_clock - CLOCK_MONOTONIC on Linux,
+// the clock of time.monotonic_ns() in the Python processes.
+#include <cstdint>
+#include <string>
+#include <deque>
+#include <mutex>
+#include <chrono>
+#include <fstream>
+#include <stdexcept>
+
+class SpanBuffer {
+public:
+    static constexpr const char* METADATA_KEY = "x-trace-context";
+
+    // capacity 0 - tracing disabled, nothing is recorded
+    SpanBuffer(const std::string& process, size_t capacity, const std::string& path)
+        : process(process), capacity(capacity), path(path) {}
+
+    bool enabled() const { return capacity > 0; }
+
+    static uint64_t now_us()
+    {
+        return std::chrono::duration_cast<std::chrono::microseconds>(std::chrono::steady_clock::now().time_since_epoch()).count();
+    }
+
+    // Records transport span from the sender's hop, returns context ("" if request is not traced)
+    std::string extract(const std::string& context, uint64_t received_us)
+    {
+        if (!enabled() || context.empty())
+            return "";
+
+        size_t hop = context.rfind(',');
+        hop = (hop == std::string::npos) ? context.rfind(';') : hop;
+        size_t equals = context.find('=', hop);
+        if (hop != std::string::npos && equals != std::string::npos) {
+            try {
+                std::string sender  = context.substr(hop + 1, equals - hop - 1);
+                uint64_t    sent_us = std::stoull(context.substr(equals + 1));
+                record(context, sender + "->" + process, sent_us, received_us);
+            } catch (std::exception&) {
+                // malformed hop - context is still passed on
+            }
+        }
+        return context;
+    }
+
+    // Records span of the trace identified by context ("" - nothing is recorded)
+    void record(const std::string& context, const std::string& stage, uint64_t start_us, uint64_t end_us)
+    {
+        if (!enabled() || context.empty())
+            return;
+
+        size_t first = context.find(';');
+        size_t second = context.find(';', first + 1);
+        if (first == std::string::npos || second == std::string::npos)
+            return;
+
+        Span span{context.substr(0, first), 0, stage, start_us, end_us};
+        // Trace id is written into the file as is - only hex ids are accepted
+        if (span.trace_id.find_first_not_of("0123456789abcdef") != std::string::npos)
+            return;
+        try {
+            span.sample_id = std::stoull(context.substr(first + 1, second - first - 1));
+        } catch (std::exception&) {
+            return;
+        }
+
+        std::lock_guard<std::mutex> lock(mutex);
+        if (spans.size() >= capacity)
+            spans.pop_front();
+        spans.push_back(std::move(span));
+    }
+
+    // Appends recorded spans to the trace file
+    void flush()
+    {
+        std::deque<Span> taken;
+        {
+            std::lock_guard<std::mutex> lock(mutex);
+            taken.swap(spans);
+        }
+        if (taken.empty())
+            return;
+
+        std::ofstream file(path, std::ios::app);
+        for (const Span& span : taken)
+            file << "{\"process\":\"" << process << "\",\"trace\":\"" << span.trace_id << "\",\"sample\":" << span.sample_id
+                 << ",\"stage\":\"" << span.stage << "\",\"start_us\":" << span.start_us << ",\"end_us\":" << span.end_us << "}\n";
+    }
+
+private:
+    struct Span {
+        std::string trace_id;
+        uint64_t    sample_id;
+        std::string stage;
+        uint64_t    start_us;
+        uint64_t    end_us;
+    };
+
+    std::string       process;
+    size_t            capacity;
+    std::string       path;
+    std::mutex        mutex;
+    std::deque<Span>  spans;
+};
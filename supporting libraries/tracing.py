@@ -0,0 +1,203 @@
+import json
+import time
+import atexit
+import random
+import logging
+import threading
+import collections
+
+"""
+    Latency tracing of samples across ADC client, Main server and Modem server.
+
+    A trace follows one sample (or batch of samples) from the driver read in
+    ADC client to the SMS decision in the Modem server. Its context travels
+    with the gRPC-requests in metadata (METADATA_KEY):
+
+        <trace id>;<sample id>;<process>=<monotonic us>,<process>=<monotonic us>...
+
+    Every process that sends the request adds a hop with the monotonic time it
+    was sent, the receiving process records the hop as a transport span
+    ("adc->main", "main->modem"). All processes run on one host and use the
+    same monotonic clock (CLOCK_MONOTONIC), so timestamps of different
+    processes can be compared.
+
+    Spans (trace id, sample id, stage, start, end) are appended to a bounded
+    in-memory buffer - one deque.append() per span, no lock and no I/O on the
+    request path. A background thread appends them to the trace file of the
+    process (JSON lines) every flush_interval seconds and at exit.
+    trace_report.py merges the files of all processes.
+
+    Tracing is off unless setup() is called with capacity > 0; then start()
+    and extract() return None and all other functions do nothing.
+"""
+METADATA_KEY = "x-trace-context"
+
+buffer = None   # SpanBuffer of this process, None - tracing is disabled
+
+"""
+    :return: Monotonic time in microseconds (same clock in all processes of the gateway)
+"""
+def now_us():
+    return time.monotonic_ns() // 1000
+
+
+class TraceContext:
+    __slots__ = ("trace_id", "sample_id", "hops")
+
+    """
+        :param trace_id:  Unique id of the trace (hex string)
+        :param sample_id: Id of the traced sample (sequence number of the request)
+        :param hops:      List of (process, monotonic us) the context was sent from
+    """
+    def __init__(self, trace_id, sample_id, hops=None):
+        self.trace_id  = trace_id
+        self.sample_id = sample_id
+        self.hops      = hops if hops is not None else []
+
+    def encode(self):
+        return f"{self.trace_id};{self.sample_id};" + ",".join(f"{process}={t_us}" for process, t_us in self.hops)
+
+    """
+        :param value: Encoded context from metadata
+        :return:      TraceContext, None if value is malformed
+    """
+    @staticmethod
+    def decode(value):
+        try:
+            trace_id, sample_id, hops = value.split(";")
+            hops = [(process, int(t_us)) for process, t_us in (hop.split("=") for hop in hops.split(",") if hop)]
+            return TraceContext(trace_id, int(sample_id), hops)
+        except ValueError:
+            return None
+
+
+"""
+    Bounded buffer of the spans recorded by one process - when it is full
+    the oldest spans are dropped
+"""
+class SpanBuffer:
+
+    """
+        :param process:        Name of the process in the spans and hops ("adc", "main")
+        :param capacity:       Max number of spans kept between two flushes
+        :param path:           Trace file, spans are appended to it as JSON lines
+        :param flush_interval: Seconds between two flushes
+    """
+    def __init__(self, process, capacity, path, flush_interval=5.0):
+        self.process        = process
+        self.path           = path
+        self.flush_interval = flush_interval
+        self.spans          = collections.deque(maxlen=capacity)
+        self.lock           = threading.Lock()      # serializes flushes, never taken by record()
+        self.closed         = threading.Event()
+        self.flusher        = threading.Thread(target=self._flush_periodically, name="trace-flush", daemon=True)
+        self.flusher.start()
+
+    def record(self, trace, stage, start_us, end_us):
+        self.spans.append((trace.trace_id, trace.sample_id, stage, start_us, end_us))
+
+    """
+        Appends recorded spans to the trace file
+    """
+    def flush(self):
+        with self.lock:
+            lines = []
+            while True:
+                try:
+                    trace_id, sample_id, stage, start_us, end_us = self.spans.popleft()
+                except IndexError:
+                    break
+                lines.append(json.dumps({"process": self.process, "trace": trace_id, "sample": sample_id, "stage": stage,
+                                         "start_us": start_us, "end_us": end_us}, separators=(',', ':')) + "\n")
+            if not lines:
+                return
+            try:
+                with open(self.path, "a") as trace_file:
+                    trace_file.write("".join(lines))
+            except OSError as e:
+                logging.error(f"Failed to write {len(lines)} spans to {self.path}: {e}")
+
+    def close(self):
+        self.closed.set()
+        self.flush()
+
+    def _flush_periodically(self):
+        while not self.closed.wait(self.flush_interval):
+            self.flush()
+
+
+"""
+    Enables tracing in this process
+
+    :param process:  Name of the process ("adc", "main")
+    :param capacity: Max number of spans kept in memory between flushes, 0 - tracing disabled
+    :param path:     Trace file of the process
+    :return:         None
+"""
+def setup(process, capacity, path):
+    global buffer
+
+    if capacity <= 0:
+        return
+
+    buffer = SpanBuffer(process, capacity, path)
+    atexit.register(buffer.close)
+    logging.info(f"Tracing enabled: up to {capacity} spans buffered, written to {path}.")
+
+"""
+    Starts new trace
+
+    :param sample_id: Id of the traced sample
+    :return:          TraceContext, None if tracing is disabled
+"""
+def start(sample_id):
+    if buffer is None:
+        return None
+    return TraceContext("%016x" % random.getrandbits(64), sample_id)
+
+"""
+    Records span of the trace
+
+    :param trace:    TraceContext (None - nothing is recorded)
+    :param stage:    Name of the stage (e.g. "main.decide")
+    :param start_us: Start of the stage (now_us())
+    :param end_us:   End of the stage (now_us())
+    :return:         None
+"""
+def record(trace, stage, start_us, end_us):
+    if trace is not None and buffer is not None:
+        buffer.record(trace, stage, start_us, end_us)
+
+"""
+    Adds hop of this process to the trace and returns metadata for the outgoing request
+
+    :param trace:   TraceContext (None - no metadata)
+    :param sent_us: Time the request is sent (now_us())
+    :return:        gRPC metadata carrying the trace context, None if trace is None
+"""
+def metadata(trace, sent_us):
+    if trace is None or buffer is None:
+        return None
+    trace.hops.append((buffer.process, sent_us))
+    return ((METADATA_KEY, trace.encode()),)
+
+"""
+    Takes trace context from metadata of a received request and records the
+    transport span from the sender's hop to this process
+
+    :param invocation_metadata: Metadata of the received request (context.invocation_metadata())
+    :param received_us:         Time the request was received (now_us())
+    :return:                    TraceContext, None if request is not traced or tracing is disabled
+"""
+def extract(invocation_metadata, received_us):
+    if buffer is None:
+        return None
+
+    for key, value in invocation_metadata:
+        if key == METADATA_KEY:
+            trace = TraceContext.decode(value)
+            if trace is not None and trace.hops:
+                sender, sent_us = trace.hops[-1]
+                buffer.record(trace, f"{sender}->{buffer.process}", sent_us, received_us)
+            return trace
+    return None
@@ -0,0 +1,178 @@
+"""trace_report.py
+
+This Python script merges the trace files written by ADC client, Main server
+and Modem server (config keys "trace_buffer" and "trace_path", see tracing.py)
+and reports where the time goes:
+
+    1. Latency of every stage (driver read, detection, transport between the
+       processes, decision, modem request, SMS queue...) - count, p50, p99, max
+       and a histogram with power-of-two microsecond buckets
+    2. End-to-end latency of traces seen by more than one process - from the
+       first span to the last one of the trace
+    3. Optionally all spans in Chrome trace event format (--chrome trace.json),
+       which can be opened in chrome://tracing or https://ui.perfetto.dev
+
+Usage:
+    python3 trace_report.py ADC_trace.jsonl main_trace.jsonl modem_trace.jsonl [--chrome trace.json]
+
+"""
+
+import sys
+import json
+import math
+import argparse
+from collections import defaultdict
+
+END_TO_END = "end-to-end"
+
+"""
+    Reads spans from trace files
+
+    :param paths: Trace files (JSON lines)
+    :return:      List of span dicts, malformed lines are skipped
+"""
+def load_spans(paths):
+    spans = []
+    for path in paths:
+        with open(path) as trace_file:
+            for line_number, line in enumerate(trace_file, 1):
+                try:
+                    span = json.loads(line)
+                    span["start_us"], span["end_us"] = int(span["start_us"]), int(span["end_us"])
+                    spans.append(span)
+                except (ValueError, KeyError, TypeError):
+                    print(f"{path}:{line_number}: malformed span skipped", file=sys.stderr)
+    return spans
+
+"""
+    :param values: Sorted list of numbers
+    :param p:      Percentile (0 - 100)
+    :return:       Nearest-rank percentile
+"""
+def percentile(values, p):
+    return values[max(math.ceil(p / 100 * len(values)) - 1, 0)]
+
+"""
+    Groups span durations by stage and adds end-to-end latency of traces
+    crossing processes
+
+    :param spans: Spans from load_spans()
+    :return:      Dict stage -> sorted list of durations in us
+"""
+def stage_latencies(spans):
+    latencies = defaultdict(list)
+    traces    = defaultdict(list)
+
+    for span in spans:
+        latencies[span["stage"]].append(span["end_us"] - span["start_us"])
+        traces[span["trace"]].append(span)
+
+    for trace_spans in traces.values():
+        if len({span["process"] for span in trace_spans}) > 1:
+            latencies[END_TO_END].append(max(span["end_us"] for span in trace_spans) -
+                                         min(span["start_us"] for span in trace_spans))
+
+    return {stage: sorted(durations) for stage, durations in latencies.items()}
+
+"""
+    Orders stages as they follow each other in a trace - by median start
+    relative to the first span of the trace
+
+    :param spans: Spans from load_spans()
+    :return:      List of stages
+"""
+def stage_order(spans):
+    first   = {}
+    offsets = defaultdict(list)
+
+    for span in spans:
+        first[span["trace"]] = min(first.get(span["trace"], span["start_us"]), span["start_us"])
+    for span in spans:
+        offsets[span["stage"]].append(span["start_us"] - first[span["trace"]])
+
+    return sorted(offsets, key=lambda stage: percentile(sorted(offsets[stage]), 50))
+
+"""
+    :param durations: Sorted durations in us
+    :param width:     Width of the longest bar
+    :return:          Lines of a histogram with power-of-two buckets
+"""
+def histogram(durations, width=40):
+    buckets = defaultdict(int)
+    for duration in durations:
+        buckets[max(duration, 1).bit_length()] += 1
+
+    lines   = []
+    largest = max(buckets.values())
+    for bits in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bits, 0)
+        lines.append(f"    < {1 << bits:>10} us  {count:>8}  {'#' * math.ceil(count / largest * width) if count else ''}")
+    return lines
+
+"""
+    Prints latency report of all stages
+
+    :param latencies:       Result of stage_latencies()
+    :param stages:          Stages in the order they are printed (stage_order())
+    :param show_histograms: Prints histogram of every stage
+    :return:                None
+"""
+def print_report(latencies, stages, show_histograms=True):
+    stages = list(stages)
+    if END_TO_END in latencies:
+        stages.append(END_TO_END)
+
+    print(f"{'stage':<24} {'count':>8} {'p50 us':>10} {'p99 us':>10} {'max us':>10}")
+    for stage in stages:
+        durations = latencies[stage]
+        print(f"{stage:<24} {len(durations):>8} {percentile(durations, 50):>10} {percentile(durations, 99):>10} {durations[-1]:>10}")
+
+    if show_histograms:
+        for stage in stages:
+            print(f"\n{stage}")
+            print("\n".join(histogram(latencies[stage])))
+
+"""
+    Writes spans in Chrome trace event format - one row per process and trace
+
+    :param spans: Spans from load_spans()
+    :param path:  Output file
+    :return:      None
+"""
+def export_chrome(spans, path):
+    processes = {}
+    rows      = {}
+    events    = []
+
+    for span in sorted(spans, key=lambda span: span["start_us"]):
+        pid = processes.setdefault(span["process"], len(processes) + 1)
+        # Spans of concurrent traces overlap - every trace gets its own row
+        tid = rows.setdefault((pid, span["trace"]), len(rows) + 1)
+        events.append({"name": span["stage"], "cat": span["process"], "ph": "X",
+                       "ts": span["start_us"], "dur": span["end_us"] - span["start_us"],
+                       "pid": pid, "tid": tid,
+                       "args": {"trace": span["trace"], "sample": span.get("sample")}})
+
+    for process, pid in processes.items():
+        events.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": process}})
+
+    with open(path, "w") as chrome_file:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, chrome_file)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Merges trace files of the gateway processes into a latency report.")
+    parser.add_argument("traces", nargs="+", help="trace files (trace_path of ADC client, Main server, Modem server)")
+    parser.add_argument("--chrome", metavar="FILE", help="also write spans in Chrome trace event format")
+    parser.add_argument("--no-histograms", action="store_true", help="print only the percentile table")
+    args = parser.parse_args()
+
+    spans = load_spans(args.traces)
+    if not spans:
+        sys.exit("No spans found.")
+
+    print_report(stage_latencies(spans), stage_order(spans), show_histograms=not args.no_histograms)
+
+    if args.chrome:
+        export_chrome(spans, args.chrome)
+        print(f"\nChrome trace with {len(spans)} spans written to {args.chrome}")